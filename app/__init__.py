@@ -6,6 +6,16 @@ from flask import Flask
 from flask_restful import Api
 from flask_cors import CORS
 
+from .config.settings import Config
+from .utils.timing import init_request_timing
+from .utils.metrics import init_metrics
+from .utils.tracing import init_tracing
+from .utils.profiling import init_request_profiling, install_signal_handler
+from .utils.warmup import init_warmup
+from .utils.admission import init_admission_control
+from .messaging.relay import init_outbox_relay
+from .services.logo_url_refresher import init_logo_url_refresh
+
 
 def create_app():
     """Factory function para crear la aplicación Flask"""
@@ -18,6 +28,31 @@ def create_app():
     # Configurar CORS
     cors = CORS(app)
     
+    # Perfilado por petición (?__profile=1) primero, para que envuelva al resto de hooks
+    init_request_profiling(app, Config)
+    install_signal_handler(Config)
+    
+    # Trazas OpenTelemetry (opcional, contexto W3C de los headers entrantes)
+    init_tracing(app, Config)
+    
+    # Medición de tiempos por petición (Server-Timing)
+    init_request_timing(app, Config.REQUEST_TIMING_ENABLED)
+    
+    # Métricas Prometheus (latencia HTTP, repositorio y almacenamiento)
+    init_metrics(app, Config.METRICS_ENABLED)
+    
+    # Limitación de tasa por cliente y control de admisión (después de las métricas, que cuentan los 429/503)
+    init_admission_control(app, Config)
+    
+    # Calentamiento en segundo plano tras el primer health check
+    init_warmup(app, Config)
+    
+    # Relay del outbox de eventos hacia el broker (OUTBOX_ENABLED), iniciado con la primera petición
+    init_outbox_relay(app, Config)
+    
+    # Refresco en segundo plano de las URLs de logo guardadas (LOGO_URL_REFRESH_ENABLED)
+    init_logo_url_refresh(app, Config)
+    
     # Configurar rutas
     configure_routes(app)
     
@@ -27,14 +62,36 @@ def create_app():
 def configure_routes(app):
     """Configura las rutas de la aplicación"""
     from .controllers.health_controller import HealthCheckView
-    from .controllers.provider_controller import ProviderController, ProviderHealthController, ProviderDeleteAllController
+    from .controllers.storage_controller import LocalStorageController
+    from .controllers.metrics_controller import MetricsController
+    from .controllers.admin_controller import ProfilerController, QueryStatsController, CacheStatsController
+    from .controllers.provider_controller import (
+        ProviderController, ProviderHealthController, ProviderDeleteAllController, ProviderLogoUploadController,
+        ProviderJobController, ProviderLookupController, ProviderChangesController
+    )
     
     api = Api(app)
     
-    # Health check endpoints
-    api.add_resource(HealthCheckView, '/providers/ping')
-    api.add_resource(ProviderHealthController, '/providers/health')
+    # Health check endpoints: liveness (sin dependencias) y readiness (dependencias verificadas en segundo plano)
+    api.add_resource(HealthCheckView, '/providers/ping', '/providers/health/live')
+    api.add_resource(ProviderHealthController, '/providers/health', '/providers/health/ready')
+    
+    # Métricas Prometheus
+    if Config.METRICS_ENABLED:
+        api.add_resource(MetricsController, '/metrics')
+    
+    # Administración: perfilado y estadísticas de consultas (requieren ADMIN_TOKEN)
+    api.add_resource(ProfilerController, '/providers/admin/profile')
+    api.add_resource(QueryStatsController, '/providers/admin/queries')
+    api.add_resource(CacheStatsController, '/providers/admin/cache')
     
     # Provider endpoints
     api.add_resource(ProviderController, '/providers', '/providers/<string:provider_id>')
     api.add_resource(ProviderDeleteAllController, '/providers/all')
+    api.add_resource(ProviderLookupController, '/providers/lookup')
+    api.add_resource(ProviderChangesController, '/providers/changes')
+    api.add_resource(ProviderLogoUploadController, '/providers/logo-upload-url')
+    api.add_resource(ProviderJobController, '/providers/jobs/<string:job_id>')
+    
+    # Archivos de los backends de almacenamiento local y en memoria (URLs firmadas por HMAC)
+    api.add_resource(LocalStorageController, '/providers/files/<path:object_path>')
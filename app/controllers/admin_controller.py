@@ -0,0 +1,123 @@
+"""
+Controlador de Administración - Perfilado, estadísticas de consultas y caché de respuestas del proceso
+"""
+import os
+from flask import request, Response
+from typing import Any, Dict, Optional, Tuple
+
+from .base_controller import BaseController
+from ..config.settings import Config
+from ..exceptions.custom_exceptions import ProfilerBusyError
+from ..utils.admin import is_admin_request
+from ..utils.profiling import sample_stacks, render_collapsed
+from ..utils.query_stats import query_stats, SORT_KEYS
+from ..utils.response_cache import get_list_cache
+
+
+class AdminController(BaseController):
+    """Controlador base de los endpoints de administración (X-Admin-Token)"""
+
+    def __init__(self, config=None):
+        self.config = config or Config()
+
+    def authorize(self) -> Optional[Tuple[Dict[str, Any], int]]:
+        """
+        Respuesta de error si la petición no es de un administrador, None si lo es.
+
+        Sin ADMIN_TOKEN configurado los endpoints no existen (404).
+        """
+        if not self.config.ADMIN_TOKEN:
+            return self.error_response("Recurso no encontrado", 404)
+        if not is_admin_request(self.config):
+            return self.error_response("Token de administración inválido", 401)
+        return None
+
+
+class ProfilerController(AdminController):
+    """Controlador para el muestreo de pilas de todos los hilos del worker"""
+
+    def get(self):
+        """GET /providers/admin/profile?seconds=N&interval_ms=M - Pilas en formato collapsed"""
+        denied = self.authorize()
+        if denied:
+            return denied
+
+        seconds = request.args.get('seconds', default=10.0, type=float)
+        interval_ms = request.args.get('interval_ms', default=self.config.PROFILE_SAMPLE_INTERVAL_MS, type=float)
+        if not 0 < seconds <= self.config.PROFILE_MAX_SECONDS:
+            return self.error_response(
+                f"seconds debe estar entre 0 y {self.config.PROFILE_MAX_SECONDS:g}", 400
+            )
+        if interval_ms < 1:
+            return self.error_response("interval_ms debe ser al menos 1", 400)
+
+        try:
+            stacks, samples = sample_stacks(seconds, interval_ms / 1000)
+        except ProfilerBusyError as e:
+            return self.error_response(e.message, 409)
+
+        return Response(
+            render_collapsed(stacks),
+            mimetype='text/plain',
+            headers={'X-Profile-Samples': str(samples)}
+        )
+
+
+class QueryStatsController(AdminController):
+    """Controlador para las estadísticas por forma de sentencia SQL del worker"""
+
+    def get(self) -> Tuple[Dict[str, Any], int]:
+        """GET /providers/admin/queries?sort=total|mean|max|calls|slow&limit=N - Formas de sentencia más costosas"""
+        denied = self.authorize()
+        if denied:
+            return denied
+
+        sort = request.args.get('sort', 'total')
+        limit = request.args.get('limit', default=50, type=int)
+        if sort not in SORT_KEYS:
+            return self.error_response(f"sort debe ser uno de: {', '.join(SORT_KEYS)}", 400)
+        if limit < 1:
+            return self.error_response("limit debe ser un entero positivo", 400)
+
+        data = {
+            'pid': os.getpid(),
+            'threshold_ms': self.config.SLOW_QUERY_THRESHOLD_MS,
+            'dropped': query_stats.dropped,
+            'queries': query_stats.snapshot(sort=sort, limit=limit)
+        }
+        return self.success_response(data=data, message="Estadísticas de consultas obtenidas exitosamente")
+
+    def delete(self) -> Tuple[Dict[str, Any], int]:
+        """DELETE /providers/admin/queries - Reinicia las estadísticas del worker"""
+        denied = self.authorize()
+        if denied:
+            return denied
+
+        query_stats.reset()
+        return self.success_response(message="Estadísticas de consultas reiniciadas")
+
+
+class CacheStatsController(AdminController):
+    """Controlador para la caché de páginas de GET /providers del worker"""
+
+    def get(self) -> Tuple[Dict[str, Any], int]:
+        """GET /providers/admin/cache - Tamaño, aciertos, fallos y descartes"""
+        denied = self.authorize()
+        if denied:
+            return denied
+
+        cache = get_list_cache(self.config)
+        data = {'pid': os.getpid(), 'enabled': cache is not None}
+        if cache is not None:
+            data.update(cache.snapshot())
+        return self.success_response(data=data, message="Estadísticas de caché obtenidas exitosamente")
+
+    def delete(self) -> Tuple[Dict[str, Any], int]:
+        """DELETE /providers/admin/cache - Vacía la caché del worker"""
+        denied = self.authorize()
+        if denied:
+            return denied
+
+        cache = get_list_cache(self.config)
+        cleared = cache.clear() if cache is not None else 0
+        return self.success_response(data={'cleared': cleared}, message="Caché vaciada")
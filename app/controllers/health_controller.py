@@ -9,6 +9,7 @@ class HealthCheckView(Resource):
     
     def get(self):
         """
-        Usado para verificar el estado del servicio de proveedores.
+        Usado para verificar el estado del servicio de proveedores (liveness).
+        No consulta dependencias: solo indica que el proceso atiende peticiones.
         """
         return "pong", 200
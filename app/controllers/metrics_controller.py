@@ -0,0 +1,16 @@
+"""
+Controlador de Métricas - Exposición en formato Prometheus
+"""
+from flask import Response
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from .base_controller import BaseController
+from ..utils.metrics import render_metrics
+
+
+class MetricsController(BaseController):
+    """Controlador para el endpoint /metrics"""
+    
+    def get(self) -> Response:
+        """GET /metrics - Métricas del servicio (agregadas entre workers de gunicorn)"""
+        return Response(render_metrics(), mimetype=CONTENT_TYPE_LATEST)
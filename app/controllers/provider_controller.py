@@ -1,33 +1,94 @@
 """
 Controlador de Proveedores - Endpoints REST para gestión de proveedores
 """
-from flask import request
+import json
+import time
+import logging
+from datetime import datetime, timedelta
+from flask import request, Response
 from flask_restful import Resource
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 from werkzeug.datastructures import FileStorage
 
 from .base_controller import BaseController
-from ..services.provider_service import ProviderService
+from ..config.settings import Config
 from ..exceptions.custom_exceptions import ValidationError, BusinessLogicError, NotFoundError
+from ..messaging.relay import get_relay
+from ..services.logo_url_refresher import get_refresher
+from ..models.provider_model import Provider
+from ..utils.change_cursor import parse_since
+from ..utils.collection_version import providers_version
+from ..utils.health import health_checker, STATUS_HEALTHY, STATUS_DEGRADED
+from ..utils.response_cache import get_list_cache
+from ..utils.timing import timed
+
+logger = logging.getLogger(__name__)
+
+
+def _default_provider_service():
+    """ProviderService del controlador; se importa al primer uso para que arrancar no cargue SQLAlchemy"""
+    from ..services.provider_service import ProviderService
+    return ProviderService()
+
+
+def _parse_ids(values: List[Any], max_ids: int) -> List[str]:
+    """Normaliza los IDs pedidos: sin espacios ni vacíos, sin repetidos y en el orden recibido"""
+    if any(not isinstance(value, str) for value in values):
+        raise ValidationError("Los IDs deben ser cadenas de texto")
+    ids = list(dict.fromkeys(value.strip() for value in values if value.strip()))
+    if not ids:
+        raise ValidationError("Debe indicar al menos un ID en 'ids'")
+    if len(ids) > max_ids:
+        raise ValidationError(f"Se permiten como máximo {max_ids} IDs por consulta")
+    return ids
+
+
+def _lookup_data(provider_service, ids: List[str], fields: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+    """Proveedores en el orden pedido, marcando explícitamente los IDs que no existen"""
+    providers = provider_service.get_by_ids(ids, fields=fields)
+    results = [
+        {'id': provider_id, 'found': provider is not None, 'provider': provider.to_dict(fields) if provider else None}
+        for provider_id, provider in zip(ids, providers)
+    ]
+    return {
+        'providers': results,
+        'found': sum(1 for result in results if result['found']),
+        'not_found': [result['id'] for result in results if not result['found']]
+    }
 
 
 class ProviderController(BaseController):
     """Controlador para operaciones REST de proveedores"""
     
-    def __init__(self, provider_service=None):
-        self.provider_service = provider_service or ProviderService()
+    def __init__(self, provider_service=None, config=None):
+        self.provider_service = provider_service or _default_provider_service()
+        self.config = config or Config()
     
+    @timed('controller.ProviderController.get')
     def get(self, provider_id: str = None) -> Tuple[Dict[str, Any], int]:
-        """GET /providers o GET /providers/{id}"""
+        """GET /providers o GET /providers/{id} (?fields=id,name para pedir solo esos campos, ?ids=a,b para varios IDs)"""
         try:
+            try:
+                fields = Provider.parse_fields(request.args.get('fields'))
+            except ValueError as e:
+                return self.error_response(str(e), 400)
+            
+            if not provider_id and 'ids' in request.args:
+                # Consulta por varios IDs en una sola ida a la base
+                ids = _parse_ids(request.args.get('ids', '').split(','), self.config.MULTI_GET_MAX_IDS)
+                return self.success_response(
+                    data=_lookup_data(self.provider_service, ids, fields),
+                    message="Proveedores obtenidos exitosamente"
+                )
+            
             if provider_id:
                 # Obtener un proveedor específico
-                provider = self.provider_service.get_by_id(provider_id)
+                provider = self.provider_service.get_by_id(provider_id, fields=fields)
                 if not provider:
                     return self.error_response("Proveedor no encontrado", 404)
                 
                 return self.success_response(
-                    data=provider.to_dict(),
+                    data=provider.to_dict(fields),
                     message="Proveedor obtenido exitosamente"
                 )
             else:
@@ -42,12 +103,23 @@ class ProviderController(BaseController):
                 if per_page < 1 or per_page > 100:
                     return self.error_response("El parámetro 'per_page' debe estar entre 1 y 100", 400)
                 
+                cache = get_list_cache(self.config)
+                cache_key = ('list', page, per_page, fields)
+                if cache is not None:
+                    # La marca compartida detecta escrituras de otros workers e instancias
+                    stamp = self.provider_service.get_collection_stamp()
+                    body = cache.get(cache_key, stamp)
+                    if body is not None:
+                        return Response(body, mimetype='application/json', headers={'X-Cache': 'HIT'})
+                version = providers_version.value
+                
                 offset = (page - 1) * per_page
                 
                 # Obtener proveedores y total
                 providers = self.provider_service.get_providers_summary(
                     limit=per_page,
-                    offset=offset
+                    offset=offset,
+                    fields=fields
                 )
                 total = self.provider_service.get_providers_count()
                 
@@ -56,7 +128,7 @@ class ProviderController(BaseController):
                 has_next = page < total_pages
                 has_prev = page > 1
                 
-                return self.success_response(
+                response = self.success_response(
                     data={
                         'providers': providers,
                         'pagination': {
@@ -72,12 +144,35 @@ class ProviderController(BaseController):
                     },
                     message="Lista de proveedores obtenida exitosamente"
                 )
+                if cache is None:
+                    return response
+                self._cache_list_response(cache, cache_key, version, stamp, response[0], providers)
+                return response + ({'X-Cache': 'MISS'},)
                 
+        except ValidationError as e:
+            return self.error_response(str(e), 400)
         except BusinessLogicError as e:
             return self.error_response(str(e), 500)
         except Exception as e:
             return self.handle_exception(e)
     
+    def _cache_list_response(self, cache, key: tuple, version: int, stamp: tuple,
+                             body: Dict[str, Any], providers: list) -> None:
+        """Guarda la página serializada hasta el TTL o hasta poco antes del vencimiento de su primera URL firmada"""
+        try:
+            expires_at = self.provider_service.logo_urls_expire_at(providers)
+            if expires_at is None:
+                return
+            expires_at = min(
+                time.time() + self.config.RESPONSE_CACHE_TTL_SECONDS,
+                expires_at - self.config.RESPONSE_CACHE_URL_MARGIN_SECONDS
+            )
+            cache.put(key, json.dumps(body) + '\n', version, expires_at, stamp)
+        except (TypeError, ValueError) as e:
+            # La caché nunca debe hacer fallar la respuesta ya calculada
+            logger.warning(f"No se pudo guardar la página en caché: {e}")
+    
+    @timed('controller.ProviderController.post')
     def post(self) -> Tuple[Dict[str, Any], int]:
         """POST /providers - Crear nuevo proveedor (soporta JSON y multipart)"""
         try:
@@ -112,6 +207,27 @@ class ProviderController(BaseController):
             print(f"Error en crear proveedor: {error_trace}")  # Log para debugging
             return self.error_response(f"Error del sistema: {str(e)}", 500)
     
+    @timed('controller.ProviderController.delete')
+    def delete(self, provider_id: str = None) -> Tuple[Dict[str, Any], int]:
+        """DELETE /providers/{id} - Eliminar un proveedor (el logo se limpia en segundo plano)"""
+        try:
+            if not provider_id:
+                return self.error_response("Debe indicar el ID del proveedor", 400)
+            
+            result = self.provider_service.delete(provider_id)
+            
+            return self.success_response(
+                data=result,
+                message="Proveedor eliminado exitosamente"
+            )
+            
+        except NotFoundError as e:
+            return self.error_response(str(e), 404)
+        except BusinessLogicError as e:
+            return self.error_response(str(e), 500)
+        except Exception as e:
+            return self.handle_exception(e)
+    
     def _process_json_request(self) -> Dict[str, Any]:
         """Procesa una petición JSON"""
         try:
@@ -129,7 +245,9 @@ class ProviderController(BaseController):
                 'name': json_data['name'].strip(),
                 'email': json_data['email'].strip(),
                 'phone': json_data['phone'].strip(),
-                'logo_file': None  # JSON no soporta archivos
+                'logo_file': None,  # JSON no soporta archivos
+                'uploaded_logo_filename': (json_data.get('logo_filename') or '').strip() or None,
+                'uploaded_logo_token': (json_data.get('logo_upload_token') or '').strip() or None
             }
             
         except Exception as e:
@@ -169,19 +287,144 @@ class ProviderController(BaseController):
             raise ValidationError(f"Error al procesar formulario: {str(e)}")
 
 
+class ProviderLogoUploadController(BaseController):
+    """Controlador para generar URLs firmadas de subida directa de logos"""
+    
+    def __init__(self, provider_service=None):
+        self.provider_service = provider_service or _default_provider_service()
+    
+    @timed('controller.ProviderLogoUploadController.post')
+    def post(self) -> Tuple[Dict[str, Any], int]:
+        """POST /providers/logo-upload-url - Generar URL firmada para subir el logo al bucket"""
+        try:
+            json_data = request.get_json(silent=True) or {}
+            filename = (json_data.get('filename') or '').strip()
+            if not filename:
+                return self.error_response("El campo 'filename' es obligatorio", 400)
+            
+            upload = self.provider_service.create_logo_upload_url(filename)
+            
+            return self.success_response(
+                data=upload,
+                message="URL de subida generada exitosamente",
+                status_code=201
+            )
+            
+        except ValidationError as e:
+            return self.error_response(str(e), 400)
+        except BusinessLogicError as e:
+            return self.error_response(str(e), 500)
+        except Exception as e:
+            return self.handle_exception(e)
+
+
+class ProviderLookupController(BaseController):
+    """Controlador para consultar varios proveedores por ID (listas largas en el cuerpo)"""
+    
+    def __init__(self, provider_service=None, config=None):
+        self.provider_service = provider_service or _default_provider_service()
+        self.config = config or Config()
+    
+    @timed('controller.ProviderLookupController.post')
+    def post(self) -> Tuple[Dict[str, Any], int]:
+        """POST /providers/lookup - {"ids": [...], "fields": [...]} con la misma respuesta que GET /providers?ids="""
+        try:
+            json_data = request.get_json(silent=True) or {}
+            ids = json_data.get('ids')
+            if not isinstance(ids, list):
+                return self.error_response("El campo 'ids' debe ser una lista", 400)
+            ids = _parse_ids(ids, self.config.MULTI_GET_MAX_IDS)
+            
+            fields = json_data.get('fields')
+            if isinstance(fields, list) and all(isinstance(field, str) for field in fields):
+                fields = ','.join(fields)
+            if fields is not None and not isinstance(fields, str):
+                return self.error_response("El campo 'fields' debe ser una lista de cadenas", 400)
+            try:
+                fields = Provider.parse_fields(fields)
+            except ValueError as e:
+                return self.error_response(str(e), 400)
+            
+            return self.success_response(
+                data=_lookup_data(self.provider_service, ids, fields),
+                message="Proveedores obtenidos exitosamente"
+            )
+            
+        except ValidationError as e:
+            return self.error_response(str(e), 400)
+        except BusinessLogicError as e:
+            return self.error_response(str(e), 500)
+        except Exception as e:
+            return self.handle_exception(e)
+
+
+class ProviderChangesController(BaseController):
+    """Controlador del feed de cambios para sincronización incremental"""
+    
+    def __init__(self, provider_service=None, config=None):
+        self.provider_service = provider_service or _default_provider_service()
+        self.config = config or Config()
+    
+    @timed('controller.ProviderChangesController.get')
+    def get(self) -> Tuple[Dict[str, Any], int]:
+        """GET /providers/changes?since=<token|fecha>&limit=N - Altas y eliminaciones en orden (updated_at, id)"""
+        try:
+            try:
+                after = parse_since(request.args.get('since'))
+                fields = Provider.parse_fields(request.args.get('fields'))
+            except ValueError as e:
+                return self.error_response(str(e), 400)
+            
+            limit = request.args.get('limit', self.config.CHANGES_FEED_DEFAULT_LIMIT, type=int)
+            if limit < 1 or limit > self.config.CHANGES_FEED_MAX_LIMIT:
+                return self.error_response(
+                    f"El parámetro 'limit' debe estar entre 1 y {self.config.CHANGES_FEED_MAX_LIMIT}", 400
+                )
+            
+            # Las lápidas más antiguas que la retención ya se descartaron: el cliente debe resincronizar
+            retention = timedelta(days=self.config.CHANGES_TOMBSTONE_RETENTION_DAYS)
+            if after is not None and after[0] < datetime.utcnow() - retention:
+                return self.error_response(
+                    "La posición 'since' es anterior a la retención de eliminaciones; sincronice desde el inicio", 410
+                )
+            
+            return self.success_response(
+                data=self.provider_service.get_changes(after, limit, fields=fields),
+                message="Cambios de proveedores obtenidos exitosamente"
+            )
+            
+        except BusinessLogicError as e:
+            return self.error_response(str(e), 500)
+        except Exception as e:
+            return self.handle_exception(e)
+
+
 class ProviderHealthController(BaseController):
-    """Controlador para health check de proveedores"""
+    """Controlador de readiness: estado de la base de datos y del almacenamiento"""
+    
+    def __init__(self, config=None):
+        self.config = config or Config()
     
     def get(self) -> Tuple[Dict[str, Any], int]:
-        """GET /providers/ping - Health check"""
+        """GET /providers/health - Último resultado de la verificación de dependencias (503 si no está listo)"""
         try:
+            health_checker.ensure_started(self.config)
+            report = health_checker.snapshot(self.config)
+            ready = report['status'] in (STATUS_HEALTHY, STATUS_DEGRADED)
+            if self.config.OUTBOX_ENABLED:
+                # Informativo: con el broker caído los eventos esperan en el outbox y el worker sigue listo
+                report = {**report, 'outbox': get_relay(self.config).snapshot()}
+            if self.config.LOGO_URL_REFRESH_ENABLED:
+                report = {**report, 'logo_url_refresh': get_refresher(self.config).snapshot()}
             return self.success_response(
                 data={
                     'service': 'providers',
-                    'status': 'healthy',
-                    'version': '1.0.0'
+                    'version': '1.0.0',
+                    **report
                 },
-                message="Servicio de proveedores funcionando correctamente"
+                message="Servicio de proveedores funcionando correctamente" if ready
+                else "Servicio de proveedores no disponible",
+                status_code=200 if ready else 503
             )
         except Exception as e:
             return self.handle_exception(e)
@@ -191,17 +434,20 @@ class ProviderDeleteAllController(BaseController):
     """Controlador para eliminar todos los proveedores"""
     
     def __init__(self, provider_service=None):
-        self.provider_service = provider_service or ProviderService()
+        self.provider_service = provider_service or _default_provider_service()
     
+    @timed('controller.ProviderDeleteAllController.delete')
     def delete(self) -> Tuple[Dict[str, Any], int]:
         """DELETE /providers/all - Eliminar todos los proveedores"""
         try:
-            # Eliminar todos los proveedores
-            deleted_count = self.provider_service.delete_all()
+            # Eliminar todos los proveedores (los logos se limpian en segundo plano)
+            result = self.provider_service.delete_all()
+            deleted_count = result['deleted_count']
             
             return self.success_response(
                 data={
-                    'deleted_count': deleted_count
+                    'deleted_count': deleted_count,
+                    'cleanup_job': result['cleanup_job']
                 },
                 message=f"Se eliminaron {deleted_count} proveedores exitosamente"
             )
@@ -209,4 +455,27 @@ class ProviderDeleteAllController(BaseController):
         except BusinessLogicError as e:
             return self.error_response("Error temporal del sistema. Contacte soporte técnico si persiste", 500)
         except Exception as e:
-            return self.error_response("Error temporal del sistema. Contacte soporte técnico si persiste", 500)
\ No newline at end of file
+            return self.error_response("Error temporal del sistema. Contacte soporte técnico si persiste", 500)
+
+
+class ProviderJobController(BaseController):
+    """Controlador para consultar el progreso de trabajos en segundo plano"""
+    
+    def __init__(self, provider_service=None):
+        self.provider_service = provider_service or _default_provider_service()
+    
+    @timed('controller.ProviderJobController.get')
+    def get(self, job_id: str) -> Tuple[Dict[str, Any], int]:
+        """GET /providers/jobs/{id} - Estado y progreso de un trabajo"""
+        try:
+            job = self.provider_service.get_job(job_id)
+            if not job:
+                return self.error_response("Trabajo no encontrado", 404)
+            
+            return self.success_response(
+                data=job,
+                message="Estado del trabajo obtenido exitosamente"
+            )
+            
+        except Exception as e:
+            return self.handle_exception(e)
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""
+Controlador de archivos locales - Sirve y recibe objetos de los backends local y en memoria
+"""
+import io
+from flask import request, send_file, make_response
+from typing import Dict, Any, Tuple
+
+from .base_controller import BaseController
+from ..config.settings import Config
+from ..storage import get_storage_backend
+from ..storage.local_storage import LocalStorageBackend
+
+
+class LocalStorageController(BaseController):
+    """Controlador para URLs firmadas por HMAC de los backends servidos por la API"""
+    
+    def __init__(self, storage_backend=None, config=None):
+        self.config = config or Config()
+        self.storage_backend = storage_backend or get_storage_backend(self.config)
+    
+    def get(self, object_path: str):
+        """GET /providers/files/{path} - Descargar un objeto con URL firmada"""
+        signer = getattr(self.storage_backend, 'signer', None)
+        if signer is None:
+            return self.error_response("Archivo no encontrado", 404)
+        
+        if not self._has_valid_signature(signer, object_path, 'GET'):
+            return self.error_response("Firma inválida o expirada", 403)
+        
+        info = self.storage_backend.stat(object_path)
+        if info is None:
+            return self.error_response("Archivo no encontrado", 404)
+        
+        mimetype = info.get('content_type') or 'application/octet-stream'
+        
+        if isinstance(self.storage_backend, LocalStorageBackend):
+            # Delegar la transferencia al proxy (nginx) si está configurado
+            if self.config.LOCAL_STORAGE_X_ACCEL_PREFIX:
+                response = make_response('', 200)
+                response.headers['X-Accel-Redirect'] = f"{self.config.LOCAL_STORAGE_X_ACCEL_PREFIX.rstrip('/')}/{object_path}"
+                response.headers['Content-Type'] = mimetype
+                return response
+            return send_file(self.storage_backend.file_path(object_path), mimetype=mimetype)
+        
+        return send_file(io.BytesIO(self.storage_backend.get(object_path)), mimetype=mimetype)
+    
+    def put(self, object_path: str) -> Tuple[Dict[str, Any], int]:
+        """PUT /providers/files/{path} - Subir un objeto con URL firmada de subida"""
+        signer = getattr(self.storage_backend, 'signer', None)
+        if signer is None:
+            return self.error_response("Archivo no encontrado", 404)
+        
+        content_type = request.mimetype
+        if not self._has_valid_signature(signer, object_path, 'PUT', content_type):
+            return self.error_response("Firma inválida o expirada", 403)
+        
+        data = request.get_data()
+        if len(data) > self.config.MAX_CONTENT_LENGTH:
+            return self.error_response(
+                f"El archivo es demasiado grande. Máximo: {self.config.MAX_CONTENT_LENGTH // (1024*1024)}MB", 413
+            )
+        
+        self.storage_backend.put(object_path, io.BytesIO(data), content_type)
+        
+        return self.success_response(message="Archivo subido exitosamente")
+    
+    def _has_valid_signature(self, signer, object_path: str, method: str, content_type: str = None) -> bool:
+        """Verifica la firma HMAC de la URL de la petición"""
+        return signer.verify(
+            object_path,
+            method,
+            request.args.get('expires'),
+            request.args.get('signature'),
+            content_type
+        )
@@ -45,4 +45,47 @@ class NotFoundError(ProviderException):
     """Excepción para recursos no encontrados"""
     
     def __init__(self, message: str):
-        super().__init__(message, "NOT_FOUND_ERROR")
\ No newline at end of file
+        super().__init__(message, "NOT_FOUND_ERROR")
+
+
+class StorageError(ProviderException):
+    """Excepción para errores del backend de almacenamiento de objetos"""
+    
+    def __init__(self, message: str):
+        super().__init__(message, "STORAGE_ERROR")
+
+
+class PartialDeleteError(StorageError):
+    """Excepción cuando una eliminación por lotes no pudo eliminar algunos objetos"""
+    
+    def __init__(self, message: str, deleted: int, failed: list):
+        super().__init__(message)
+        self.deleted = deleted
+        self.failed = failed
+
+
+class CircuitOpenError(ProviderException):
+    """Excepción cuando un circuit breaker rechaza la llamada a una dependencia caída"""
+    
+    def __init__(self, message: str):
+        super().__init__(message, "CIRCUIT_OPEN")
+
+
+class ProfilerBusyError(ProviderException):
+    """Excepción cuando ya hay un muestreo de perfilado en curso en el proceso"""
+    
+    def __init__(self, message: str):
+        super().__init__(message, "PROFILER_BUSY")
+
+
+class PublishError(ProviderException):
+    """
+    Excepción cuando el broker de eventos rechaza o no confirma una publicación
+    
+    unavailable indica que el broker no respondió (conexión): el lote no se rechazó y
+    el fallo no cuenta como intento para OUTBOX_MAX_ATTEMPTS.
+    """
+    
+    def __init__(self, message: str, unavailable: bool = False):
+        super().__init__(message, "PUBLISH_ERROR")
+        self.unavailable = unavailable
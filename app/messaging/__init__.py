@@ -0,0 +1,39 @@
+# Publicadores de eventos de cambio del sistema de proveedores
+import threading
+
+from .base_publisher import EventPublisher, OutboxEvent
+
+_publishers = {}
+_publishers_lock = threading.Lock()
+
+
+def create_publisher(config) -> EventPublisher:
+    """Crea el publicador indicado en EVENTS_BROKER"""
+    broker = (config.EVENTS_BROKER or 'rabbitmq').lower()
+
+    if broker == 'memory':
+        from .memory_publisher import MemoryPublisher
+        return MemoryPublisher()
+
+    if broker == 'rabbitmq':
+        from .rabbitmq_publisher import RabbitMQPublisher
+        return RabbitMQPublisher(config.RABBITMQ_URL, config.RABBITMQ_EXCHANGE)
+
+    raise ValueError(f"Broker de eventos no soportado: {config.EVENTS_BROKER}")
+
+
+def get_publisher(config) -> EventPublisher:
+    """Obtiene el publicador compartido del proceso para la configuración (se crea una sola vez)"""
+    key = ((config.EVENTS_BROKER or 'rabbitmq').lower(), config.RABBITMQ_URL, config.RABBITMQ_EXCHANGE)
+    with _publishers_lock:
+        if key not in _publishers:
+            _publishers[key] = create_publisher(config)
+        return _publishers[key]
+
+
+def close_publishers() -> None:
+    """Cierra y descarta los publicadores del proceso (tras un fork o entre pruebas)"""
+    with _publishers_lock:
+        for publisher in _publishers.values():
+            publisher.close()
+        _publishers.clear()
@@ -0,0 +1,42 @@
+"""
+Publicador de eventos base - Interfaz para brokers de mensajería
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+
+
+class OutboxEvent:
+    """Evento de cambio leído del outbox, listo para publicar (attempts: lotes rechazados que lo incluían)"""
+
+    __slots__ = ('id', 'event_type', 'aggregate_id', 'payload', 'created_at', 'attempts')
+
+    def __init__(self, id: str, event_type: str, aggregate_id: Optional[str], payload: str, created_at: datetime,
+                 attempts: int = 0):
+        self.id = id
+        self.event_type = event_type
+        self.aggregate_id = aggregate_id
+        self.payload = payload
+        self.created_at = created_at
+        self.attempts = attempts
+
+
+class EventPublisher(ABC):
+    """Interfaz común para los brokers a los que el relay publica el outbox"""
+
+    # Nombre legible del broker para mensajes de error
+    display_name = "broker"
+
+    @abstractmethod
+    def publish_batch(self, events: List[OutboxEvent]) -> None:
+        """
+        Publica los eventos en orden y retorna solo cuando el broker confirmó todos
+
+        Raises:
+            PublishError: Si el broker rechazó o no confirmó alguno (el lote se reintenta completo)
+        """
+        pass
+
+    def close(self) -> None:
+        """Libera la conexión con el broker (por defecto no hace nada)"""
+        pass
@@ -0,0 +1,45 @@
+"""
+Broker en memoria - Sustituto local de RabbitMQ para pruebas y desarrollo
+"""
+import json
+import threading
+from typing import Any, Dict, List
+
+from .base_publisher import EventPublisher, OutboxEvent
+from ..exceptions.custom_exceptions import PublishError
+
+
+class MemoryPublisher(EventPublisher):
+    """
+    Guarda los mensajes confirmados en memoria
+
+    reject_next simula rechazos (nack) de los próximos lotes y reject_ids el rechazo de todo
+    lote que incluya alguno de esos eventos.
+    """
+
+    display_name = "broker en memoria"
+
+    def __init__(self):
+        self.messages: List[Dict[str, Any]] = []
+        self.reject_next = 0
+        self.reject_ids = set()
+        self._lock = threading.Lock()
+
+    def publish_batch(self, events: List[OutboxEvent]) -> None:
+        with self._lock:
+            if self.reject_next:
+                self.reject_next -= 1
+                raise PublishError("El broker en memoria rechazó el lote")
+            if any(event.id in self.reject_ids for event in events):
+                raise PublishError("El broker en memoria rechazó un evento del lote")
+            for event in events:
+                self.messages.append({
+                    'message_id': event.id,
+                    'routing_key': event.event_type,
+                    'body': json.loads(event.payload)
+                })
+
+    def routing_keys(self) -> List[str]:
+        """Claves de enrutamiento de los mensajes recibidos, en orden"""
+        with self._lock:
+            return [message['routing_key'] for message in self.messages]
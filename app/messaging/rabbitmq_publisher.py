@@ -0,0 +1,89 @@
+"""
+Publicador de eventos sobre RabbitMQ (pika) con confirmaciones del broker
+"""
+import logging
+import threading
+from datetime import timezone
+from typing import List
+
+import pika
+
+from .base_publisher import EventPublisher, OutboxEvent
+from ..exceptions.custom_exceptions import PublishError
+
+logger = logging.getLogger(__name__)
+
+# Errores tras los que la conexión queda inservible y se vuelve a abrir
+CONNECTION_ERRORS = (pika.exceptions.AMQPConnectionError, pika.exceptions.AMQPChannelError)
+
+
+class RabbitMQPublisher(EventPublisher):
+    """
+    Publica en un exchange topic durable, con la clave de enrutamiento igual al tipo de evento
+
+    El canal trabaja en modo confirm: con el adaptador bloqueante de pika cada basic_publish
+    espera el ack del broker, así que al retornar publish_batch todo el lote quedó persistido
+    (mensajes persistentes en colas durables). El message_id es el id del evento para que los
+    consumidores descarten duplicados: la entrega es al menos una vez.
+    """
+
+    display_name = "RabbitMQ"
+
+    def __init__(self, url: str, exchange: str):
+        self.parameters = pika.URLParameters(url)
+        self.exchange = exchange
+        self._connection = None
+        self._channel = None
+        self._lock = threading.Lock()
+
+    def publish_batch(self, events: List[OutboxEvent]) -> None:
+        with self._lock:
+            # Una conexión cerrada por el broker mientras el relay estaba inactivo se reabre una vez
+            for attempt in range(2):
+                try:
+                    channel = self._ensure_channel()
+                    for event in events:
+                        channel.basic_publish(
+                            exchange=self.exchange,
+                            routing_key=event.event_type,
+                            body=event.payload.encode('utf-8'),
+                            properties=pika.BasicProperties(
+                                content_type='application/json',
+                                delivery_mode=pika.spec.PERSISTENT_DELIVERY_MODE,
+                                message_id=event.id,
+                                type=event.event_type,
+                                timestamp=int(event.created_at.replace(tzinfo=timezone.utc).timestamp())
+                            )
+                        )
+                    return
+                except pika.exceptions.NackError as e:
+                    raise PublishError(f"RabbitMQ rechazó {len(e.messages)} mensajes del lote")
+                except CONNECTION_ERRORS as e:
+                    self._close_connection()
+                    if attempt:
+                        raise PublishError(
+                            f"Error de conexión con RabbitMQ: {str(e) or type(e).__name__}", unavailable=True
+                        )
+                    logger.info(f"Reconectando con RabbitMQ: {str(e) or type(e).__name__}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_connection()
+
+    def _ensure_channel(self):
+        """Abre la conexión y el canal en modo confirm la primera vez o tras un error"""
+        if self._channel is None or not self._channel.is_open:
+            self._close_connection()
+            self._connection = pika.BlockingConnection(self.parameters)
+            self._channel = self._connection.channel()
+            self._channel.exchange_declare(exchange=self.exchange, exchange_type='topic', durable=True)
+            self._channel.confirm_delivery()
+        return self._channel
+
+    def _close_connection(self) -> None:
+        connection, self._connection, self._channel = self._connection, None, None
+        if connection is not None and connection.is_open:
+            try:
+                connection.close()
+            except Exception as e:
+                logger.debug(f"Error al cerrar la conexión con RabbitMQ: {e}")
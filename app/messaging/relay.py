@@ -0,0 +1,179 @@
+"""
+Relay del outbox - Publica en el broker los eventos escritos por el repositorio
+
+Corre en un hilo por worker, iniciado con la primera petición (OUTBOX_ENABLED). Publica
+lotes de OUTBOX_BATCH_SIZE eventos en orden de creación hasta vaciar el outbox; luego
+espera OUTBOX_POLL_SECONDS o hasta que una escritura del propio proceso lo despierte.
+Si el broker falla, espera con backoff exponencial hasta OUTBOX_MAX_BACKOFF_SECONDS:
+los eventos siguen en el outbox y nada se pierde mientras el broker no esté disponible.
+Un evento que el broker rechaza OUTBOX_MAX_ATTEMPTS veces queda apartado en el outbox
+(se registra en el log y en providers_outbox_events_total{result="parked"}) para que
+no detenga a los siguientes.
+"""
+import random
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from ..utils import metrics
+from ..utils.collection_version import providers_version
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    """Publica el outbox de proveedores con el publicador configurado"""
+
+    def __init__(self, config, repository=None, publisher=None):
+        self.config = config
+        self._repository = repository
+        self._publisher = publisher
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = {
+            'published': 0, 'failures': 0, 'parked': 0, 'last_error': None, 'backoff_seconds': 0.0
+        }
+
+    @property
+    def repository(self):
+        if self._repository is None:
+            from ..repositories.provider_repository import ProviderRepository
+            self._repository = ProviderRepository()
+        return self._repository
+
+    @property
+    def publisher(self):
+        if self._publisher is None:
+            from . import get_publisher
+            self._publisher = get_publisher(self.config)
+        return self._publisher
+
+    def run_once(self) -> int:
+        """
+        Publica lotes hasta vaciar el outbox
+
+        Returns:
+            int: Eventos publicados
+
+        Raises:
+            Exception: El error del broker o de la base si un lote falló (queda para el próximo intento)
+        """
+        published = 0
+        while True:
+            count = self.repository.publish_outbox(
+                self.config.OUTBOX_BATCH_SIZE, self._publish, self.config.OUTBOX_MAX_ATTEMPTS
+            )
+            if count:
+                metrics.record_outbox_events('published', count)
+                with self._lock:
+                    self._state['published'] += count
+            published += count
+            if count < self.config.OUTBOX_BATCH_SIZE:
+                return published
+
+    def start(self) -> None:
+        """Inicia el hilo del relay y lo despierta con cada escritura del proceso"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._loop, name='outbox-relay', daemon=True)
+            providers_version.subscribe(self._on_change)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Detiene el hilo del relay (pruebas y apagado)"""
+        providers_version.unsubscribe(self._on_change)
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Eventos publicados, fallos y espera actual del relay en este proceso"""
+        with self._lock:
+            return {'running': self._thread is not None and not self._stopped.is_set(), **self._state}
+
+    def _loop(self) -> None:
+        backoff = 0.0
+        while not self._stopped.is_set():
+            self._wake.clear()
+            try:
+                self.run_once()
+                backoff = 0.0
+                wait = self.config.OUTBOX_POLL_SECONDS
+            except Exception as e:
+                backoff = min(self.config.OUTBOX_MAX_BACKOFF_SECONDS, max(self.config.OUTBOX_POLL_SECONDS, backoff * 2))
+                wait = backoff * random.uniform(0.5, 1.0)
+                logger.warning(f"No se pudo publicar el outbox ({str(e)}); reintento en {wait:.1f}s")
+                with self._lock:
+                    self._state['failures'] += 1
+                    self._state['last_error'] = str(e)
+            with self._lock:
+                self._state['backoff_seconds'] = backoff
+            if backoff:
+                # Durante el backoff las escrituras no despiertan al relay
+                self._stopped.wait(wait)
+            else:
+                self._wake.wait(wait)
+
+    def _publish(self, events) -> None:
+        try:
+            self.publisher.publish_batch(events)
+        except Exception as e:
+            metrics.record_outbox_events('failed', len(events))
+            if not getattr(e, 'unavailable', False):
+                self._record_parked(events, e)
+            raise
+
+    def _record_parked(self, events, error: Exception) -> None:
+        """Registra los eventos que con este rechazo llegan a OUTBOX_MAX_ATTEMPTS y quedan apartados"""
+        parked = [event for event in events if event.attempts + 1 >= self.config.OUTBOX_MAX_ATTEMPTS]
+        if not parked:
+            return
+        metrics.record_outbox_events('parked', len(parked))
+        with self._lock:
+            self._state['parked'] += len(parked)
+        logger.error(
+            f"Eventos apartados del outbox tras {self.config.OUTBOX_MAX_ATTEMPTS} rechazos "
+            f"({', '.join(event.id for event in parked)}): {str(error)}"
+        )
+
+    def _on_change(self, event: str, version: int) -> None:
+        self._wake.set()
+
+
+_relay: Optional[OutboxRelay] = None
+_relay_lock = threading.Lock()
+
+
+def get_relay(config) -> OutboxRelay:
+    """Relay del proceso (se crea una sola vez)"""
+    global _relay
+    with _relay_lock:
+        if _relay is None:
+            _relay = OutboxRelay(config)
+        return _relay
+
+
+def stop_relay(timeout: Optional[float] = 5.0) -> None:
+    """Detiene y descarta el relay del proceso (tras un fork o entre pruebas)"""
+    global _relay
+    with _relay_lock:
+        relay, _relay = _relay, None
+    if relay is not None:
+        relay.stop(timeout)
+
+
+def init_outbox_relay(app, config) -> None:
+    """Con OUTBOX_ENABLED, inicia el relay del worker con la primera petición"""
+    if not config.OUTBOX_ENABLED:
+        return
+    started = threading.Event()
+
+    @app.before_request
+    def _start_outbox_relay():
+        if not started.is_set():
+            started.set()
+            get_relay(config).start()
@@ -4,13 +4,17 @@ Modelo de Proveedor - Entidad para gestionar proveedores
 import re
 import uuid
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Optional, Tuple
 from .base_model import BaseModel
 
 
 class Provider(BaseModel):
     """Modelo de Proveedor con validaciones específicas"""
     
+    # Campos que se pueden pedir con fields=, en el orden en que se serializan
+    FIELDS = ('id', 'name', 'email', 'phone', 'logo_filename', 'logo_url', 'created_at', 'updated_at')
+    SUMMARY_FIELDS = ('id', 'name', 'email', 'phone', 'logo_filename', 'logo_url')
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.id = kwargs.get('id', str(uuid.uuid4()))
@@ -19,12 +23,35 @@ class Provider(BaseModel):
         self.phone = kwargs.get('phone', '')
         self.logo_filename = kwargs.get('logo_filename', '')
         self.logo_url = kwargs.get('logo_url', '')
+        # Vencimiento de logo_url guardada (no se expone: las lecturas deciden si sirve o se vuelve a firmar)
+        self.logo_url_expires_at = kwargs.get('logo_url_expires_at')
         self.created_at = kwargs.get('created_at', datetime.utcnow())
         self.updated_at = kwargs.get('updated_at', datetime.utcnow())
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convierte el modelo a diccionario"""
-        return {
+    @classmethod
+    def parse_fields(cls, value: Optional[str]) -> Optional[Tuple[str, ...]]:
+        """
+        Normaliza el parámetro fields= (nombres separados por coma)
+        
+        Returns:
+            Optional[Tuple[str, ...]]: Campos pedidos en el orden de FIELDS, None si no se indicó
+            
+        Raises:
+            ValueError: Si algún campo no existe
+        """
+        if value is None or not value.strip():
+            return None
+        requested = {field.strip() for field in value.split(',') if field.strip()}
+        unknown = sorted(requested - set(cls.FIELDS))
+        if unknown:
+            raise ValueError(
+                f"Campos no válidos en 'fields': {', '.join(unknown)}. Permitidos: {', '.join(cls.FIELDS)}"
+            )
+        return tuple(field for field in cls.FIELDS if field in requested)
+    
+    def to_dict(self, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Convierte el modelo a diccionario (solo los campos indicados, si se indican)"""
+        data = {
             'id': self.id,
             'name': self.name,
             'email': self.email,
@@ -34,6 +61,9 @@ class Provider(BaseModel):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+        if fields is None:
+            return data
+        return {field: data[field] for field in self.FIELDS if field in fields}
     
     def validate(self) -> None:
         """Valida los datos del modelo según las reglas de negocio"""
@@ -2,7 +2,7 @@
 Repositorio base - Estructura para implementar operaciones CRUD
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Tuple
 
 
 class BaseRepository(ABC):
@@ -14,16 +14,17 @@ class BaseRepository(ABC):
         pass
     
     @abstractmethod
-    def get_by_id(self, entity_id: str) -> Optional[Any]:
+    def get_by_id(self, entity_id: str, fields: Optional[Tuple[str, ...]] = None) -> Optional[Any]:
         """Obtiene una entidad por ID"""
         pass
     
     @abstractmethod
-    def get_all(self, limit: Optional[int] = None, offset: int = 0) -> List[Any]:
+    def get_all(self, limit: Optional[int] = None, offset: int = 0,
+                fields: Optional[Tuple[str, ...]] = None) -> List[Any]:
         """Obtiene todas las entidades"""
         pass
     
     @abstractmethod
-    def get_by_email(self, email: str) -> Optional[Any]:
+    def get_by_email(self, email: str, use_primary: bool = False) -> Optional[Any]:
         """Obtiene una entidad por email"""
         pass
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""
+Migraciones del esquema - Acceso programático a las revisiones de Alembic
+
+En despliegue las migraciones se aplican con 'alembic upgrade head'; este módulo
+permite aplicarlas sobre un engine existente (pruebas, benchmarks) y consultar
+la revisión de la base sin ejecutar DDL.
+"""
+import os
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.engine import Engine
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ALEMBIC_INI = os.path.join(PROJECT_ROOT, 'alembic.ini')
+
+
+def alembic_config() -> AlembicConfig:
+    """Configuración de Alembic del proyecto, sin reconfigurar el logging de la aplicación"""
+    config = AlembicConfig(ALEMBIC_INI)
+    config.set_main_option('script_location', os.path.join(PROJECT_ROOT, 'migrations'))
+    config.attributes['configure_logger'] = False
+    return config
+
+
+def upgrade_database(engine: Engine, revision: str = 'head') -> None:
+    """Aplica las migraciones pendientes sobre el engine indicado"""
+    config = alembic_config()
+    with engine.begin() as connection:
+        config.attributes['connection'] = connection
+        command.upgrade(config, revision)
+
+
+def head_revision() -> Optional[str]:
+    """Última revisión disponible en migrations/versions"""
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def database_revision(engine: Engine) -> Optional[str]:
+    """Revisión aplicada en la base de datos (None si nunca se migró)"""
+    with engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
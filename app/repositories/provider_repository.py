@@ -1,24 +1,38 @@
 """
 Repositorio de Proveedores - Implementación con SQLAlchemy
 """
-from typing import List, Optional
-from sqlalchemy import create_engine, Column, String, DateTime, Text
+import json
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import (
+    create_engine, delete, insert, update, func, select, text, tuple_, any_, or_, bindparam,
+    Column, String, DateTime, Text, Integer, Index
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
-from datetime import datetime
+from datetime import datetime, timedelta
 import uuid
 
 from .base_repository import BaseRepository
+from .read_replicas import get_replica_set, close_replica_sets
+from .retry import retry_transient, IDEMPOTENT, NON_IDEMPOTENT
 from ..models.provider_model import Provider
 from ..config.settings import Config
+from ..messaging.base_publisher import OutboxEvent
+from ..exceptions.custom_exceptions import DatabaseError
+from ..utils.collection_version import providers_version
+from ..utils.timing import timed
+from ..utils import metrics, tracing, query_stats
 
 # Configuración de SQLAlchemy
 Base = declarative_base()
 
 
 class ProviderDB(Base):
-    """Modelo de base de datos para proveedores"""
+    """Modelo de base de datos para proveedores (el esquema se crea con las migraciones de migrations/)"""
     __tablename__ = 'providers'
     
     id = Column(String(36), primary_key=True)
@@ -27,27 +41,103 @@ class ProviderDB(Base):
     phone = Column(String(20), nullable=False)
     logo_filename = Column(String(255), nullable=True)
     logo_url = Column(Text, nullable=True)
+    logo_url_expires_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('ix_providers_name_id', 'name', 'id'),
+        Index('ix_providers_email_lower', func.lower(email)),
+        Index('ix_providers_created_at', 'created_at'),
+        Index('ix_providers_updated_at_id', 'updated_at', 'id'),
+        Index('ix_providers_logo_url_expires_at', 'logo_url_expires_at'),
+    )
+
+
+class ProviderTombstoneDB(Base):
+    """Lápida de un proveedor eliminado: registra la eliminación para el feed de cambios"""
+    __tablename__ = 'provider_tombstones'
+    
+    id = Column(String(36), primary_key=True)
+    deleted_at = Column(DateTime, nullable=False)
+    
+    __table_args__ = (
+        Index('ix_provider_tombstones_deleted_at_id', 'deleted_at', 'id'),
+    )
+
+
+class ProviderOutboxDB(Base):
+    """Evento de cambio pendiente de publicar, escrito en la misma transacción que el cambio"""
+    __tablename__ = 'provider_outbox'
+    
+    id = Column(String(36), primary_key=True)
+    event_type = Column(String(64), nullable=False)
+    aggregate_id = Column(String(36), nullable=True)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    attempts = Column(Integer, nullable=False, server_default='0')
+    last_error = Column(Text, nullable=True)
+    
+    __table_args__ = (
+        Index('ix_provider_outbox_created_at_id', 'created_at', 'id'),
+    )
+
+
+# Engines compartidos por el proceso, uno por URL de base de datos (el pool vive entre peticiones)
+_engines: Dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(database_url: str) -> Engine:
+    """Obtiene el engine del proceso para la URL, creándolo la primera vez"""
+    with _engines_lock:
+        engine = _engines.get(database_url)
+        if engine is None:
+            engine = create_engine(database_url, **Config.SQLALCHEMY_ENGINE_OPTIONS)
+            metrics.instrument_engine(engine)
+            tracing.instrument_engine(engine)
+            query_stats.instrument_engine(engine, Config)
+            _engines[database_url] = engine
+        return engine
+
+
+def dispose_engines() -> None:
+    """Cierra y descarta los engines y réplicas del proceso (tras un fork o entre pruebas)"""
+    close_replica_sets()
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
 
 
 class ProviderRepository(BaseRepository):
     """Repositorio para operaciones CRUD de proveedores"""
     
     def __init__(self):
-        self.engine = create_engine(Config.SQLALCHEMY_DATABASE_URI)
+        self.engine = get_engine(Config.SQLALCHEMY_DATABASE_URI)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
-        self._create_tables()
-    
-    def _create_tables(self):
-        """Crea las tablas si no existen"""
-        try:
-            Base.metadata.create_all(bind=self.engine)
-        except SQLAlchemyError as e:
-            print(f"Error creando tablas: {e}")
+        self.replicas = get_replica_set(Config, get_engine)
     
-    def _get_session(self) -> Session:
-        """Obtiene una sesión de base de datos"""
+    def _get_session(self, read_only: bool = False) -> Session:
+        """
+        Obtiene una sesión de base de datos
+        
+        Las sesiones de solo lectura usan una réplica de DATABASE_READ_URLS. La conexión
+        se abre aquí para que, si la réplica no responde, se saque de la rotación y la
+        lectura pase a otra réplica o al primario en lugar de fallar.
+        """
+        if read_only and self.replicas is not None:
+            for _ in self.replicas.replicas:
+                replica = self.replicas.choose()
+                if replica is None:
+                    break
+                session = self.SessionLocal(bind=replica.engine)
+                try:
+                    session.connection()
+                    return session
+                except SQLAlchemyError as e:
+                    session.close()
+                    self.replicas.mark_down(replica, e)
         return self.SessionLocal()
     
     def _db_to_model(self, db_provider: ProviderDB) -> Provider:
@@ -59,10 +149,15 @@ class ProviderRepository(BaseRepository):
             phone=db_provider.phone,
             logo_filename=db_provider.logo_filename,
             logo_url=db_provider.logo_url,
+            logo_url_expires_at=db_provider.logo_url_expires_at,
             created_at=db_provider.created_at,
             updated_at=db_provider.updated_at
         )
     
+    def _columns(self, fields: Tuple[str, ...]) -> list:
+        """Columnas de ProviderDB para los campos pedidos"""
+        return [getattr(ProviderDB, field) for field in fields]
+    
     def _model_to_db(self, provider: Provider) -> ProviderDB:
         """Convierte un modelo de dominio a modelo de DB"""
         return ProviderDB(
@@ -72,12 +167,21 @@ class ProviderRepository(BaseRepository):
             phone=provider.phone,
             logo_filename=provider.logo_filename,
             logo_url=provider.logo_url,
+            logo_url_expires_at=provider.logo_url_expires_at,
             created_at=provider.created_at,
             updated_at=provider.updated_at
         )
     
+    @timed('db.create')
     def create(self, **kwargs) -> Provider:
         """Crea un nuevo proveedor"""
+        # El id se fija antes de los reintentos para reconocer un intento anterior que sí se aplicó
+        kwargs.setdefault('id', str(uuid.uuid4()))
+        return self._insert(**kwargs)
+    
+    @retry_transient('create', IDEMPOTENT)
+    def _insert(self, **kwargs) -> Provider:
+        """Inserta el proveedor; si la fila con su id ya existe (reintento tras una desconexión) la retorna"""
         session = self._get_session()
         try:
             # Crear modelo de dominio
@@ -85,90 +189,475 @@ class ProviderRepository(BaseRepository):
             provider.validate()  # Validar antes de guardar
             
             # Verificar que el email no exista
-            existing = session.query(ProviderDB).filter(ProviderDB.email == provider.email).first()
+            existing = session.query(ProviderDB).filter(
+                (ProviderDB.id == provider.id) | (func.lower(ProviderDB.email) == provider.email.strip().lower())
+            ).first()
+            if existing is not None and existing.id == provider.id:
+                return self._db_to_model(existing)
             if existing:
                 raise ValueError("Ya existe un proveedor con este correo electrónico")
             
             # Convertir a modelo de DB y guardar
             db_provider = self._model_to_db(provider)
             session.add(db_provider)
+            self._add_event(session, 'provider.created', provider.id, provider.to_dict())
             session.commit()
+            providers_version.bump('create')
             session.refresh(db_provider)
             
             return self._db_to_model(db_provider)
             
         except SQLAlchemyError as e:
             session.rollback()
-            raise Exception(f"Error al crear proveedor: {str(e)}")
+            raise DatabaseError(f"Error al crear proveedor: {str(e)}") from e
         finally:
             session.close()
     
-    def get_by_id(self, provider_id: str) -> Optional[Provider]:
-        """Obtiene un proveedor por ID"""
-        session = self._get_session()
+    @timed('db.get_by_id')
+    @retry_transient('get_by_id', IDEMPOTENT)
+    def get_by_id(self, provider_id: str, fields: Optional[Tuple[str, ...]] = None) -> Optional[Provider]:
+        """Obtiene un proveedor por ID (solo las columnas de fields, si se indican)"""
+        session = self._get_session(read_only=True)
         try:
+            if fields:
+                row = session.query(*self._columns(fields)).filter(ProviderDB.id == provider_id).first()
+                return Provider(**row._asdict()) if row else None
             db_provider = session.query(ProviderDB).filter(ProviderDB.id == provider_id).first()
             if db_provider:
                 return self._db_to_model(db_provider)
             return None
         except SQLAlchemyError as e:
-            raise Exception(f"Error al obtener proveedor: {str(e)}")
+            raise DatabaseError(f"Error al obtener proveedor: {str(e)}") from e
         finally:
             session.close()
     
-    def get_all(self, limit: Optional[int] = None, offset: int = 0) -> List[Provider]:
-        """Obtiene todos los proveedores ordenados por nombre"""
-        session = self._get_session()
+    @timed('db.get_all')
+    @retry_transient('get_all', IDEMPOTENT)
+    def get_all(self, limit: Optional[int] = None, offset: int = 0,
+                fields: Optional[Tuple[str, ...]] = None) -> List[Provider]:
+        """
+        Obtiene todos los proveedores ordenados por nombre (id como desempate, índice ix_providers_name_id)
+        
+        Con fields solo se leen esas columnas y los proveedores retornados solo tienen válidos esos campos.
+        """
+        session = self._get_session(read_only=True)
         try:
-            query = session.query(ProviderDB).order_by(ProviderDB.name.asc()).offset(offset)
+            entities = self._columns(fields) if fields else [ProviderDB]
+            query = session.query(*entities).order_by(ProviderDB.name.asc(), ProviderDB.id.asc()).offset(offset)
             if limit:
                 query = query.limit(limit)
             
+            if fields:
+                return [Provider(**row._asdict()) for row in query.all()]
             db_providers = query.all()
             return [self._db_to_model(db_provider) for db_provider in db_providers]
         except SQLAlchemyError as e:
-            raise Exception(f"Error al obtener proveedores: {str(e)}")
+            raise DatabaseError(f"Error al obtener proveedores: {str(e)}") from e
         finally:
             session.close()
     
+    @timed('db.count_all')
+    @retry_transient('count_all', IDEMPOTENT)
     def count_all(self) -> int:
         """Cuenta el total de proveedores"""
-        session = self._get_session()
+        session = self._get_session(read_only=True)
         try:
             return session.query(ProviderDB).count()
         except SQLAlchemyError as e:
-            raise Exception(f"Error al contar proveedores: {str(e)}")
+            raise DatabaseError(f"Error al contar proveedores: {str(e)}") from e
         finally:
             session.close()
     
-    
-    def get_by_email(self, email: str) -> Optional[Provider]:
-        """Obtiene un proveedor por email"""
+    @timed('db.collection_stamp')
+    @retry_transient('collection_stamp', IDEMPOTENT)
+    def collection_stamp(self) -> Tuple[int, Optional[datetime], Optional[datetime]]:
+        """
+        Marca compartida de la colección: (total, último updated_at, última lápida)
+        
+        Cambia con cada alta, modificación o eliminación hecha por cualquier worker o
+        instancia. Se lee del primario para no perder una escritura aún no replicada;
+        los máximos salen de ix_providers_updated_at_id e ix_provider_tombstones_deleted_at_id.
+        """
         session = self._get_session()
         try:
-            db_provider = session.query(ProviderDB).filter(ProviderDB.email == email).first()
+            return tuple(session.execute(
+                select(
+                    select(func.count()).select_from(ProviderDB).scalar_subquery(),
+                    select(func.max(ProviderDB.updated_at)).scalar_subquery(),
+                    select(func.max(ProviderTombstoneDB.deleted_at)).scalar_subquery()
+                )
+            ).one())
+        except SQLAlchemyError as e:
+            raise DatabaseError(f"Error al leer la marca de la colección: {str(e)}") from e
+        finally:
+            session.close()
+    
+    
+    @timed('db.get_by_ids')
+    @retry_transient('get_by_ids', IDEMPOTENT)
+    def get_by_ids(self, provider_ids: List[str], fields: Optional[Tuple[str, ...]] = None) -> List[Provider]:
+        """
+        Obtiene los proveedores de varios IDs en una sola consulta (en cualquier orden; los inexistentes se omiten)
+        
+        En PostgreSQL la lista viaja como un solo parámetro array (id = ANY(:ids)), de modo que la
+        sentencia es la misma para cualquier cantidad de IDs; en otros motores se usa IN.
+        """
+        if not provider_ids:
+            return []
+        session = self._get_session(read_only=True)
+        try:
+            condition = self._ids_condition(provider_ids, session.get_bind().dialect.name)
+            if fields:
+                rows = session.query(*self._columns(fields)).filter(condition).all()
+                return [Provider(**row._asdict()) for row in rows]
+            return [self._db_to_model(db_provider) for db_provider in session.query(ProviderDB).filter(condition).all()]
+        except SQLAlchemyError as e:
+            raise DatabaseError(f"Error al obtener proveedores por ID: {str(e)}") from e
+        finally:
+            session.close()
+    
+    @timed('db.get_changes')
+    @retry_transient('get_changes', IDEMPOTENT)
+    def get_changes(self, after: Optional[Tuple[datetime, str]], until: datetime, limit: int,
+                    fields: Optional[Tuple[str, ...]] = None) -> List[Tuple[datetime, str, Optional[Provider]]]:
+        """
+        Cambios posteriores a la posición after y anteriores a until, ordenados por (updated_at, id)
+        
+        Recorre por keyset los proveedores (índice ix_providers_updated_at_id) y las lápidas
+        (ix_provider_tombstones_deleted_at_id) y mezcla ambos resultados. Retorna hasta
+        limit + 1 elementos (el sobrante indica que hay más) como (fecha, id, proveedor);
+        el proveedor es None para las eliminaciones.
+        """
+        session = self._get_session(read_only=True)
+        try:
+            columns = self._columns(fields) if fields else [ProviderDB]
+            providers = session.query(*columns).filter(ProviderDB.updated_at < until)
+            tombstones = session.query(ProviderTombstoneDB).filter(ProviderTombstoneDB.deleted_at < until)
+            if after is not None:
+                providers = providers.filter(tuple_(ProviderDB.updated_at, ProviderDB.id) > after)
+                tombstones = tombstones.filter(tuple_(ProviderTombstoneDB.deleted_at, ProviderTombstoneDB.id) > after)
+            providers = providers.order_by(ProviderDB.updated_at.asc(), ProviderDB.id.asc()).limit(limit + 1)
+            tombstones = tombstones.order_by(
+                ProviderTombstoneDB.deleted_at.asc(), ProviderTombstoneDB.id.asc()
+            ).limit(limit + 1)
+            
+            models = [Provider(**row._asdict()) if fields else self._db_to_model(row) for row in providers.all()]
+            changes = [(provider.updated_at, provider.id, provider) for provider in models]
+            changes += [(tombstone.deleted_at, tombstone.id, None) for tombstone in tombstones.all()]
+            changes.sort(key=lambda change: change[:2])
+            return changes[:limit + 1]
+        except SQLAlchemyError as e:
+            raise DatabaseError(f"Error al obtener cambios de proveedores: {str(e)}") from e
+        finally:
+            session.close()
+    
+    @staticmethod
+    def _ids_condition(provider_ids: List[str], dialect_name: str):
+        """Condición id en la lista: ANY con un parámetro array en PostgreSQL, IN en otros motores"""
+        if dialect_name == 'postgresql':
+            return ProviderDB.id == any_(bindparam('ids', list(provider_ids), type_=ARRAY(String)))
+        return ProviderDB.id.in_(list(provider_ids))
+    
+    @timed('db.get_by_email')
+    @retry_transient('get_by_email', IDEMPOTENT)
+    def get_by_email(self, email: str, use_primary: bool = False) -> Optional[Provider]:
+        """
+        Obtiene un proveedor por email
+        
+        Args:
+            use_primary: Leer del primario (verificaciones previas a una escritura, que una réplica retrasada no vería)
+        """
+        session = self._get_session(read_only=not use_primary)
+        try:
+            db_provider = session.query(ProviderDB).filter(func.lower(ProviderDB.email) == email.strip().lower()).first()
             if db_provider:
                 return self._db_to_model(db_provider)
             return None
         except SQLAlchemyError as e:
-            raise Exception(f"Error al obtener proveedor por email: {str(e)}")
+            raise DatabaseError(f"Error al obtener proveedor por email: {str(e)}") from e
         finally:
             session.close()
     
-    def delete_all(self) -> int:
-        """Elimina todos los proveedores de la base de datos"""
+    @timed('db.logo_filename_in_use')
+    @retry_transient('logo_filename_in_use', IDEMPOTENT)
+    def logo_filename_in_use(self, logo_filename: str) -> bool:
+        """Indica si algún proveedor ya referencia el logo (se lee del primario: precede a una escritura)"""
         session = self._get_session()
         try:
-            # Contar registros antes de eliminar
-            count = session.query(ProviderDB).count()
-            
-            # Eliminar todos los registros
-            session.query(ProviderDB).delete()
+            return session.execute(
+                select(ProviderDB.id).where(ProviderDB.logo_filename == logo_filename).limit(1)
+            ).first() is not None
+        except SQLAlchemyError as e:
+            raise DatabaseError(f"Error al verificar el logo: {str(e)}") from e
+        finally:
+            session.close()
+    
+    @timed('db.delete_all')
+    @retry_transient('delete_all', NON_IDEMPOTENT)
+    def delete_all(self, truncate: bool = False) -> int:
+        """
+        Elimina todos los proveedores en una sola sentencia y retorna cuántos se eliminaron
+        
+        Args:
+            truncate: Usar TRUNCATE en lugar de DELETE (solo PostgreSQL; en otros motores se ignora)
+        """
+        session = self._get_session()
+        try:
+            count = len(self._delete_all_rows(session, truncate))
             session.commit()
+            providers_version.bump('delete_all')
             
             return count
         except SQLAlchemyError as e:
             session.rollback()
-            raise Exception(f"Error al eliminar todos los proveedores: {str(e)}")
+            raise DatabaseError(f"Error al eliminar todos los proveedores: {str(e)}") from e
+        finally:
+            session.close()
+    
+    @timed('db.delete_all_returning_logos')
+    @retry_transient('delete_all_returning_logos', NON_IDEMPOTENT)
+    def delete_all_returning_logos(self, truncate: bool = False) -> Tuple[int, List[str]]:
+        """
+        Elimina todos los proveedores en una sola sentencia y retorna (eliminados, logos a limpiar)
+        
+        Args:
+            truncate: Usar TRUNCATE en lugar de DELETE ... RETURNING (solo PostgreSQL)
+        """
+        session = self._get_session()
+        try:
+            rows = self._delete_all_rows(session, truncate)
+            session.commit()
+            providers_version.bump('delete_all')
+            
+            return len(rows), [row.logo_filename for row in rows if row.logo_filename]
+        except SQLAlchemyError as e:
+            session.rollback()
+            raise DatabaseError(f"Error al eliminar todos los proveedores: {str(e)}") from e
+        finally:
+            session.close()
+    
+    @timed('db.delete_by_id')
+    @retry_transient('delete_by_id', NON_IDEMPOTENT)
+    def delete_by_id(self, provider_id: str) -> Tuple[bool, Optional[str]]:
+        """Elimina un proveedor y retorna (eliminado, logo a limpiar)"""
+        session = self._get_session()
+        try:
+            if self.engine.dialect.delete_returning:
+                row = session.execute(
+                    delete(ProviderDB).where(ProviderDB.id == provider_id).returning(ProviderDB.logo_filename)
+                ).first()
+            else:
+                # Motores sin RETURNING: leer la fila con bloqueo y eliminarla (como _delete_all_rows)
+                row = session.execute(
+                    select(ProviderDB.logo_filename).where(ProviderDB.id == provider_id).with_for_update()
+                ).first()
+                if row is not None:
+                    session.execute(delete(ProviderDB).where(ProviderDB.id == provider_id))
+            if row is not None:
+                self._write_tombstones(session, [provider_id])
+                self._add_event(session, 'provider.deleted', provider_id, {'id': provider_id})
+            session.commit()
+            
+            if row is None:
+                return False, None
+            providers_version.bump('delete')
+            return True, row.logo_filename or None
+        except SQLAlchemyError as e:
+            session.rollback()
+            raise DatabaseError(f"Error al eliminar proveedor: {str(e)}") from e
+        finally:
+            session.close()
+    
+    def _delete_all_rows(self, session: Session, truncate: bool) -> list:
+        """Elimina todas las filas dentro de la transacción, deja sus lápidas y retorna (id, logo_filename) de cada una"""
+        if truncate and self._supports_truncate():
+            rows = self._truncate(session)
+        elif self.engine.dialect.delete_returning:
+            rows = session.execute(delete(ProviderDB).returning(ProviderDB.id, ProviderDB.logo_filename)).all()
+        else:
+            # Motores sin RETURNING: leer las filas y eliminar con bloqueo de filas
+            rows = session.execute(select(ProviderDB.id, ProviderDB.logo_filename).with_for_update()).all()
+            session.execute(delete(ProviderDB))
+        self._write_tombstones(session, [row.id for row in rows])
+        if rows:
+            self._add_event(session, 'provider.all_deleted', None, {'count': len(rows)})
+        return rows
+    
+    def _write_tombstones(self, session: Session, provider_ids: List[str]) -> None:
+        """
+        Registra las eliminaciones en la misma transacción que las ejecuta
+        
+        De paso descarta las lápidas más antiguas que CHANGES_TOMBSTONE_RETENTION_DAYS,
+        así la tabla queda acotada sin un trabajo de limpieza aparte.
+        """
+        if not provider_ids:
+            return
+        now = datetime.utcnow()
+        session.execute(
+            delete(ProviderTombstoneDB).where(
+                ProviderTombstoneDB.deleted_at < now - timedelta(days=Config.CHANGES_TOMBSTONE_RETENTION_DAYS)
+            )
+        )
+        session.execute(
+            insert(ProviderTombstoneDB),
+            [{'id': provider_id, 'deleted_at': now} for provider_id in provider_ids]
+        )
+    
+    def _add_event(self, session: Session, event_type: str, aggregate_id: Optional[str], data: Dict[str, Any]) -> None:
+        """Agrega un evento de cambio al outbox en la transacción de la sesión (con OUTBOX_ENABLED)"""
+        if not Config.OUTBOX_ENABLED:
+            return
+        event_id = str(uuid.uuid4())
+        created_at = datetime.utcnow()
+        payload = {
+            'id': event_id,
+            'type': event_type,
+            'occurred_at': created_at.isoformat(),
+            'data': data
+        }
+        session.add(ProviderOutboxDB(
+            id=event_id,
+            event_type=event_type,
+            aggregate_id=aggregate_id,
+            payload=json.dumps(payload),
+            created_at=created_at,
+            attempts=0
+        ))
+    
+    @timed('db.publish_outbox')
+    def publish_outbox(self, limit: int, publish: Callable[[List[OutboxEvent]], None],
+                       max_attempts: Optional[int] = None) -> int:
+        """
+        Publica el siguiente lote del outbox y lo elimina si publish termina sin error
+        
+        El lote se bloquea con FOR UPDATE SKIP LOCKED (en PostgreSQL) durante la publicación,
+        así que varios workers pueden correr el relay sin publicar dos veces el mismo evento.
+        Si publish falla el lote queda en el outbox con el error registrado y, si el broker lo
+        rechazó (no solo no respondió), con un intento más.
+        
+        Un evento que ya fue rechazado se publica solo, para que un evento que el broker
+        siempre rechaza no arrastre a los demás; con max_attempts intentos queda apartado
+        (no se vuelve a elegir) y los siguientes se publican.
+        
+        Returns:
+            int: Cantidad de eventos publicados (0 si el outbox estaba vacío)
+        """
+        session = self._get_session()
+        try:
+            query = select(ProviderOutboxDB)
+            if max_attempts is not None:
+                query = query.where(ProviderOutboxDB.attempts < max_attempts)
+            rows = session.execute(
+                query
+                .order_by(ProviderOutboxDB.created_at.asc(), ProviderOutboxDB.id.asc())
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            ).scalars().all()
+            if not rows:
+                session.rollback()
+                return 0
+            if rows[0].attempts:
+                rows = rows[:1]
+            
+            events = [
+                OutboxEvent(row.id, row.event_type, row.aggregate_id, row.payload, row.created_at, row.attempts)
+                for row in rows
+            ]
+            ids = [event.id for event in events]
+            try:
+                publish(events)
+            except Exception as e:
+                values = {'last_error': str(e)[:1000]}
+                if not getattr(e, 'unavailable', False):
+                    values['attempts'] = ProviderOutboxDB.attempts + 1
+                session.execute(update(ProviderOutboxDB).where(ProviderOutboxDB.id.in_(ids)).values(**values))
+                session.commit()
+                raise
+            session.execute(delete(ProviderOutboxDB).where(ProviderOutboxDB.id.in_(ids)))
+            session.commit()
+            return len(events)
+        except SQLAlchemyError as e:
+            session.rollback()
+            raise DatabaseError(f"Error al publicar el outbox: {str(e)}") from e
+        finally:
+            session.close()
+    
+    @timed('db.refresh_logo_urls')
+    def refresh_logo_urls(self, before: datetime, limit: int,
+                          sign: Callable[[List[str]], Dict[str, Tuple[str, Optional[datetime]]]]) -> int:
+        """
+        Vuelve a firmar las URLs de logo guardadas que vencen antes de before (o sin vencimiento)
+        
+        El lote se bloquea con FOR UPDATE SKIP LOCKED (en PostgreSQL) para que varios workers
+        no firmen las mismas filas, y se actualiza con un solo UPDATE por lotes. updated_at se
+        conserva: un refresco de URL no es un cambio del proveedor para el feed de cambios.
+        
+        Args:
+            before: Las URLs que vencen antes de esta fecha se vuelven a firmar
+            limit: Máximo de filas del lote
+            sign: Recibe los nombres de archivo y retorna (url, vence) por nombre; las URLs
+                sin vencimiento conocido o que vencen antes de before no se guardan (la fila
+                seguiría pendiente y se volvería a elegir en el lote siguiente)
+            
+        Returns:
+            int: Filas actualizadas, que dejan de estar pendientes (menos que limit si no quedan
+            más o alguna no se pudo firmar)
+        """
+        session = self._get_session()
+        try:
+            rows = session.execute(
+                select(ProviderDB.id, ProviderDB.logo_filename)
+                .where(
+                    ProviderDB.logo_filename.isnot(None),
+                    ProviderDB.logo_filename != '',
+                    or_(ProviderDB.logo_url_expires_at.is_(None), ProviderDB.logo_url_expires_at < before)
+                )
+                .order_by(ProviderDB.logo_url_expires_at.asc(), ProviderDB.id.asc())
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not rows:
+                session.rollback()
+                return 0
+            
+            signed = sign(list(dict.fromkeys(row.logo_filename for row in rows)))
+            updates = []
+            for row in rows:
+                logo_url, expires_at = signed.get(row.logo_filename, (None, None))
+                if expires_at is not None and expires_at >= before:
+                    updates.append({'row_id': row.id, 'new_logo_url': logo_url, 'new_expires_at': expires_at})
+            if updates:
+                table = ProviderDB.__table__
+                session.execute(
+                    update(table)
+                    .where(table.c.id == bindparam('row_id'))
+                    .values(
+                        logo_url=bindparam('new_logo_url'),
+                        logo_url_expires_at=bindparam('new_expires_at'),
+                        updated_at=table.c.updated_at
+                    ),
+                    updates
+                )
+            session.commit()
+            return len(updates)
+        except SQLAlchemyError as e:
+            session.rollback()
+            raise DatabaseError(f"Error al refrescar las URLs de logo: {str(e)}") from e
         finally:
-            session.close()
\ No newline at end of file
+            session.close()
+    
+    def _supports_truncate(self) -> bool:
+        """TRUNCATE solo se usa en PostgreSQL"""
+        return self.engine.dialect.name == 'postgresql'
+    
+    def _truncate(self, session: Session) -> list:
+        """
+        Vacía la tabla con TRUNCATE dentro de la transacción de la sesión.
+        
+        El bloqueo exclusivo se toma antes de leer las filas para que ninguna
+        inserción concurrente quede fuera de la limpieza del bucket ni de las lápidas.
+        """
+        session.execute(text(f"LOCK TABLE {ProviderDB.__tablename__} IN ACCESS EXCLUSIVE MODE"))
+        rows = session.execute(select(ProviderDB.id, ProviderDB.logo_filename)).all()
+        session.execute(text(f"TRUNCATE TABLE {ProviderDB.__tablename__}"))
+        return rows
\ No newline at end of file
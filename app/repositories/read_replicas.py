@@ -0,0 +1,177 @@
+"""
+Réplicas de lectura - Selección de réplica y verificación de su estado
+
+Con DATABASE_READ_URLS definido, las lecturas del repositorio se envían a una de
+las réplicas (round_robin o least_latency según DATABASE_READ_STRATEGY). Un hilo
+del proceso verifica cada réplica con SELECT 1 (y, en PostgreSQL, su retraso de
+replicación); una réplica que falla la verificación o al conectar queda fuera de
+la rotación hasta DATABASE_READ_RETRY_SECONDS después y, si ninguna está
+disponible, las lecturas usan el primario.
+"""
+import time
+import logging
+import itertools
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ('round_robin', 'least_latency')
+
+# Retraso de replicación en segundos; 0 si la réplica ya aplicó todo lo recibido
+POSTGRESQL_LAG_QUERY = (
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+# Peso de la última medición en la latencia promedio (EWMA) de cada réplica
+LATENCY_SMOOTHING = 0.3
+
+
+class Replica:
+    """Engine de una réplica y su estado de disponibilidad"""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.name = repr(engine.url)  # URL sin contraseña
+        self.healthy = True
+        self.down_until = 0.0
+        self.latency_ms: Optional[float] = None
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def available(self, now: float) -> bool:
+        """Disponible si está sana o si ya pasó el tiempo de espera tras la última falla"""
+        return self.healthy or now >= self.down_until
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'url': self.name,
+            'healthy': self.healthy,
+            'latency_ms': round(self.latency_ms, 2) if self.latency_ms is not None else None,
+            'lag_seconds': self.lag_seconds,
+            'error': self.last_error
+        }
+
+
+class ReplicaSet:
+    """Réplicas de lectura del proceso con selección y verificación en segundo plano"""
+
+    def __init__(self, engines: List[Engine], config):
+        if config.DATABASE_READ_STRATEGY not in STRATEGIES:
+            raise ValueError(f"Estrategia de réplicas no soportada: {config.DATABASE_READ_STRATEGY}")
+        self.replicas = [Replica(engine) for engine in engines]
+        self.config = config
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def choose(self) -> Optional[Replica]:
+        """Réplica para la próxima lectura (None si ninguna está disponible: se usa el primario)"""
+        self._ensure_monitor()
+        now = time.monotonic()
+        available = [replica for replica in self.replicas if replica.available(now)]
+        if not available:
+            return None
+        if self.config.DATABASE_READ_STRATEGY == 'least_latency':
+            # Las réplicas aún sin medir se prueban primero
+            return min(available, key=lambda replica: replica.latency_ms or 0.0)
+        return available[next(self._counter) % len(available)]
+
+    def mark_down(self, replica: Replica, error: Exception) -> None:
+        """Saca la réplica de la rotación hasta DATABASE_READ_RETRY_SECONDS"""
+        was_healthy = replica.healthy
+        replica.healthy = False
+        replica.down_until = time.monotonic() + self.config.DATABASE_READ_RETRY_SECONDS
+        replica.last_error = str(error)
+        if was_healthy:
+            logger.warning(f"Réplica {replica.name} fuera de rotación: {error}")
+
+    def check(self) -> None:
+        """Verifica todas las réplicas: conexión, latencia y retraso de replicación"""
+        for replica in self.replicas:
+            try:
+                latency_ms, lag = self._probe(replica)
+            except Exception as e:
+                self.mark_down(replica, e)
+                continue
+
+            replica.latency_ms = latency_ms if replica.latency_ms is None else (
+                LATENCY_SMOOTHING * latency_ms + (1 - LATENCY_SMOOTHING) * replica.latency_ms
+            )
+            replica.lag_seconds = lag
+            max_lag = self.config.DATABASE_READ_MAX_LAG_SECONDS
+            if max_lag and lag is not None and lag > max_lag:
+                self.mark_down(replica, RuntimeError(f"Retraso de replicación de {lag:.1f}s"))
+                continue
+
+            if not replica.healthy:
+                logger.info(f"Réplica {replica.name} de vuelta en rotación")
+            replica.healthy = True
+            replica.last_error = None
+
+    def _probe(self, replica: Replica) -> Tuple[float, Optional[float]]:
+        started = time.perf_counter()
+        with replica.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            latency_ms = (time.perf_counter() - started) * 1000
+            lag = None
+            if replica.engine.dialect.name == 'postgresql':
+                value = connection.execute(text(POSTGRESQL_LAG_QUERY)).scalar()
+                lag = float(value) if value is not None else None
+        return latency_ms, lag
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Estado de cada réplica (readiness)"""
+        return [replica.to_dict() for replica in self.replicas]
+
+    def _ensure_monitor(self) -> None:
+        if not self.config.DATABASE_READ_CHECK_INTERVAL_SECONDS:
+            return
+        with self._lock:
+            if self._thread is not None or self._stopped.is_set():
+                return
+            self._thread = threading.Thread(target=self._monitor, name='replica-checker', daemon=True)
+            self._thread.start()
+
+    def _monitor(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Error inesperado al verificar las réplicas")
+            self._stopped.wait(self.config.DATABASE_READ_CHECK_INTERVAL_SECONDS)
+
+    def close(self) -> None:
+        """Detiene la verificación en segundo plano"""
+        self._stopped.set()
+
+
+# Réplicas del proceso por lista de URLs (el estado de cada réplica vive entre peticiones)
+_replica_sets: Dict[Tuple[str, ...], ReplicaSet] = {}
+_replica_sets_lock = threading.Lock()
+
+
+def get_replica_set(config, engine_factory: Callable[[str], Engine]) -> Optional[ReplicaSet]:
+    """Réplicas compartidas del proceso para DATABASE_READ_URLS (None si no hay réplicas configuradas)"""
+    urls = tuple(url for url in config.DATABASE_READ_URLS if url)
+    if not urls:
+        return None
+    with _replica_sets_lock:
+        replica_set = _replica_sets.get(urls)
+        if replica_set is None:
+            replica_set = ReplicaSet([engine_factory(url) for url in urls], config)
+            _replica_sets[urls] = replica_set
+        return replica_set
+
+
+def close_replica_sets() -> None:
+    """Detiene y descarta las réplicas del proceso (tras un fork o entre pruebas)"""
+    with _replica_sets_lock:
+        for replica_set in _replica_sets.values():
+            replica_set.close()
+        _replica_sets.clear()
@@ -0,0 +1,96 @@
+"""
+Reintentos de operaciones del repositorio ante errores transitorios de la base de datos
+
+Los métodos del repositorio convierten SQLAlchemyError en DatabaseError conservando
+el error original como causa. retry_transient clasifica esa causa y repite el método
+completo (con una sesión nueva) si el error es transitorio y la operación admite
+repetirse, con backoff exponencial con jitter completo y sin exceder
+DB_RETRY_BUDGET_MS desde el primer intento.
+"""
+import time
+import random
+import logging
+import functools
+from typing import Callable, Optional
+
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+
+from ..config.settings import Config
+from ..utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# Motivos de reintento
+DISCONNECT = 'disconnect'
+CONFLICT = 'conflict'
+
+# Políticas: qué motivos puede reintentar cada tipo de operación. Las lecturas y las
+# escrituras que reconocen su propio intento anterior admiten cualquier error transitorio.
+IDEMPOTENT = frozenset({DISCONNECT, CONFLICT})
+# El resto de escrituras solo ante conflictos, en los que el servidor revirtió la transacción:
+# tras una desconexión no se sabe si el COMMIT se aplicó y repetir podría duplicar el efecto.
+NON_IDEMPOTENT = frozenset({CONFLICT})
+
+# SQLSTATE de PostgreSQL: serialización, deadlock, timeout de bloqueo y clase 08 (conexión)
+CONFLICT_SQLSTATES = {'40001', '40P01', '55P03'}
+DISCONNECT_SQLSTATES = {'57P01', '57P02', '57P03'}
+
+
+def classify_error(error: BaseException) -> Optional[str]:
+    """Motivo de reintento del error (DISCONNECT o CONFLICT) o None si no es transitorio"""
+    if not isinstance(error, DBAPIError):
+        return None
+    if error.connection_invalidated:
+        return DISCONNECT
+
+    sqlstate = getattr(error.orig, 'sqlstate', None) or getattr(error.orig, 'pgcode', None)
+    if sqlstate:
+        if sqlstate in CONFLICT_SQLSTATES:
+            return CONFLICT
+        if sqlstate.startswith('08') or sqlstate in DISCONNECT_SQLSTATES:
+            return DISCONNECT
+        return None
+
+    # SQLite no tiene SQLSTATE: una base bloqueada por otro escritor es un conflicto
+    if 'database is locked' in str(error.orig):
+        return CONFLICT
+    return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Espera antes del reintento (attempt desde 1): uniforme entre 0 y el backoff exponencial"""
+    ceiling = min(Config.DB_RETRY_MAX_DELAY_MS, Config.DB_RETRY_BASE_DELAY_MS * 2 ** (attempt - 1))
+    return random.uniform(0, ceiling) / 1000
+
+
+def retry_transient(operation: str, policy: frozenset) -> Callable:
+    """Decorador que repite el método del repositorio ante errores transitorios permitidos por la política"""
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            started = time.monotonic()
+            attempt = 1
+            while True:
+                try:
+                    return method(*args, **kwargs)
+                except Exception as e:
+                    cause = e if isinstance(e, SQLAlchemyError) else e.__cause__
+                    reason = classify_error(cause)
+                    if reason is None or reason not in policy:
+                        raise
+
+                    delay = backoff_delay(attempt)
+                    elapsed = time.monotonic() - started
+                    if attempt >= Config.DB_RETRY_MAX_ATTEMPTS or (elapsed + delay) * 1000 > Config.DB_RETRY_BUDGET_MS:
+                        metrics.record_db_retry(operation, reason, exhausted=True)
+                        raise
+
+                    metrics.record_db_retry(operation, reason, exhausted=False)
+                    logger.warning(
+                        f"Reintentando {operation} ({reason}, intento {attempt + 1} de {Config.DB_RETRY_MAX_ATTEMPTS}) "
+                        f"en {delay * 1000:.0f} ms: {cause}"
+                    )
+                    time.sleep(delay)
+                    attempt += 1
+        return wrapper
+    return decorator
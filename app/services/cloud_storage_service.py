@@ -1,56 +1,53 @@
 """
-Servicio de Google Cloud Storage para manejo de imágenes
+Servicio de almacenamiento de imágenes (Google Cloud Storage u otro backend configurado)
 """
-import os
-import uuid
+import io
+import time
 import logging
-from typing import Optional, Tuple
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple, Dict, Any, List, Callable
 from werkzeug.datastructures import FileStorage
-from google.cloud import storage
-from google.cloud.exceptions import GoogleCloudError
-from PIL import Image
-import io
 
 from ..config.settings import Config
+from ..exceptions.custom_exceptions import StorageError, CircuitOpenError, PartialDeleteError
+from ..storage import StorageBackend, get_storage_backend
+from ..utils.circuit_breaker import CircuitBreaker, get_storage_breaker
+from ..utils.metrics import record_cache_access
+from ..utils.timing import span
 
 logger = logging.getLogger(__name__)
 
+# Últimas URLs firmadas por objeto (ruta -> (url, vence)), servidas si el almacenamiento no responde
+_signed_urls: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+# Vencimiento de cada una de esas URLs (url -> vence), para quien solo tiene la URL
+_signed_url_expiry: Dict[str, float] = {}
+_signed_urls_lock = threading.Lock()
+
 
 class CloudStorageService:
-    """Servicio para manejar operaciones con Google Cloud Storage"""
+    """Servicio para manejar las imágenes de proveedores sobre un backend de almacenamiento"""
     
-    def __init__(self, config: Config = None):
+    def __init__(self, config: Config = None, storage_backend: Optional[StorageBackend] = None):
         self.config = config or Config()
-        self._client = None
-        self._bucket = None
+        self._backend = storage_backend
         
         logger.info(f"CloudStorageService inicializado - Bucket: {self.config.BUCKET_NAME}, Folder: {self.config.BUCKET_FOLDER}")
     
     @property
-    def client(self) -> storage.Client:
-        """Obtiene el cliente de Google Cloud Storage"""
-        if self._client is None:
-            try:
-                # Configurar credenciales si están disponibles
-                if self.config.GOOGLE_APPLICATION_CREDENTIALS:
-                    os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = self.config.GOOGLE_APPLICATION_CREDENTIALS
-                
-                self._client = storage.Client(project=self.config.GCP_PROJECT_ID)
-            except Exception as e:
-                raise GoogleCloudError(f"Error al inicializar cliente de GCS: {str(e)}")
-        
-        return self._client
+    def breaker(self) -> Optional[CircuitBreaker]:
+        """Circuit breaker del almacenamiento compartido por el proceso (None si está deshabilitado)"""
+        return get_storage_breaker(self.config)
     
     @property
-    def bucket(self) -> storage.Bucket:
-        """Obtiene el bucket de Google Cloud Storage"""
-        if self._bucket is None:
-            try:
-                self._bucket = self.client.bucket(self.config.BUCKET_NAME)
-            except Exception as e:
-                raise GoogleCloudError(f"Error al obtener bucket '{self.config.BUCKET_NAME}': {str(e)}")
-        
-        return self._bucket
+    def backend(self) -> StorageBackend:
+        """Obtiene el backend de almacenamiento (compartido por el proceso, se crea al primer uso)"""
+        if self._backend is None:
+            self._backend = get_storage_backend(self.config)
+        return self._backend
     
     def validate_image_file(self, file: FileStorage) -> Tuple[bool, str]:
         """
@@ -88,16 +85,25 @@ class CloudStorageService:
             return False, f"El archivo es demasiado grande. Máximo: {max_size // (1024*1024)}MB"
         
         # Verificar que sea una imagen válida
-        try:
-            file.seek(0)
-            with Image.open(file) as img:
-                img.verify()
-            file.seek(0)
-        except Exception:
+        file.seek(0)
+        is_image = self._is_valid_image(file)
+        file.seek(0)
+        if not is_image:
             return False, "El archivo no es una imagen válida"
         
         return True, "Archivo válido"
     
+    @staticmethod
+    def _is_valid_image(stream) -> bool:
+        """Verifica con Pillow que el contenido sea una imagen (Pillow se importa al primer uso, no al arrancar)"""
+        from PIL import Image
+        try:
+            with Image.open(stream) as img:
+                img.verify()
+            return True
+        except Exception:
+            return False
+    
     def upload_image(self, file: FileStorage, filename: str) -> Tuple[bool, str, Optional[str]]:
         """
         Sube una imagen al bucket de Google Cloud Storage en la carpeta específica
@@ -115,23 +121,17 @@ class CloudStorageService:
             if not is_valid:
                 return False, error_message, None
             
-            # Crear ruta completa con carpeta
-            full_path = f"{self.config.BUCKET_FOLDER}/{filename}"
-            
-            # Crear blob en el bucket
-            blob = self.bucket.blob(full_path)
-            
             # Configurar metadatos
-            blob.metadata = {
+            content_type = f'image/{filename.split(".")[-1].lower()}'
+            metadata = {
                 'original_filename': file.filename,
-                'content_type': f'image/{filename.split(".")[-1].lower()}',
+                'content_type': content_type,
                 'uploaded_by': 'medisupply-providers',
                 'folder': self.config.BUCKET_FOLDER
             }
             
-            # Subir archivo
-            file.seek(0)
-            blob.upload_from_file(file, content_type=blob.metadata['content_type'])
+            # Subir archivo a la carpeta de proveedores
+            self._call('storage.put', self.backend.put, self._object_path(filename), file, content_type, metadata)
             
             # Generar URL firmada
             signed_url = self.get_image_url(filename)
@@ -140,8 +140,8 @@ class CloudStorageService:
             
             return True, "Imagen subida exitosamente", signed_url
             
-        except GoogleCloudError as e:
-            return False, f"Error de Google Cloud Storage: {str(e)}", None
+        except StorageError as e:
+            return False, f"Error de {self.backend.display_name}: {str(e)}", None
         except Exception as e:
             return False, f"Error al subir imagen: {str(e)}", None
     
@@ -156,23 +156,61 @@ class CloudStorageService:
             Tuple[bool, str]: (éxito, mensaje)
         """
         try:
-            full_path = f"{self.config.BUCKET_FOLDER}/{filename}"
-            blob = self.bucket.blob(full_path)
-            
-            if blob.exists():
-                blob.delete()
+            deleted = self._call('storage.delete', self.backend.delete, self._object_path(filename))
+            if deleted:
                 return True, "Imagen eliminada exitosamente"
             else:
                 return False, "La imagen no existe"
                 
-        except GoogleCloudError as e:
-            return False, f"Error de Google Cloud Storage: {str(e)}"
+        except StorageError as e:
+            return False, f"Error de {self.backend.display_name}: {str(e)}"
         except Exception as e:
             return False, f"Error al eliminar imagen: {str(e)}"
     
+    def delete_images(self, filenames: List[str], progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """
+        Elimina varias imágenes del bucket en lotes de STORAGE_DELETE_BATCH_SIZE
+        
+        Args:
+            filenames: Nombres de los archivos a eliminar
+            progress: Callback opcional (procesados_en_lote, eliminados_en_lote) tras cada lote
+            
+        Returns:
+            int: Número de imágenes eliminadas
+            
+        Raises:
+            PartialDeleteError: Si alguna imagen no se pudo eliminar (tras intentar todos los lotes)
+        """
+        batch_size = self.config.STORAGE_DELETE_BATCH_SIZE
+        deleted = 0
+        failed: List[str] = []
+        for start in range(0, len(filenames), batch_size):
+            batch = filenames[start:start + batch_size]
+            try:
+                batch_deleted = self._call(
+                    'storage.delete_many', self.backend.delete_many, [self._object_path(filename) for filename in batch]
+                )
+            except PartialDeleteError as e:
+                batch_deleted = e.deleted
+                failed += e.failed
+            deleted += batch_deleted
+            if progress:
+                progress(len(batch), batch_deleted)
+        
+        if failed:
+            raise PartialDeleteError(
+                f"No se pudieron eliminar {len(failed)} de {len(filenames)} imágenes (primera: {failed[0]})",
+                deleted, failed
+            )
+        logger.info(f"Limpieza de imágenes completada - Eliminadas: {deleted} de {len(filenames)}")
+        return deleted
+    
     def get_image_url(self, filename: str, expiration_hours: int = 168) -> str:
         """
-        Genera una URL firmada de una imagen en Cloud Storage usando impersonated credentials (Cloud Run safe)
+        Genera una URL firmada de una imagen (en GCS usando impersonated credentials, Cloud Run safe)
+        
+        Si el almacenamiento falla o su circuit breaker está abierto, retorna la última URL
+        firmada vigente del objeto o, si no hay, la URL pública, sin esperar al backend.
         
         Args:
             filename: Nombre del archivo
@@ -181,41 +219,206 @@ class CloudStorageService:
         Returns:
             str: URL firmada de la imagen
         """
+        return self._sign_image_url(filename, expiration_hours)[0]
+    
+    def _sign_image_url(self, filename: str, expiration_hours: int) -> Tuple[str, Optional[float]]:
+        """
+        Firma una imagen como get_image_url y retorna también el vencimiento (epoch) de la URL
+        
+        Solo una URL firmada en esta llamada tiene vencimiento; la alternativa (última URL
+        recordada o URL pública) tiene None aunque se conozca el de la URL recordada. Un
+        objeto inexistente da ('', ahora + expiration_hours).
+        """
+        full_path = self._object_path(filename)
         try:
-            from datetime import datetime, timedelta, timezone
-            from google.auth import default, impersonated_credentials
-            
-            full_path = f"{self.config.BUCKET_FOLDER}/{filename}"
-            blob = self.bucket.blob(full_path)
-
-            if not blob.exists():
+            exists = self._call('storage.exists', self.backend.exists, full_path)
+            if not exists:
                 logger.warning(f"El archivo {filename} no existe en el bucket")
-                return ""
-
-            expiration = datetime.now(timezone.utc) + timedelta(hours=expiration_hours)
+                return "", time.time() + expiration_hours * 3600
 
-            # Cargar credenciales actuales (las del Cloud Run service account)
-            source_credentials, _ = default()
-
-            # Impersonar el service account que firmará la URL
-            target_credentials = impersonated_credentials.Credentials(
-                source_credentials=source_credentials,
-                target_principal=self.config.SIGNING_SERVICE_ACCOUNT_EMAIL,
-                target_scopes=["https://www.googleapis.com/auth/devstorage.read_only"],
-                lifetime=300,
-            )
-
-            # Generar la URL firmada usando las credenciales impersonadas
-            signed_url = blob.generate_signed_url(
-                expiration=expiration,
-                method="GET",
-                version="v4",
-                credentials=target_credentials,
-            )
+            expiration = timedelta(hours=expiration_hours)
+            signed_url = self._call('storage.sign', self.backend.sign, full_path, expiration)
+            expires_at = self._remember_signed_url(full_path, signed_url, expiration)
 
             logger.info(f"URL firmada generada para {filename}")
-            return signed_url
+            return signed_url, expires_at
 
+        except CircuitOpenError:
+            return self._fallback_url(full_path), None
         except Exception as e:
             logger.error(f"Error al generar URL firmada para {filename}: {e}")
-            return f"https://storage.googleapis.com/{self.config.BUCKET_NAME}/{self.config.BUCKET_FOLDER}/{filename}"
+            return self._fallback_url(full_path), None
+    
+    def get_image_urls(self, filenames: List[str], expiration_hours: int = 168) -> Dict[str, str]:
+        """
+        Genera las URLs firmadas de varias imágenes en una pasada
+        
+        Cada nombre distinto se firma una sola vez y, con STORAGE_SIGN_CONCURRENCY > 1, las
+        verificaciones contra el backend se hacen en paralelo. Cada URL se obtiene como en
+        get_image_url, con la misma alternativa ante fallos del almacenamiento.
+        
+        Returns:
+            Dict[str, str]: URL firmada por nombre de archivo
+        """
+        return {
+            filename: url
+            for filename, (url, _) in self._sign_image_urls(filenames, expiration_hours).items()
+        }
+    
+    def _sign_image_urls(self, filenames: List[str], expiration_hours: int) -> Dict[str, Tuple[str, Optional[float]]]:
+        """(url, vence) de cada nombre distinto, firmados como en _sign_image_url"""
+        unique = list(dict.fromkeys(filename for filename in filenames if filename))
+        workers = min(self.config.STORAGE_SIGN_CONCURRENCY, len(unique))
+        if workers <= 1:
+            return {filename: self._sign_image_url(filename, expiration_hours) for filename in unique}
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sign') as executor:
+            # Cada tarea corre en una copia del contexto para que sus spans cuenten en la petición
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._sign_image_url, filename, expiration_hours)
+                for filename in unique
+            ]
+            return {filename: future.result() for filename, future in zip(unique, futures)}
+    
+    def generate_upload_url(self, filename: str, content_type: str) -> Dict[str, Any]:
+        """
+        Genera una URL firmada para que el cliente suba la imagen directamente al bucket
+        
+        Args:
+            filename: Nombre del archivo en el bucket
+            content_type: Tipo de contenido que el cliente debe enviar en el PUT
+            
+        Returns:
+            Dict[str, Any]: URL de subida, método, headers requeridos y expiración
+        """
+        try:
+            expires_in = timedelta(minutes=self.config.SIGNED_UPLOAD_URL_EXPIRATION_MINUTES)
+            upload_url = self._call(
+                'storage.sign',
+                self.backend.sign,
+                self._object_path(filename),
+                expires_in,
+                method='PUT',
+                content_type=content_type
+            )
+            
+            logger.info(f"URL de subida firmada generada para {filename}")
+            
+            return {
+                'upload_url': upload_url,
+                'method': 'PUT',
+                'headers': {'Content-Type': content_type, **self.backend.upload_headers()},
+                'expires_at': (datetime.now(timezone.utc) + expires_in).isoformat()
+            }
+        except Exception as e:
+            raise StorageError(f"Error al generar URL de subida para {filename}: {str(e)}")
+    
+    def confirm_upload(self, filename: str) -> Tuple[bool, str, Optional[str]]:
+        """
+        Confirma que una imagen subida directamente al bucket existe y es válida
+        
+        Además del tipo y tamaño declarados, descarga el objeto (acotado por MAX_CONTENT_LENGTH)
+        y lo verifica con Pillow como upload_image; si no es válido, lo elimina.
+        
+        Args:
+            filename: Nombre del archivo en el bucket
+            
+        Returns:
+            Tuple[bool, str, Optional[str]]: (éxito, mensaje, url_firmada)
+        """
+        try:
+            full_path = self._object_path(filename)
+            info = self._call('storage.stat', self.backend.stat, full_path)
+            
+            if info is None:
+                return False, "La imagen no ha sido subida al bucket", None
+            
+            content_type = info.get('content_type') or ''
+            if not content_type.startswith('image/'):
+                self._call('storage.delete', self.backend.delete, full_path)
+                return False, "El archivo subido no es una imagen válida", None
+            
+            size = info.get('size')
+            if not size or size > self.config.MAX_CONTENT_LENGTH:
+                self._call('storage.delete', self.backend.delete, full_path)
+                return False, f"El archivo es demasiado grande. Máximo: {self.config.MAX_CONTENT_LENGTH // (1024*1024)}MB", None
+            
+            data = self._call('storage.get', self.backend.get, full_path)
+            if data is None:
+                return False, "La imagen no ha sido subida al bucket", None
+            if not self._is_valid_image(io.BytesIO(data)):
+                self._call('storage.delete', self.backend.delete, full_path)
+                return False, "El archivo subido no es una imagen válida", None
+            
+            signed_url = self.get_image_url(filename)
+            
+            logger.info(f"Subida directa confirmada - Filename: {filename}")
+            
+            return True, "Imagen confirmada exitosamente", signed_url
+            
+        except StorageError as e:
+            return False, f"Error de {self.backend.display_name}: {str(e)}", None
+        except Exception as e:
+            return False, f"Error al confirmar imagen: {str(e)}", None
+    
+    def _call(self, phase: str, function: Callable[..., Any], *args, **kwargs) -> Any:
+        """Llama al backend dentro del span de la fase y a través del circuit breaker del almacenamiento"""
+        def timed_call():
+            with span(phase):
+                return function(*args, **kwargs)
+        
+        breaker = self.breaker
+        if breaker is None:
+            return timed_call()
+        return breaker.call(timed_call)
+    
+    def sign_image_urls(self, filenames: List[str], expiration_hours: int = 168) -> Dict[str, Tuple[str, Optional[float]]]:
+        """
+        Firma varias imágenes como get_image_urls y retorna también el vencimiento de cada URL
+        
+        Un objeto inexistente da ('', ahora + expiration_hours) para no volver a consultarlo hasta
+        entonces. Solo las URLs firmadas en esta llamada tienen vencimiento: la alternativa con
+        el almacenamiento caído (incluida la última URL firmada recordada) tiene vencimiento None.
+        
+        Returns:
+            Dict[str, Tuple[str, Optional[float]]]: (url, vence en epoch) por nombre de archivo
+        """
+        return self._sign_image_urls(filenames, expiration_hours)
+    
+    def remember_signed_url(self, filename: str, signed_url: str, expires_at: float) -> None:
+        """Registra una URL firmada guardada fuera del proceso (en la base) con su vencimiento en epoch"""
+        self._store_signed_url(self._object_path(filename), signed_url, expires_at)
+    
+    def _remember_signed_url(self, full_path: str, signed_url: str, expiration: timedelta) -> float:
+        """Guarda la URL firmada como última conocida del objeto (hasta SIGNED_URL_CACHE_SIZE objetos) y retorna su vencimiento"""
+        expires_at = time.time() + expiration.total_seconds()
+        self._store_signed_url(full_path, signed_url, expires_at)
+        return expires_at
+    
+    def _store_signed_url(self, full_path: str, signed_url: str, expires_at: float) -> None:
+        with _signed_urls_lock:
+            previous = _signed_urls.pop(full_path, None)
+            if previous is not None:
+                _signed_url_expiry.pop(previous[0], None)
+            _signed_urls[full_path] = (signed_url, expires_at)
+            _signed_url_expiry[signed_url] = expires_at
+            while len(_signed_urls) > self.config.SIGNED_URL_CACHE_SIZE:
+                _, (evicted_url, _) = _signed_urls.popitem(last=False)
+                _signed_url_expiry.pop(evicted_url, None)
+    
+    def signed_url_expires_at(self, signed_url: str) -> Optional[float]:
+        """Vencimiento (epoch) de una URL firmada recordada por este proceso, None si no se conoce"""
+        with _signed_urls_lock:
+            return _signed_url_expiry.get(signed_url)
+
+    def _fallback_url(self, full_path: str) -> str:
+        """Última URL firmada aún vigente del objeto o, si no hay, su URL pública"""
+        with _signed_urls_lock:
+            cached = _signed_urls.get(full_path)
+        hit = cached is not None and cached[1] > time.time()
+        record_cache_access('signed_url_fallback', hit)
+        return cached[0] if hit else self.backend.public_url(full_path)
+    
+    def _object_path(self, filename: str) -> str:
+        """Ruta completa del objeto dentro de la carpeta de proveedores"""
+        return f"{self.config.BUCKET_FOLDER}/{filename}"
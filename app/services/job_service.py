@@ -0,0 +1,139 @@
+"""
+Servicio de trabajos en segundo plano - Ejecución asíncrona con seguimiento de progreso
+"""
+import uuid
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from ..config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundJob:
+    """Estado y progreso de un trabajo en segundo plano"""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+    def __init__(self, job_type: str, total: int = 0):
+        self.id = str(uuid.uuid4())
+        self.job_type = job_type
+        self.status = self.PENDING
+        self.total = total
+        self.processed = 0
+        self.succeeded = 0
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    def advance(self, processed: int, succeeded: int = 0) -> None:
+        """Registra el avance del trabajo"""
+        with self._lock:
+            self.processed += processed
+            self.succeeded += succeeded
+
+    @property
+    def finished(self) -> bool:
+        """Indica si el trabajo terminó (con éxito o con error)"""
+        return self.status in (self.COMPLETED, self.FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convierte el trabajo a diccionario"""
+        with self._lock:
+            progress = round(self.processed / self.total * 100, 1) if self.total else 100.0
+            return {
+                'id': self.id,
+                'type': self.job_type,
+                'status': self.status,
+                'total': self.total,
+                'processed': self.processed,
+                'succeeded': self.succeeded,
+                'progress': progress if self.status != self.PENDING else 0.0,
+                'error': self.error,
+                'created_at': self.created_at.isoformat(),
+                'started_at': self.started_at.isoformat() if self.started_at else None,
+                'finished_at': self.finished_at.isoformat() if self.finished_at else None
+            }
+
+
+class JobService:
+    """Ejecuta trabajos en un pool de hilos del proceso y conserva su estado un tiempo"""
+
+    def __init__(self, max_workers: int = 2, retention_seconds: int = 3600):
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='provider-jobs')
+        self._jobs: Dict[str, BackgroundJob] = {}
+        self._finished_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, job_type: str, total: int, func: Callable[[BackgroundJob], None]) -> BackgroundJob:
+        """
+        Encola un trabajo en segundo plano
+
+        Args:
+            job_type: Tipo del trabajo (p. ej. 'logo_cleanup')
+            total: Número de elementos a procesar, para calcular el progreso
+            func: Función que recibe el trabajo y reporta su avance con job.advance()
+
+        Returns:
+            BackgroundJob: Trabajo encolado
+        """
+        job = BackgroundJob(job_type, total)
+        with self._lock:
+            self._purge_expired()
+            self._jobs[job.id] = job
+
+        self._executor.submit(self._run, job, func)
+        return job
+
+    def get(self, job_id: str) -> Optional[BackgroundJob]:
+        """Obtiene un trabajo por ID (None si no existe o ya expiró)"""
+        with self._lock:
+            self._purge_expired()
+            return self._jobs.get(job_id)
+
+    def _run(self, job: BackgroundJob, func: Callable[[BackgroundJob], None]) -> None:
+        """Ejecuta el trabajo registrando su estado final"""
+        job.status = BackgroundJob.RUNNING
+        job.started_at = datetime.utcnow()
+        try:
+            func(job)
+            job.status = BackgroundJob.COMPLETED
+        except Exception as e:
+            logger.error(f"Trabajo {job.job_type} {job.id} falló: {e}")
+            job.error = str(e)
+            job.status = BackgroundJob.FAILED
+        finally:
+            job.finished_at = datetime.utcnow()
+            with self._lock:
+                self._finished_at[job.id] = time.monotonic()
+
+    def _purge_expired(self) -> None:
+        """Descarta los trabajos terminados hace más de retention_seconds"""
+        limit = time.monotonic() - self.retention_seconds
+        for job_id in [job_id for job_id, finished in self._finished_at.items() if finished < limit]:
+            self._finished_at.pop(job_id, None)
+            self._jobs.pop(job_id, None)
+
+
+_job_service: Optional[JobService] = None
+_job_service_lock = threading.Lock()
+
+
+def get_job_service(config: Config = None) -> JobService:
+    """Obtiene el servicio de trabajos compartido por el proceso"""
+    global _job_service
+    with _job_service_lock:
+        if _job_service is None:
+            config = config or Config()
+            _job_service = JobService(config.BACKGROUND_JOB_WORKERS, config.BACKGROUND_JOB_RETENTION_SECONDS)
+        return _job_service
@@ -0,0 +1,140 @@
+"""
+Refresco de URLs de logo - Renueva en segundo plano las URLs firmadas guardadas
+
+Corre en un hilo por worker, iniciado con la primera petición (LOGO_URL_REFRESH_ENABLED).
+Cada LOGO_URL_REFRESH_INTERVAL_SECONDS vuelve a firmar, en lotes de LOGO_URL_REFRESH_BATCH_SIZE,
+las URLs que vencen en menos de LOGO_URL_REFRESH_BEFORE_HOURS y las guarda en la base, para
+que las lecturas sirvan la URL guardada sin firmar en la petición.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class LogoUrlRefresher:
+    """Renueva las URLs de logo guardadas antes de que venzan"""
+
+    def __init__(self, config, repository=None, cloud_storage_service=None):
+        self.config = config
+        self._repository = repository
+        self._cloud_storage_service = cloud_storage_service
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = {'refreshed': 0, 'failures': 0, 'last_error': None, 'last_run_at': None}
+
+    @property
+    def repository(self):
+        if self._repository is None:
+            from ..repositories.provider_repository import ProviderRepository
+            self._repository = ProviderRepository()
+        return self._repository
+
+    @property
+    def cloud_storage_service(self):
+        if self._cloud_storage_service is None:
+            from .cloud_storage_service import CloudStorageService
+            self._cloud_storage_service = CloudStorageService(self.config)
+        return self._cloud_storage_service
+
+    def run_once(self) -> int:
+        """
+        Renueva lotes hasta que no queden URLs por vencer (o un lote no se pueda firmar completo)
+        
+        Cada fila contada deja de estar pendiente, así que un lote incompleto (por ejemplo con el
+        almacenamiento caído, cuando nada se firma) termina la pasada en lugar de volver a
+        elegir las mismas filas.
+
+        Returns:
+            int: URLs renovadas
+        """
+        before = datetime.utcnow() + timedelta(hours=self.config.LOGO_URL_REFRESH_BEFORE_HOURS)
+        batch_size = self.config.LOGO_URL_REFRESH_BATCH_SIZE
+        refreshed = 0
+        while True:
+            count = self.repository.refresh_logo_urls(before, batch_size, self._sign)
+            metrics.record_logo_urls('refreshed', count)
+            refreshed += count
+            if count < batch_size:
+                break
+        with self._lock:
+            self._state['refreshed'] += refreshed
+            self._state['last_run_at'] = datetime.utcnow().isoformat()
+        return refreshed
+
+    def start(self) -> None:
+        """Inicia el hilo del refresco"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._loop, name='logo-url-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Detiene el hilo del refresco (pruebas y apagado)"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """URLs renovadas, fallos y última ejecución del refresco en este proceso"""
+        with self._lock:
+            return {'running': self._thread is not None and not self._stopped.is_set(), **self._state}
+
+    def _loop(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.warning(f"No se pudieron refrescar las URLs de logo: {str(e)}")
+                with self._lock:
+                    self._state['failures'] += 1
+                    self._state['last_error'] = str(e)
+            self._stopped.wait(self.config.LOGO_URL_REFRESH_INTERVAL_SECONDS)
+
+    def _sign(self, filenames: List[str]) -> Dict[str, Tuple[str, Optional[datetime]]]:
+        """Firma los logos del lote; el vencimiento se guarda como fecha UTC sin zona horaria"""
+        return {
+            filename: (url, datetime.utcfromtimestamp(expires_at) if expires_at is not None else None)
+            for filename, (url, expires_at) in self.cloud_storage_service.sign_image_urls(filenames).items()
+        }
+
+
+_refresher: Optional[LogoUrlRefresher] = None
+_refresher_lock = threading.Lock()
+
+
+def get_refresher(config) -> LogoUrlRefresher:
+    """Refresco del proceso (se crea una sola vez)"""
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = LogoUrlRefresher(config)
+        return _refresher
+
+
+def stop_refresher(timeout: Optional[float] = 5.0) -> None:
+    """Detiene y descarta el refresco del proceso (tras un fork o entre pruebas)"""
+    global _refresher
+    with _refresher_lock:
+        refresher, _refresher = _refresher, None
+    if refresher is not None:
+        refresher.stop(timeout)
+
+
+def init_logo_url_refresh(app, config) -> None:
+    """Con LOGO_URL_REFRESH_ENABLED, inicia el refresco del worker con la primera petición"""
+    if not config.LOGO_URL_REFRESH_ENABLED:
+        return
+    started = threading.Event()
+
+    @app.before_request
+    def _start_logo_url_refresh():
+        if not started.is_set():
+            started.set()
+            get_refresher(config).start()
@@ -1,27 +1,44 @@
 """
 Servicio de Proveedores - Lógica de negocio para proveedores
 """
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 from werkzeug.datastructures import FileStorage
 import os
+import math
 import uuid
+import logging
 
 from .base_service import BaseService
 from .cloud_storage_service import CloudStorageService
+from .job_service import get_job_service
 from ..repositories.provider_repository import ProviderRepository
 from ..models.provider_model import Provider
-from ..exceptions.custom_exceptions import ValidationError, BusinessLogicError
+from ..exceptions.custom_exceptions import ValidationError, BusinessLogicError, NotFoundError
 from ..config.settings import Config
+from ..utils.change_cursor import Position, encode_cursor
+from ..utils.collection_version import providers_version
+from ..utils.metrics import record_logo_urls
+from ..utils.single_flight import SingleFlight
+from ..utils.upload_token import issue_upload_token, verify_upload_token
+from ..utils.timing import span, timed
+
+logger = logging.getLogger(__name__)
+
+# Lecturas en curso del proceso; los servicios se crean por petición, el grupo es compartido
+_reads = SingleFlight('single_flight')
 
 
 class ProviderService(BaseService):
     """Servicio para operaciones de negocio de proveedores"""
     
-    def __init__(self, provider_repository=None, cloud_storage_service=None, config=None):
+    def __init__(self, provider_repository=None, cloud_storage_service=None, config=None, job_service=None):
         self.provider_repository = provider_repository or ProviderRepository()
         self.config = config or Config()
         self.cloud_storage_service = cloud_storage_service or CloudStorageService(self.config)
+        self.job_service = job_service or get_job_service(self.config)
     
+    @timed('service.create')
     def create(self, **kwargs) -> Provider:
         """Crea un nuevo proveedor con validaciones de negocio"""
         try:
@@ -30,14 +47,20 @@ class ProviderService(BaseService):
             
             # Procesar archivo de logo si se proporciona
             logo_file = kwargs.get('logo_file')
+            uploaded_logo_filename = kwargs.pop('uploaded_logo_filename', None)
+            uploaded_logo_token = kwargs.pop('uploaded_logo_token', None)
             logo_filename = None
             logo_url = None
             
             if logo_file is not None:
                 logo_filename, logo_url = self._process_logo_file(logo_file)
-                if logo_filename:
-                    kwargs['logo_filename'] = logo_filename
-                    kwargs['logo_url'] = logo_url
+            elif uploaded_logo_filename or uploaded_logo_token:
+                logo_filename, logo_url = self._confirm_uploaded_logo(uploaded_logo_token, uploaded_logo_filename)
+            
+            if logo_filename:
+                kwargs['logo_filename'] = logo_filename
+                kwargs['logo_url'] = logo_url
+                kwargs['logo_url_expires_at'] = self._logo_url_expires_at(logo_url)
             
             # Crear proveedor
             provider = self.provider_repository.create(**kwargs)
@@ -49,35 +72,255 @@ class ProviderService(BaseService):
         except Exception as e:
             raise BusinessLogicError(f"Error al crear proveedor: {str(e)}")
     
-    def get_by_id(self, provider_id: str) -> Optional[Provider]:
-        """Obtiene un proveedor por ID"""
+    def _coalesce(self, key: tuple, function, *args, **kwargs):
+        """
+        Ejecuta la lectura o se une a una idéntica en curso (SINGLE_FLIGHT_ENABLED)
+        
+        La clave incluye la versión de la colección: una lectura que empieza después de
+        una escritura no recibe el resultado de una que empezó antes.
+        """
+        if not self.config.SINGLE_FLIGHT_ENABLED:
+            return function(*args, **kwargs)
+        return _reads.do(key + (providers_version.value,), function, *args, **kwargs)
+    
+    @timed('service.get_by_id')
+    def get_by_id(self, provider_id: str, fields: Optional[Tuple[str, ...]] = None) -> Optional[Provider]:
+        """Obtiene un proveedor por ID (solo los campos de fields, si se indican)"""
+        return self._coalesce(('get_by_id', provider_id, fields), self._get_by_id, provider_id, fields)
+    
+    def _get_by_id(self, provider_id: str, fields: Optional[Tuple[str, ...]]) -> Optional[Provider]:
         try:
-            provider = self.provider_repository.get_by_id(provider_id)
-            if provider and provider.logo_filename:
-                # Generar URL para el logo
-                provider.logo_url = self.cloud_storage_service.get_image_url(provider.logo_filename)
+            provider = self.provider_repository.get_by_id(provider_id, fields=self._query_fields(fields))
+            if provider and self._signs_logo(fields):
+                self._attach_logo_urls([provider])
             return provider
         except Exception as e:
             raise BusinessLogicError(f"Error al obtener proveedor: {str(e)}")
     
-    def get_all(self, limit: Optional[int] = None, offset: int = 0) -> List[Provider]:
-        """Obtiene todos los proveedores con paginación"""
+    @timed('service.get_all')
+    def get_all(self, limit: Optional[int] = None, offset: int = 0,
+                fields: Optional[Tuple[str, ...]] = None) -> List[Provider]:
+        """Obtiene todos los proveedores con paginación (solo los campos de fields, si se indican)"""
+        return self._coalesce(('get_all', limit, offset, fields), self._get_all, limit, offset, fields)
+    
+    def _get_all(self, limit: Optional[int], offset: int, fields: Optional[Tuple[str, ...]]) -> List[Provider]:
         try:
-            providers = self.provider_repository.get_all(limit=limit, offset=offset)
-            # Generar URLs para todos los proveedores que tengan logo
-            for provider in providers:
-                if provider.logo_filename:
-                    provider.logo_url = self.cloud_storage_service.get_image_url(provider.logo_filename)
+            providers = self.provider_repository.get_all(limit=limit, offset=offset, fields=self._query_fields(fields))
+            if self._signs_logo(fields):
+                self._attach_logo_urls(providers)
             return providers
         except Exception as e:
             raise BusinessLogicError(f"Error al obtener proveedores: {str(e)}")
     
-    def delete_all(self) -> int:
-        """Elimina todos los proveedores de la base de datos"""
+    @timed('service.get_by_ids')
+    def get_by_ids(self, provider_ids: List[str], fields: Optional[Tuple[str, ...]] = None) -> List[Optional[Provider]]:
+        """
+        Obtiene varios proveedores con una sola consulta y firma sus logos en lote
+        
+        Returns:
+            List[Optional[Provider]]: Un elemento por ID en el orden pedido (None si no existe)
+        """
         try:
-            return self.provider_repository.delete_all()
+            query_fields = self._query_fields(fields)
+            if query_fields is not None and 'id' not in query_fields:
+                # El id se necesita para ubicar cada fila en el orden pedido
+                query_fields = ('id',) + query_fields
+            providers = self.provider_repository.get_by_ids(provider_ids, fields=query_fields)
+            
+            if self._signs_logo(fields):
+                self._attach_logo_urls(providers)
+            
+            by_id = {provider.id: provider for provider in providers}
+            return [by_id.get(provider_id) for provider_id in provider_ids]
+        except Exception as e:
+            raise BusinessLogicError(f"Error al obtener proveedores: {str(e)}")
+    
+    @timed('service.get_changes')
+    def get_changes(self, after: Optional[Position], limit: int,
+                    fields: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+        """
+        Página del feed de cambios a partir de la posición after (None: desde el inicio)
+        
+        Solo se entregan cambios anteriores a ahora menos CHANGES_FEED_SETTLE_SECONDS: updated_at
+        se asigna antes del commit, así que una transacción en curso puede hacer visible después
+        un cambio con fecha anterior a otros ya entregados. Sin más cambios, next_since avanza
+        hasta ese límite para que la siguiente consulta no vuelva a recorrer lo ya visto.
+        
+        Returns:
+            Dict[str, Any]: changes (op upsert/delete en orden), next_since y has_more
+        """
+        try:
+            until = datetime.utcnow() - timedelta(seconds=self.config.CHANGES_FEED_SETTLE_SECONDS)
+            query_fields = self._query_fields(fields)
+            if query_fields is not None:
+                # La posición de cada cambio se arma con id y updated_at
+                query_fields = tuple(
+                    field for field in Provider.FIELDS + self._LOGO_URL_COLUMNS
+                    if field in query_fields + ('id', 'updated_at')
+                )
+            changes = self.provider_repository.get_changes(after, until, limit, fields=query_fields)
+            has_more = len(changes) > limit
+            changes = changes[:limit]
+            
+            providers = [provider for _, _, provider in changes if provider is not None]
+            if self._signs_logo(fields):
+                self._attach_logo_urls(providers)
+            
+            if changes:
+                position = changes[-1][:2]
+            elif after is None or after < (until, ''):
+                position = (until, '')
+            else:
+                position = after
+            return {
+                'changes': [
+                    {
+                        'id': provider_id,
+                        'op': 'delete' if provider is None else 'upsert',
+                        'changed_at': changed_at.isoformat(),
+                        'provider': provider.to_dict(fields) if provider is not None else None
+                    }
+                    for changed_at, provider_id, provider in changes
+                ],
+                'next_since': encode_cursor(position),
+                'has_more': has_more
+            }
+        except Exception as e:
+            raise BusinessLogicError(f"Error al obtener cambios de proveedores: {str(e)}")
+    
+    # Columnas con las que se arma logo_url: la URL guardada, su vencimiento y el archivo para volver a firmar
+    _LOGO_URL_COLUMNS = ('logo_filename', 'logo_url', 'logo_url_expires_at')
+    
+    def _attach_logo_urls(self, providers: List[Provider]) -> None:
+        """
+        Asigna logo_url a los proveedores con logo
+        
+        Se sirve la URL guardada mientras le queden al menos LOGO_URL_MIN_VALIDITY_SECONDS de
+        validez (el refresco en segundo plano la renueva antes); las que no tienen vencimiento
+        o están por vencer se firman aquí, en un solo lote.
+        """
+        valid_until = datetime.utcnow() + timedelta(seconds=self.config.LOGO_URL_MIN_VALIDITY_SECONDS)
+        to_sign, stored = [], 0
+        for provider in providers:
+            if not provider.logo_filename:
+                continue
+            expires_at = provider.logo_url_expires_at
+            if isinstance(expires_at, datetime) and expires_at > valid_until:
+                if provider.logo_url:
+                    # Para que el caché de respuestas conozca su vencimiento
+                    self.cloud_storage_service.remember_signed_url(
+                        provider.logo_filename, provider.logo_url, expires_at.replace(tzinfo=timezone.utc).timestamp()
+                    )
+                stored += 1
+                continue
+            to_sign.append(provider)
+        record_logo_urls('stored', stored)
+        if not to_sign:
+            return
+        
+        record_logo_urls('signed', len(to_sign))
+        urls = self.cloud_storage_service.get_image_urls([provider.logo_filename for provider in to_sign])
+        for provider in to_sign:
+            provider.logo_url = urls[provider.logo_filename]
+    
+    def _logo_url_expires_at(self, logo_url: Optional[str]) -> Optional[datetime]:
+        """Vencimiento (UTC) de una URL recién firmada, None si no se conoce (URL pública alternativa)"""
+        expires_at = self.cloud_storage_service.signed_url_expires_at(logo_url) if logo_url else None
+        if not isinstance(expires_at, (int, float)):
+            return None
+        return datetime.utcfromtimestamp(expires_at)
+    
+    @staticmethod
+    def _signs_logo(fields: Optional[Tuple[str, ...]]) -> bool:
+        """La URL del logo solo se firma si se pidió logo_url (o todos los campos)"""
+        return fields is None or 'logo_url' in fields
+    
+    @classmethod
+    def _query_fields(cls, fields: Optional[Tuple[str, ...]]) -> Optional[Tuple[str, ...]]:
+        """Columnas a leer para los campos pedidos: logo_url sale de la URL guardada o de logo_filename"""
+        if fields is None:
+            return None
+        columns = tuple(field for field in Provider.FIELDS if field in fields and field not in cls._LOGO_URL_COLUMNS)
+        if 'logo_url' in fields:
+            return columns + cls._LOGO_URL_COLUMNS
+        if 'logo_filename' in fields:
+            return columns + ('logo_filename',)
+        return columns
+    
+    @timed('service.delete_all')
+    def delete_all(self) -> dict:
+        """
+        Elimina todos los proveedores y encola la limpieza de sus logos en el bucket
+        
+        Returns:
+            dict: deleted_count y el trabajo de limpieza (None si no había logos)
+        """
+        try:
+            deleted_count, logo_filenames = self.provider_repository.delete_all_returning_logos(
+                truncate=self._truncate_enabled()
+            )
         except Exception as e:
             raise BusinessLogicError(f"Error al eliminar todos los proveedores: {str(e)}")
+        
+        return {
+            'deleted_count': deleted_count,
+            'cleanup_job': self._schedule_logo_cleanup(logo_filenames)
+        }
+    
+    @timed('service.delete')
+    def delete(self, provider_id: str) -> dict:
+        """
+        Elimina un proveedor y encola la limpieza de su logo en el bucket
+        
+        Returns:
+            dict: id del proveedor y el trabajo de limpieza (None si no tenía logo)
+        """
+        try:
+            deleted, logo_filename = self.provider_repository.delete_by_id(provider_id)
+        except Exception as e:
+            raise BusinessLogicError(f"Error al eliminar proveedor: {str(e)}")
+        
+        if not deleted:
+            raise NotFoundError("Proveedor no encontrado")
+        
+        return {
+            'id': provider_id,
+            'cleanup_job': self._schedule_logo_cleanup([logo_filename] if logo_filename else [])
+        }
+    
+    def get_job(self, job_id: str) -> Optional[dict]:
+        """Obtiene el estado de un trabajo en segundo plano"""
+        job = self.job_service.get(job_id)
+        return job.to_dict() if job else None
+    
+    def _truncate_enabled(self) -> bool:
+        """
+        TRUNCATE (bloqueo ACCESS EXCLUSIVE) solo con DELETE_ALL_STRATEGY=truncate y
+        DELETE_ALL_ALLOW_TRUNCATE activado explícitamente, y nunca en producción
+        """
+        if self.config.DELETE_ALL_STRATEGY != 'truncate':
+            return False
+        if not self.config.DELETE_ALL_ALLOW_TRUNCATE:
+            logger.warning("DELETE_ALL_STRATEGY=truncate requiere DELETE_ALL_ALLOW_TRUNCATE=True; se usa DELETE")
+            return False
+        if self.config.ENVIRONMENT == 'production':
+            logger.warning("DELETE_ALL_STRATEGY=truncate se ignora en producción; se usa DELETE")
+            return False
+        return True
+    
+    def _schedule_logo_cleanup(self, logo_filenames: List[str]) -> Optional[dict]:
+        """Encola la eliminación por lotes de los logos sin bloquear la petición"""
+        if not logo_filenames:
+            return None
+        
+        def cleanup(job):
+            self.cloud_storage_service.delete_images(
+                logo_filenames,
+                progress=lambda processed, deleted: job.advance(processed, deleted)
+            )
+        
+        job = self.job_service.submit('logo_cleanup', len(logo_filenames), cleanup)
+        return job.to_dict()
     
     
     def validate_business_rules(self, **kwargs) -> None:
@@ -116,7 +359,7 @@ class ProviderService(BaseService):
         
         # Validar email único
         if 'email' in kwargs and kwargs['email']:
-            existing_provider = self.provider_repository.get_by_email(kwargs['email'].strip())
+            existing_provider = self.provider_repository.get_by_email(kwargs['email'].strip(), use_primary=True)
             if existing_provider:
                 errors.append("Ya existe un proveedor con este correo electrónico")
         
@@ -166,6 +409,67 @@ class ProviderService(BaseService):
                 raise
             raise ValidationError(f"Error al procesar archivo de logo: {str(e)}")
     
+    @timed('service.create_logo_upload_url')
+    def create_logo_upload_url(self, original_filename: str) -> dict:
+        """
+        Genera una URL firmada para subir el logo directamente al bucket
+        
+        Args:
+            original_filename: Nombre original del archivo que subirá el cliente
+            
+        Returns:
+            dict: Nombre asignado al logo y datos de la URL de subida
+        """
+        if not self._is_allowed_file(original_filename):
+            raise ValidationError("El campo 'Logo' debe aceptar únicamente archivos de imagen (JPG, PNG, GIF)")
+        
+        try:
+            unique_filename = Provider().generate_logo_filename(original_filename)
+            extension = unique_filename.split('.')[-1]
+            content_type = 'image/jpeg' if extension in ('jpg', 'jpeg') else f'image/{extension}'
+            
+            upload = self.cloud_storage_service.generate_upload_url(unique_filename, content_type)
+            upload['logo_filename'] = unique_filename
+            upload['logo_upload_token'] = issue_upload_token(unique_filename, self.config.SECRET_KEY)
+            return upload
+        except Exception as e:
+            raise BusinessLogicError(f"Error al generar URL de subida: {str(e)}")
+    
+    def _confirm_uploaded_logo(self, upload_token: Optional[str],
+                               logo_filename: Optional[str] = None) -> tuple[str, Optional[str]]:
+        """
+        Confirma un logo subido directamente al bucket con una URL de subida firmada
+        
+        Args:
+            upload_token: Token entregado junto con la URL de subida (contiene el nombre asignado)
+            logo_filename: Nombre asignado al logo; si se envía debe coincidir con el del token
+            
+        Returns:
+            tuple[str, Optional[str]]: (filename, url_firmada)
+        """
+        if not upload_token:
+            raise ValidationError("El logo subido requiere el 'logo_upload_token' entregado con la URL de subida")
+        try:
+            token_filename = verify_upload_token(
+                upload_token, self.config.SECRET_KEY, self.config.LOGO_UPLOAD_TOKEN_MAX_AGE_SECONDS
+            )
+        except ValueError as e:
+            raise ValidationError(str(e))
+        if logo_filename and logo_filename != token_filename:
+            raise ValidationError("El nombre del logo no corresponde al token de subida")
+        logo_filename = token_filename
+        
+        if not logo_filename.startswith('logo_') or not self._is_allowed_file(logo_filename):
+            raise ValidationError("El nombre del logo subido no es válido")
+        if self.provider_repository.logo_filename_in_use(logo_filename):
+            raise ValidationError("El logo subido ya está asociado a otro proveedor")
+        
+        success, message, signed_url = self.cloud_storage_service.confirm_upload(logo_filename)
+        if not success:
+            raise ValidationError(f"Error al confirmar imagen: {message}")
+        
+        return logo_filename, signed_url
+    
     def _is_allowed_file(self, filename: str) -> bool:
         """Verifica si el archivo está permitido"""
         if not filename or '.' not in filename:
@@ -176,30 +480,49 @@ class ProviderService(BaseService):
         
         return extension in allowed_extensions
     
-    def get_providers_summary(self, limit: Optional[int] = None, offset: int = 0) -> List[dict]:
-        """Obtiene un resumen de proveedores para listado"""
+    @timed('service.get_providers_summary')
+    def get_providers_summary(self, limit: Optional[int] = None, offset: int = 0,
+                              fields: Optional[Tuple[str, ...]] = None) -> List[dict]:
+        """Obtiene un resumen de proveedores para listado (SUMMARY_FIELDS o los campos de fields)"""
         try:
-            providers = self.get_all(limit=limit, offset=offset)
-            
-            return [
-                {
-                    'id': provider.id,
-                    'name': provider.name,
-                    'email': provider.email,
-                    'phone': provider.phone,
-                    'logo_filename': provider.logo_filename,
-                    'logo_url': provider.logo_url
-                }
-                for provider in providers
-            ]
+            providers = self.get_all(limit=limit, offset=offset, fields=fields)
+            
+            with span('serialize'):
+                return [provider.to_dict(fields or Provider.SUMMARY_FIELDS) for provider in providers]
             
         except Exception as e:
             raise BusinessLogicError(f"Error al obtener resumen de proveedores: {str(e)}")
     
+    def logo_urls_expire_at(self, summaries: List[dict]) -> Optional[float]:
+        """
+        Primer vencimiento (epoch) de las URLs firmadas de un listado
+        
+        Returns:
+            Optional[float]: math.inf si no hay URLs, None si alguna no tiene vencimiento
+            conocido (URL pública alternativa)
+        """
+        expires_at = math.inf
+        for summary in summaries:
+            if not summary.get('logo_url'):
+                continue
+            url_expires_at = self.cloud_storage_service.signed_url_expires_at(summary['logo_url'])
+            if url_expires_at is None:
+                return None
+            expires_at = min(expires_at, url_expires_at)
+        return expires_at
+    
+    def get_collection_stamp(self) -> tuple:
+        """Marca compartida de la colección con la que se validan las páginas en caché"""
+        try:
+            return self.provider_repository.collection_stamp()
+        except Exception as e:
+            raise BusinessLogicError(f"Error al leer la marca de la colección: {str(e)}")
+    
+    @timed('service.get_providers_count')
     def get_providers_count(self) -> int:
         """Obtiene el total de proveedores"""
         try:
-            return self.provider_repository.count_all()
+            return self._coalesce(('count_all',), self.provider_repository.count_all)
         except Exception as e:
             raise BusinessLogicError(f"Error al contar proveedores: {str(e)}")
     
@@ -0,0 +1,54 @@
+# Backends de almacenamiento de objetos del sistema de proveedores
+import threading
+
+from .base_storage import StorageBackend
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def create_storage_backend(config) -> StorageBackend:
+    """Crea el backend de almacenamiento indicado en STORAGE_BACKEND"""
+    backend = (config.STORAGE_BACKEND or 'gcs').lower()
+
+    if backend == 'fake':
+        from .fake_storage import FakeStorageBackend
+        return FakeStorageBackend(
+            root=config.FAKE_STORAGE_ROOT,
+            latency=config.STORAGE_LATENCY_MS / 1000.0,
+            jitter=config.STORAGE_LATENCY_JITTER_MS / 1000.0
+        )
+
+    if backend == 'local':
+        from .local_storage import LocalStorageBackend
+        return LocalStorageBackend(config.UPLOAD_FOLDER, _create_signer(config))
+
+    if backend == 'memory':
+        from .memory_storage import MemoryStorageBackend
+        return MemoryStorageBackend(_create_signer(config))
+
+    if backend == 'gcs':
+        from .gcs_storage import GCSStorageBackend
+        return GCSStorageBackend(config)
+
+    raise ValueError(f"Backend de almacenamiento no soportado: {config.STORAGE_BACKEND}")
+
+
+def get_storage_backend(config) -> StorageBackend:
+    """Obtiene el backend compartido del proceso para la configuración (se crea una sola vez)"""
+    key = (
+        (config.STORAGE_BACKEND or 'gcs').lower(),
+        config.BUCKET_NAME,
+        config.UPLOAD_FOLDER,
+        config.FAKE_STORAGE_ROOT
+    )
+    with _backends_lock:
+        if key not in _backends:
+            _backends[key] = create_storage_backend(config)
+        return _backends[key]
+
+
+def _create_signer(config):
+    """Firmador HMAC para las URLs servidas por la propia API"""
+    from .local_storage import UrlSigner
+    return UrlSigner(config.STORAGE_SIGNING_KEY or config.SECRET_KEY, config.LOCAL_STORAGE_BASE_URL)
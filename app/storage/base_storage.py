@@ -0,0 +1,75 @@
+"""
+Backend de almacenamiento base - Interfaz para almacenes de objetos
+"""
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import Any, BinaryIO, Dict, List, Optional
+
+# Objeto consultado por check(); no necesita existir
+HEALTH_CHECK_PATH = '.health-check'
+
+
+class StorageBackend(ABC):
+    """Interfaz común para los backends de almacenamiento de objetos"""
+
+    # Nombre legible del backend para mensajes de error
+    display_name = "almacenamiento"
+
+    @abstractmethod
+    def put(self, path: str, stream: BinaryIO, content_type: str, metadata: Optional[Dict[str, str]] = None) -> None:
+        """Guarda el contenido de un stream en la ruta indicada"""
+        pass
+
+    @abstractmethod
+    def get(self, path: str) -> Optional[bytes]:
+        """Obtiene el contenido de un objeto (None si no existe)"""
+        pass
+
+    @abstractmethod
+    def delete(self, path: str) -> bool:
+        """Elimina un objeto; retorna False si no existía"""
+        pass
+
+    def warm_up(self) -> None:
+        """Prepara clientes y credenciales antes de la primera petición (por defecto no hace nada)"""
+        pass
+
+    def check(self) -> None:
+        """Verifica que el almacén responde (lanza una excepción si no); usado por la sonda de readiness"""
+        self.exists(HEALTH_CHECK_PATH)
+
+    def upload_headers(self) -> Dict[str, str]:
+        """
+        Headers que el cliente debe enviar en el PUT de una URL firmada de subida, además de
+        Content-Type (por defecto ninguno: la API acota el tamaño al recibir el archivo)
+        """
+        return {}
+
+    def delete_many(self, paths: List[str]) -> int:
+        """Elimina varios objetos; retorna cuántos se eliminaron"""
+        return sum(1 for path in paths if self.delete(path))
+
+    @abstractmethod
+    def exists(self, path: str) -> bool:
+        """Verifica si un objeto existe"""
+        pass
+
+    @abstractmethod
+    def stat(self, path: str) -> Optional[Dict[str, Any]]:
+        """Obtiene tamaño y tipo de contenido de un objeto (None si no existe)"""
+        pass
+
+    @abstractmethod
+    def sign(self, path: str, expiration: timedelta, method: str = 'GET', content_type: Optional[str] = None) -> str:
+        """Genera una URL firmada con la expiración y método indicados"""
+        pass
+
+    @abstractmethod
+    def list(self, prefix: str = '') -> List[str]:
+        """Lista las rutas de los objetos que empiezan por el prefijo"""
+        pass
+
+    @abstractmethod
+    def public_url(self, path: str) -> str:
+        """URL sin firmar de un objeto, usada como fallback"""
+        pass
@@ -0,0 +1,84 @@
+"""
+Backend de almacenamiento falso sobre el sistema de archivos, con latencia inyectable.
+
+Emula el comportamiento de un bucket remoto para pruebas de integración y benchmarks
+sin red: cada operación espera la latencia configurada antes de tocar el disco.
+"""
+import time
+import random
+import threading
+from datetime import timedelta
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from .local_storage import LocalStorageBackend, UrlSigner
+
+
+class FakeStorageBackend(LocalStorageBackend):
+    """Almacén de objetos falso respaldado por un directorio local"""
+
+    display_name = "almacenamiento simulado"
+
+    OPERATIONS = ('put', 'get', 'delete', 'exists', 'stat', 'sign', 'list')
+
+    def __init__(self, root: str, latency: float = 0.0, jitter: float = 0.0,
+                 latencies: Optional[Dict[str, float]] = None, base_url: str = 'http://fake-storage.local'):
+        """
+        Args:
+            root: Directorio donde se guardan los objetos
+            latency: Latencia en segundos inyectada en cada operación
+            jitter: Variación aleatoria máxima (en segundos) sumada a la latencia
+            latencies: Latencias específicas por operación (put, get, exists, sign, ...)
+            base_url: Prefijo de las URLs generadas
+        """
+        super().__init__(root, UrlSigner('fake-storage-key', base_url))
+        self.latency = latency
+        self.jitter = jitter
+        self.latencies = latencies or {}
+        self.calls = {operation: 0 for operation in self.OPERATIONS}
+        self._lock = threading.Lock()
+
+    def put(self, path: str, stream: BinaryIO, content_type: str, metadata: Optional[Dict[str, str]] = None) -> None:
+        """Guarda el objeto tras la latencia simulada"""
+        self._simulate('put')
+        super().put(path, stream, content_type, metadata)
+
+    def get(self, path: str) -> Optional[bytes]:
+        """Lee el objeto tras la latencia simulada"""
+        self._simulate('get')
+        return super().get(path)
+
+    def delete(self, path: str) -> bool:
+        """Elimina el objeto tras la latencia simulada"""
+        self._simulate('delete')
+        return super().delete(path)
+
+    def exists(self, path: str) -> bool:
+        """Verifica el objeto tras la latencia simulada"""
+        self._simulate('exists')
+        return super().exists(path)
+
+    def stat(self, path: str) -> Optional[Dict[str, Any]]:
+        """Obtiene los metadatos tras la latencia simulada"""
+        self._simulate('stat')
+        return super().stat(path)
+
+    def sign(self, path: str, expiration: timedelta, method: str = 'GET', content_type: Optional[str] = None) -> str:
+        """Firma la URL tras la latencia simulada"""
+        self._simulate('sign')
+        return super().sign(path, expiration, method, content_type)
+
+    def list(self, prefix: str = '') -> List[str]:
+        """Lista los objetos tras la latencia simulada"""
+        self._simulate('list')
+        return super().list(prefix)
+
+    def _simulate(self, operation: str) -> None:
+        """Registra la llamada e inyecta la latencia configurada para la operación"""
+        with self._lock:
+            self.calls[operation] += 1
+
+        delay = self.latencies.get(operation, self.latency)
+        if self.jitter:
+            delay += random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
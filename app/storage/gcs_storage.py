@@ -0,0 +1,304 @@
+"""
+Backend de almacenamiento sobre Google Cloud Storage
+"""
+import os
+import time
+import random
+import logging
+import functools
+import threading
+from datetime import timedelta
+from typing import Any, BinaryIO, Dict, List, Optional
+import requests
+from google.cloud import storage
+
+from .base_storage import StorageBackend
+from ..config.settings import Config
+from ..exceptions.custom_exceptions import StorageError, PartialDeleteError
+from ..utils.timing import timed
+
+logger = logging.getLogger(__name__)
+
+# Alcances de las credenciales de firma según el método de la URL
+READ_SCOPE = "https://www.googleapis.com/auth/devstorage.read_only"
+WRITE_SCOPE = "https://www.googleapis.com/auth/devstorage.read_write"
+
+# Códigos HTTP que GCS recomienda reintentar en subidas reanudables
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Máximo de operaciones por petición batch que acepta GCS
+GCS_BATCH_LIMIT = 100
+
+
+def _wrap_gcs_errors(method):
+    """Convierte cualquier error del cliente de GCS en StorageError"""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        try:
+            return method(*args, **kwargs)
+        except StorageError:
+            raise
+        except Exception as e:
+            raise StorageError(str(e))
+    return wrapper
+
+
+class GCSStorageBackend(StorageBackend):
+    """Backend de almacenamiento en un bucket de Google Cloud Storage"""
+
+    display_name = "Google Cloud Storage"
+
+    def __init__(self, config: Config = None):
+        self.config = config or Config()
+        self._client = None
+        self._bucket = None
+        self._signing_credentials: Dict[str, Any] = {}
+        self._signing_lock = threading.Lock()
+
+    @property
+    def client(self) -> storage.Client:
+        """Obtiene el cliente de Google Cloud Storage"""
+        if self._client is None:
+            try:
+                # Configurar credenciales si están disponibles
+                if self.config.GOOGLE_APPLICATION_CREDENTIALS:
+                    os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = self.config.GOOGLE_APPLICATION_CREDENTIALS
+
+                self._client = storage.Client(project=self.config.GCP_PROJECT_ID)
+            except Exception as e:
+                raise StorageError(f"Error al inicializar cliente de GCS: {str(e)}")
+
+        return self._client
+
+    @property
+    def bucket(self) -> storage.Bucket:
+        """Obtiene el bucket de Google Cloud Storage"""
+        if self._bucket is None:
+            try:
+                self._bucket = self.client.bucket(self.config.BUCKET_NAME)
+            except StorageError:
+                raise
+            except Exception as e:
+                raise StorageError(f"Error al obtener bucket '{self.config.BUCKET_NAME}': {str(e)}")
+
+        return self._bucket
+
+    @_wrap_gcs_errors
+    def put(self, path: str, stream: BinaryIO, content_type: str, metadata: Optional[Dict[str, str]] = None) -> None:
+        """Sube un archivo al bucket (por partes si supera el umbral de subida reanudable)"""
+        blob = self.bucket.blob(path)
+        blob.metadata = metadata
+
+        stream.seek(0, 2)
+        size = stream.tell()
+        stream.seek(0)
+        if size > self.config.RESUMABLE_UPLOAD_THRESHOLD:
+            self._upload_resumable(blob, stream, content_type, size)
+        else:
+            blob.upload_from_file(stream, content_type=content_type)
+
+    @_wrap_gcs_errors
+    def get(self, path: str) -> Optional[bytes]:
+        """Descarga el contenido de un objeto del bucket"""
+        blob = self.bucket.get_blob(path)
+        if blob is None:
+            return None
+        return blob.download_as_bytes()
+
+    @_wrap_gcs_errors
+    def delete(self, path: str) -> bool:
+        """Elimina un objeto del bucket si existe"""
+        blob = self.bucket.blob(path)
+        if not blob.exists():
+            return False
+        blob.delete()
+        return True
+
+    @_wrap_gcs_errors
+    def delete_many(self, paths: List[str]) -> int:
+        """
+        Elimina varios objetos en peticiones batch de hasta GCS_BATCH_LIMIT operaciones
+
+        Cada sub-respuesta se revisa: un objeto inexistente (404) ya está eliminado y no se
+        cuenta; cualquier otro error (403, 5xx) se informa con PartialDeleteError después de
+        procesar todos los lotes.
+
+        Returns:
+            int: Objetos eliminados
+
+        Raises:
+            PartialDeleteError: Si algún objeto no se pudo eliminar (con los eliminados y los fallidos)
+        """
+        deleted = 0
+        failed = []
+        for start in range(0, len(paths), GCS_BATCH_LIMIT):
+            chunk = paths[start:start + GCS_BATCH_LIMIT]
+            with self.client.batch(raise_exception=False) as batch:
+                for path in chunk:
+                    self.bucket.delete_blob(path)
+            # La librería solo expone las sub-respuestas en _responses, en el orden de las peticiones
+            statuses = [response.status_code for response in batch._responses]
+            for index, path in enumerate(chunk):
+                status = statuses[index] if index < len(statuses) else None
+                if status is not None and 200 <= status < 300:
+                    deleted += 1
+                elif status != 404:
+                    failed.append((path, status))
+
+        if failed:
+            path, status = failed[0]
+            raise PartialDeleteError(
+                f"No se pudieron eliminar {len(failed)} de {len(paths)} objetos (primero: {path}, estado {status})",
+                deleted, [path for path, _ in failed]
+            )
+        return deleted
+
+    @_wrap_gcs_errors
+    def exists(self, path: str) -> bool:
+        """Verifica si un objeto existe en el bucket"""
+        return self.bucket.blob(path).exists()
+
+    @_wrap_gcs_errors
+    def stat(self, path: str) -> Optional[Dict[str, Any]]:
+        """Obtiene los metadatos de un objeto del bucket"""
+        blob = self.bucket.get_blob(path)
+        if blob is None:
+            return None
+        return {'size': blob.size, 'content_type': blob.content_type}
+
+    @_wrap_gcs_errors
+    def sign(self, path: str, expiration: timedelta, method: str = 'GET', content_type: Optional[str] = None) -> str:
+        """Genera una URL firmada v4 usando impersonated credentials (Cloud Run safe)"""
+        credentials = self._get_signing_credentials(READ_SCOPE if method == 'GET' else WRITE_SCOPE)
+
+        return self.bucket.blob(path).generate_signed_url(
+            expiration=expiration,
+            method=method,
+            version="v4",
+            content_type=content_type,
+            headers=self.upload_headers() if method == 'PUT' else None,
+            credentials=credentials,
+        )
+
+    def upload_headers(self) -> Dict[str, str]:
+        """El tamaño máximo queda firmado en la URL de subida: GCS rechaza un PUT mayor a MAX_CONTENT_LENGTH"""
+        return {'x-goog-content-length-range': f'0,{self.config.MAX_CONTENT_LENGTH}'}
+
+    @_wrap_gcs_errors
+    def list(self, prefix: str = '') -> List[str]:
+        """Lista los objetos del bucket con el prefijo indicado"""
+        return [blob.name for blob in self.client.list_blobs(self.bucket, prefix=prefix)]
+
+    def public_url(self, path: str) -> str:
+        """URL pública (sin firma) del objeto"""
+        return f"https://storage.googleapis.com/{self.config.BUCKET_NAME}/{path}"
+
+    @_wrap_gcs_errors
+    def warm_up(self) -> None:
+        """Crea el cliente y obtiene el token de las credenciales de firma de lectura"""
+        from google.auth.transport.requests import Request
+
+        bucket = self.bucket
+        self._get_signing_credentials(READ_SCOPE).refresh(Request())
+        logger.info(f"Cliente y credenciales de firma de GCS listos para el bucket {bucket.name}")
+
+    def _get_signing_credentials(self, scope: str):
+        """
+        Credenciales impersonadas del service account de firmado, una por alcance.
+
+        Se crean una sola vez por proceso: la librería renueva el token al expirar.
+        """
+        credentials = self._signing_credentials.get(scope)
+        if credentials is None:
+            with self._signing_lock:
+                credentials = self._signing_credentials.get(scope)
+                if credentials is None:
+                    credentials = self._signing_credentials[scope] = self._create_signing_credentials(scope)
+        return credentials
+
+    @timed('storage.iam_credentials')
+    def _create_signing_credentials(self, scope: str):
+        """Obtiene credenciales impersonadas del service account de firmado"""
+        from google.auth import default, impersonated_credentials
+
+        # Cargar credenciales actuales (las del Cloud Run service account)
+        source_credentials, _ = default()
+
+        # Impersonar el service account que firmará la URL
+        return impersonated_credentials.Credentials(
+            source_credentials=source_credentials,
+            target_principal=self.config.SIGNING_SERVICE_ACCOUNT_EMAIL,
+            target_scopes=[scope],
+            lifetime=300,
+        )
+
+    def _upload_resumable(self, blob, file, content_type: str, total_size: int) -> None:
+        """
+        Sube un archivo por fragmentos usando una sesión reanudable de GCS.
+
+        Cada fragmento se reintenta con backoff exponencial; tras un fallo se consulta
+        a GCS el offset confirmado para continuar desde ahí sin reenviar lo ya subido.
+        """
+        chunk_size = self.config.UPLOAD_CHUNK_SIZE
+        session_url = blob.create_resumable_upload_session(content_type=content_type, size=total_size)
+
+        offset = 0
+        attempt = 0
+        while offset is not None and offset < total_size:
+            file.seek(offset)
+            chunk = file.read(chunk_size)
+            end = offset + len(chunk) - 1
+
+            try:
+                response = requests.put(
+                    session_url,
+                    data=chunk,
+                    headers={'Content-Range': f'bytes {offset}-{end}/{total_size}'},
+                    timeout=self.config.UPLOAD_CHUNK_TIMEOUT
+                )
+                if response.status_code in (200, 201):
+                    return
+                if response.status_code == 308:
+                    offset = self._committed_offset(response)
+                    attempt = 0
+                    continue
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    raise StorageError(f"Subida reanudable rechazada con estado {response.status_code}")
+                logger.warning(f"Fragmento {offset}-{end} falló con estado {response.status_code}")
+            except requests.RequestException as e:
+                logger.warning(f"Fragmento {offset}-{end} falló: {e}")
+
+            attempt += 1
+            if attempt > self.config.UPLOAD_MAX_RETRIES:
+                raise StorageError(f"Subida reanudable abortada tras {self.config.UPLOAD_MAX_RETRIES} reintentos")
+            time.sleep(self._backoff_delay(attempt))
+            offset = self._query_upload_offset(session_url, total_size)
+
+    def _query_upload_offset(self, session_url: str, total_size: int) -> Optional[int]:
+        """Consulta el offset confirmado de una sesión reanudable (None si ya terminó)"""
+        try:
+            response = requests.put(
+                session_url,
+                headers={'Content-Range': f'bytes */{total_size}', 'Content-Length': '0'},
+                timeout=self.config.UPLOAD_CHUNK_TIMEOUT
+            )
+        except requests.RequestException:
+            return 0
+
+        if response.status_code in (200, 201):
+            return None
+        if response.status_code == 308:
+            return self._committed_offset(response)
+        return 0
+
+    def _committed_offset(self, response) -> int:
+        """Obtiene el siguiente offset a partir del header Range de una respuesta 308"""
+        range_header = response.headers.get('Range')
+        if not range_header:
+            return 0
+        return int(range_header.split('-')[-1]) + 1
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Calcula el tiempo de espera con backoff exponencial y jitter"""
+        delay = min(self.config.UPLOAD_RETRY_MAX_BACKOFF, self.config.UPLOAD_RETRY_BACKOFF * (2 ** (attempt - 1)))
+        return delay * random.uniform(0.5, 1.0)
@@ -0,0 +1,140 @@
+"""
+Backend de almacenamiento en disco local con URLs firmadas por HMAC
+"""
+import os
+import hmac
+import json
+import time
+import shutil
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, BinaryIO, Dict, List, Optional
+from urllib.parse import urlencode
+
+from .base_storage import StorageBackend
+from ..exceptions.custom_exceptions import StorageError
+
+
+class UrlSigner:
+    """Firma y verifica URLs de objetos servidos por la propia API"""
+
+    def __init__(self, secret_key: str, base_url: str):
+        self.secret_key = secret_key.encode('utf-8')
+        self.base_url = base_url.rstrip('/')
+
+    def sign(self, path: str, expiration: timedelta, method: str = 'GET', content_type: Optional[str] = None) -> str:
+        """Genera la URL firmada de un objeto"""
+        expires = int((datetime.now(timezone.utc) + expiration).timestamp())
+        query = urlencode({
+            'method': method,
+            'expires': expires,
+            'signature': self._signature(path, method, expires, content_type)
+        })
+        return f"{self.base_url}/{path}?{query}"
+
+    def verify(self, path: str, method: str, expires: str, signature: str, content_type: Optional[str] = None) -> bool:
+        """Verifica que la firma corresponda al objeto, método y tipo de contenido y no haya expirado"""
+        try:
+            expires_at = int(expires)
+        except (TypeError, ValueError):
+            return False
+
+        if expires_at < time.time():
+            return False
+
+        expected = self._signature(path, method, expires_at, content_type)
+        return hmac.compare_digest(expected, signature or '')
+
+    def _signature(self, path: str, method: str, expires: int, content_type: Optional[str]) -> str:
+        """Calcula la firma HMAC-SHA256 de la petición"""
+        message = f"{method.upper()}\n{path}\n{expires}\n{content_type or ''}"
+        return hmac.new(self.secret_key, message.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+class LocalStorageBackend(StorageBackend):
+    """Almacén de objetos en un directorio local, servido por la API con URLs firmadas"""
+
+    display_name = "almacenamiento local"
+
+    def __init__(self, root: str, signer: UrlSigner):
+        self.root = os.path.abspath(root)
+        self.signer = signer
+        os.makedirs(self.root, exist_ok=True)
+
+    def put(self, path: str, stream: BinaryIO, content_type: str, metadata: Optional[Dict[str, str]] = None) -> None:
+        """Guarda el objeto y sus metadatos en disco"""
+        file_path = self.file_path(path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+        stream.seek(0)
+        with open(file_path, 'wb') as target:
+            shutil.copyfileobj(stream, target)
+
+        with open(self._meta_path(path), 'w') as meta_file:
+            json.dump({'content_type': content_type, 'metadata': metadata or {}}, meta_file)
+
+    def get(self, path: str) -> Optional[bytes]:
+        """Lee el contenido del objeto"""
+        file_path = self.file_path(path)
+        if not os.path.isfile(file_path):
+            return None
+        with open(file_path, 'rb') as source:
+            return source.read()
+
+    def delete(self, path: str) -> bool:
+        """Elimina el objeto y sus metadatos"""
+        file_path = self.file_path(path)
+        if not os.path.isfile(file_path):
+            return False
+        os.remove(file_path)
+        if os.path.isfile(self._meta_path(path)):
+            os.remove(self._meta_path(path))
+        return True
+
+    def exists(self, path: str) -> bool:
+        """Verifica si el objeto existe en disco"""
+        return os.path.isfile(self.file_path(path))
+
+    def stat(self, path: str) -> Optional[Dict[str, Any]]:
+        """Obtiene tamaño y tipo de contenido del objeto"""
+        file_path = self.file_path(path)
+        if not os.path.isfile(file_path):
+            return None
+
+        content_type = None
+        if os.path.isfile(self._meta_path(path)):
+            with open(self._meta_path(path)) as meta_file:
+                content_type = json.load(meta_file).get('content_type')
+
+        return {'size': os.path.getsize(file_path), 'content_type': content_type}
+
+    def sign(self, path: str, expiration: timedelta, method: str = 'GET', content_type: Optional[str] = None) -> str:
+        """Genera una URL firmada por HMAC servida por la API"""
+        return self.signer.sign(path, expiration, method, content_type)
+
+    def list(self, prefix: str = '') -> List[str]:
+        """Lista los objetos bajo el prefijo"""
+        paths = []
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith('.meta.json'):
+                    continue
+                relative = os.path.relpath(os.path.join(directory, name), self.root).replace(os.sep, '/')
+                if relative.startswith(prefix):
+                    paths.append(relative)
+        return sorted(paths)
+
+    def public_url(self, path: str) -> str:
+        """URL sin firma del objeto (no accesible sin firma válida)"""
+        return f"{self.signer.base_url}/{path}"
+
+    def file_path(self, path: str) -> str:
+        """Ruta en disco del objeto, impidiendo salir del directorio raíz"""
+        file_path = os.path.abspath(os.path.join(self.root, path))
+        if not file_path.startswith(self.root + os.sep):
+            raise StorageError(f"Ruta de objeto inválida: {path}")
+        return file_path
+
+    def _meta_path(self, path: str) -> str:
+        """Ruta en disco de los metadatos del objeto"""
+        return self.file_path(path) + '.meta.json'
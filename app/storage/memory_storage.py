@@ -0,0 +1,64 @@
+"""
+Backend de almacenamiento en memoria del proceso
+"""
+import threading
+from datetime import timedelta
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from .base_storage import StorageBackend
+from .local_storage import UrlSigner
+
+
+class MemoryStorageBackend(StorageBackend):
+    """Almacén de objetos en memoria, servido por la API con URLs firmadas (desarrollo y pruebas)"""
+
+    display_name = "almacenamiento en memoria"
+
+    def __init__(self, signer: UrlSigner):
+        self.signer = signer
+        self._objects: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, path: str, stream: BinaryIO, content_type: str, metadata: Optional[Dict[str, str]] = None) -> None:
+        """Guarda el contenido del stream en memoria"""
+        stream.seek(0)
+        data = stream.read()
+        with self._lock:
+            self._objects[path] = {'data': data, 'content_type': content_type, 'metadata': metadata or {}}
+
+    def get(self, path: str) -> Optional[bytes]:
+        """Obtiene el contenido del objeto"""
+        with self._lock:
+            entry = self._objects.get(path)
+        return entry['data'] if entry else None
+
+    def delete(self, path: str) -> bool:
+        """Elimina el objeto"""
+        with self._lock:
+            return self._objects.pop(path, None) is not None
+
+    def exists(self, path: str) -> bool:
+        """Verifica si el objeto existe"""
+        with self._lock:
+            return path in self._objects
+
+    def stat(self, path: str) -> Optional[Dict[str, Any]]:
+        """Obtiene tamaño y tipo de contenido del objeto"""
+        with self._lock:
+            entry = self._objects.get(path)
+        if entry is None:
+            return None
+        return {'size': len(entry['data']), 'content_type': entry['content_type']}
+
+    def sign(self, path: str, expiration: timedelta, method: str = 'GET', content_type: Optional[str] = None) -> str:
+        """Genera una URL firmada por HMAC servida por la API"""
+        return self.signer.sign(path, expiration, method, content_type)
+
+    def list(self, prefix: str = '') -> List[str]:
+        """Lista los objetos bajo el prefijo"""
+        with self._lock:
+            return sorted(path for path in self._objects if path.startswith(prefix))
+
+    def public_url(self, path: str) -> str:
+        """URL sin firma del objeto (no accesible sin firma válida)"""
+        return f"{self.signer.base_url}/{path}"
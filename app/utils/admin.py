@@ -0,0 +1,24 @@
+"""
+Acceso a las herramientas de administración - Token compartido e IPs permitidas
+"""
+import hmac
+
+from flask import request
+
+ADMIN_TOKEN_HEADER = 'X-Admin-Token'
+
+
+def is_admin_request(config) -> bool:
+    """True si la petición trae el ADMIN_TOKEN configurado (sin token configurado nadie es administrador)"""
+    expected = config.ADMIN_TOKEN
+    if not expected:
+        return False
+    supplied = request.headers.get(ADMIN_TOKEN_HEADER, '')
+    return hmac.compare_digest(supplied.encode(), expected.encode())
+
+
+def is_allowed_caller(config) -> bool:
+    """True si la petición es de un administrador o llega desde una IP de PROFILE_ALLOWED_IPS"""
+    if is_admin_request(config):
+        return True
+    return bool(request.remote_addr) and request.remote_addr in config.PROFILE_ALLOWED_IPS
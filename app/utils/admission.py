@@ -0,0 +1,186 @@
+"""
+Control de admisión y limitación de tasa por cliente
+
+Cada worker atiende como máximo ADMISSION_MAX_CONCURRENT peticiones a la vez; las
+demás esperan en una cola acotada, ordenada por prioridad: las lecturas interactivas
+(un proveedor, creación) pasan antes que el tráfico masivo (listados con per_page
+grande, DELETE /providers/all). Con la cola llena, o si la espera supera
+ADMISSION_QUEUE_TIMEOUT_MS, la petición se rechaza de inmediato con 503 y
+Retry-After en lugar de esperar hasta que el cliente agote su timeout. El tráfico
+masivo solo puede ocupar las primeras ADMISSION_BULK_MAX_QUEUE posiciones de la
+cola, de modo que siempre queda lugar para las peticiones interactivas.
+
+Antes de la admisión, un token bucket por cliente (X-API-Key o IP) limita la tasa
+de cada uno a RATE_LIMIT_PER_SECOND con ráfagas de hasta RATE_LIMIT_BURST (429).
+"""
+import math
+import time
+import heapq
+import hashlib
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from . import metrics
+
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+PRIORITY_RANKS = {INTERACTIVE: 0, BULK: 1}
+
+API_KEY_HEADER = 'X-API-Key'
+
+# Rutas que nunca se limitan: sondas, métricas y administración deben responder bajo carga
+EXEMPT_PREFIXES = ('/providers/ping', '/providers/health', '/metrics', '/providers/admin/')
+
+
+class AdmissionController:
+    """Límite de concurrencia con cola acotada y ordenada por prioridad"""
+
+    def __init__(self, max_concurrent: int, max_queue: int, bulk_max_queue: int):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.bulk_max_queue = min(bulk_max_queue, max_queue)
+        self._condition = threading.Condition()
+        self._active = 0
+        self._waiting = []  # heap de (rango de prioridad, orden de llegada)
+        self._sequence = itertools.count()
+
+    def acquire(self, priority: str, timeout: float) -> Optional[str]:
+        """Espera un lugar; retorna None si se admitió o el motivo del rechazo (queue_full, queue_timeout)"""
+        with self._condition:
+            if self._active < self.max_concurrent and not self._waiting:
+                self._active += 1
+                return None
+
+            limit = self.max_queue if priority == INTERACTIVE else self.bulk_max_queue
+            if len(self._waiting) >= limit:
+                return 'queue_full'
+
+            entry = (PRIORITY_RANKS[priority], next(self._sequence))
+            heapq.heappush(self._waiting, entry)
+            deadline = time.monotonic() + timeout
+            while True:
+                if self._waiting[0] == entry and self._active < self.max_concurrent:
+                    heapq.heappop(self._waiting)
+                    self._active += 1
+                    # El siguiente en la cola puede tener lugar también
+                    self._condition.notify_all()
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                    self._condition.notify_all()
+                    return 'queue_timeout'
+                self._condition.wait(remaining)
+
+    def release(self) -> None:
+        """Libera el lugar de una petición admitida"""
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    @property
+    def queued(self) -> int:
+        with self._condition:
+            return len(self._waiting)
+
+
+class RateLimiter:
+    """Token bucket por cliente; recuerda hasta max_clients clientes (los menos recientes se descartan)"""
+
+    def __init__(self, rate: float, burst: float, max_clients: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()  # cliente -> [tokens, última recarga]
+
+    def acquire(self, key: str) -> float:
+        """Consume un token; retorna 0 si se permitió o los segundos hasta el próximo token"""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [self.burst, now]
+                self._buckets[key] = bucket
+                while len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            self._buckets.move_to_end(key)
+
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / self.rate
+
+
+def client_key(request, config) -> str:
+    """Identidad del cliente para la limitación de tasa: hash de X-API-Key o su IP"""
+    api_key = request.headers.get(API_KEY_HEADER)
+    if api_key:
+        return 'key:' + hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    # Detrás de N proxies de confianza la IP del cliente es la N-ésima desde el final de X-Forwarded-For
+    route = request.access_route
+    proxies = config.RATE_LIMIT_TRUSTED_PROXIES
+    if proxies and len(route) >= proxies:
+        return 'ip:' + route[-proxies]
+    return 'ip:' + (request.remote_addr or 'desconocida')
+
+
+def request_priority(request, config) -> str:
+    """Prioridad de la petición: BULK para listados grandes, sincronizaciones y eliminaciones masivas, INTERACTIVE para el resto"""
+    if request.path in ('/providers/all', '/providers/changes'):
+        return BULK
+    if request.method == 'GET' and request.path.rstrip('/') == '/providers':
+        per_page = request.args.get('per_page', default=10, type=int)
+        if per_page >= config.ADMISSION_BULK_PER_PAGE:
+            return BULK
+    return INTERACTIVE
+
+
+def _overloaded(message: str, retry_after: float, status_code: int = 503):
+    return {'error': message}, status_code, {'Retry-After': str(max(1, math.ceil(retry_after)))}
+
+
+def init_admission_control(app, config) -> None:
+    """Registra la limitación de tasa (RATE_LIMIT_ENABLED) y el control de admisión (ADMISSION_ENABLED)"""
+    if not config.RATE_LIMIT_ENABLED and not config.ADMISSION_ENABLED:
+        return
+
+    from flask import g, request
+
+    limiter = RateLimiter(
+        config.RATE_LIMIT_PER_SECOND, config.RATE_LIMIT_BURST, config.RATE_LIMIT_MAX_CLIENTS
+    ) if config.RATE_LIMIT_ENABLED else None
+    admission = AdmissionController(
+        config.ADMISSION_MAX_CONCURRENT, config.ADMISSION_MAX_QUEUE, config.ADMISSION_BULK_MAX_QUEUE
+    ) if config.ADMISSION_ENABLED else None
+    app.extensions['admission'] = admission
+
+    @app.before_request
+    def _admit_request():
+        if request.path.startswith(EXEMPT_PREFIXES):
+            return None
+
+        if limiter is not None:
+            wait = limiter.acquire(client_key(request, config))
+            if wait:
+                metrics.record_request_shed('rate_limited', 'all')
+                return _overloaded("Demasiadas peticiones, intente más tarde", wait, 429)
+
+        if admission is not None:
+            priority = request_priority(request, config)
+            rejection = admission.acquire(priority, config.ADMISSION_QUEUE_TIMEOUT_MS / 1000)
+            if rejection:
+                metrics.record_request_shed(rejection, priority)
+                return _overloaded("Servicio sobrecargado, intente más tarde", config.ADMISSION_RETRY_AFTER_SECONDS)
+            g.admitted = True
+        return None
+
+    @app.teardown_request
+    def _release_request(exc):
+        if g.pop('admitted', False):
+            admission.release()
@@ -0,0 +1,55 @@
+"""
+Posiciones del feed de cambios
+
+Una posición es el par (fecha del cambio, id) del último cambio entregado; el feed
+retorna los cambios estrictamente posteriores en ese orden. Se entrega a los
+clientes como un token opaco (base64 url-safe) para que lo devuelvan tal cual en
+since=. since= también acepta una fecha ISO 8601, que equivale a pedir todos los
+cambios desde esa fecha inclusive.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+Position = Tuple[datetime, str]
+
+
+def encode_cursor(position: Position) -> str:
+    """Token opaco de la posición"""
+    changed_at, provider_id = position
+    raw = json.dumps([changed_at.isoformat(), provider_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def parse_since(value: Optional[str]) -> Optional[Position]:
+    """
+    Interpreta el parámetro since= (token del feed o fecha ISO 8601)
+
+    Returns:
+        Optional[Position]: Posición a partir de la cual retornar cambios, None si no se indicó
+
+    Raises:
+        ValueError: Si no es un token ni una fecha válida
+    """
+    if value is None or not value.strip():
+        return None
+    value = value.strip()
+    try:
+        return _naive_utc(datetime.fromisoformat(value.replace('Z', '+00:00'))), ''
+    except ValueError:
+        pass
+    try:
+        raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+        changed_at, provider_id = json.loads(raw)
+        return _naive_utc(datetime.fromisoformat(changed_at)), str(provider_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise ValueError("El parámetro 'since' debe ser un token del feed o una fecha ISO 8601")
+
+
+def _naive_utc(moment: datetime) -> datetime:
+    """Las fechas se guardan en UTC sin zona horaria"""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
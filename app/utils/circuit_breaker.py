@@ -0,0 +1,158 @@
+"""
+Circuit breaker para dependencias externas
+
+Cuenta las últimas llamadas a la dependencia (ventana de tamaño fijo) y se abre
+cuando la proporción de fallos o de llamadas lentas supera el umbral. Abierto,
+rechaza las llamadas de inmediato con CircuitOpenError para que el llamador use
+su alternativa en lugar de esperar a la dependencia. Pasado el tiempo de espera
+deja pasar unas pocas llamadas de prueba (semiabierto): si todas funcionan se
+cierra y, si alguna falla, vuelve a abrirse.
+"""
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from ..exceptions.custom_exceptions import CircuitOpenError
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Circuit breaker por conteo de llamadas con umbrales de fallos y de lentitud"""
+
+    def __init__(self, name: str, window_size: int = 20, min_calls: int = 10, failure_rate: float = 0.5,
+                 slow_call_seconds: float = 1.0, slow_call_rate: float = 0.8, open_seconds: float = 30.0,
+                 half_open_calls: int = 3):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        self._lock = threading.Lock()
+        self._calls = deque(maxlen=window_size)  # (falló, lenta) de las últimas llamadas
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_started = 0
+        self._probes_succeeded = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._expire_open()
+            return self._state
+
+    def allow(self) -> bool:
+        """Indica si la llamada puede ir a la dependencia (en semiabierto, solo las de prueba)"""
+        with self._lock:
+            self._expire_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes_started < self.half_open_calls:
+                self._probes_started += 1
+                return True
+            return False
+
+    def record(self, duration: float, failed: bool) -> None:
+        """Registra el resultado de una llamada permitida por allow()"""
+        slow = duration >= self.slow_call_seconds
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if failed or slow:
+                    self._transition(OPEN)
+                else:
+                    self._probes_succeeded += 1
+                    if self._probes_succeeded >= self.half_open_calls:
+                        self._transition(CLOSED)
+                return
+            if self._state == OPEN:
+                return
+
+            self._calls.append((failed, slow))
+            if len(self._calls) < self.min_calls:
+                return
+            failures = sum(1 for call_failed, _ in self._calls if call_failed)
+            slow_calls = sum(1 for _, call_slow in self._calls if call_slow)
+            if failures / len(self._calls) >= self.failure_rate or slow_calls / len(self._calls) >= self.slow_call_rate:
+                self._transition(OPEN)
+
+    def call(self, function: Callable[..., Any], *args, **kwargs) -> Any:
+        """Ejecuta la función a través del circuito; lanza CircuitOpenError si está abierto"""
+        if not self.allow():
+            raise CircuitOpenError(f"Circuito '{self.name}' abierto: la dependencia no está disponible")
+        started = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        except Exception:
+            self.record(time.perf_counter() - started, failed=True)
+            raise
+        self.record(time.perf_counter() - started, failed=False)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado del circuito y proporciones de la ventana actual"""
+        with self._lock:
+            self._expire_open()
+            calls = len(self._calls)
+            return {
+                'name': self.name,
+                'state': self._state,
+                'calls': calls,
+                'failure_rate': round(sum(1 for failed, _ in self._calls if failed) / calls, 3) if calls else 0.0,
+                'slow_call_rate': round(sum(1 for _, slow in self._calls if slow) / calls, 3) if calls else 0.0
+            }
+
+    def reset(self) -> None:
+        """Cierra el circuito y descarta la ventana (pruebas)"""
+        with self._lock:
+            self._transition(CLOSED)
+
+    def _expire_open(self) -> None:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+
+    def _transition(self, state: str) -> None:
+        previous, self._state = self._state, state
+        self._calls.clear()
+        self._probes_started = 0
+        self._probes_succeeded = 0
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state != previous:
+            log = logger.info if state == CLOSED else logger.warning
+            log(f"Circuito '{self.name}': {previous} -> {state}")
+            metrics.record_circuit_state(self.name, state)
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_storage_breaker(config) -> Optional[CircuitBreaker]:
+    """Circuito del proceso para el almacenamiento de objetos (None si STORAGE_BREAKER_ENABLED es False)"""
+    if not config.STORAGE_BREAKER_ENABLED:
+        return None
+    with _breakers_lock:
+        breaker = _breakers.get('storage')
+        if breaker is None:
+            breaker = CircuitBreaker(
+                'storage',
+                window_size=config.STORAGE_BREAKER_WINDOW,
+                min_calls=config.STORAGE_BREAKER_MIN_CALLS,
+                failure_rate=config.STORAGE_BREAKER_FAILURE_RATE,
+                slow_call_seconds=config.STORAGE_BREAKER_SLOW_CALL_MS / 1000,
+                slow_call_rate=config.STORAGE_BREAKER_SLOW_CALL_RATE,
+                open_seconds=config.STORAGE_BREAKER_OPEN_SECONDS,
+                half_open_calls=config.STORAGE_BREAKER_HALF_OPEN_CALLS
+            )
+            _breakers['storage'] = breaker
+        return breaker
@@ -0,0 +1,58 @@
+"""
+Versión de colección - Contador monotónico que cambia con cada escritura
+"""
+import logging
+import threading
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+class CollectionVersion:
+    """
+    Versión de una colección dentro del proceso.
+
+    Los repositorios la incrementan tras cada commit que modifica la colección;
+    las cachés y contadores derivados se suscriben para invalidarse en el mismo paso.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._version = 0
+        self._listeners: List[Callable[[str, int], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> int:
+        """Versión actual de la colección"""
+        return self._version
+
+    def bump(self, event: str) -> int:
+        """Incrementa la versión y notifica a los suscriptores"""
+        with self._lock:
+            self._version += 1
+            version = self._version
+            listeners = list(self._listeners)
+
+        for listener in listeners:
+            try:
+                listener(event, version)
+            except Exception as e:
+                logger.warning(f"Suscriptor de '{self.name}' falló al invalidar ({event}): {e}")
+        return version
+
+    def subscribe(self, listener: Callable[[str, int], None]) -> None:
+        """Registra una función (evento, versión) llamada en cada cambio"""
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[str, int], None]) -> None:
+        """Elimina un suscriptor registrado"""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+
+# Versión de la colección de proveedores compartida por el proceso
+providers_version = CollectionVersion('providers')
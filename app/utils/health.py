@@ -0,0 +1,152 @@
+"""
+Verificación de dependencias para el endpoint de readiness
+
+Un hilo del proceso revisa cada HEALTH_CHECK_INTERVAL_SECONDS la base de datos
+(conexión y conexiones libres del pool) y el almacenamiento, y guarda el resultado.
+Las sondas solo leen ese resultado, así que responden en O(1) sin generar carga
+sobre PostgreSQL ni GCS por cada petición. Si el último resultado es más antiguo
+que HEALTH_CHECK_MAX_AGE_SECONDS (el hilo quedó bloqueado en una dependencia),
+el proceso se reporta como no listo.
+"""
+import json
+import time
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+STATUS_STARTING = 'starting'
+STATUS_HEALTHY = 'healthy'
+STATUS_DEGRADED = 'degraded'
+STATUS_UNHEALTHY = 'unhealthy'
+
+
+def pool_headroom(pool) -> Optional[int]:
+    """Conexiones que aún se pueden obtener del pool sin esperar (None si el pool no tiene límite)"""
+    from sqlalchemy.pool import QueuePool
+
+    if not isinstance(pool, QueuePool) or pool._max_overflow < 0:
+        return None
+    return pool.size() + pool._max_overflow - pool.checkedout()
+
+
+class HealthChecker:
+    """Ejecuta las verificaciones de dependencias en segundo plano y guarda el último resultado"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._report: Optional[Dict[str, Any]] = None
+        self._checked_at: Optional[float] = None
+
+    def ensure_started(self, config) -> None:
+        """Lanza el hilo de verificación la primera vez que se consulta el estado en este proceso"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._loop, args=(config,), name='health-checker', daemon=True)
+            self._thread.start()
+
+    def _loop(self, config) -> None:
+        while True:
+            try:
+                self.run_checks(config)
+            except Exception:
+                logger.exception("Error inesperado en la verificación de dependencias")
+            time.sleep(config.HEALTH_CHECK_INTERVAL_SECONDS)
+
+    def run_checks(self, config) -> Dict[str, Any]:
+        """Verifica las dependencias y guarda el resultado (las sondas leen el último)"""
+        checks = {
+            'database': self._timed_check(self._check_database, config),
+            'storage': self._timed_check(self._check_storage, config)
+        }
+        checks['storage']['required'] = config.HEALTH_STORAGE_REQUIRED
+
+        if not checks['database']['ok'] or (config.HEALTH_STORAGE_REQUIRED and not checks['storage']['ok']):
+            status = STATUS_UNHEALTHY
+        elif not checks['storage']['ok']:
+            status = STATUS_DEGRADED
+        else:
+            status = STATUS_HEALTHY
+
+        report = {
+            'status': status,
+            'checked_at': datetime.now(timezone.utc).isoformat(),
+            'checks': checks
+        }
+        with self._lock:
+            previous = self._report['status'] if self._report else None
+            self._report = report
+            self._checked_at = time.monotonic()
+        if status != previous:
+            log = logger.info if status == STATUS_HEALTHY else logger.warning
+            log(json.dumps({'event': 'health', 'status': status, 'previous': previous, 'checks': checks}))
+        return report
+
+    def _timed_check(self, check, config) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            result = {'ok': True, **(check(config) or {})}
+        except Exception as e:
+            result = {'ok': False, 'error': str(e)}
+        result['ms'] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+
+    def _check_database(self, config) -> Dict[str, Any]:
+        """SELECT 1 por una conexión del pool, solo si quedan conexiones libres para las peticiones"""
+        from sqlalchemy import text
+        from ..repositories.provider_repository import get_engine
+        from ..repositories.read_replicas import get_replica_set
+
+        engine = get_engine(config.SQLALCHEMY_DATABASE_URI)
+        headroom = pool_headroom(engine.pool)
+        if headroom is not None and headroom < config.HEALTH_POOL_MIN_FREE:
+            raise RuntimeError(f"Pool de conexiones agotado: {headroom} conexiones libres")
+
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        result = {'pool_free': headroom}
+
+        # Las réplicas caídas no afectan la readiness: sus lecturas pasan al primario
+        replicas = get_replica_set(config, get_engine)
+        if replicas is not None:
+            result['replicas'] = replicas.snapshot()
+        return result
+
+    def _check_storage(self, config) -> Dict[str, Any]:
+        """Consulta al backend de almacenamiento compartido del proceso (sin pasar por su circuit breaker)"""
+        from ..storage import get_storage_backend
+        from .circuit_breaker import get_storage_breaker
+
+        get_storage_backend(config).check()
+        breaker = get_storage_breaker(config)
+        return {'circuit': breaker.state} if breaker is not None else {}
+
+    def snapshot(self, config) -> Dict[str, Any]:
+        """Último resultado; 'starting' si aún no hay ninguno y 'unhealthy' si quedó desactualizado"""
+        with self._lock:
+            report, checked_at = self._report, self._checked_at
+        if report is None:
+            return {'status': STATUS_STARTING, 'checked_at': None, 'checks': {}}
+
+        age = time.monotonic() - checked_at
+        if age > config.HEALTH_CHECK_MAX_AGE_SECONDS:
+            return {
+                **report,
+                'status': STATUS_UNHEALTHY,
+                'error': f"Verificación desactualizada ({age:.0f}s sin resultado)"
+            }
+        return report
+
+    def reset(self) -> None:
+        """Descarta el resultado guardado (pruebas)"""
+        with self._lock:
+            self._report = None
+            self._checked_at = None
+
+
+# Verificador del proceso: cada worker de gunicorn revisa sus propias conexiones
+health_checker = HealthChecker()
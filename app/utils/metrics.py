@@ -0,0 +1,226 @@
+"""
+Métricas Prometheus del servicio de proveedores
+
+En modo multiproceso (gunicorn) cada worker escribe sus valores en
+PROMETHEUS_MULTIPROC_DIR y /metrics los agrega al exportar.
+"""
+import os
+import time
+import logging
+
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+
+from .timing import add_phase_observer
+
+logger = logging.getLogger(__name__)
+
+# Buckets en segundos, desde respuestas en memoria hasta firmas lentas contra IAM
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    'providers_http_request_duration_seconds',
+    'Duración de las peticiones HTTP por ruta, método y estado',
+    ['method', 'route', 'status'],
+    buckets=LATENCY_BUCKETS
+)
+
+DB_QUERIES = Counter(
+    'providers_db_queries_total',
+    'Operaciones del repositorio de proveedores',
+    ['operation', 'outcome']
+)
+
+DB_QUERY_LATENCY = Histogram(
+    'providers_db_query_duration_seconds',
+    'Duración de las operaciones del repositorio de proveedores',
+    ['operation'],
+    buckets=LATENCY_BUCKETS
+)
+
+STORAGE_LATENCY = Histogram(
+    'providers_storage_operation_duration_seconds',
+    'Duración de las operaciones contra el almacenamiento de objetos',
+    ['operation', 'outcome'],
+    buckets=LATENCY_BUCKETS
+)
+
+DB_RETRIES = Counter(
+    'providers_db_retries_total',
+    'Reintentos del repositorio ante errores transitorios (exhausted: se agotaron los intentos o el presupuesto)',
+    ['operation', 'reason', 'outcome']
+)
+
+REQUESTS_SHED = Counter(
+    'providers_requests_shed_total',
+    'Peticiones rechazadas por el control de admisión (queue_full, queue_timeout) o la limitación de tasa',
+    ['reason', 'priority']
+)
+
+CACHE_REQUESTS = Counter(
+    'providers_cache_requests_total',
+    'Consultas a cachés internas (la tasa de aciertos es hit / (hit + miss))',
+    ['cache', 'result']
+)
+
+CACHE_EVICTIONS = Counter(
+    'providers_cache_evictions_total',
+    'Entradas descartadas de cachés internas (capacity: límite de memoria, expired, invalidated: escritura)',
+    ['cache', 'reason']
+)
+
+OUTBOX_EVENTS = Counter(
+    'providers_outbox_events_total',
+    'Eventos del outbox publicados en el broker (published), cuyo lote falló y se reintentará (failed) '
+    'o apartados tras OUTBOX_MAX_ATTEMPTS rechazos (parked)',
+    ['result']
+)
+
+LOGO_URLS = Counter(
+    'providers_logo_urls_total',
+    'URLs de logo servidas desde la base (stored), firmadas en la lectura (signed) o renovadas en segundo plano (refreshed)',
+    ['source']
+)
+
+CIRCUIT_STATE = Gauge(
+    'providers_circuit_state',
+    'Estado de los circuit breakers (0 cerrado, 1 semiabierto, 2 abierto)',
+    ['circuit'],
+    multiprocess_mode='livemax'
+)
+
+CIRCUIT_STATE_VALUES = {'closed': 0, 'half_open': 1, 'open': 2}
+
+DB_POOL_CONNECTIONS = Gauge(
+    'providers_db_pool_connections',
+    'Conexiones abiertas en el pool de SQLAlchemy',
+    multiprocess_mode='livesum'
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    'providers_db_pool_checked_out',
+    'Conexiones del pool en uso',
+    multiprocess_mode='livesum'
+)
+
+DB_POOL_SIZE = Gauge(
+    'providers_db_pool_size',
+    'Tamaño configurado del pool de SQLAlchemy',
+    multiprocess_mode='livesum'
+)
+
+_enabled = False
+
+
+def init_metrics(app, enabled: bool) -> None:
+    """Registra la medición de latencia HTTP y el observador de fases de repositorio y almacenamiento"""
+    global _enabled
+    if not enabled:
+        return
+    _enabled = True
+    add_phase_observer(_observe_phase)
+
+    from flask import g, request
+
+    @app.before_request
+    def _start_request_metrics():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request_metrics(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            REQUEST_LATENCY.labels(request.method, route, str(response.status_code)).observe(
+                time.perf_counter() - started
+            )
+        return response
+
+
+def record_cache_access(cache: str, hit: bool) -> None:
+    """Registra un acierto o fallo de una caché interna"""
+    if _enabled:
+        CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def record_cache_eviction(cache: str, reason: str, count: int = 1) -> None:
+    """Registra entradas descartadas de una caché interna"""
+    if _enabled:
+        CACHE_EVICTIONS.labels(cache, reason).inc(count)
+
+
+def record_db_retry(operation: str, reason: str, exhausted: bool) -> None:
+    """Registra un reintento de una operación del repositorio, o que ya no se reintentará"""
+    if _enabled:
+        DB_RETRIES.labels(operation, reason, 'exhausted' if exhausted else 'retried').inc()
+
+
+def record_request_shed(reason: str, priority: str) -> None:
+    """Registra una petición rechazada por sobrecarga o por exceder la tasa del cliente"""
+    if _enabled:
+        REQUESTS_SHED.labels(reason, priority).inc()
+
+
+def record_outbox_events(result: str, count: int) -> None:
+    """Registra eventos del outbox publicados, fallidos o apartados"""
+    if _enabled:
+        OUTBOX_EVENTS.labels(result).inc(count)
+
+
+def record_logo_urls(source: str, count: int) -> None:
+    """Registra URLs de logo servidas desde la base, firmadas en la lectura o renovadas"""
+    if _enabled and count:
+        LOGO_URLS.labels(source).inc(count)
+
+
+def record_circuit_state(circuit: str, state: str) -> None:
+    """Registra el estado actual de un circuit breaker"""
+    if _enabled:
+        CIRCUIT_STATE.labels(circuit).set(CIRCUIT_STATE_VALUES[state])
+
+
+def instrument_engine(engine) -> None:
+    """Actualiza los gauges del pool con los eventos de conexión del engine"""
+    from sqlalchemy import event
+    from sqlalchemy.exc import InvalidRequestError
+
+    try:
+        event.listen(engine, 'connect', lambda *args: DB_POOL_CONNECTIONS.inc())
+        event.listen(engine, 'close', lambda *args: DB_POOL_CONNECTIONS.dec())
+        event.listen(engine, 'checkout', lambda *args: DB_POOL_CHECKED_OUT.inc())
+        event.listen(engine, 'checkin', lambda *args: DB_POOL_CHECKED_OUT.dec())
+    except InvalidRequestError as e:
+        logger.warning(f"No se pudo instrumentar el pool de conexiones: {e}")
+        return
+
+    # Solo QueuePool expone size(); SingletonThreadPool (SQLite en memoria) no tiene tamaño fijo
+    pool_size = getattr(engine.pool, 'size', None)
+    if callable(pool_size):
+        DB_POOL_SIZE.inc(pool_size())
+
+
+def render_metrics() -> bytes:
+    """Exporta las métricas en formato de texto Prometheus, agregando los workers si aplica"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def mark_process_dead(pid: int) -> None:
+    """Descarta los gauges 'live' de un worker terminado (hook child_exit de gunicorn)"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
+
+
+def _observe_phase(name: str, duration: float, failed: bool) -> None:
+    """Traduce las fases de timing (db.*, storage.*) a métricas"""
+    layer, _, operation = name.partition('.')
+    outcome = 'error' if failed else 'ok'
+    if layer == 'db':
+        DB_QUERIES.labels(operation, outcome).inc()
+        DB_QUERY_LATENCY.labels(operation).observe(duration)
+    elif layer == 'storage':
+        STORAGE_LATENCY.labels(operation, outcome).observe(duration)
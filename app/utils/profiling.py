@@ -0,0 +1,196 @@
+"""
+Perfilado bajo demanda - Muestreo estadístico de pilas y cProfile por petición
+
+El muestreador lee la pila de todos los hilos del proceso a intervalos fijos
+(sys._current_frames) sin instrumentar el código, y agrega las muestras en formato
+'collapsed' (una línea 'hilo;f1;f2;... N' por pila), la entrada de flamegraph.pl
+y speedscope. El muestreo mide tiempo de pared: los hilos en espera también aparecen.
+"""
+import io
+import os
+import sys
+import time
+import pstats
+import signal
+import logging
+import cProfile
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from ..exceptions.custom_exceptions import ProfilerBusyError
+
+logger = logging.getLogger(__name__)
+
+# Un solo muestreo a la vez por proceso: dos muestreadores se medirían entre sí
+_sampling_lock = threading.Lock()
+
+PROFILE_SORT_KEYS = ('cumulative', 'tottime', 'calls', 'ncalls')
+
+
+class StackSampler:
+    """Muestreador estadístico de las pilas de todos los hilos del proceso"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter = Counter()
+
+    def run(self, seconds: float) -> Counter:
+        """Toma muestras durante los segundos indicados y retorna las pilas agregadas"""
+        own = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while True:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident != own:
+                    self.stacks[self._collapse(names.get(ident, f'thread-{ident}'), frame)] += 1
+            # Las referencias a frames mantienen vivas sus variables locales
+            del frames, frame
+            self.samples += 1
+            if time.monotonic() >= deadline:
+                return self.stacks
+            time.sleep(self.interval)
+
+    @staticmethod
+    def _collapse(thread_name: str, frame) -> str:
+        """Pila como 'hilo;raíz;...;hoja' con función, archivo y línea de definición"""
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        parts.append(thread_name.replace(';', '_'))
+        parts.reverse()
+        return ';'.join(parts)
+
+
+def _short_path(filename: str) -> str:
+    """Últimos dos componentes de la ruta (p. ej. 'services/provider_service.py')"""
+    head, tail = os.path.split(filename)
+    return os.path.join(os.path.basename(head), tail) if head else tail
+
+
+def sample_stacks(seconds: float, interval: float) -> Tuple[Counter, int]:
+    """
+    Muestrea todos los hilos del proceso.
+
+    Args:
+        seconds: Duración del muestreo
+        interval: Segundos entre muestras
+
+    Returns:
+        Tuple[Counter, int]: Pilas agregadas y número de muestras tomadas
+
+    Raises:
+        ProfilerBusyError: Si ya hay un muestreo en curso en el proceso
+    """
+    if not _sampling_lock.acquire(blocking=False):
+        raise ProfilerBusyError("Ya hay un perfilado en curso en este proceso")
+    try:
+        sampler = StackSampler(interval)
+        return sampler.run(seconds), sampler.samples
+    finally:
+        _sampling_lock.release()
+
+
+def render_collapsed(stacks: Counter) -> str:
+    """Formato collapsed ('pila N' por línea, de la más frecuente a la menos)"""
+    return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def profile_to_file(seconds: float, interval: float, output_dir: str) -> Optional[str]:
+    """Muestrea el proceso y escribe el resultado en output_dir; retorna la ruta o None si estaba ocupado"""
+    try:
+        stacks, samples = sample_stacks(seconds, interval)
+    except ProfilerBusyError as e:
+        logger.warning(f"Perfilado por señal descartado: {e.message}")
+        return None
+
+    timestamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    path = os.path.join(output_dir, f"providers-profile-{os.getpid()}-{timestamp}.folded")
+    os.makedirs(output_dir, exist_ok=True)
+    with open(path, 'w') as output:
+        output.write(render_collapsed(stacks))
+    logger.info(f"Perfil de {samples} muestras escrito en {path}")
+    return path
+
+
+def install_signal_handler(config) -> bool:
+    """
+    Registra SIGUSR2 para perfilar el proceso en un hilo aparte si PROFILE_SIGNAL_ENABLED está activo.
+
+    Returns:
+        bool: True si el manejador quedó registrado
+    """
+    if not config.PROFILE_SIGNAL_ENABLED:
+        return False
+
+    def _handle_profile_signal(signum, frame):
+        # El manejador corre en el hilo principal: el muestreo no debe bloquearlo
+        threading.Thread(
+            target=profile_to_file,
+            args=(config.PROFILE_SIGNAL_SECONDS, config.PROFILE_SAMPLE_INTERVAL_MS / 1000, config.PROFILE_OUTPUT_DIR),
+            name='profile-signal',
+            daemon=True
+        ).start()
+
+    try:
+        signal.signal(signal.SIGUSR2, _handle_profile_signal)
+    except ValueError:
+        logger.warning("El perfilado por señal solo puede registrarse desde el hilo principal")
+        return False
+    return True
+
+
+def init_request_profiling(app, config) -> None:
+    """
+    Registra el modo ?__profile=1: la respuesta se reemplaza por el informe de cProfile
+    de la petición. Solo aplica a llamadores permitidos; sin ADMIN_TOKEN ni
+    PROFILE_ALLOWED_IPS no se registra ningún hook.
+    """
+    if not config.ADMIN_TOKEN and not config.PROFILE_ALLOWED_IPS:
+        return
+
+    from flask import g, request
+    from .admin import is_allowed_caller
+
+    @app.before_request
+    def _start_request_profile():
+        if request.args.get('__profile') != '1' or not is_allowed_caller(config):
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Otro perfilador (p. ej. un depurador) ya está activo en este hilo
+            logger.warning(f"No se pudo perfilar la petición: {e}")
+            return
+        g.request_profiler = profiler
+
+    @app.after_request
+    def _finish_request_profile(response):
+        profiler = g.pop('request_profiler', None)
+        if profiler is None:
+            return response
+        profiler.disable()
+
+        sort_key = request.args.get('__profile_sort', 'cumulative')
+        if sort_key not in PROFILE_SORT_KEYS:
+            sort_key = 'cumulative'
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats(sort_key).print_stats(config.PROFILE_STATS_LIMIT)
+
+        response.direct_passthrough = False
+        response.set_data(report.getvalue())
+        response.mimetype = 'text/plain'
+        response.headers['X-Profile'] = 'cProfile'
+        return response
+
+    @app.teardown_request
+    def _discard_request_profile(exc):
+        profiler = g.pop('request_profiler', None)
+        if profiler is not None:
+            profiler.disable()
@@ -0,0 +1,257 @@
+"""
+Estadísticas de sentencias SQL y log de consultas lentas
+
+Cada sentencia ejecutada por los engines instrumentados se agrupa por su forma
+(el SQL normalizado, sin valores literales ni parámetros) para acumular llamadas,
+tiempos y errores. Las que superan SLOW_QUERY_THRESHOLD_MS se registran en el
+logger 'app.slow_query' con los parámetros redactados y, si SLOW_QUERY_EXPLAIN
+está activo, la primera ocurrencia lenta de cada forma captura su plan de ejecución.
+"""
+import re
+import json
+import time
+import hashlib
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger('app.slow_query')
+
+_WHITESPACE = re.compile(r'\s+')
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w$])\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%\(\w+\)s|%s|(?<!:):\w+|\$\d+')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_LOCKING_CLAUSE = re.compile(r'\bFOR\s+(?:NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b', re.IGNORECASE)
+
+# Prefijo del plan por motor; ANALYZE ejecuta la sentencia, por eso solo se aplica a lecturas
+EXPLAIN_PREFIXES = {
+    'postgresql': 'EXPLAIN (ANALYZE, BUFFERS) ',
+    'sqlite': 'EXPLAIN QUERY PLAN '
+}
+
+SORT_KEYS = {
+    'total': lambda stat: stat['total_ms'],
+    'mean': lambda stat: stat['mean_ms'],
+    'max': lambda stat: stat['max_ms'],
+    'calls': lambda stat: stat['calls'],
+    'slow': lambda stat: stat['slow_calls']
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_statement(statement: str) -> str:
+    """
+    Forma de la sentencia: literales y parámetros como '?' y listas IN colapsadas.
+
+    SQLAlchemy reutiliza el texto compilado de cada sentencia, por lo que la caché
+    evita repetir las expresiones regulares en cada ejecución.
+    """
+    shape = _STRING_LITERAL.sub('?', statement)
+    shape = _PLACEHOLDER.sub('?', shape)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _WHITESPACE.sub(' ', shape).strip()
+    return _PLACEHOLDER_LIST.sub('(?, ...)', shape)
+
+
+@functools.lru_cache(maxsize=1024)
+def shape_id(shape: str) -> str:
+    """Identificador corto y estable de una forma de sentencia"""
+    return hashlib.sha1(shape.encode()).hexdigest()[:12]
+
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> Any:
+    """Parámetros sin valores: solo nombres y tipos"""
+    if executemany:
+        return f"<{len(parameters)} filas>"
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+def is_locking_read(statement: str) -> bool:
+    """Indica si la sentencia bloquea filas (FOR UPDATE / FOR SHARE, incluido SKIP LOCKED y NOWAIT)"""
+    return _LOCKING_CLAUSE.search(_STRING_LITERAL.sub('?', statement)) is not None
+
+
+class QueryStats:
+    """Estadísticas por forma de sentencia dentro del proceso"""
+
+    def __init__(self, max_shapes: int = 500):
+        self.max_shapes = max_shapes
+        self.dropped = 0
+        self._shapes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._explain_executor: Optional[ThreadPoolExecutor] = None
+        self._explain_futures: List = []
+
+    def record(self, statement: str, duration_ms: float, failed: bool = False, slow: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Acumula una ejecución de la sentencia.
+
+        Returns:
+            Optional[Dict[str, Any]]: Entrada de la forma, o None si se alcanzó max_shapes
+        """
+        shape = normalize_statement(statement)
+        key = shape_id(shape)
+        with self._lock:
+            entry = self._shapes.get(key)
+            if entry is None:
+                if len(self._shapes) >= self.max_shapes:
+                    self.dropped += 1
+                    return None
+                entry = self._shapes[key] = {
+                    'shape_id': key,
+                    'statement': shape,
+                    'calls': 0,
+                    'errors': 0,
+                    'slow_calls': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'last_seen': None,
+                    'explain': None
+                }
+            entry['calls'] += 1
+            entry['total_ms'] += duration_ms
+            entry['max_ms'] = max(entry['max_ms'], duration_ms)
+            entry['last_seen'] = time.time()
+            if failed:
+                entry['errors'] += 1
+            if slow:
+                entry['slow_calls'] += 1
+            return entry
+
+    def claim_explain(self, entry: Dict[str, Any]) -> bool:
+        """Marca la forma para capturar su plan; True solo la primera vez"""
+        with self._lock:
+            if entry['explain'] is not None:
+                return False
+            entry['explain'] = {'status': 'pending'}
+            return True
+
+    def capture_explain(self, engine, entry: Dict[str, Any], statement: str, parameters: Any) -> None:
+        """Obtiene el plan de la sentencia en segundo plano, en otra conexión y sin confirmar cambios"""
+        with self._lock:
+            if self._explain_executor is None:
+                self._explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='slow-query-explain')
+            self._explain_futures = [future for future in self._explain_futures if not future.done()]
+            self._explain_futures.append(
+                self._explain_executor.submit(self._explain, engine, entry, statement, parameters)
+            )
+
+    def _explain(self, engine, entry: Dict[str, Any], statement: str, parameters: Any) -> None:
+        prefix = EXPLAIN_PREFIXES[engine.dialect.name]
+        try:
+            with engine.connect() as connection:
+                try:
+                    rows = connection.exec_driver_sql(prefix + statement, parameters or ()).all()
+                finally:
+                    connection.rollback()
+            plan = {'status': 'captured', 'plan': [str(row[-1]) for row in rows]}
+        except Exception as e:
+            plan = {'status': 'failed', 'error': str(e)}
+        with self._lock:
+            entry['explain'] = plan
+
+    def wait_for_explains(self, timeout: Optional[float] = None) -> None:
+        """Espera a que terminen las capturas de planes pendientes"""
+        with self._lock:
+            futures = list(self._explain_futures)
+        for future in futures:
+            future.result(timeout=timeout)
+
+    def snapshot(self, sort: str = 'total', limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Formas ordenadas por el criterio indicado (total, mean, max, calls o slow)"""
+        with self._lock:
+            stats = []
+            for entry in self._shapes.values():
+                stat = dict(entry)
+                stat['mean_ms'] = round(entry['total_ms'] / entry['calls'], 3)
+                stat['total_ms'] = round(entry['total_ms'], 3)
+                stat['max_ms'] = round(entry['max_ms'], 3)
+                stat['last_seen'] = datetime.fromtimestamp(entry['last_seen'], timezone.utc).isoformat()
+                stats.append(stat)
+        stats.sort(key=SORT_KEYS.get(sort, SORT_KEYS['total']), reverse=True)
+        return stats[:limit] if limit else stats
+
+    def reset(self) -> None:
+        """Descarta las estadísticas acumuladas"""
+        with self._lock:
+            self._shapes.clear()
+            self.dropped = 0
+
+
+# Estadísticas compartidas por los engines del proceso
+query_stats = QueryStats()
+
+
+def instrument_engine(engine, config) -> None:
+    """Mide cada sentencia del engine si QUERY_STATS_ENABLED está activo"""
+    if not config.QUERY_STATS_ENABLED:
+        return
+
+    from sqlalchemy import event
+    from sqlalchemy.exc import InvalidRequestError
+
+    query_stats.max_shapes = config.QUERY_STATS_MAX_SHAPES
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, execution_context, executemany):
+        if execution_context is not None:
+            execution_context._query_started = time.perf_counter()
+
+    def _after_cursor_execute(conn, cursor, statement, parameters, execution_context, executemany):
+        started = getattr(execution_context, '_query_started', None)
+        if started is not None:
+            _finish(conn, statement, parameters, executemany, started, failed=False)
+
+    def _handle_error(exception_context):
+        execution_context = exception_context.execution_context
+        started = getattr(execution_context, '_query_started', None)
+        if started is not None and exception_context.statement is not None:
+            _finish(
+                exception_context.connection, exception_context.statement, exception_context.parameters,
+                False, started, failed=True
+            )
+
+    def _finish(conn, statement, parameters, executemany, started, failed):
+        duration_ms = (time.perf_counter() - started) * 1000
+        # Los planes capturados también pasan por el engine: no se miden a sí mismos
+        if statement.lstrip()[:7].upper() == 'EXPLAIN':
+            return
+        slow = duration_ms >= config.SLOW_QUERY_THRESHOLD_MS
+        entry = query_stats.record(statement, duration_ms, failed=failed, slow=slow)
+        if not slow:
+            return
+
+        logger.warning(json.dumps({
+            'event': 'slow_query',
+            'shape_id': entry['shape_id'] if entry else shape_id(normalize_statement(statement)),
+            'duration_ms': round(duration_ms, 2),
+            'failed': failed,
+            'statement': normalize_statement(statement),
+            'parameters': redact_parameters(parameters, executemany)
+        }))
+
+        if (
+            entry is not None
+            and config.SLOW_QUERY_EXPLAIN
+            and not executemany
+            and conn.engine.dialect.name in EXPLAIN_PREFIXES
+            and statement.lstrip()[:6].upper() == 'SELECT'
+            # ANALYZE volvería a tomar los bloqueos de filas de la lectura original
+            and not is_locking_read(statement)
+            and query_stats.claim_explain(entry)
+        ):
+            query_stats.capture_explain(conn.engine, entry, statement, parameters)
+
+    try:
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'handle_error', _handle_error)
+    except InvalidRequestError as e:
+        logger.warning(f"No se pudo instrumentar el engine para estadísticas de consultas: {e}")
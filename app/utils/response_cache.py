@@ -0,0 +1,154 @@
+"""
+Caché de respuestas serializadas
+
+Guarda el cuerpo JSON ya serializado de una respuesta junto con la versión de la
+colección con la que se calculó y su vencimiento. Cada escritura de la colección la
+vacía (suscripción a la versión) y una entrada calculada antes de una escritura nunca
+se guarda ni se sirve después de ella. Esa versión es del proceso: para ver también las
+escrituras de otros workers o instancias, cada entrada guarda además una marca leída de
+una fuente compartida (la base) y solo se sirve mientras la marca actual sea la misma.
+El vencimiento es el menor entre el TTL y la
+primera URL firmada que contiene la respuesta, para no servir URLs vencidas. La
+memoria está acotada por cantidad de entradas y por bytes; al excederse se descartan
+las menos usadas recientemente.
+"""
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from . import metrics
+from .collection_version import CollectionVersion, providers_version
+
+
+class _Entry:
+    __slots__ = ('body', 'version', 'expires_at', 'stamp')
+
+    def __init__(self, body: str, version: int, expires_at: float, stamp: Hashable = None):
+        self.body = body
+        self.version = version
+        self.expires_at = expires_at
+        self.stamp = stamp
+
+
+class ResponseCache:
+    """Caché LRU de cuerpos serializados invalidada por la versión de una colección"""
+
+    def __init__(self, name: str, collection: CollectionVersion, max_entries: int, max_bytes: int):
+        self.name = name
+        self.collection = collection
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0, 'stale': 0}
+        collection.subscribe(self._on_change)
+
+    def get(self, key: Hashable, stamp: Hashable = None) -> Optional[str]:
+        """Cuerpo guardado para la clave si sigue vigente y se guardó con la misma marca, None si no"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.version != self.collection.value or entry.expires_at <= now):
+                self._remove(key, 'expirations')
+                entry = None
+            elif entry is not None and entry.stamp != stamp:
+                self._remove(key, 'stale')
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+            else:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+        metrics.record_cache_access(self.name, hit=entry is not None)
+        return entry.body if entry is not None else None
+
+    def put(self, key: Hashable, body: str, version: int, expires_at: float, stamp: Hashable = None) -> bool:
+        """
+        Guarda el cuerpo calculado con la versión y la marca indicadas (leídas antes de calcularlo)
+
+        Returns:
+            bool: False si no se guardó (la colección cambió, ya venció o excede max_bytes)
+        """
+        size = len(body)
+        with self._lock:
+            if version != self.collection.value or expires_at <= time.time() or size > self.max_bytes:
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(body, version, expires_at, stamp)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)), 'evictions')
+        return True
+
+    def clear(self) -> int:
+        """Descarta todas las entradas y retorna cuántas había"""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            self._stats['invalidations'] += count
+        if count:
+            metrics.record_cache_eviction(self.name, 'invalidated', count)
+        return count
+
+    def close(self) -> None:
+        """Deja de seguir la versión de la colección"""
+        self.collection.unsubscribe(self._on_change)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Tamaño y estadísticas de la caché en el proceso"""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'version': self.collection.value,
+                'hit_rate': round(self._stats['hits'] / lookups, 3) if lookups else 0.0,
+                **self._stats
+            }
+
+    def _on_change(self, event: str, version: int) -> None:
+        self.clear()
+
+    def _remove(self, key: Hashable, stat: Optional[str] = None) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+        if stat:
+            self._stats[stat] += 1
+            reason = {'evictions': 'capacity', 'stale': 'stale'}.get(stat, 'expired')
+            metrics.record_cache_eviction(self.name, reason)
+
+
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_list_cache(config) -> Optional[ResponseCache]:
+    """Caché del proceso para las páginas de GET /providers (None si RESPONSE_CACHE_ENABLED es False)"""
+    if not config.RESPONSE_CACHE_ENABLED:
+        return None
+    with _caches_lock:
+        cache = _caches.get('providers_list')
+        if cache is None:
+            cache = ResponseCache(
+                'providers_list',
+                providers_version,
+                max_entries=config.RESPONSE_CACHE_MAX_ENTRIES,
+                max_bytes=config.RESPONSE_CACHE_MAX_BYTES
+            )
+            _caches['providers_list'] = cache
+        return cache
+
+
+def close_caches() -> None:
+    """Descarta las cachés del proceso (pruebas)"""
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.close()
+        _caches.clear()
@@ -0,0 +1,65 @@
+"""
+Single-flight - Agrupa lecturas idénticas concurrentes en una sola ejecución
+
+Mientras una llamada con cierta clave está en curso, los threads que piden la misma
+clave no la repiten: esperan a que termine y reciben su resultado, o su excepción.
+Al terminar la clave se libera, así que no es una caché: una llamada posterior vuelve
+a ejecutarse. El resultado es el mismo objeto para todos y debe tratarse como de solo
+lectura.
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+from . import metrics
+
+
+class _Flight:
+    """Ejecución en curso de una clave"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Grupo de ejecuciones en curso indexadas por clave, compartido por los threads del proceso"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def do(self, key: Hashable, function: Callable[..., Any], *args, **kwargs) -> Any:
+        """Ejecuta function o, si ya hay una ejecución con la misma clave, espera su resultado"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+        metrics.record_cache_access(self.name, hit=not leader)
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = function(*args, **kwargs)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
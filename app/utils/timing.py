@@ -0,0 +1,185 @@
+"""
+Medición de tiempos por petición - Spans ligeros y header Server-Timing
+"""
+import json
+import time
+import logging
+import functools
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Callable, ContextManager, Dict, List, Optional
+
+logger = logging.getLogger('app.timing')
+
+# Medición activa de la petición en curso (None si la medición está deshabilitada)
+_current_timing: ContextVar[Optional['RequestTiming']] = ContextVar('request_timing', default=None)
+
+_NULL_SPAN = nullcontext()
+
+# Observadores de fases (p. ej. métricas), activos aunque la medición por petición esté deshabilitada
+_phase_observers: List[Callable[[str, float, bool], None]] = []
+
+# Fábrica de context managers que envuelve cada fase (p. ej. spans de OpenTelemetry)
+_phase_tracer: Optional[Callable[[str], ContextManager]] = None
+
+
+class RequestTiming:
+    """Acumula la duración y el número de llamadas de cada fase de una petición"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, List[float]] = {}
+
+    def add(self, name: str, duration_ms: float) -> None:
+        """Suma una duración (en ms) a la fase indicada"""
+        phase = self.phases.get(name)
+        if phase is None:
+            self.phases[name] = [duration_ms, 1]
+        else:
+            phase[0] += duration_ms
+            phase[1] += 1
+
+    def total_ms(self) -> float:
+        """Duración transcurrida desde el inicio de la petición"""
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self, total_ms: float) -> str:
+        """Valor del header Server-Timing"""
+        entries = [
+            f'{name};dur={duration:.2f};desc="x{count}"' for name, (duration, count) in self.phases.items()
+        ]
+        entries.append(f'total;dur={total_ms:.2f}')
+        return ', '.join(entries)
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """Fases como diccionario {fase: {ms, count}}"""
+        return {name: {'ms': round(duration, 2), 'count': count} for name, (duration, count) in self.phases.items()}
+
+
+def current_timing() -> Optional[RequestTiming]:
+    """Medición de la petición en curso"""
+    return _current_timing.get()
+
+
+def add_phase_observer(observer: Callable[[str, float, bool], None]) -> None:
+    """
+    Registra una función (fase, segundos, falló) llamada al terminar cada span.
+
+    Permite que métricas u otros exportadores reutilicen los mismos puntos de medición.
+    """
+    if observer not in _phase_observers:
+        _phase_observers.append(observer)
+
+
+def remove_phase_observer(observer: Callable[[str, float, bool], None]) -> None:
+    """Elimina un observador registrado"""
+    if observer in _phase_observers:
+        _phase_observers.remove(observer)
+
+
+def set_phase_tracer(tracer: Optional[Callable[[str], ContextManager]]) -> None:
+    """Define la fábrica de context managers que envuelve cada fase (None para quitarla)"""
+    global _phase_tracer
+    _phase_tracer = tracer
+
+
+def _record(timing: Optional[RequestTiming], name: str, duration: float, failed: bool) -> None:
+    """Registra la duración (en segundos) en la petición en curso y en los observadores"""
+    if timing is not None:
+        timing.add(name, duration * 1000)
+    for observer in _phase_observers:
+        try:
+            observer(name, duration, failed)
+        except Exception as e:
+            logger.warning(f"Observador de tiempos falló en {name}: {e}")
+
+
+@contextmanager
+def _measure(timing: Optional[RequestTiming], name: str):
+    with _phase_tracer(name) if _phase_tracer is not None else _NULL_SPAN:
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            _record(timing, name, time.perf_counter() - started, failed)
+
+
+def span(name: str):
+    """
+    Context manager que mide una fase de la petición en curso.
+
+    Sin medición activa, observadores ni tracer retorna un context manager nulo compartido, sin tomar tiempos.
+    """
+    timing = _current_timing.get()
+    if timing is None and not _phase_observers and _phase_tracer is None:
+        return _NULL_SPAN
+    return _measure(timing, name)
+
+
+def timed(name: str):
+    """Decorador que mide cada llamada a la función como la fase indicada"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timing = _current_timing.get()
+            if timing is None and not _phase_observers and _phase_tracer is None:
+                return func(*args, **kwargs)
+            with _measure(timing, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def init_request_timing(app, enabled: bool) -> None:
+    """
+    Registra el middleware de medición en la aplicación.
+
+    Si está deshabilitado no se registra ningún hook, por lo que los spans
+    no encuentran medición activa y no tienen costo apreciable.
+    """
+    if not enabled:
+        return
+
+    from flask import g, request
+    from .tracing import current_trace_id
+
+    @app.before_request
+    def _start_request_timing():
+        g.request_timing_token = _current_timing.set(RequestTiming())
+
+    @app.after_request
+    def _finish_request_timing(response):
+        timing = _current_timing.get()
+        if timing is None:
+            return response
+
+        total_ms = timing.total_ms()
+        response.headers['Server-Timing'] = timing.server_timing(total_ms)
+        entry = {
+            'event': 'request_timing',
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 2),
+            'phases': timing.to_dict()
+        }
+        trace_id = current_trace_id()
+        if trace_id:
+            entry['trace_id'] = trace_id
+        logger.info(json.dumps(entry))
+        return response
+
+    @app.teardown_request
+    def _reset_request_timing(exc):
+        token = g.pop('request_timing_token', None)
+        if token is not None:
+            try:
+                _current_timing.reset(token)
+            except ValueError:
+                # El token pertenece a otro contexto: basta con desactivar la medición
+                _current_timing.set(None)
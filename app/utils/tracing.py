@@ -0,0 +1,175 @@
+"""
+Trazas OpenTelemetry opcionales
+
+Cada petición abre un span de servidor con el contexto W3C (traceparent) recibido;
+las fases medidas con timing (controlador, servicio, repositorio, almacenamiento)
+y cada sentencia SQL se registran como spans hijos.
+"""
+import logging
+from contextlib import contextmanager
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_tracer = None
+_memory_exporter = None
+
+
+def init_tracing(app, config) -> bool:
+    """
+    Configura el tracer y los hooks de la aplicación si TRACING_ENABLED está activo.
+
+    Returns:
+        bool: True si las trazas quedaron habilitadas
+    """
+    global _tracer, _memory_exporter
+    if not config.TRACING_ENABLED:
+        return False
+
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor, BatchSpanProcessor
+    except ImportError:
+        logger.warning("TRACING_ENABLED=True pero opentelemetry-sdk no está instalado; trazas deshabilitadas")
+        return False
+
+    exporter_name = config.TRACING_EXPORTER
+    if exporter_name == 'otlp':
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning(
+                "TRACING_EXPORTER=otlp pero opentelemetry-exporter-otlp-proto-http no está instalado; "
+                "trazas deshabilitadas"
+            )
+            return False
+
+    from .timing import set_phase_tracer
+
+    provider = TracerProvider(resource=Resource.create({'service.name': config.TRACING_SERVICE_NAME}))
+    if exporter_name == 'memory':
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+        _memory_exporter = InMemorySpanExporter()
+        provider.add_span_processor(SimpleSpanProcessor(_memory_exporter))
+    elif exporter_name == 'otlp':
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    else:
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+        provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter()))
+
+    _tracer = provider.get_tracer('medisupply.providers')
+    set_phase_tracer(_phase_span)
+    _register_request_hooks(app)
+    return True
+
+
+def get_memory_exporter():
+    """Exportador en memoria (TRACING_EXPORTER=memory) para pruebas sin red"""
+    return _memory_exporter
+
+
+def instrument_engine(engine) -> None:
+    """Registra un span por cada sentencia SQL ejecutada por el engine"""
+    from sqlalchemy import event
+    from sqlalchemy.exc import InvalidRequestError
+
+    try:
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'handle_error', _handle_error)
+    except InvalidRequestError as e:
+        logger.warning(f"No se pudo instrumentar el engine para trazas: {e}")
+
+
+@contextmanager
+def _phase_span(name: str):
+    """Span hijo del contexto actual para una fase medida con timing"""
+    tracer = _tracer
+    if tracer is None:
+        yield
+        return
+    with tracer.start_as_current_span(name):
+        yield
+
+
+def _register_request_hooks(app) -> None:
+    """Abre y cierra el span de servidor de cada petición"""
+    from flask import g, request
+    from opentelemetry import context, trace
+    from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+
+    propagator = TraceContextTextMapPropagator()
+
+    @app.before_request
+    def _start_request_span():
+        parent = propagator.extract(carrier=request.headers)
+        name = f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"
+        span = _tracer.start_span(name, context=parent, kind=trace.SpanKind.SERVER)
+        span.set_attribute('http.method', request.method)
+        span.set_attribute('http.target', request.full_path.rstrip('?'))
+        g.tracing_span = span
+        g.tracing_token = context.attach(trace.set_span_in_context(span, parent))
+
+    @app.after_request
+    def _finish_request_span(response):
+        span = g.get('tracing_span')
+        if span is not None:
+            span.set_attribute('http.status_code', response.status_code)
+            if response.status_code >= 500:
+                span.set_status(trace.Status(trace.StatusCode.ERROR))
+            # Devolver el contexto para correlacionar la respuesta con la traza
+            propagator.inject(response.headers, context=trace.set_span_in_context(span))
+        return response
+
+    @app.teardown_request
+    def _end_request_span(exc):
+        span = g.pop('tracing_span', None)
+        token = g.pop('tracing_token', None)
+        if span is not None:
+            if exc is not None:
+                span.record_exception(exc)
+                span.set_status(trace.Status(trace.StatusCode.ERROR))
+            span.end()
+        if token is not None:
+            context.detach(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, execution_context, executemany):
+    if _tracer is None:
+        return
+    from opentelemetry import trace
+
+    verb = statement.lstrip().split(' ', 1)[0].upper()
+    span = _tracer.start_span(f"sql {verb}", kind=trace.SpanKind.CLIENT)
+    span.set_attribute('db.system', conn.engine.dialect.name)
+    span.set_attribute('db.statement', statement)
+    if execution_context is not None:
+        execution_context._tracing_span = span
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, execution_context, executemany):
+    span = getattr(execution_context, '_tracing_span', None)
+    if span is not None:
+        span.end()
+        execution_context._tracing_span = None
+
+
+def _handle_error(exception_context):
+    span = getattr(exception_context.execution_context, '_tracing_span', None)
+    if span is not None:
+        from opentelemetry import trace
+        span.record_exception(exception_context.original_exception)
+        span.set_status(trace.Status(trace.StatusCode.ERROR))
+        span.end()
+        exception_context.execution_context._tracing_span = None
+
+
+def current_trace_id() -> Optional[str]:
+    """ID de la traza activa en hexadecimal (None si no hay trazas)"""
+    if _tracer is None:
+        return None
+    from opentelemetry import trace
+
+    span_context = trace.get_current_span().get_span_context()
+    return format(span_context.trace_id, '032x') if span_context.is_valid else None
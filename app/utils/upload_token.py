@@ -0,0 +1,34 @@
+"""
+Tokens de subida directa de logos
+
+POST /providers/logo-upload-url asigna el nombre del objeto y entrega un token firmado
+con SECRET_KEY que lo contiene. El alta solo confirma el logo indicado por un token
+válido y vigente, así que un cliente no puede asociar un objeto que no subió él (por
+ejemplo el logo de otro proveedor) adivinando o copiando su nombre.
+"""
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+
+_SALT = 'logo-upload'
+
+
+def issue_upload_token(logo_filename: str, secret_key: str) -> str:
+    """Token firmado para el logo asignado"""
+    return URLSafeTimedSerializer(secret_key, salt=_SALT).dumps(logo_filename)
+
+
+def verify_upload_token(token: str, secret_key: str, max_age_seconds: int) -> str:
+    """
+    Nombre del logo contenido en el token
+
+    Raises:
+        ValueError: Si el token no es válido o venció
+    """
+    try:
+        logo_filename = URLSafeTimedSerializer(secret_key, salt=_SALT).loads(token, max_age=max_age_seconds)
+    except SignatureExpired:
+        raise ValueError("El token de subida del logo venció")
+    except BadSignature:
+        raise ValueError("El token de subida del logo no es válido")
+    if not isinstance(logo_filename, str):
+        raise ValueError("El token de subida del logo no es válido")
+    return logo_filename
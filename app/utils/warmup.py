@@ -0,0 +1,107 @@
+"""
+Calentamiento del proceso tras el primer health check
+
+El arranque no importa SQLAlchemy, Pillow ni los clientes de Google para que el
+contenedor responda cuanto antes. Con WARMUP_ENABLED, la primera respuesta exitosa
+de un health check lanza en segundo plano los pasos que de otro modo pagaría la
+primera petición real: importar esas dependencias, abrir conexiones del pool y
+obtener las credenciales de firma del almacenamiento.
+"""
+import json
+import time
+import logging
+import threading
+from contextlib import ExitStack
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Rutas cuya primera respuesta exitosa dispara el calentamiento
+HEALTH_PATHS = ('/providers/ping', '/providers/health', '/providers/health/live', '/providers/health/ready')
+
+_state: Dict[str, Any] = {'status': 'idle', 'steps': {}}
+_state_lock = threading.Lock()
+_thread: Optional[threading.Thread] = None
+
+
+def warmup_state() -> Dict[str, Any]:
+    """Estado del calentamiento: idle | running | completed | failed, con la duración de cada paso"""
+    with _state_lock:
+        return {'status': _state['status'], 'steps': dict(_state['steps'])}
+
+
+def start_warmup(config) -> bool:
+    """Lanza el calentamiento en segundo plano; retorna False si ya se lanzó en este proceso"""
+    global _thread
+    with _state_lock:
+        if _state['status'] != 'idle':
+            return False
+        _state['status'] = 'running'
+        _thread = threading.Thread(target=run_warmup, args=(config,), name='warmup', daemon=True)
+    _thread.start()
+    return True
+
+
+def wait_for_warmup(timeout: Optional[float] = None) -> None:
+    """Espera a que termine el calentamiento lanzado (pruebas y benchmarks)"""
+    if _thread is not None:
+        _thread.join(timeout)
+
+
+def run_warmup(config) -> Dict[str, Any]:
+    """Ejecuta los pasos de calentamiento; un paso fallido no impide los siguientes"""
+    steps = {}
+    for name, step in (('imports', _import_dependencies), ('database', _connect_pool), ('storage', _warm_storage)):
+        started = time.perf_counter()
+        try:
+            step(config)
+            steps[name] = {'ms': round((time.perf_counter() - started) * 1000, 2), 'ok': True}
+        except Exception as e:
+            steps[name] = {'ms': round((time.perf_counter() - started) * 1000, 2), 'ok': False, 'error': str(e)}
+
+    status = 'completed' if all(step['ok'] for step in steps.values()) else 'failed'
+    with _state_lock:
+        _state['status'] = status
+        _state['steps'] = steps
+    log = logger.info if status == 'completed' else logger.warning
+    log(json.dumps({'event': 'warmup', 'status': status, 'steps': steps}))
+    return steps
+
+
+def _import_dependencies(config) -> None:
+    """Importa las dependencias diferidas del arranque (SQLAlchemy, Pillow)"""
+    from ..services import provider_service  # noqa: F401
+    from PIL import Image  # noqa: F401
+
+
+def _connect_pool(config) -> None:
+    """Abre WARMUP_POOL_CONNECTIONS conexiones a la vez para que queden en el pool"""
+    from sqlalchemy import text
+    from ..repositories.provider_repository import get_engine
+
+    engine = get_engine(config.SQLALCHEMY_DATABASE_URI)
+    with ExitStack() as stack:
+        for _ in range(max(1, config.WARMUP_POOL_CONNECTIONS)):
+            connection = stack.enter_context(engine.connect())
+            connection.execute(text("SELECT 1"))
+
+
+def _warm_storage(config) -> None:
+    """Crea el backend de almacenamiento y sus credenciales"""
+    from ..storage import get_storage_backend
+
+    get_storage_backend(config).warm_up()
+
+
+def init_warmup(app, config) -> None:
+    """Registra el disparo del calentamiento si WARMUP_ENABLED está activo"""
+    if not config.WARMUP_ENABLED:
+        return
+
+    from flask import request
+
+    @app.after_request
+    def _trigger_warmup(response):
+        if request.path in HEALTH_PATHS and response.status_code < 400 and _state['status'] == 'idle':
+            start_warmup(config)
+        return response
@@ -0,0 +1 @@
+# Benchmarks de carga del servicio de proveedores
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""
+Compara dos reportes JSON de benchmarks.run
+
+Uso:
+    python -m benchmarks.compare base.json candidate.json
+"""
+import sys
+import json
+from typing import Any, Dict, List, Optional
+
+METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'req_per_s')
+
+
+def compare(base: Dict[str, Any], candidate: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Diferencia porcentual por escenario y métrica (solo escenarios presentes en ambos reportes)"""
+    rows = []
+    for name, base_result in base['scenarios'].items():
+        candidate_result = candidate['scenarios'].get(name)
+        if candidate_result is None:
+            continue
+        row = {'scenario': name}
+        for metric in METRICS:
+            before, after = base_result[metric], candidate_result[metric]
+            row[metric] = {
+                'base': before,
+                'candidate': after,
+                'change_pct': round((after - before) / before * 100, 1) if before else None
+            }
+        rows.append(row)
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = argv if argv is not None else sys.argv[1:]
+    if len(argv) != 2:
+        print(__doc__.strip(), file=sys.stderr)
+        sys.exit(2)
+
+    with open(argv[0]) as base_file, open(argv[1]) as candidate_file:
+        base, candidate = json.load(base_file), json.load(candidate_file)
+
+    print(f"{'escenario':<28}" + ''.join(f"{metric:>24}" for metric in METRICS))
+    for row in compare(base, candidate):
+        cells = []
+        for metric in METRICS:
+            values = row[metric]
+            change = f"{values['change_pct']:+.1f}%" if values['change_pct'] is not None else 'n/a'
+            cells.append(f"{values['base']:>8} → {values['candidate']:<8} {change:>6}")
+        print(f"{row['scenario']:<28}" + ''.join(f"{cell:>24}" for cell in cells))
+
+
+if __name__ == '__main__':
+    main()
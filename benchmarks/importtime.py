@@ -0,0 +1,128 @@
+"""
+Perfil de importación del arranque (python -X importtime)
+
+Ejecuta create_app() en procesos nuevos y reporta el tiempo de arranque, el tiempo
+de importación, los módulos más costosos y qué dependencias pesadas se cargaron.
+El reporte usa el mismo formato de escenarios que benchmarks.run, por lo que dos
+reportes se comparan con benchmarks.compare.
+
+Uso:
+    python -m benchmarks.importtime --repeat 5 --top 15 --output importtime.json
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from .run import git_commit
+from .stats import summarize
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencias que el arranque no debe importar: se cargan en la primera petición o en el calentamiento
+HEAVY_MODULES = ('sqlalchemy', 'PIL', 'google.cloud.storage', 'google.auth', 'alembic', 'opentelemetry.sdk')
+
+STARTUP_SCRIPT = (
+    "import sys, json\n"
+    "from app import create_app\n"
+    "create_app()\n"
+    f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))\n"
+)
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Perfil de importación del arranque de la aplicación")
+    parser.add_argument('--repeat', type=int, default=5, help="Procesos medidos (se reporta la mediana)")
+    parser.add_argument('--top', type=int, default=15, help="Módulos más costosos a listar")
+    parser.add_argument('--output', default='', help="Archivo JSON de resultados (por defecto stdout)")
+    return parser.parse_args(argv)
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Entradas de -X importtime: módulo, tiempo propio y acumulado (µs) y profundidad"""
+    modules = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                'module': name,
+                'self_us': int(self_us),
+                'cumulative_us': int(cumulative_us),
+                'depth': len(indent) // 2
+            })
+    return modules
+
+
+def measure_startup() -> Dict[str, Any]:
+    """Arranca la aplicación en un proceso nuevo y mide importaciones y duración total"""
+    env = dict(os.environ)
+    env.pop('PROMETHEUS_MULTIPROC_DIR', None)
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    wall = time.perf_counter() - started
+
+    modules = parse_importtime(completed.stderr)
+    return {
+        'wall_seconds': wall,
+        'import_seconds': sum(module['cumulative_us'] for module in modules if module['depth'] == 0) / 1e6,
+        'modules': modules,
+        'heavy_modules': json.loads(completed.stdout.strip().splitlines()[-1])
+    }
+
+
+def build_report(runs: List[Dict[str, Any]], top: int) -> Dict[str, Any]:
+    """Resume varias mediciones: percentiles de arranque e importación y módulos más costosos"""
+    reference = sorted(runs, key=lambda run: run['import_seconds'])[len(runs) // 2]
+    slowest = sorted(reference['modules'], key=lambda module: module['cumulative_us'], reverse=True)
+    return {
+        'scenarios': {
+            'startup': summarize([run['wall_seconds'] for run in runs], 0, sum(run['wall_seconds'] for run in runs)),
+            'imports': summarize([run['import_seconds'] for run in runs], 0, sum(run['import_seconds'] for run in runs))
+        },
+        'heavy_modules_at_startup': sorted({name for run in runs for name in run['heavy_modules']}),
+        'top_modules': [
+            {'module': module['module'], 'cumulative_ms': round(module['cumulative_us'] / 1000, 2)}
+            for module in slowest[:top]
+        ]
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    runs = [measure_startup() for _ in range(args.repeat)]
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'parameters': {'repeat': args.repeat, 'top': args.top},
+        **build_report(runs, args.top)
+    }
+    print(f"startup: {report['scenarios']['startup']}", file=sys.stderr)
+    print(f"imports: {report['scenarios']['imports']}", file=sys.stderr)
+    if report['heavy_modules_at_startup']:
+        print(f"dependencias pesadas importadas al arrancar: {report['heavy_modules_at_startup']}", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as target:
+            target.write(output + '\n')
+    else:
+        print(output)
+    return report
+
+
+if __name__ == '__main__':
+    main()
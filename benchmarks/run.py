@@ -0,0 +1,223 @@
+"""
+Benchmark de carga de la API de proveedores
+
+Levanta la aplicación en un servidor local con varios hilos, siembra N proveedores
+con Faker y mide cada escenario con la concurrencia indicada. El almacenamiento de
+logos usa el backend falso en disco con latencia inyectable.
+
+Uso:
+    python -m benchmarks.run --providers 1000 --concurrency 8 --requests 200 --output results.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import logging
+import random
+import argparse
+import tempfile
+import platform
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from werkzeug.serving import make_server
+
+from app.config.settings import Config
+from .seed import ProviderSeeder, TINY_PNG
+from .stats import summarize
+
+PAGE_SIZES = (10, 50, 100)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark de carga de la API de proveedores")
+    parser.add_argument('--providers', type=int, default=1000, help="Proveedores sembrados antes de medir")
+    parser.add_argument('--requests', type=int, default=200, help="Peticiones por escenario")
+    parser.add_argument('--concurrency', type=int, default=8, help="Clientes concurrentes")
+    parser.add_argument('--storage-latency-ms', type=float, default=20.0, help="Latencia por operación del almacenamiento falso")
+    parser.add_argument('--storage-jitter-ms', type=float, default=5.0, help="Variación aleatoria de la latencia")
+    parser.add_argument('--logo-ratio', type=float, default=0.5, help="Fracción de proveedores sembrados con logo")
+    parser.add_argument('--delete-iterations', type=int, default=3, help="Repeticiones de DELETE /providers/all")
+    parser.add_argument('--scenarios', default='', help="Escenarios a ejecutar separados por coma (por defecto todos)")
+    parser.add_argument('--database-url', default='', help="Base de datos (por defecto SQLite temporal)")
+    parser.add_argument('--seed', type=int, default=42, help="Semilla de Faker y del orden de las peticiones")
+    parser.add_argument('--output', default='', help="Archivo JSON de resultados (por defecto stdout)")
+    return parser.parse_args(argv)
+
+
+def configure(args: argparse.Namespace, workdir: str) -> None:
+    """Apunta la aplicación a la base de datos y al almacenamiento falso del benchmark"""
+    Config.SQLALCHEMY_DATABASE_URI = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    Config.STORAGE_BACKEND = 'fake'
+    Config.FAKE_STORAGE_ROOT = os.path.join(workdir, 'bucket')
+    Config.STORAGE_LATENCY_MS = args.storage_latency_ms
+    Config.STORAGE_LATENCY_JITTER_MS = args.storage_jitter_ms
+    Config.REQUEST_TIMING_ENABLED = False
+    Config.TRACING_ENABLED = False
+
+
+class ApiServer:
+    """Servidor WSGI local con un hilo por petición"""
+
+    def __init__(self, app):
+        # El log de acceso de werkzeug distorsiona las mediciones
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        self._server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.base_url = f"http://127.0.0.1:{self._server.server_port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._thread.join()
+
+
+class LoadRunner:
+    """Ejecuta un escenario con N clientes concurrentes y mide cada petición"""
+
+    def __init__(self, base_url: str, concurrency: int):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def run(self, total: int, make_request: Callable[[requests.Session, int], requests.Response]) -> Dict[str, Any]:
+        latencies: List[float] = []
+        errors = 0
+        lock = threading.Lock()
+
+        def execute(index: int) -> None:
+            nonlocal errors
+            started = time.perf_counter()
+            try:
+                response = make_request(self._session(), index)
+                ok = response.status_code < 400
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - started
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            list(pool.map(execute, range(total)))
+        return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def build_scenarios(args: argparse.Namespace, base_url: str, ids: List[str],
+                    seeder: ProviderSeeder) -> Dict[str, Callable[[requests.Session, int], requests.Response]]:
+    """Escenarios de lectura y escritura indexados por nombre"""
+    rng = random.Random(args.seed)
+    seed_lock = threading.Lock()
+    scenarios = {}
+
+    for per_page in PAGE_SIZES:
+        last_page = max(1, -(-args.providers // per_page))
+        for label, page in (('first', 1), ('middle', max(1, last_page // 2)), ('last', last_page)):
+            url = f"{base_url}/providers?page={page}&per_page={per_page}"
+            scenarios[f"list_{label}_per_page_{per_page}"] = lambda session, i, url=url: session.get(url)
+
+    scenarios['get_by_id'] = lambda session, i: session.get(f"{base_url}/providers/{rng.choice(ids)}")
+
+    def next_provider() -> dict:
+        with seed_lock:
+            return seeder.provider_data()
+
+    scenarios['post_json'] = lambda session, i: session.post(f"{base_url}/providers", json=next_provider())
+    scenarios['post_multipart'] = lambda session, i: session.post(
+        f"{base_url}/providers",
+        data=next_provider(),
+        files={'logo': ('logo.png', io.BytesIO(TINY_PNG), 'image/png')}
+    )
+    return scenarios
+
+
+def run_delete_all(args: argparse.Namespace, base_url: str, seeder: ProviderSeeder, repository) -> Dict[str, Any]:
+    """Mide DELETE /providers/all resembrando la tabla antes de cada iteración (fuera de la medición)"""
+    latencies = []
+    wall = 0.0
+    for _ in range(args.delete_iterations):
+        seeder.seed(repository, args.providers, Config.FAKE_STORAGE_ROOT, Config.BUCKET_FOLDER, args.logo_ratio)
+        started = time.perf_counter()
+        response = requests.delete(f"{base_url}/providers/all")
+        elapsed = time.perf_counter() - started
+        wall += elapsed
+        if response.status_code < 400:
+            latencies.append(elapsed)
+    return summarize(latencies, args.delete_iterations - len(latencies), wall)
+
+
+def git_commit() -> Optional[str]:
+    """Commit actual del repositorio, para comparar resultados entre versiones"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    selected = {name.strip() for name in args.scenarios.split(',') if name.strip()}
+
+    with tempfile.TemporaryDirectory(prefix='providers-bench-') as workdir:
+        configure(args, workdir)
+
+        from app import create_app
+        from app.repositories.provider_repository import ProviderRepository
+        from app.repositories.migrations import upgrade_database
+
+        app = create_app()
+        repository = ProviderRepository()
+        upgrade_database(repository.engine)
+        repository.delete_all()
+        seeder = ProviderSeeder(args.seed)
+        ids = seeder.seed(repository, args.providers, Config.FAKE_STORAGE_ROOT, Config.BUCKET_FOLDER, args.logo_ratio)
+
+        results = {}
+        with ApiServer(app) as server:
+            runner = LoadRunner(server.base_url, args.concurrency)
+            for name, make_request in build_scenarios(args, server.base_url, ids, seeder).items():
+                if selected and name not in selected:
+                    continue
+                results[name] = runner.run(args.requests, make_request)
+                print(f"{name}: {results[name]}", file=sys.stderr)
+
+            if not selected or 'delete_all' in selected:
+                results['delete_all'] = run_delete_all(args, server.base_url, seeder, repository)
+                print(f"delete_all: {results['delete_all']}", file=sys.stderr)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'parameters': {key: value for key, value in vars(args).items() if key not in ('output', 'scenarios')},
+        'scenarios': results
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as target:
+            target.write(output + '\n')
+    else:
+        print(output)
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Carga de proveedores sintéticos con Faker para los benchmarks
+"""
+import io
+import re
+import uuid
+import zlib
+import struct
+from datetime import datetime
+from typing import List
+
+from faker import Faker
+from sqlalchemy import insert
+
+from app.repositories.provider_repository import ProviderDB, ProviderRepository
+from app.storage.local_storage import LocalStorageBackend, UrlSigner
+
+
+def _tiny_png() -> bytes:
+    """PNG válido de 1x1 píxel, usado como logo"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    header = struct.pack('>IIBBBBB', 1, 1, 8, 6, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(b'\x00\x00\x00\x00\x00')) + chunk(b'IEND', b'')
+
+
+TINY_PNG = _tiny_png()
+
+_INVALID_NAME_CHARS = re.compile(r'[^a-zA-Z0-9\sáéíóúÁÉÍÓÚñÑüÜ]')
+
+
+class ProviderSeeder:
+    """Genera proveedores reproducibles (misma semilla, mismos datos)"""
+
+    def __init__(self, seed: int = 42, locale: str = 'es_CO'):
+        self.faker = Faker(locale)
+        self.faker.seed_instance(seed)
+        self._counter = 0
+
+    def provider_data(self) -> dict:
+        """Datos válidos para un proveedor nuevo (nombre, email único y teléfono)"""
+        self._counter += 1
+        name = _INVALID_NAME_CHARS.sub('', self.faker.company()).strip() or 'Proveedor'
+        return {
+            'name': f"{name} {self._counter}",
+            'email': f"bench{self._counter}.{uuid.uuid4().hex[:8]}@{self.faker.free_email_domain()}",
+            'phone': self.faker.numerify('3#########')
+        }
+
+    def seed(self, repository: ProviderRepository, count: int, storage_root: str, bucket_folder: str,
+             logo_ratio: float = 0.5, batch_size: int = 1000) -> List[str]:
+        """
+        Inserta proveedores en bloque y guarda sus logos directamente en disco (sin latencia simulada)
+
+        Returns:
+            List[str]: IDs de los proveedores creados
+        """
+        storage = LocalStorageBackend(storage_root, UrlSigner('seed', '/'))
+        logo_every = int(round(1 / logo_ratio)) if logo_ratio > 0 else 0
+        ids = []
+        rows = []
+        now = datetime.utcnow()
+
+        for index in range(count):
+            row = self.provider_data()
+            row.update({'id': str(uuid.uuid4()), 'created_at': now, 'updated_at': now, 'logo_filename': None})
+            if logo_every and index % logo_every == 0:
+                row['logo_filename'] = f"logo_{uuid.uuid4().hex}.png"
+                storage.put(f"{bucket_folder}/{row['logo_filename']}", io.BytesIO(TINY_PNG), 'image/png')
+            rows.append(row)
+            ids.append(row['id'])
+
+            if len(rows) >= batch_size:
+                self._insert(repository, rows)
+                rows = []
+
+        if rows:
+            self._insert(repository, rows)
+        return ids
+
+    def _insert(self, repository: ProviderRepository, rows: List[dict]) -> None:
+        session = repository._get_session()
+        try:
+            session.execute(insert(ProviderDB), rows)
+            session.commit()
+        finally:
+            session.close()
@@ -0,0 +1,39 @@
+"""
+Estadísticas de latencia de los benchmarks
+"""
+import statistics
+from typing import Any, Dict, List
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil por interpolación lineal sobre valores ordenados"""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+
+    rank = (len(sorted_values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+def summarize(latencies: List[float], errors: int, wall_seconds: float) -> Dict[str, Any]:
+    """
+    Resume las latencias (en segundos) de un escenario
+
+    Returns:
+        Dict[str, Any]: Conteos, percentiles en milisegundos y peticiones por segundo
+    """
+    ordered = sorted(latencies)
+    total = len(ordered) + errors
+    return {
+        'requests': total,
+        'errors': errors,
+        'p50_ms': round(percentile(ordered, 50) * 1000, 2),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 2),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 2),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 2) if ordered else 0.0,
+        'max_ms': round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        'req_per_s': round(total / wall_seconds, 2) if wall_seconds > 0 else 0.0
+    }
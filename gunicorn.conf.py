@@ -0,0 +1,27 @@
+"""
+Configuración de gunicorn para el servicio de proveedores
+
+Uso: gunicorn -c gunicorn.conf.py app:app
+"""
+import os
+import shutil
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8080')}"
+workers = int(os.getenv('GUNICORN_WORKERS', '2'))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# Directorio compartido donde cada worker escribe sus métricas Prometheus
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/providers-metrics')
+
+
+def on_starting(server):
+    """Limpia las métricas de ejecuciones anteriores antes de crear los workers"""
+    metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Descarta los gauges del worker terminado"""
+    from app.utils.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
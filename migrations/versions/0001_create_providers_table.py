@@ -0,0 +1,42 @@
+"""Tabla de proveedores
+
+Línea base del esquema. Las bases creadas antes de las migraciones (create_all al
+arrancar) ya tienen la tabla: en ese caso la revisión solo queda registrada.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table('providers'):
+        return
+
+    op.create_table(
+        'providers',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('name', sa.String(255), nullable=False),
+        sa.Column('email', sa.String(255), nullable=False, unique=True),
+        sa.Column('phone', sa.String(20), nullable=False),
+        sa.Column('logo_filename', sa.String(255), nullable=True),
+        sa.Column('logo_url', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('providers')
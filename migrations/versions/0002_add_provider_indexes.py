@@ -0,0 +1,52 @@
+"""Índices de las consultas frecuentes de proveedores
+
+- (name, id): listados paginados ordenados por nombre, con id como desempate estable
+- lower(email): búsquedas de email sin distinguir mayúsculas
+- created_at y updated_at: consultas por fecha de alta y de modificación
+
+En PostgreSQL los índices se crean con CREATE INDEX CONCURRENTLY, fuera de la
+transacción de la migración, para no bloquear escrituras sobre la tabla.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00
+
+"""
+from contextlib import nullcontext
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ('ix_providers_name_id', ['name', 'id']),
+    ('ix_providers_email_lower', [sa.text('lower(email)')]),
+    ('ix_providers_created_at', ['created_at']),
+    ('ix_providers_updated_at', ['updated_at'])
+)
+
+
+def _outside_transaction():
+    """CONCURRENTLY no puede ejecutarse dentro de una transacción"""
+    if op.get_context().dialect.name == 'postgresql':
+        return op.get_context().autocommit_block()
+    return nullcontext()
+
+
+def upgrade() -> None:
+    with _outside_transaction():
+        for name, columns in INDEXES:
+            op.create_index(name, 'providers', columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with _outside_transaction():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='providers', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,64 @@
+"""Feed de cambios: índice (updated_at, id) y lápidas de proveedores eliminados
+
+- (updated_at, id): recorrido por keyset de GET /providers/changes; reemplaza al
+  índice de updated_at, que es su prefijo
+- provider_tombstones: una fila por proveedor eliminado (id, deleted_at) para que
+  las eliminaciones también aparezcan en el feed
+- Las filas sin updated_at (creadas antes de que se asignara) toman created_at,
+  para que ninguna quede fuera del feed
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00
+
+"""
+from contextlib import nullcontext
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _outside_transaction():
+    """CONCURRENTLY no puede ejecutarse dentro de una transacción"""
+    if op.get_context().dialect.name == 'postgresql':
+        return op.get_context().autocommit_block()
+    return nullcontext()
+
+
+def upgrade() -> None:
+    op.create_table(
+        'provider_tombstones',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False)
+    )
+    op.create_index('ix_provider_tombstones_deleted_at_id', 'provider_tombstones', ['deleted_at', 'id'])
+    op.execute(
+        "UPDATE providers SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) WHERE updated_at IS NULL"
+    )
+
+    with _outside_transaction():
+        op.create_index(
+            'ix_providers_updated_at_id', 'providers', ['updated_at', 'id'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.drop_index('ix_providers_updated_at', table_name='providers', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with _outside_transaction():
+        op.create_index(
+            'ix_providers_updated_at', 'providers', ['updated_at'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.drop_index('ix_providers_updated_at_id', table_name='providers', postgresql_concurrently=True, if_exists=True)
+
+    op.drop_index('ix_provider_tombstones_deleted_at_id', table_name='provider_tombstones')
+    op.drop_table('provider_tombstones')
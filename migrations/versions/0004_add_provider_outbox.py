@@ -0,0 +1,41 @@
+"""Outbox transaccional de eventos de cambio de proveedores
+
+Las escrituras agregan aquí sus eventos en la misma transacción; el relay los
+publica en el broker y los elimina al recibir la confirmación. Solo contiene
+eventos pendientes, así que el índice (created_at, id) recorre la cola en orden.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'provider_outbox',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('event_type', sa.String(64), nullable=False),
+        sa.Column('aggregate_id', sa.String(36), nullable=True),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.Text(), nullable=True)
+    )
+    op.create_index('ix_provider_outbox_created_at_id', 'provider_outbox', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_provider_outbox_created_at_id', table_name='provider_outbox')
+    op.drop_table('provider_outbox')
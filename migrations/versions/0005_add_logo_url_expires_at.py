@@ -0,0 +1,52 @@
+"""Vencimiento de la URL firmada guardada del logo
+
+- logo_url_expires_at: las lecturas sirven logo_url mientras le quede validez suficiente
+- índice sobre logo_url_expires_at: el refresco en segundo plano busca las URLs que vencen pronto
+
+Las filas existentes quedan sin vencimiento: se firman al leerlas hasta que el refresco
+las actualice. En PostgreSQL el índice se crea con CREATE INDEX CONCURRENTLY.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:00
+
+"""
+from contextlib import nullcontext
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _outside_transaction():
+    """CONCURRENTLY no puede ejecutarse dentro de una transacción"""
+    if op.get_context().dialect.name == 'postgresql':
+        return op.get_context().autocommit_block()
+    return nullcontext()
+
+
+def upgrade() -> None:
+    op.add_column('providers', sa.Column('logo_url_expires_at', sa.DateTime(), nullable=True))
+
+    with _outside_transaction():
+        op.create_index(
+            'ix_providers_logo_url_expires_at', 'providers', ['logo_url_expires_at'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with _outside_transaction():
+        op.drop_index(
+            'ix_providers_logo_url_expires_at', table_name='providers', postgresql_concurrently=True, if_exists=True
+        )
+
+    with op.batch_alter_table('providers') as batch_op:
+        batch_op.drop_column('logo_url_expires_at')
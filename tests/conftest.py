@@ -38,3 +38,60 @@ def pytest_configure(config):
     sys.modules['google.cloud.exceptions'] = mock_google_cloud_error
     sys.modules['PIL'] = mock_pil
     sys.modules['PIL.Image'] = mock_image
+
+
+@pytest.fixture
+def fake_storage(tmp_path):
+    """Backend de almacenamiento falso en disco, sin latencia, para pruebas de integración"""
+    from app.storage.fake_storage import FakeStorageBackend
+    return FakeStorageBackend(root=str(tmp_path / 'bucket'))
+
+
+@pytest.fixture(autouse=True)
+def reset_engines():
+    """Descarta los engines compartidos para que cada prueba use sus propios mocks de create_engine"""
+    from app.repositories.provider_repository import _engines
+    _engines.clear()
+    yield
+    _engines.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_storage_breaker():
+    """Cada prueba parte con el circuito del almacenamiento cerrado y sin URLs firmadas recordadas"""
+    from app.utils.circuit_breaker import _breakers
+    from app.services.cloud_storage_service import _signed_urls, _signed_url_expiry
+    _breakers.clear()
+    _signed_urls.clear()
+    _signed_url_expiry.clear()
+    yield
+    _breakers.clear()
+    _signed_urls.clear()
+    _signed_url_expiry.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_response_cache():
+    """Cada prueba parte sin páginas de GET /providers guardadas"""
+    from app.utils.response_cache import close_caches
+    close_caches()
+    yield
+    close_caches()
+
+
+@pytest.fixture(autouse=True)
+def reset_outbox_relay():
+    """Cada prueba parte sin relay del outbox ni publicadores abiertos"""
+    from app.messaging import close_publishers
+    from app.messaging.relay import stop_relay
+    yield
+    stop_relay()
+    close_publishers()
+
+
+@pytest.fixture(autouse=True)
+def reset_logo_url_refresher():
+    """Cada prueba parte sin hilo de refresco de URLs de logo"""
+    from app.services.logo_url_refresher import stop_refresher
+    yield
+    stop_refresher()
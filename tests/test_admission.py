@@ -0,0 +1,200 @@
+import threading
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from flask import Flask, request
+from app.utils.admission import (
+    AdmissionController, RateLimiter, init_admission_control, client_key, request_priority, BULK, INTERACTIVE
+)
+
+
+@pytest.fixture
+def config():
+    return SimpleNamespace(
+        ADMISSION_ENABLED=True,
+        ADMISSION_MAX_CONCURRENT=1,
+        ADMISSION_MAX_QUEUE=2,
+        ADMISSION_BULK_MAX_QUEUE=1,
+        ADMISSION_QUEUE_TIMEOUT_MS=50,
+        ADMISSION_BULK_PER_PAGE=50,
+        ADMISSION_RETRY_AFTER_SECONDS=2,
+        RATE_LIMIT_ENABLED=False,
+        RATE_LIMIT_PER_SECOND=1,
+        RATE_LIMIT_BURST=2,
+        RATE_LIMIT_MAX_CLIENTS=100,
+        RATE_LIMIT_TRUSTED_PROXIES=0
+    )
+
+
+def make_app(config, release=None):
+    app = Flask(__name__)
+    init_admission_control(app, config)
+
+    @app.route('/providers')
+    def providers():
+        if release is not None:
+            release.wait(5)
+        return {'data': []}
+
+    @app.route('/providers/ping')
+    def ping():
+        return 'pong'
+
+    return app
+
+
+class TestAdmissionController:
+    """Pruebas unitarias para el límite de concurrencia con cola por prioridad"""
+
+    def test_admits_up_to_limit_then_queue_full(self):
+        """Prueba que pasado el límite se encola y con la cola llena se rechaza de inmediato"""
+        admission = AdmissionController(max_concurrent=1, max_queue=0, bulk_max_queue=0)
+
+        assert admission.acquire(INTERACTIVE, 1) is None
+        assert admission.acquire(INTERACTIVE, 1) == 'queue_full'
+        admission.release()
+        assert admission.acquire(INTERACTIVE, 1) is None
+
+    def test_queue_timeout(self):
+        """Prueba que una espera que excede el timeout se rechaza y deja la cola vacía"""
+        admission = AdmissionController(max_concurrent=1, max_queue=2, bulk_max_queue=1)
+        admission.acquire(INTERACTIVE, 1)
+
+        assert admission.acquire(INTERACTIVE, 0.01) == 'queue_timeout'
+        assert admission.queued == 0
+
+    def test_bulk_limited_to_queue_share(self):
+        """Prueba que el tráfico masivo no ocupa los lugares de la cola reservados a los interactivos"""
+        admission = AdmissionController(max_concurrent=1, max_queue=2, bulk_max_queue=1)
+        admission.acquire(INTERACTIVE, 1)
+        waiter = threading.Thread(target=admission.acquire, args=(BULK, 1))
+        waiter.start()
+        while admission.queued < 1:
+            pass
+
+        assert admission.acquire(BULK, 0.01) == 'queue_full'
+        assert admission.acquire(INTERACTIVE, 0.01) == 'queue_timeout'
+        admission.release()
+        waiter.join()
+
+    def test_interactive_admitted_before_bulk(self):
+        """Prueba que al liberarse un lugar pasa primero la petición interactiva aunque llegó después"""
+        admission = AdmissionController(max_concurrent=1, max_queue=2, bulk_max_queue=2)
+        admission.acquire(INTERACTIVE, 1)
+        order = []
+
+        def wait(priority):
+            admission.acquire(priority, 5)
+            order.append(priority)
+            admission.release()
+
+        waiters = [threading.Thread(target=wait, args=(BULK,)), threading.Thread(target=wait, args=(INTERACTIVE,))]
+        for count, waiter in enumerate(waiters, start=1):
+            waiter.start()
+            while admission.queued < count:
+                pass
+        admission.release()
+        for waiter in waiters:
+            waiter.join()
+
+        assert order == [INTERACTIVE, BULK]
+
+
+class TestRateLimiter:
+    """Pruebas unitarias para el token bucket por cliente"""
+
+    def test_burst_then_refill(self):
+        """Prueba que se permite la ráfaga y luego un token por cada 1/rate segundos"""
+        limiter = RateLimiter(rate=2, burst=2, max_clients=10)
+
+        with patch('app.utils.admission.time.monotonic', return_value=100.0):
+            assert limiter.acquire('a') == 0
+            assert limiter.acquire('a') == 0
+            assert limiter.acquire('a') == pytest.approx(0.5)
+            assert limiter.acquire('b') == 0
+        with patch('app.utils.admission.time.monotonic', return_value=100.5):
+            assert limiter.acquire('a') == 0
+
+    def test_forgets_least_recent_clients(self):
+        """Prueba que solo se recuerdan max_clients clientes"""
+        limiter = RateLimiter(rate=1, burst=1, max_clients=2)
+        for key in ('a', 'b', 'c'):
+            limiter.acquire(key)
+
+        assert list(limiter._buckets) == ['b', 'c']
+
+
+class TestAdmissionMiddleware:
+    """Pruebas del control de admisión y la limitación de tasa en la aplicación"""
+
+    def test_priority_and_client_key(self, config):
+        """Prueba la clasificación por prioridad y la identidad del cliente"""
+        app = make_app(config)
+        cases = [
+            ('/providers?per_page=100', {}, BULK),
+            ('/providers?per_page=10', {}, INTERACTIVE),
+            ('/providers/123', {}, INTERACTIVE),
+            ('/providers/changes?limit=10', {}, BULK)
+        ]
+        for path, headers, priority in cases:
+            with app.test_request_context(path, headers=headers):
+                assert request_priority(request, config) == priority
+        with app.test_request_context('/providers', method='DELETE'):
+            assert request_priority(request, config) == INTERACTIVE
+        with app.test_request_context('/providers/all', method='DELETE'):
+            assert request_priority(request, config) == BULK
+
+        with app.test_request_context('/providers', environ_base={'REMOTE_ADDR': '10.0.0.1'},
+                                      headers={'X-Forwarded-For': '1.2.3.4, 10.0.0.9'}):
+            assert client_key(request, config) == 'ip:10.0.0.1'
+            config.RATE_LIMIT_TRUSTED_PROXIES = 1
+            assert client_key(request, config) == 'ip:10.0.0.9'
+        with app.test_request_context('/providers', headers={'X-API-Key': 'clave'}):
+            assert client_key(request, config).startswith('key:')
+            assert 'clave' not in client_key(request, config)
+
+    def test_overloaded_returns_503_with_retry_after(self, config):
+        """Prueba que con el worker ocupado y la cola llena se responde 503 con Retry-After sin esperar"""
+        config.ADMISSION_MAX_QUEUE = 0
+        release = threading.Event()
+        app = make_app(config, release)
+        admission = app.extensions['admission']
+        busy = threading.Thread(target=app.test_client().get, args=('/providers',))
+        busy.start()
+        while admission._active < 1:
+            pass
+
+        with patch('app.utils.admission.metrics.record_request_shed') as mock_record:
+            response = app.test_client().get('/providers')
+            ping = app.test_client().get('/providers/ping')
+        release.set()
+        busy.join()
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '2'
+        mock_record.assert_called_once_with('queue_full', INTERACTIVE)
+        assert ping.status_code == 200
+        assert admission._active == 0
+        assert app.test_client().get('/providers').status_code == 200
+
+    def test_rate_limited_returns_429(self, config):
+        """Prueba que un cliente que excede su tasa recibe 429 y los demás no se ven afectados"""
+        config.ADMISSION_ENABLED = False
+        config.RATE_LIMIT_ENABLED = True
+        client = make_app(config).test_client()
+
+        statuses = [client.get('/providers', headers={'X-API-Key': 'a'}).status_code for _ in range(3)]
+        limited = client.get('/providers', headers={'X-API-Key': 'a'})
+
+        assert statuses == [200, 200, 429]
+        assert int(limited.headers['Retry-After']) >= 1
+        assert client.get('/providers', headers={'X-API-Key': 'b'}).status_code == 200
+        assert client.get('/providers/ping', headers={'X-API-Key': 'a'}).status_code == 200
+
+    def test_disabled_registers_nothing(self, config):
+        """Prueba que sin ADMISSION_ENABLED ni RATE_LIMIT_ENABLED no se registran hooks"""
+        config.ADMISSION_ENABLED = False
+        app = make_app(config)
+
+        assert 'admission' not in app.extensions
+        assert app.before_request_funcs == {}
@@ -0,0 +1,87 @@
+import pytest
+from unittest.mock import patch
+from app.models.provider_model import Provider
+from app.repositories.provider_repository import ProviderRepository
+from app.repositories.migrations import upgrade_database
+from benchmarks.stats import percentile, summarize
+from benchmarks.seed import ProviderSeeder
+from benchmarks.compare import compare
+from benchmarks.importtime import parse_importtime, measure_startup, build_report
+
+
+class TestBenchmarks:
+    """Pruebas unitarias para las utilidades de benchmarks"""
+    
+    def test_percentile_interpolates(self):
+        """Prueba el cálculo de percentiles con interpolación lineal"""
+        values = [0.01 * i for i in range(1, 101)]
+        
+        assert percentile(values, 50) == pytest.approx(0.505)
+        assert percentile(values, 99) == pytest.approx(0.9901)
+        assert percentile([], 95) == 0.0
+        assert percentile([0.2], 95) == 0.2
+    
+    def test_summarize_reports_ms_and_throughput(self):
+        """Prueba el resumen de un escenario"""
+        result = summarize([0.1, 0.2, 0.3], errors=1, wall_seconds=2.0)
+        
+        assert result['requests'] == 4
+        assert result['errors'] == 1
+        assert result['p50_ms'] == 200.0
+        assert result['max_ms'] == 300.0
+        assert result['req_per_s'] == 2.0
+    
+    def test_seeder_is_reproducible_and_valid(self):
+        """Prueba que la misma semilla genera los mismos datos y que pasan las validaciones"""
+        first, second = ProviderSeeder(7).provider_data(), ProviderSeeder(7).provider_data()
+        
+        assert first['name'] == second['name']
+        assert first['phone'] == second['phone']
+        Provider(**first).validate()
+    
+    def test_seed_inserts_providers_and_logos(self, tmp_path):
+        """Prueba la siembra en bloque con logos en el almacenamiento falso"""
+        with patch('app.repositories.provider_repository.Config.SQLALCHEMY_DATABASE_URI', 'sqlite://'):
+            repository = ProviderRepository()
+        upgrade_database(repository.engine)
+        
+        ids = ProviderSeeder(1).seed(repository, 10, str(tmp_path), 'providers', logo_ratio=0.5, batch_size=4)
+        
+        assert len(ids) == 10
+        assert repository.count_all() == 10
+        assert len(list((tmp_path / 'providers').glob('*.png'))) == 5
+    
+    def test_compare_reports_relative_change(self):
+        """Prueba la comparación de dos reportes"""
+        base = {'scenarios': {'get_by_id': {'p50_ms': 10, 'p95_ms': 20, 'p99_ms': 30, 'req_per_s': 100}}}
+        candidate = {'scenarios': {'get_by_id': {'p50_ms': 5, 'p95_ms': 20, 'p99_ms': 33, 'req_per_s': 0}}}
+        
+        row = compare(base, candidate)[0]
+        
+        assert row['p50_ms']['change_pct'] == -50.0
+        assert row['p99_ms']['change_pct'] == 10.0
+        assert row['req_per_s']['change_pct'] == -100.0
+    
+    def test_parse_importtime(self):
+        """Prueba la lectura de la salida de python -X importtime"""
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     _json\n"
+            "import time:       450 |        570 |   json\n"
+            "import time:      1000 |       1570 | app\n"
+        )
+        
+        modules = parse_importtime(stderr)
+        
+        assert [module['module'] for module in modules] == ['_json', 'json', 'app']
+        assert modules[2] == {'module': 'app', 'self_us': 1000, 'cumulative_us': 1570, 'depth': 0}
+        assert modules[0]['depth'] == 2
+    
+    def test_startup_defers_heavy_dependencies(self):
+        """Prueba que create_app() no importa SQLAlchemy, Pillow ni los clientes de Google"""
+        run = measure_startup()
+        report = build_report([run], top=5)
+        
+        assert report['heavy_modules_at_startup'] == []
+        assert report['scenarios']['imports']['requests'] == 1
+        assert len(report['top_modules']) == 5
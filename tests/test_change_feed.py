@@ -0,0 +1,192 @@
+import base64
+import json
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+from flask import Flask
+from flask_restful import Api
+from sqlalchemy import text
+from app.config.settings import Config
+from app.controllers.provider_controller import ProviderChangesController
+from app.repositories.migrations import upgrade_database
+from app.repositories.provider_repository import ProviderRepository, ProviderTombstoneDB
+from app.services.cloud_storage_service import CloudStorageService
+from app.services.provider_service import ProviderService
+from app.utils.change_cursor import encode_cursor, parse_since
+
+
+@pytest.fixture
+def repository():
+    with patch('app.repositories.provider_repository.Config.SQLALCHEMY_DATABASE_URI', 'sqlite://'):
+        repository = ProviderRepository()
+    upgrade_database(repository.engine)
+    return repository
+
+
+@pytest.fixture
+def providers(repository):
+    return [
+        repository.create(name=f'Farmacia {name}', email=f'{name.lower()}@farmacia.com', phone=f'300123456{i}')
+        for i, name in enumerate(('Uno', 'Dos', 'Tres'))
+    ]
+
+
+@pytest.fixture
+def service(repository):
+    backend = MagicMock()
+    backend.exists.return_value = True
+    backend.sign.return_value = 'https://firmada/logo.png'
+    with patch.object(Config, 'CHANGES_FEED_SETTLE_SECONDS', 0):
+        yield ProviderService(
+            provider_repository=repository,
+            cloud_storage_service=CloudStorageService(Config(), storage_backend=backend)
+        )
+
+
+def sync(service, since=None, limit=100):
+    """Recorre el feed hasta el final y retorna (cambios, posición final)"""
+    changes, after = [], parse_since(since)
+    while True:
+        page = service.get_changes(after, limit, fields=('id', 'name'))
+        changes += page['changes']
+        after = parse_since(page['next_since'])
+        if not page['has_more']:
+            return changes, page['next_since']
+
+
+class TestChangeCursor:
+    """Pruebas unitarias para las posiciones del feed"""
+
+    def test_token_round_trip(self):
+        """Prueba que el token se decodifica a la misma posición"""
+        position = (datetime(2026, 10, 19, 12, 30, 0, 123456), 'p-1')
+
+        assert parse_since(encode_cursor(position)) == position
+
+    def test_timestamp_with_zone(self):
+        """Prueba que una fecha con zona horaria se lleva a UTC e incluye esa fecha"""
+        assert parse_since('2026-10-19T14:00:00+02:00') == (datetime(2026, 10, 19, 12, 0), '')
+        assert parse_since('2026-10-19T12:00:00Z') == (datetime(2026, 10, 19, 12, 0), '')
+
+    def test_token_with_zone(self):
+        """Prueba que un token con zona horaria se lleva a UTC sin zona, como las fechas guardadas"""
+        raw = json.dumps(['2026-01-01T02:00:00+02:00', 'x']).encode()
+        token = base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+        assert parse_since(token) == (datetime(2026, 1, 1, 0, 0), 'x')
+
+    @pytest.mark.parametrize('value', ['ayer', 'Zm9v', 'WzFd'])
+    def test_invalid(self, value):
+        """Prueba que un valor que no es token ni fecha se rechaza"""
+        with pytest.raises(ValueError, match='since'):
+            parse_since(value)
+
+
+class TestChangeFeed:
+    """Pruebas del feed de cambios contra SQLite"""
+
+    def test_keyset_pages_in_order(self, service, providers):
+        """Prueba que las páginas encadenadas entregan cada alta una vez en orden (updated_at, id)"""
+        changes, _ = sync(service, limit=2)
+
+        expected = sorted(providers, key=lambda provider: (provider.updated_at, provider.id))
+        assert [change['id'] for change in changes] == [provider.id for provider in expected]
+        assert {change['op'] for change in changes} == {'upsert'}
+        assert changes[0]['provider'] == {'id': expected[0].id, 'name': expected[0].name}
+
+    def test_only_deltas_after_cursor(self, service, repository, providers):
+        """Prueba que tras sincronizar solo se transfieren los cambios nuevos, incluidas las eliminaciones"""
+        _, since = sync(service)
+
+        repository.delete_by_id(providers[0].id)
+        created = repository.create(name='Farmacia Cuatro', email='cuatro@farmacia.com', phone='3001234569')
+        changes, _ = sync(service, since)
+
+        assert [(change['id'], change['op']) for change in changes] == [
+            (providers[0].id, 'delete'), (created.id, 'upsert')
+        ]
+        assert changes[0]['provider'] is None
+
+    def test_delete_all_leaves_tombstones(self, service, repository, providers):
+        """Prueba que DELETE /providers/all deja una lápida por proveedor"""
+        _, since = sync(service)
+
+        repository.delete_all_returning_logos()
+        changes, _ = sync(service, since)
+
+        assert sorted(change['id'] for change in changes) == sorted(provider.id for provider in providers)
+        assert {change['op'] for change in changes} == {'delete'}
+
+    def test_settle_window_defers_recent_changes(self, service, providers):
+        """Prueba que los cambios más recientes que el margen se entregan en una consulta posterior"""
+        with patch.object(Config, 'CHANGES_FEED_SETTLE_SECONDS', 3600):
+            page = service.get_changes(None, 100)
+
+        assert page['changes'] == []
+        assert len(sync(service, page['next_since'])[0]) == 3
+
+    def test_old_tombstones_purged(self, service, repository, providers):
+        """Prueba que cada eliminación descarta las lápidas fuera de la retención"""
+        session = repository.SessionLocal()
+        session.add(ProviderTombstoneDB(id='antigua', deleted_at=datetime.utcnow() - timedelta(days=31)))
+        session.commit()
+        session.close()
+
+        repository.delete_by_id(providers[0].id)
+
+        with repository.engine.connect() as connection:
+            ids = connection.execute(text("SELECT id FROM provider_tombstones")).scalars().all()
+        assert ids == [providers[0].id]
+
+    def test_query_uses_keyset_index(self, repository):
+        """Prueba que el recorrido de proveedores usa el índice (updated_at, id)"""
+        with repository.engine.connect() as connection:
+            plan = connection.execute(text(
+                "EXPLAIN QUERY PLAN SELECT id FROM providers WHERE (updated_at, id) > ('2026-01-01', '') "
+                "AND updated_at < '2027-01-01' ORDER BY updated_at, id LIMIT 10"
+            )).all()
+
+        assert 'ix_providers_updated_at_id' in ' '.join(str(row) for row in plan)
+
+
+class TestChangeFeedEndpoint:
+    """Pruebas de GET /providers/changes"""
+
+    @pytest.fixture
+    def client(self, service):
+        app = Flask(__name__)
+        Api(app).add_resource(
+            ProviderChangesController, '/providers/changes', resource_class_kwargs={'provider_service': service}
+        )
+        return app.test_client()
+
+    def test_changes_since_timestamp(self, client, providers):
+        """Prueba la consulta por fecha y el token de continuación"""
+        since = (min(provider.updated_at for provider in providers) - timedelta(seconds=1)).isoformat()
+
+        data = client.get(f'/providers/changes?since={since}&limit=2&fields=id').get_json()['data']
+        rest = client.get(f"/providers/changes?since={data['next_since']}").get_json()['data']
+
+        assert (len(data['changes']), data['has_more']) == (2, True)
+        assert (len(rest['changes']), rest['has_more']) == (1, False)
+
+    @pytest.mark.parametrize('query', ['since=ayer', 'limit=0', 'limit=100000', 'fields=password'])
+    def test_invalid_parameters(self, client, query):
+        """Prueba que los parámetros inválidos responden 400"""
+        assert client.get(f'/providers/changes?{query}').status_code == 400
+
+    def test_token_with_zone(self, client, providers):
+        """Prueba que un token con zona horaria se compara con las fechas guardadas sin fallar"""
+        raw = json.dumps([(datetime.utcnow() - timedelta(hours=1)).isoformat() + '+00:00', 'x']).encode()
+        token = base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+        response = client.get(f'/providers/changes?since={token}')
+
+        assert response.status_code == 200
+        assert len(response.get_json()['data']['changes']) == 3
+
+    def test_cursor_older_than_retention(self, client):
+        """Prueba que una posición anterior a la retención de lápidas responde 410"""
+        since = (datetime.utcnow() - timedelta(days=Config.CHANGES_TOMBSTONE_RETENTION_DAYS + 1)).isoformat()
+
+        assert client.get(f'/providers/changes?since={since}').status_code == 410
@@ -0,0 +1,147 @@
+import pytest
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+from app.config.settings import Config
+from app.exceptions.custom_exceptions import CircuitOpenError, StorageError
+from app.services.cloud_storage_service import CloudStorageService
+from app.utils.circuit_breaker import CircuitBreaker, get_storage_breaker
+
+
+def failing():
+    raise StorageError("timeout")
+
+
+class TestCircuitBreaker:
+    """Pruebas unitarias para CircuitBreaker"""
+
+    @pytest.fixture
+    def breaker(self):
+        return CircuitBreaker('prueba', window_size=4, min_calls=4, failure_rate=0.5,
+                              slow_call_seconds=1.0, slow_call_rate=0.75, open_seconds=30, half_open_calls=2)
+
+    def test_opens_on_failure_rate(self, breaker):
+        """Prueba que se abre cuando la proporción de fallos alcanza el umbral"""
+        breaker.call(lambda: 'ok')
+        breaker.call(lambda: 'ok')
+        for _ in range(2):
+            with pytest.raises(StorageError):
+                breaker.call(failing)
+
+        assert breaker.state == 'open'
+        function = MagicMock()
+        with pytest.raises(CircuitOpenError):
+            breaker.call(function)
+        function.assert_not_called()
+
+    def test_needs_min_calls(self, breaker):
+        """Prueba que no se abre con menos de min_calls llamadas"""
+        for _ in range(3):
+            with pytest.raises(StorageError):
+                breaker.call(failing)
+
+        assert breaker.state == 'closed'
+
+    def test_opens_on_slow_calls(self, breaker):
+        """Prueba que las llamadas lentas también abren el circuito"""
+        for duration in (2.0, 2.0, 0.1, 3.0):
+            breaker.allow()
+            breaker.record(duration, failed=False)
+
+        assert breaker.state == 'open'
+        assert breaker.allow() is False
+
+    def test_half_open_closes_after_successful_probes(self, breaker):
+        """Prueba que tras open_seconds deja pasar llamadas de prueba y se cierra si funcionan"""
+        with patch('app.utils.circuit_breaker.time.monotonic', return_value=100.0):
+            for _ in range(4):
+                breaker.allow()
+                breaker.record(0.1, failed=True)
+
+        with patch('app.utils.circuit_breaker.time.monotonic', return_value=131.0):
+            assert breaker.state == 'half_open'
+            assert breaker.allow() is True
+            assert breaker.allow() is True
+            assert breaker.allow() is False
+            breaker.record(0.1, failed=False)
+            breaker.record(0.1, failed=False)
+
+            assert breaker.state == 'closed'
+
+    def test_half_open_reopens_on_failure(self, breaker):
+        """Prueba que un fallo de la llamada de prueba vuelve a abrir el circuito"""
+        with patch('app.utils.circuit_breaker.time.monotonic', return_value=100.0):
+            for _ in range(4):
+                breaker.allow()
+                breaker.record(0.1, failed=True)
+
+        with patch('app.utils.circuit_breaker.time.monotonic', return_value=131.0):
+            breaker.allow()
+            breaker.record(0.1, failed=True)
+
+            assert breaker.state == 'open'
+            assert breaker.snapshot()['calls'] == 0
+
+    def test_storage_breaker_shared_and_optional(self):
+        """Prueba que el circuito del almacenamiento es único por proceso y se puede deshabilitar"""
+        assert get_storage_breaker(Config) is get_storage_breaker(Config)
+        with patch.object(Config, 'STORAGE_BREAKER_ENABLED', False):
+            assert get_storage_breaker(Config) is None
+
+
+class TestStorageCircuitBreaker:
+    """Pruebas del circuit breaker en CloudStorageService"""
+
+    @pytest.fixture
+    def backend(self):
+        backend = MagicMock()
+        backend.exists.return_value = True
+        backend.sign.return_value = 'https://firmada/logo.png'
+        backend.public_url.return_value = 'https://publica/logo.png'
+        return backend
+
+    @pytest.fixture
+    def service(self, backend):
+        with patch.object(Config, 'STORAGE_BREAKER_MIN_CALLS', 4), patch.object(Config, 'STORAGE_BREAKER_WINDOW', 4):
+            yield CloudStorageService(Config(), storage_backend=backend)
+
+    def test_open_circuit_serves_last_known_url(self, service, backend):
+        """Prueba que con el circuito abierto se sirve la última URL firmada sin llamar al backend"""
+        assert service.get_image_url('logo.png') == 'https://firmada/logo.png'
+
+        backend.exists.side_effect = StorageError("timeout")
+        for _ in range(4):
+            assert service.get_image_url('logo.png') == 'https://firmada/logo.png'
+        assert service.breaker.state == 'open'
+
+        backend.exists.reset_mock()
+        assert service.get_image_url('logo.png') == 'https://firmada/logo.png'
+        assert service.get_image_url('otro.png') == 'https://publica/logo.png'
+        backend.exists.assert_not_called()
+
+    def test_expired_last_known_url_not_served(self, service, backend):
+        """Prueba que una URL recordada ya vencida no se usa como alternativa"""
+        service.get_image_url('logo.png', expiration_hours=0)
+        backend.exists.side_effect = StorageError("timeout")
+
+        assert service.get_image_url('logo.png') == 'https://publica/logo.png'
+
+    def test_open_circuit_fails_uploads_fast(self, service, backend):
+        """Prueba que las operaciones sin alternativa fallan de inmediato con el circuito abierto"""
+        for _ in range(4):
+            service.breaker.allow()
+            service.breaker.record(0.1, failed=True)
+
+        with pytest.raises(StorageError):
+            service.generate_upload_url('logo.png', 'image/png')
+        assert service.delete_image('logo.png')[0] is False
+        backend.sign.assert_not_called()
+        backend.delete.assert_not_called()
+
+    def test_signed_url_cache_is_bounded(self, service, backend):
+        """Prueba que solo se recuerdan SIGNED_URL_CACHE_SIZE objetos"""
+        with patch.object(Config, 'SIGNED_URL_CACHE_SIZE', 2):
+            for name in ('a.png', 'b.png', 'c.png'):
+                service._remember_signed_url(name, f'https://firmada/{name}', timedelta(hours=1))
+
+        from app.services.cloud_storage_service import _signed_urls
+        assert list(_signed_urls) == ['b.png', 'c.png']
@@ -4,8 +4,12 @@ Pruebas para el servicio de almacenamiento en la nube
 import pytest
 from unittest.mock import MagicMock, patch, Mock
 from werkzeug.datastructures import FileStorage
+import io
 from app.services.cloud_storage_service import CloudStorageService
+from app.storage.gcs_storage import GCSStorageBackend
+from app.storage.fake_storage import FakeStorageBackend
 from app.config.settings import Config
+from app.exceptions.custom_exceptions import PartialDeleteError
 
 
 class TestCloudStorageService:
@@ -22,12 +26,22 @@ class TestCloudStorageService:
         config.ALLOWED_EXTENSIONS = ["jpg", "jpeg", "png", "gif"]
         config.MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5MB
         config.SIGNING_SERVICE_ACCOUNT_EMAIL = "test-signing@test-project.iam.gserviceaccount.com"
+        config.UPLOAD_CHUNK_SIZE = 4
+        config.RESUMABLE_UPLOAD_THRESHOLD = 1024 * 1024
+        config.UPLOAD_MAX_RETRIES = 2
+        config.UPLOAD_RETRY_BACKOFF = 0.0
+        config.UPLOAD_RETRY_MAX_BACKOFF = 0.0
+        config.UPLOAD_CHUNK_TIMEOUT = 5
+        config.SIGNED_UPLOAD_URL_EXPIRATION_MINUTES = 15
+        config.STORAGE_DELETE_BATCH_SIZE = 2
+        config.STORAGE_BREAKER_ENABLED = False
+        config.SIGNED_URL_CACHE_SIZE = 100
         return config
 
     @pytest.fixture
     def cloud_service(self, mock_config):
         """Servicio de cloud storage con mocks"""
-        with patch('app.services.cloud_storage_service.storage') as mock_storage:
+        with patch('app.storage.gcs_storage.storage') as mock_storage:
             # Mock del cliente y bucket
             mock_client = MagicMock()
             mock_bucket = MagicMock()
@@ -37,9 +51,10 @@ class TestCloudStorageService:
             mock_client.bucket.return_value = mock_bucket
             mock_bucket.blob.return_value = mock_blob
             
-            service = CloudStorageService(mock_config)
-            service._client = mock_client
-            service._bucket = mock_bucket
+            backend = GCSStorageBackend(mock_config)
+            backend._client = mock_client
+            backend._bucket = mock_bucket
+            service = CloudStorageService(mock_config, storage_backend=backend)
             
             return service, mock_blob
 
@@ -100,9 +115,8 @@ class TestCloudStorageService:
         
         result = service.get_image_url("test-image.jpg")
 
-        expected_url = "https://storage.googleapis.com/test-bucket/test-folder/test-image.jpg"
-        assert result == expected_url
-        # No verificar exists porque se ejecuta dentro del try-catch
+        assert result == ""
+        mock_blob.exists.assert_called_once()
 
 
     def test_upload_image_google_cloud_error(self, cloud_service):
@@ -116,7 +130,7 @@ class TestCloudStorageService:
         mock_file.tell = MagicMock(return_value=1024)  # 1KB
         
         # Mock PIL Image
-        with patch('app.services.cloud_storage_service.Image') as mock_image:
+        with patch('PIL.Image') as mock_image:
             mock_image.open.return_value.verify.return_value = None
             
             # Configurar mock para que lance GoogleCloudError
@@ -180,6 +194,36 @@ class TestCloudStorageService:
         assert "Imagen eliminada exitosamente" in message
         mock_blob.delete.assert_called_once()
 
+    def test_delete_images_in_batches(self, cloud_service):
+        """Prueba delete_images en lotes de STORAGE_DELETE_BATCH_SIZE con progreso"""
+        service, _ = cloud_service
+        progress = []
+        service.backend.client.batch.return_value.__enter__.side_effect = [
+            MagicMock(_responses=[MagicMock(status_code=204)] * count) for count in (2, 1)
+        ]
+        
+        deleted = service.delete_images(["a.jpg", "b.jpg", "c.jpg"], progress=lambda *args: progress.append(args))
+        
+        assert deleted == 3
+        assert progress == [(2, 2), (1, 1)]
+        assert service.backend.client.batch.call_count == 2
+        service.backend.bucket.delete_blob.assert_any_call("test-folder/c.jpg")
+
+    def test_delete_images_reports_failures_after_all_batches(self, cloud_service):
+        """Prueba que un lote con fallos no detiene los siguientes y la limpieza termina con error"""
+        service, _ = cloud_service
+        progress = []
+        service.backend.client.batch.return_value.__enter__.side_effect = [
+            MagicMock(_responses=[MagicMock(status_code=204), MagicMock(status_code=500)]),
+            MagicMock(_responses=[MagicMock(status_code=204)])
+        ]
+        
+        with pytest.raises(PartialDeleteError) as error:
+            service.delete_images(["a.jpg", "b.jpg", "c.jpg"], progress=lambda *args: progress.append(args))
+        
+        assert progress == [(2, 1), (1, 1)]
+        assert (error.value.deleted, error.value.failed) == (2, ["test-folder/b.jpg"])
+    
     def test_get_image_url_with_impersonated_credentials(self, cloud_service):
         """Prueba get_image_url con impersonated credentials - simplificada"""
         service, mock_blob = cloud_service
@@ -213,7 +257,7 @@ class TestCloudStorageService:
         mock_file.seek = MagicMock()
         mock_file.tell = MagicMock(return_value=1024)  # 1KB
 
-        with patch('app.services.cloud_storage_service.Image') as mock_image, \
+        with patch('PIL.Image') as mock_image, \
              patch.object(service, 'get_image_url') as mock_get_url:
             
             mock_image.open.return_value.verify.return_value = None
@@ -226,3 +270,140 @@ class TestCloudStorageService:
             assert url == "https://signed-url.com/test.jpg"
             mock_blob.upload_from_file.assert_called_once()
             mock_get_url.assert_called_once_with("test.jpg")
+
+    def test_upload_image_uses_resumable_upload_above_threshold(self, cloud_service, mock_config):
+        """Prueba que upload_image usa subida reanudable para archivos grandes"""
+        service, mock_blob = cloud_service
+        mock_config.RESUMABLE_UPLOAD_THRESHOLD = 8
+
+        file_storage = FileStorage(stream=io.BytesIO(b"0123456789"), filename="test.png")
+
+        with patch('PIL.Image'), \
+             patch.object(service.backend, '_upload_resumable') as mock_resumable, \
+             patch.object(service, 'get_image_url', return_value="https://signed-url.com/test.png"):
+            success, _, _ = service.upload_image(file_storage, "test.png")
+
+        assert success
+        mock_resumable.assert_called_once_with(mock_blob, file_storage, 'image/png', 10)
+        mock_blob.upload_from_file.assert_not_called()
+
+    def test_generate_upload_url(self, cloud_service):
+        """Prueba la generación de URL firmada de subida directa"""
+        service, mock_blob = cloud_service
+        mock_blob.generate_signed_url.return_value = "https://storage.googleapis.com/upload?sig=1"
+
+        with patch.object(service.backend, '_get_signing_credentials') as mock_credentials:
+            result = service.generate_upload_url("logo_1.png", "image/png")
+
+        assert result['upload_url'] == "https://storage.googleapis.com/upload?sig=1"
+        assert result['method'] == 'PUT'
+        # El tamaño máximo queda firmado: el cliente debe enviar el mismo header
+        size_range = {'x-goog-content-length-range': f'0,{service.config.MAX_CONTENT_LENGTH}'}
+        assert result['headers'] == {'Content-Type': 'image/png', **size_range}
+        assert 'expires_at' in result
+        kwargs = mock_blob.generate_signed_url.call_args.kwargs
+        assert kwargs['method'] == 'PUT'
+        assert kwargs['content_type'] == 'image/png'
+        assert kwargs['headers'] == size_range
+        assert kwargs['credentials'] == mock_credentials.return_value
+
+    def test_generate_upload_url_error(self, cloud_service):
+        """Prueba la generación de URL de subida con error de credenciales"""
+        service, _ = cloud_service
+
+        with patch.object(service.backend, '_get_signing_credentials', side_effect=Exception("Credentials error")):
+            with pytest.raises(Exception, match="Error al generar URL de subida"):
+                service.generate_upload_url("logo_1.png", "image/png")
+
+    def test_confirm_upload_success(self, cloud_service):
+        """Prueba la confirmación de una subida directa válida"""
+        service, _ = cloud_service
+        uploaded_blob = MagicMock(content_type='image/png', size=1024)
+        uploaded_blob.download_as_bytes.return_value = b'png-bytes'
+        service.backend.bucket.get_blob.return_value = uploaded_blob
+
+        with patch.object(service, 'get_image_url', return_value="https://signed-url.com/logo.png"):
+            success, message, url = service.confirm_upload("logo_1.png")
+
+        assert success
+        assert url == "https://signed-url.com/logo.png"
+        service.backend.bucket.get_blob.assert_called_with("test-folder/logo_1.png")
+        uploaded_blob.download_as_bytes.assert_called_once()
+        uploaded_blob.delete.assert_not_called()
+
+    def test_confirm_upload_missing_blob(self, cloud_service):
+        """Prueba la confirmación cuando el cliente no subió el archivo"""
+        service, _ = cloud_service
+        service.backend.bucket.get_blob.return_value = None
+
+        success, message, url = service.confirm_upload("logo_1.png")
+
+        assert not success
+        assert "no ha sido subida" in message
+        assert url is None
+
+    def test_confirm_upload_rejects_invalid_content(self, cloud_service):
+        """Prueba que la confirmación elimina archivos que no son imágenes o exceden el tamaño"""
+        service, mock_blob = cloud_service
+        mock_blob.exists.return_value = True
+        not_image = MagicMock(content_type='application/pdf', size=1024)
+        too_big = MagicMock(content_type='image/png', size=10 * 1024 * 1024)
+
+        service.backend.bucket.get_blob.return_value = not_image
+        success, message, _ = service.confirm_upload("logo_1.png")
+        assert not success
+        assert mock_blob.delete.call_count == 1
+
+        service.backend.bucket.get_blob.return_value = too_big
+        with patch.object(service, '_call', wraps=service._call) as call:
+            success, message, _ = service.confirm_upload("logo_1.png")
+        assert not success
+        assert "demasiado grande" in message
+        assert mock_blob.delete.call_count == 2
+        # La eliminación pasa por el span y el circuit breaker del almacenamiento
+        call.assert_any_call('storage.delete', service.backend.delete, "test-folder/logo_1.png")
+
+    def test_confirm_upload_verifies_content(self, cloud_service):
+        """Prueba que la confirmación verifica los bytes subidos y elimina lo que no es una imagen"""
+        service, mock_blob = cloud_service
+        uploaded_blob = MagicMock(content_type='image/png', size=1024)
+        uploaded_blob.download_as_bytes.return_value = b'%PDF-1.4'
+        service.backend.bucket.get_blob.return_value = uploaded_blob
+
+        with patch('PIL.Image') as mock_image:
+            mock_image.open.side_effect = OSError("cannot identify image file")
+            success, message, url = service.confirm_upload("logo_1.png")
+
+        assert not success
+        assert message == "El archivo subido no es una imagen válida"
+        assert url is None
+        assert mock_image.open.call_args.args[0].getvalue() == b'%PDF-1.4'
+        mock_blob.delete.assert_called_once()
+
+    def test_service_with_fake_storage_backend(self, mock_config, fake_storage):
+        """Prueba el ciclo subir/firmar/eliminar contra el backend falso en disco"""
+        service = CloudStorageService(mock_config, storage_backend=fake_storage)
+        file_storage = FileStorage(stream=io.BytesIO(b"fake-png-bytes"), filename="logo.png")
+
+        with patch('PIL.Image'):
+            success, _, url = service.upload_image(file_storage, "logo_1.png")
+
+        assert success
+        assert url.startswith("http://fake-storage.local/test-folder/logo_1.png?")
+        assert fake_storage.get("test-folder/logo_1.png") == b"fake-png-bytes"
+        assert service.confirm_upload("logo_1.png")[0]
+        assert service.delete_image("logo_1.png") == (True, "Imagen eliminada exitosamente")
+        assert service.get_image_url("logo_1.png") == ""
+
+    def test_backend_created_from_config(self, mock_config, tmp_path):
+        """Prueba que el backend se crea según STORAGE_BACKEND al primer uso"""
+        mock_config.STORAGE_BACKEND = 'fake'
+        mock_config.FAKE_STORAGE_ROOT = str(tmp_path)
+        mock_config.STORAGE_LATENCY_MS = 0
+        mock_config.STORAGE_LATENCY_JITTER_MS = 0
+
+        service = CloudStorageService(mock_config)
+
+        assert isinstance(service.backend, FakeStorageBackend)
+        assert service.backend is service.backend
+
@@ -64,7 +64,7 @@ class TestCloudStorageSimpleCoverage:
             file_storage.seek.return_value = None
             file_storage.tell.return_value = 1024
             
-            with patch('app.services.cloud_storage_service.Image') as mock_image:
+            with patch('PIL.Image') as mock_image:
                 mock_image.open.side_effect = Exception("Invalid image")
                 
                 is_valid, message = service.validate_image_file(file_storage)
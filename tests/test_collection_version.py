@@ -0,0 +1,43 @@
+from app.utils.collection_version import CollectionVersion
+
+
+class TestCollectionVersion:
+    """Pruebas unitarias para CollectionVersion"""
+    
+    def test_bump_increments_and_notifies(self):
+        """Prueba que bump incrementa la versión y notifica a los suscriptores"""
+        version = CollectionVersion('providers')
+        events = []
+        version.subscribe(lambda event, value: events.append((event, value)))
+        
+        assert version.bump('create') == 1
+        assert version.bump('delete') == 2
+        assert version.value == 2
+        assert events == [('create', 1), ('delete', 2)]
+    
+    def test_failing_listener_does_not_break_bump(self):
+        """Prueba que un suscriptor con error no impide notificar a los demás"""
+        version = CollectionVersion('providers')
+        events = []
+        
+        def failing(event, value):
+            raise RuntimeError("cache caída")
+        
+        version.subscribe(failing)
+        version.subscribe(lambda event, value: events.append(event))
+        
+        version.bump('delete_all')
+        
+        assert events == ['delete_all']
+    
+    def test_unsubscribe(self):
+        """Prueba que un suscriptor eliminado deja de recibir eventos"""
+        version = CollectionVersion('providers')
+        events = []
+        listener = lambda event, value: events.append(event)
+        version.subscribe(listener)
+        version.unsubscribe(listener)
+        
+        version.bump('create')
+        
+        assert events == []
@@ -0,0 +1,79 @@
+"""
+Pruebas para el backend de almacenamiento falso en disco
+"""
+import io
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+from app.storage import create_storage_backend
+from app.storage.fake_storage import FakeStorageBackend
+from app.exceptions.custom_exceptions import StorageError
+
+
+class TestFakeStorageBackend:
+    """Pruebas para FakeStorageBackend"""
+
+    def test_put_get_stat_delete(self, fake_storage):
+        """Prueba el ciclo de vida completo de un objeto"""
+        fake_storage.put("providers/logo.png", io.BytesIO(b"png"), "image/png", {'folder': 'providers'})
+
+        assert fake_storage.exists("providers/logo.png")
+        assert fake_storage.get("providers/logo.png") == b"png"
+        assert fake_storage.stat("providers/logo.png") == {'size': 3, 'content_type': "image/png"}
+        assert fake_storage.delete("providers/logo.png") is True
+        assert fake_storage.delete("providers/logo.png") is False
+        assert fake_storage.get("providers/logo.png") is None
+        assert fake_storage.stat("providers/logo.png") is None
+
+    def test_list_excludes_metadata(self, fake_storage):
+        """Prueba que el listado solo incluye objetos bajo el prefijo"""
+        fake_storage.put("providers/b.png", io.BytesIO(b"b"), "image/png")
+        fake_storage.put("providers/a.png", io.BytesIO(b"a"), "image/png")
+        fake_storage.put("otros/c.png", io.BytesIO(b"c"), "image/png")
+
+        assert fake_storage.list("providers/") == ["providers/a.png", "providers/b.png"]
+
+    def test_sign_includes_method_and_expiration(self, fake_storage):
+        """Prueba el formato de la URL firmada simulada"""
+        url = fake_storage.sign("providers/logo.png", timedelta(minutes=5), method='PUT')
+
+        assert url.startswith("http://fake-storage.local/providers/logo.png?method=PUT&expires=")
+
+    def test_rejects_paths_outside_root(self, fake_storage):
+        """Prueba que no se puede escapar del directorio raíz"""
+        with pytest.raises(StorageError):
+            fake_storage.exists("../fuera.png")
+
+    def test_injected_latency_per_operation(self, tmp_path):
+        """Prueba que la latencia configurada se inyecta en cada operación"""
+        backend = FakeStorageBackend(root=str(tmp_path), latency=0.01, latencies={'sign': 0.05})
+
+        with patch('app.storage.fake_storage.time.sleep') as mock_sleep:
+            backend.exists("providers/logo.png")
+            backend.sign("providers/logo.png", timedelta(hours=1))
+
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [0.01, 0.05]
+        assert backend.calls['exists'] == 1
+        assert backend.calls['sign'] == 1
+
+    def test_create_storage_backend_from_config(self, tmp_path):
+        """Prueba la creación del backend según la configuración"""
+        class FakeConfig:
+            STORAGE_BACKEND = 'fake'
+            FAKE_STORAGE_ROOT = str(tmp_path)
+            STORAGE_LATENCY_MS = 20
+            STORAGE_LATENCY_JITTER_MS = 5
+
+        backend = create_storage_backend(FakeConfig)
+
+        assert isinstance(backend, FakeStorageBackend)
+        assert backend.latency == 0.02
+        assert backend.jitter == 0.005
+
+    def test_create_storage_backend_unknown(self):
+        """Prueba que un backend desconocido lanza error"""
+        class FakeConfig:
+            STORAGE_BACKEND = 's3'
+
+        with pytest.raises(ValueError, match="no soportado"):
+            create_storage_backend(FakeConfig)
@@ -0,0 +1,234 @@
+"""
+Pruebas para el backend de almacenamiento de Google Cloud Storage
+"""
+import io
+import pytest
+import requests
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+from app.storage.gcs_storage import GCSStorageBackend, GCS_BATCH_LIMIT
+from app.storage.base_storage import StorageBackend
+from app.exceptions.custom_exceptions import StorageError, PartialDeleteError
+from app.config.settings import Config
+
+
+class TestGCSStorageBackend:
+    """Pruebas para GCSStorageBackend"""
+
+    @pytest.fixture
+    def mock_config(self):
+        """Configuración mock"""
+        config = MagicMock(spec=Config)
+        config.GCP_PROJECT_ID = "test-project"
+        config.BUCKET_NAME = "test-bucket"
+        config.GOOGLE_APPLICATION_CREDENTIALS = None
+        config.SIGNING_SERVICE_ACCOUNT_EMAIL = "test-signing@test-project.iam.gserviceaccount.com"
+        config.UPLOAD_CHUNK_SIZE = 4
+        config.RESUMABLE_UPLOAD_THRESHOLD = 1024 * 1024
+        config.UPLOAD_MAX_RETRIES = 2
+        config.UPLOAD_RETRY_BACKOFF = 0.0
+        config.UPLOAD_RETRY_MAX_BACKOFF = 0.0
+        config.UPLOAD_CHUNK_TIMEOUT = 5
+        return config
+
+    @pytest.fixture
+    def backend(self, mock_config):
+        """Backend con bucket mockeado"""
+        backend = GCSStorageBackend(mock_config)
+        backend._client = MagicMock()
+        backend._bucket = MagicMock()
+        return backend
+
+    def test_backend_inheritance(self, backend):
+        """Prueba que GCSStorageBackend implementa StorageBackend"""
+        assert isinstance(backend, StorageBackend)
+        assert backend.display_name == "Google Cloud Storage"
+
+    def test_put_small_file_uploads_in_one_shot(self, backend):
+        """Prueba que los archivos pequeños se suben en una sola petición"""
+        blob = backend.bucket.blob.return_value
+
+        backend.put("providers/logo.png", io.BytesIO(b"0123456789"), "image/png", {'folder': 'providers'})
+
+        backend.bucket.blob.assert_called_with("providers/logo.png")
+        assert blob.metadata == {'folder': 'providers'}
+        blob.upload_from_file.assert_called_once()
+        assert blob.upload_from_file.call_args.kwargs['content_type'] == "image/png"
+
+    def test_put_large_file_uses_resumable_upload(self, backend, mock_config):
+        """Prueba que los archivos sobre el umbral usan subida reanudable"""
+        mock_config.RESUMABLE_UPLOAD_THRESHOLD = 8
+        blob = backend.bucket.blob.return_value
+        stream = io.BytesIO(b"0123456789")
+
+        with patch.object(backend, '_upload_resumable') as mock_resumable:
+            backend.put("providers/logo.png", stream, "image/png")
+
+        mock_resumable.assert_called_once_with(blob, stream, "image/png", 10)
+        blob.upload_from_file.assert_not_called()
+
+    def test_put_wraps_client_errors(self, backend):
+        """Prueba que los errores del cliente se convierten en StorageError"""
+        backend.bucket.blob.return_value.upload_from_file.side_effect = Exception("boom")
+
+        with pytest.raises(StorageError, match="boom"):
+            backend.put("providers/logo.png", io.BytesIO(b"x"), "image/png")
+
+    def test_delete_missing_object(self, backend):
+        """Prueba eliminar un objeto inexistente"""
+        blob = backend.bucket.blob.return_value
+        blob.exists.return_value = False
+
+        assert backend.delete("providers/logo.png") is False
+        blob.delete.assert_not_called()
+
+    def _batch_responses(self, backend, *statuses):
+        """Sub-respuestas de cada batch, en orden (una lista de estados por batch)"""
+        batches = [MagicMock(_responses=[MagicMock(status_code=status) for status in batch]) for batch in statuses]
+        backend.client.batch.return_value.__enter__.side_effect = batches
+
+    def test_delete_many_uses_single_batch(self, backend):
+        """Prueba que delete_many agrupa las eliminaciones en un batch"""
+        paths = [f"providers/logo_{i}.png" for i in range(3)]
+        self._batch_responses(backend, [204, 204, 204])
+
+        assert backend.delete_many(paths) == 3
+        backend.client.batch.assert_called_once_with(raise_exception=False)
+        assert backend.bucket.delete_blob.call_count == 3
+        backend.bucket.blob.return_value.exists.assert_not_called()
+
+    def test_delete_many_mixed_failures(self, backend):
+        """Prueba que un 404 cuenta como ya eliminado y los 403/5xx se informan como fallidos"""
+        paths = [f"providers/logo_{i}.png" for i in range(4)]
+        self._batch_responses(backend, [204, 404, 403, 503])
+
+        with pytest.raises(PartialDeleteError) as error:
+            backend.delete_many(paths)
+
+        assert error.value.deleted == 1
+        assert error.value.failed == ["providers/logo_2.png", "providers/logo_3.png"]
+
+    def test_delete_many_splits_batches_at_limit(self, backend):
+        """Prueba que el backend no envía más de GCS_BATCH_LIMIT operaciones por batch"""
+        paths = [f"providers/logo_{i}.png" for i in range(GCS_BATCH_LIMIT + 1)]
+        self._batch_responses(backend, [204] * GCS_BATCH_LIMIT, [204])
+
+        assert backend.delete_many(paths) == GCS_BATCH_LIMIT + 1
+        assert backend.client.batch.call_count == 2
+
+    def test_stat_and_get(self, backend):
+        """Prueba la lectura de metadatos y contenido"""
+        blob = MagicMock(size=10, content_type="image/png")
+        blob.download_as_bytes.return_value = b"data"
+        backend.bucket.get_blob.return_value = blob
+
+        assert backend.stat("providers/logo.png") == {'size': 10, 'content_type': "image/png"}
+        assert backend.get("providers/logo.png") == b"data"
+
+        backend.bucket.get_blob.return_value = None
+        assert backend.stat("providers/logo.png") is None
+        assert backend.get("providers/logo.png") is None
+
+    def test_sign_uses_write_scope_for_uploads(self, backend):
+        """Prueba que las URLs de subida se firman con alcance de escritura"""
+        blob = backend.bucket.blob.return_value
+        blob.generate_signed_url.return_value = "https://signed"
+
+        with patch.object(backend, '_get_signing_credentials') as mock_credentials:
+            url = backend.sign("providers/logo.png", timedelta(minutes=5), method='PUT', content_type='image/png')
+
+        assert url == "https://signed"
+        mock_credentials.assert_called_once_with("https://www.googleapis.com/auth/devstorage.read_write")
+        assert blob.generate_signed_url.call_args.kwargs['method'] == 'PUT'
+
+    def test_signing_credentials_created_once_per_scope(self, backend):
+        """Prueba que las credenciales impersonadas se reutilizan entre firmas"""
+        with patch.object(backend, '_create_signing_credentials') as mock_create:
+            backend.sign("providers/a.png", timedelta(minutes=5))
+            backend.sign("providers/b.png", timedelta(minutes=5))
+            backend.sign("providers/c.png", timedelta(minutes=5), method='PUT')
+
+        assert [c.args[0] for c in mock_create.call_args_list] == [
+            "https://www.googleapis.com/auth/devstorage.read_only",
+            "https://www.googleapis.com/auth/devstorage.read_write"
+        ]
+
+    def test_warm_up_prefetches_read_credentials(self, backend):
+        """Prueba que el calentamiento obtiene el token de las credenciales de lectura"""
+        transport = MagicMock()
+        with patch.object(backend, '_create_signing_credentials') as mock_create, \
+                patch.dict('sys.modules', {'google.auth': MagicMock(), 'google.auth.transport': MagicMock(),
+                                           'google.auth.transport.requests': transport}):
+            backend.warm_up()
+            backend.sign("providers/a.png", timedelta(minutes=5))
+
+        mock_create.assert_called_once_with("https://www.googleapis.com/auth/devstorage.read_only")
+        mock_create.return_value.refresh.assert_called_once_with(transport.Request.return_value)
+
+    def test_list_and_public_url(self, backend):
+        """Prueba el listado de objetos y la URL pública"""
+        backend.client.list_blobs.return_value = [MagicMock(), MagicMock()]
+        backend.client.list_blobs.return_value[0].name = "providers/a.png"
+        backend.client.list_blobs.return_value[1].name = "providers/b.png"
+
+        assert backend.list("providers/") == ["providers/a.png", "providers/b.png"]
+        assert backend.public_url("providers/a.png") == "https://storage.googleapis.com/test-bucket/providers/a.png"
+
+    def test_upload_resumable_sends_chunks_with_content_range(self, backend):
+        """Prueba que la subida reanudable envía fragmentos con Content-Range"""
+        blob = MagicMock()
+        blob.create_resumable_upload_session.return_value = "https://upload/session"
+
+        partial = MagicMock(status_code=308, headers={'Range': 'bytes=0-3'})
+        partial_2 = MagicMock(status_code=308, headers={'Range': 'bytes=0-7'})
+        done = MagicMock(status_code=200, headers={})
+
+        with patch('app.storage.gcs_storage.requests.put', side_effect=[partial, partial_2, done]) as mock_put:
+            backend._upload_resumable(blob, io.BytesIO(b"0123456789"), 'image/png', 10)
+
+        ranges = [c.kwargs['headers']['Content-Range'] for c in mock_put.call_args_list]
+        assert ranges == ['bytes 0-3/10', 'bytes 4-7/10', 'bytes 8-9/10']
+        assert mock_put.call_args_list[2].kwargs['data'] == b"89"
+
+    def test_upload_resumable_retries_failed_chunk_from_committed_offset(self, backend):
+        """Prueba que un fragmento fallido se reintenta desde el offset confirmado"""
+        blob = MagicMock()
+        blob.create_resumable_upload_session.return_value = "https://upload/session"
+
+        responses = [
+            MagicMock(status_code=308, headers={'Range': 'bytes=0-3'}),
+            requests.ConnectionError("reset"),
+            MagicMock(status_code=308, headers={'Range': 'bytes=0-5'}),  # consulta de estado
+            MagicMock(status_code=201, headers={}),
+        ]
+
+        with patch('app.storage.gcs_storage.requests.put', side_effect=responses) as mock_put, \
+             patch('app.storage.gcs_storage.time.sleep') as mock_sleep:
+            backend._upload_resumable(blob, io.BytesIO(b"0123456789"), 'image/png', 10)
+
+        mock_sleep.assert_called_once()
+        assert mock_put.call_args_list[2].kwargs['headers']['Content-Range'] == 'bytes */10'
+        assert mock_put.call_args_list[3].kwargs['headers']['Content-Range'] == 'bytes 6-9/10'
+
+    def test_upload_resumable_aborts_after_max_retries(self, backend):
+        """Prueba que la subida reanudable se aborta al agotar los reintentos"""
+        blob = MagicMock()
+        blob.create_resumable_upload_session.return_value = "https://upload/session"
+
+        with patch('app.storage.gcs_storage.requests.put',
+                   return_value=MagicMock(status_code=503, headers={})), \
+             patch('app.storage.gcs_storage.time.sleep'):
+            with pytest.raises(StorageError, match="Subida reanudable abortada"):
+                backend._upload_resumable(blob, io.BytesIO(b"0123456789"), 'image/png', 10)
+
+    def test_upload_resumable_non_retryable_status(self, backend):
+        """Prueba que un estado no reintentable aborta la subida inmediatamente"""
+        blob = MagicMock()
+        blob.create_resumable_upload_session.return_value = "https://upload/session"
+
+        with patch('app.storage.gcs_storage.requests.put',
+                   return_value=MagicMock(status_code=403, headers={})) as mock_put:
+            with pytest.raises(StorageError, match="rechazada con estado 403"):
+                backend._upload_resumable(blob, io.BytesIO(b"0123456789"), 'image/png', 10)
+
+        assert mock_put.call_count == 1
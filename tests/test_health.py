@@ -0,0 +1,162 @@
+import time
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from app import create_app
+from app.config.settings import Config
+from app.repositories.provider_repository import get_engine
+from app.utils.health import HealthChecker, health_checker, pool_headroom
+
+
+@pytest.fixture
+def config(tmp_path):
+    return SimpleNamespace(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'health.db'}",
+        STORAGE_BACKEND='memory',
+        STORAGE_SIGNING_KEY='clave',
+        SECRET_KEY='secreto',
+        LOCAL_STORAGE_BASE_URL='/providers/files',
+        BUCKET_NAME='bucket',
+        UPLOAD_FOLDER='uploads',
+        FAKE_STORAGE_ROOT='.fake',
+        HEALTH_CHECK_INTERVAL_SECONDS=5,
+        HEALTH_CHECK_MAX_AGE_SECONDS=30,
+        HEALTH_POOL_MIN_FREE=1,
+        HEALTH_STORAGE_REQUIRED=False,
+        DATABASE_READ_URLS=[],
+        STORAGE_BREAKER_ENABLED=False
+    )
+
+
+class TestHealthChecker:
+    """Pruebas unitarias para la verificación de dependencias en segundo plano"""
+
+    def test_starting_until_first_check(self, config):
+        """Prueba que sin resultado el estado es 'starting'"""
+        assert HealthChecker().snapshot(config)['status'] == 'starting'
+
+    def test_healthy(self, config):
+        """Prueba que la base y el almacenamiento disponibles dan 'healthy'"""
+        checker = HealthChecker()
+
+        report = checker.run_checks(config)
+
+        assert report['status'] == 'healthy'
+        assert report['checks']['database']['ok'] is True
+        assert report['checks']['database']['pool_free'] == 15
+        assert report['checks']['storage']['ok'] is True
+        assert checker.snapshot(config) == report
+
+    def test_database_failure_is_unhealthy(self, config):
+        """Prueba que una base inaccesible da 'unhealthy' con el error"""
+        config.SQLALCHEMY_DATABASE_URI = 'sqlite:////no/existe/health.db'
+
+        report = HealthChecker().run_checks(config)
+
+        assert report['status'] == 'unhealthy'
+        assert report['checks']['database']['ok'] is False
+        assert 'unable to open database file' in report['checks']['database']['error']
+
+    def test_pool_exhausted_is_unhealthy_without_connecting(self, config):
+        """Prueba que sin conexiones libres en el pool no se espera una conexión"""
+        engine = get_engine(config.SQLALCHEMY_DATABASE_URI)
+        config.HEALTH_POOL_MIN_FREE = 16
+
+        with patch.object(engine, 'connect') as mock_connect:
+            report = HealthChecker().run_checks(config)
+
+        assert report['status'] == 'unhealthy'
+        assert 'agotado' in report['checks']['database']['error']
+        mock_connect.assert_not_called()
+
+    def test_storage_failure_is_degraded_unless_required(self, config):
+        """Prueba que el almacenamiento caído degrada el servicio y solo lo saca de rotación si es requerido"""
+        checker = HealthChecker()
+        with patch('app.storage.memory_storage.MemoryStorageBackend.exists', side_effect=Exception("sin red")):
+            assert checker.run_checks(config)['status'] == 'degraded'
+            config.HEALTH_STORAGE_REQUIRED = True
+            report = checker.run_checks(config)
+
+        assert report['status'] == 'unhealthy'
+        assert report['checks']['storage'] == {'ok': False, 'error': 'sin red', 'ms': report['checks']['storage']['ms'], 'required': True}
+
+    def test_stale_report_is_unhealthy(self, config):
+        """Prueba que un resultado más antiguo que HEALTH_CHECK_MAX_AGE_SECONDS no se considera válido"""
+        checker = HealthChecker()
+        checker.run_checks(config)
+
+        with patch('app.utils.health.time.monotonic', return_value=checker._checked_at + 31):
+            snapshot = checker.snapshot(config)
+
+        assert snapshot['status'] == 'unhealthy'
+        assert 'desactualizada' in snapshot['error']
+
+    def test_background_thread_started_once(self, config):
+        """Prueba que el hilo de verificación se lanza una sola vez y publica el resultado"""
+        checker = HealthChecker()
+        config.HEALTH_CHECK_INTERVAL_SECONDS = 3600
+
+        checker.ensure_started(config)
+        thread = checker._thread
+        checker.ensure_started(config)
+
+        assert checker._thread is thread
+        for _ in range(100):
+            if checker.snapshot(config)['status'] != 'starting':
+                break
+            time.sleep(0.01)
+        assert checker.snapshot(config)['status'] == 'healthy'
+
+    def test_pool_headroom(self, config):
+        """Prueba el cálculo de conexiones libres del pool"""
+        engine = get_engine(config.SQLALCHEMY_DATABASE_URI)
+
+        with engine.connect():
+            assert pool_headroom(engine.pool) == 14
+        assert pool_headroom(engine.pool) == 15
+
+
+class TestHealthEndpoints:
+    """Pruebas de integración para liveness y readiness"""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        health_checker.reset()
+        with patch.object(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'health.db'}"), \
+                patch.object(Config, 'STORAGE_BACKEND', 'memory'), \
+                patch.object(health_checker, 'ensure_started') as mock_start:
+            yield create_app().test_client(), mock_start
+        health_checker.reset()
+
+    def test_liveness(self, client):
+        """Prueba que liveness no depende del verificador"""
+        client, mock_start = client
+
+        response = client.get('/providers/health/live')
+
+        assert response.status_code == 200
+        mock_start.assert_not_called()
+
+    def test_readiness_starting(self, client):
+        """Prueba que readiness responde 503 hasta tener el primer resultado"""
+        client, mock_start = client
+
+        response = client.get('/providers/health/ready')
+
+        assert response.status_code == 503
+        assert response.get_json()['data']['status'] == 'starting'
+        mock_start.assert_called_once()
+
+    def test_readiness_reads_cached_report(self, client):
+        """Prueba que readiness retorna el último resultado sin verificar dependencias"""
+        client, _ = client
+        health_checker.run_checks(Config)
+
+        with patch.object(HealthChecker, 'run_checks') as mock_run:
+            ready = client.get('/providers/health/ready')
+            health = client.get('/providers/health')
+
+        assert ready.status_code == health.status_code == 200
+        assert ready.get_json()['data']['status'] == 'healthy'
+        assert set(health.get_json()['data']['checks']) == {'database', 'storage'}
+        mock_run.assert_not_called()
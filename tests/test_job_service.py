@@ -0,0 +1,67 @@
+import pytest
+import threading
+from unittest.mock import patch
+from app.services.job_service import JobService, BackgroundJob, get_job_service
+
+
+class TestJobService:
+    """Pruebas unitarias para JobService"""
+    
+    @pytest.fixture
+    def job_service(self):
+        """Fixture para JobService con un solo hilo"""
+        service = JobService(max_workers=1, retention_seconds=60)
+        yield service
+        service._executor.shutdown(wait=True)
+    
+    def test_submit_runs_job_and_reports_progress(self, job_service):
+        """Prueba que el trabajo se ejecuta y reporta su progreso"""
+        def work(job):
+            job.advance(2, 2)
+            job.advance(2, 1)
+        
+        job = job_service.submit('logo_cleanup', 4, work)
+        job_service._executor.shutdown(wait=True)
+        
+        result = job_service.get(job.id).to_dict()
+        assert result['status'] == BackgroundJob.COMPLETED
+        assert result['processed'] == 4
+        assert result['succeeded'] == 3
+        assert result['progress'] == 100.0
+        assert result['finished_at'] is not None
+    
+    def test_submit_returns_before_job_finishes(self, job_service):
+        """Prueba que submit no bloquea mientras el trabajo corre"""
+        release = threading.Event()
+        
+        job = job_service.submit('logo_cleanup', 10, lambda job: release.wait(5))
+        
+        assert job_service.get(job.id).status in (BackgroundJob.PENDING, BackgroundJob.RUNNING)
+        release.set()
+    
+    def test_failed_job_records_error(self, job_service):
+        """Prueba que un trabajo con error queda marcado como fallido"""
+        def work(job):
+            raise RuntimeError("bucket no disponible")
+        
+        job = job_service.submit('logo_cleanup', 1, work)
+        job_service._executor.shutdown(wait=True)
+        
+        assert job.status == BackgroundJob.FAILED
+        assert job.error == "bucket no disponible"
+    
+    def test_get_unknown_job(self, job_service):
+        """Prueba obtener un trabajo inexistente"""
+        assert job_service.get('missing') is None
+    
+    def test_finished_jobs_expire(self, job_service):
+        """Prueba que los trabajos terminados se descartan tras el tiempo de retención"""
+        job = job_service.submit('logo_cleanup', 0, lambda job: None)
+        job_service._executor.shutdown(wait=True)
+        
+        with patch('app.services.job_service.time.monotonic', return_value=10 ** 9):
+            assert job_service.get(job.id) is None
+    
+    def test_get_job_service_is_shared(self):
+        """Prueba que el servicio de trabajos es único por proceso"""
+        assert get_job_service() is get_job_service()
@@ -0,0 +1,85 @@
+"""
+Pruebas para el backend de almacenamiento en disco local
+"""
+import io
+import pytest
+from datetime import timedelta
+from urllib.parse import urlparse, parse_qs
+from app.storage.local_storage import LocalStorageBackend, UrlSigner
+from app.exceptions.custom_exceptions import StorageError
+
+
+class TestUrlSigner:
+    """Pruebas para UrlSigner"""
+
+    @pytest.fixture
+    def signer(self):
+        """Firmador con clave de prueba"""
+        return UrlSigner('test-secret', '/providers/files/')
+
+    def _query(self, url):
+        return {key: values[0] for key, values in parse_qs(urlparse(url).query).items()}
+
+    def test_sign_and_verify(self, signer):
+        """Prueba que una URL firmada se verifica correctamente"""
+        url = signer.sign('providers/logo.png', timedelta(minutes=5))
+        query = self._query(url)
+
+        assert url.startswith('/providers/files/providers/logo.png?')
+        assert signer.verify('providers/logo.png', 'GET', query['expires'], query['signature'])
+
+    def test_verify_rejects_other_path_method_or_content_type(self, signer):
+        """Prueba que la firma está ligada a la ruta, el método y el tipo de contenido"""
+        query = self._query(signer.sign('providers/logo.png', timedelta(minutes=5), 'PUT', 'image/png'))
+
+        assert signer.verify('providers/logo.png', 'PUT', query['expires'], query['signature'], 'image/png')
+        assert not signer.verify('providers/otro.png', 'PUT', query['expires'], query['signature'], 'image/png')
+        assert not signer.verify('providers/logo.png', 'GET', query['expires'], query['signature'], 'image/png')
+        assert not signer.verify('providers/logo.png', 'PUT', query['expires'], query['signature'], 'image/gif')
+
+    def test_verify_rejects_expired_or_malformed(self, signer):
+        """Prueba que se rechazan firmas expiradas o con parámetros inválidos"""
+        query = self._query(signer.sign('providers/logo.png', timedelta(seconds=-1)))
+
+        assert not signer.verify('providers/logo.png', 'GET', query['expires'], query['signature'])
+        assert not signer.verify('providers/logo.png', 'GET', 'abc', query['signature'])
+        assert not signer.verify('providers/logo.png', 'GET', None, None)
+
+    def test_verify_rejects_other_secret(self, signer):
+        """Prueba que una firma de otra clave no es válida"""
+        query = self._query(UrlSigner('otra-clave', '/providers/files').sign('providers/logo.png', timedelta(minutes=5)))
+
+        assert not signer.verify('providers/logo.png', 'GET', query['expires'], query['signature'])
+
+
+class TestLocalStorageBackend:
+    """Pruebas para LocalStorageBackend"""
+
+    @pytest.fixture
+    def backend(self, tmp_path):
+        """Backend local sobre un directorio temporal"""
+        return LocalStorageBackend(str(tmp_path / 'uploads'), UrlSigner('test-secret', '/providers/files'))
+
+    def test_put_get_stat_list_delete(self, backend):
+        """Prueba el ciclo de vida completo de un objeto"""
+        backend.put('providers/logo.png', io.BytesIO(b'png'), 'image/png')
+
+        assert backend.exists('providers/logo.png')
+        assert backend.get('providers/logo.png') == b'png'
+        assert backend.stat('providers/logo.png') == {'size': 3, 'content_type': 'image/png'}
+        assert backend.list('providers/') == ['providers/logo.png']
+        assert backend.delete('providers/logo.png') is True
+        assert not backend.exists('providers/logo.png')
+        assert backend.list() == []
+
+    def test_file_path_stays_inside_root(self, backend):
+        """Prueba que no se puede escapar del directorio raíz"""
+        assert backend.file_path('providers/logo.png').startswith(backend.root)
+
+        with pytest.raises(StorageError):
+            backend.file_path('../../etc/passwd')
+
+    def test_sign_and_public_url(self, backend):
+        """Prueba las URLs generadas por el backend"""
+        assert backend.sign('providers/logo.png', timedelta(hours=1)).startswith('/providers/files/providers/logo.png?method=GET')
+        assert backend.public_url('providers/logo.png') == '/providers/files/providers/logo.png'
@@ -0,0 +1,210 @@
+import time
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+from flask import Flask
+from sqlalchemy import select, update
+from app.config.settings import Config
+from app.repositories.migrations import upgrade_database
+from app.repositories.provider_repository import ProviderDB, ProviderRepository
+from app.services.cloud_storage_service import CloudStorageService
+from app.services.logo_url_refresher import LogoUrlRefresher, get_refresher, init_logo_url_refresh
+from app.services.provider_service import ProviderService
+from app.utils.upload_token import issue_upload_token
+
+
+@pytest.fixture
+def repository(tmp_path):
+    # Base en archivo: el hilo del refresco usa otra conexión que la prueba
+    database_url = f"sqlite:///{tmp_path / 'providers.db'}"
+    with patch('app.repositories.provider_repository.Config.SQLALCHEMY_DATABASE_URI', database_url):
+        repository = ProviderRepository()
+    upgrade_database(repository.engine)
+    return repository
+
+
+@pytest.fixture
+def backend():
+    backend = MagicMock()
+    backend.exists.return_value = True
+    backend.sign.side_effect = lambda path, expires_in: f'https://firmada/{path}?v={time.monotonic_ns()}'
+    return backend
+
+
+@pytest.fixture
+def storage(backend):
+    return CloudStorageService(Config(), storage_backend=backend)
+
+
+@pytest.fixture
+def service(repository, storage):
+    return ProviderService(provider_repository=repository, cloud_storage_service=storage)
+
+
+@pytest.fixture
+def refresher(repository, storage):
+    with patch.object(Config, 'LOGO_URL_REFRESH_BATCH_SIZE', 2):
+        yield LogoUrlRefresher(Config, repository=repository, cloud_storage_service=storage)
+
+
+@pytest.fixture
+def provider(repository):
+    return repository.create(name='Farmacia Uno', email='uno@farmacia.com', phone='3001234567', logo_filename='a.png')
+
+
+def stored(repository, provider_id):
+    """(logo_url, logo_url_expires_at, updated_at) guardados del proveedor"""
+    with repository.engine.connect() as connection:
+        return connection.execute(
+            select(ProviderDB.logo_url, ProviderDB.logo_url_expires_at, ProviderDB.updated_at)
+            .where(ProviderDB.id == provider_id)
+        ).one()
+
+
+def expire(repository, provider_id, expires_at):
+    with repository.engine.begin() as connection:
+        connection.execute(
+            update(ProviderDB).where(ProviderDB.id == provider_id).values(logo_url_expires_at=expires_at)
+        )
+
+
+class TestLogoUrlRefresh:
+    """Pruebas de las URLs de logo guardadas y su refresco contra SQLite"""
+
+    def test_refresh_signs_in_batches_and_keeps_updated_at(self, repository, refresher, provider, backend):
+        """Prueba que el refresco guarda URL y vencimiento de todas las filas sin cambiar updated_at"""
+        others = [
+            repository.create(
+                name=f'Farmacia {name}', email=f'{name}@farmacia.com', phone=phone, logo_filename=f'{name}.png'
+            )
+            for name, phone in (('dos', '3001234568'), ('tres', '3001234569'))
+        ]
+
+        assert refresher.run_once() == 3
+
+        logo_url, expires_at, updated_at = stored(repository, provider.id)
+        assert logo_url.startswith('https://firmada/') and updated_at == provider.updated_at
+        assert abs(expires_at - (datetime.utcnow() + timedelta(hours=168))) < timedelta(minutes=1)
+        assert all(stored(repository, other.id)[1] is not None for other in others)
+        assert refresher.snapshot()['refreshed'] == 3
+
+    def test_only_urls_near_expiry(self, repository, refresher, provider, backend):
+        """Prueba que solo se renuevan las URLs que vencen dentro de LOGO_URL_REFRESH_BEFORE_HOURS"""
+        refresher.run_once()
+        backend.sign.reset_mock()
+
+        assert refresher.run_once() == 0
+        expire(repository, provider.id, datetime.utcnow() + timedelta(hours=1))
+        assert refresher.run_once() == 1
+        assert backend.sign.call_count == 1
+
+    def test_storage_failure_keeps_rows_pending(self, repository, refresher, provider, backend):
+        """Prueba que una URL alternativa (almacenamiento caído) no se guarda y la fila queda para otra pasada"""
+        backend.exists.side_effect = RuntimeError('sin conexión')
+
+        assert refresher.run_once() == 0
+        assert stored(repository, provider.id)[1] is None
+
+    def test_cached_url_fallback_ends_pass(self, repository, refresher, provider, backend, storage):
+        """Prueba que con el almacenamiento caído la última URL recordada no cuenta como renovada ni repite el lote"""
+        other = repository.create(name='Farmacia Dos', email='dos@farmacia.com', phone='3001234568', logo_filename='b.png')
+        soon = datetime.utcnow() + timedelta(hours=10)
+        for row, filename in ((provider, 'a.png'), (other, 'b.png')):
+            storage.remember_signed_url(filename, f'https://firmada/{filename}', time.time() + 10 * 3600)
+            expire(repository, row.id, soon)
+        backend.exists.side_effect = RuntimeError('sin conexión')
+        batches = []
+        refresh = repository.refresh_logo_urls
+
+        def bounded_refresh(*args):
+            batches.append(args)
+            assert len(batches) < 5, "el refresco repite el mismo lote"
+            return refresh(*args)
+
+        with patch.object(repository, 'refresh_logo_urls', side_effect=bounded_refresh):
+            assert refresher.run_once() == 0
+
+        assert len(batches) == 1
+        assert stored(repository, provider.id)[1] == soon
+
+    def test_signature_shorter_than_window_ends_pass(self, repository, refresher, provider):
+        """Prueba que una URL que aún vencería dentro de la ventana no se guarda ni repite el lote"""
+        with patch.object(Config, 'LOGO_URL_REFRESH_BEFORE_HOURS', 200):
+            assert refresher.run_once() == 0
+
+        assert stored(repository, provider.id)[1] is None
+
+    def test_missing_object_stores_empty_url(self, repository, refresher, provider, backend):
+        """Prueba que un logo inexistente guarda URL vacía con vencimiento para no consultarlo en cada pasada"""
+        backend.exists.return_value = False
+
+        assert refresher.run_once() == 1
+        logo_url, expires_at, _ = stored(repository, provider.id)
+        assert logo_url == '' and expires_at > datetime.utcnow()
+
+
+class TestStoredLogoUrlReads:
+    """Pruebas de las lecturas con URL de logo guardada"""
+
+    def test_read_serves_stored_url(self, repository, service, refresher, provider, backend):
+        """Prueba que una URL guardada vigente se sirve sin firmar en la petición"""
+        refresher.run_once()
+        backend.reset_mock()
+
+        read = service.get_by_id(provider.id)
+
+        assert read.logo_url == stored(repository, provider.id)[0]
+        backend.exists.assert_not_called()
+        backend.sign.assert_not_called()
+        assert service.logo_urls_expire_at([{'logo_url': read.logo_url}]) is not None
+
+    def test_near_expiry_signed_inline(self, repository, service, refresher, provider, backend):
+        """Prueba que una URL con menos de LOGO_URL_MIN_VALIDITY_SECONDS de validez se firma en la lectura"""
+        refresher.run_once()
+        expire(repository, provider.id, datetime.utcnow() + timedelta(minutes=10))
+        backend.sign.reset_mock()
+
+        read = service.get_all(fields=('id', 'logo_url'))[0]
+
+        assert read.logo_url != stored(repository, provider.id)[0]
+        assert backend.sign.call_count == 1
+
+    def test_create_stores_expiry(self, repository, service, backend):
+        """Prueba que el alta guarda el vencimiento de la URL firmada al confirmar el logo"""
+        backend.stat.return_value = {'content_type': 'image/png', 'size': 10}
+        backend.get.return_value = b'png-bytes'
+
+        created = service.create(
+            name='Farmacia Uno', email='uno@farmacia.com', phone='3001234567',
+            uploaded_logo_token=issue_upload_token('logo_a.png', Config.SECRET_KEY)
+        )
+
+        logo_url, expires_at, _ = stored(repository, created.id)
+        assert logo_url == created.logo_url and expires_at > datetime.utcnow() + timedelta(hours=167)
+
+
+class TestLogoUrlRefresher:
+    """Pruebas del hilo de refresco"""
+
+    def test_first_request_starts_refresher(self, repository, storage, provider):
+        """Prueba que la primera petición inicia el hilo y este renueva las URLs"""
+        app = Flask(__name__)
+        app.add_url_rule('/ping', 'ping', lambda: 'ok')
+        with patch.object(Config, 'LOGO_URL_REFRESH_ENABLED', True):
+            init_logo_url_refresh(app, Config)
+            refresher = get_refresher(Config)
+            refresher._repository, refresher._cloud_storage_service = repository, storage
+            app.test_client().get('/ping')
+
+        deadline = time.monotonic() + 5
+        while stored(repository, provider.id)[1] is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert stored(repository, provider.id)[1] is not None
+        assert refresher.snapshot()['running'] is True
+
+    def test_disabled_by_default(self):
+        """Prueba que sin LOGO_URL_REFRESH_ENABLED no se registra el inicio del hilo"""
+        app = Flask(__name__)
+        init_logo_url_refresh(app, Config)
+
+        assert not app.before_request_funcs
@@ -0,0 +1,84 @@
+"""
+Pruebas para el backend de almacenamiento en memoria
+"""
+import io
+import pytest
+from datetime import timedelta
+from unittest.mock import MagicMock
+from app.storage import create_storage_backend, get_storage_backend
+from app.storage.local_storage import LocalStorageBackend, UrlSigner
+from app.storage.memory_storage import MemoryStorageBackend
+
+
+class TestMemoryStorageBackend:
+    """Pruebas para MemoryStorageBackend"""
+
+    @pytest.fixture
+    def backend(self):
+        """Backend en memoria con firmador de prueba"""
+        return MemoryStorageBackend(UrlSigner('test-secret', '/providers/files'))
+
+    def test_put_get_stat_list_delete(self, backend):
+        """Prueba el ciclo de vida completo de un objeto"""
+        backend.put('providers/b.png', io.BytesIO(b'bb'), 'image/png')
+        backend.put('providers/a.gif', io.BytesIO(b'a'), 'image/gif')
+
+        assert backend.exists('providers/a.gif')
+        assert backend.get('providers/b.png') == b'bb'
+        assert backend.stat('providers/a.gif') == {'size': 1, 'content_type': 'image/gif'}
+        assert backend.list('providers/') == ['providers/a.gif', 'providers/b.png']
+        assert backend.delete('providers/a.gif') is True
+        assert backend.delete('providers/a.gif') is False
+        assert backend.get('providers/a.gif') is None
+        assert backend.stat('providers/a.gif') is None
+
+    def test_delete_many_counts_existing_objects(self, backend):
+        """Prueba que delete_many cuenta solo los objetos que existían"""
+        backend.put('providers/a.png', io.BytesIO(b'a'), 'image/png')
+
+        assert backend.delete_many(['providers/a.png', 'providers/missing.png']) == 1
+        assert backend.list() == []
+
+    def test_sign_uses_signer(self, backend):
+        """Prueba que las URLs se firman con HMAC"""
+        url = backend.sign('providers/a.png', timedelta(minutes=1))
+
+        assert url.startswith('/providers/files/providers/a.png?method=GET&expires=')
+        assert backend.public_url('providers/a.png') == '/providers/files/providers/a.png'
+
+
+class TestStorageBackendFactory:
+    """Pruebas para la selección de backend por configuración"""
+
+    @pytest.fixture
+    def config(self, tmp_path):
+        """Configuración mínima de almacenamiento"""
+        config = MagicMock()
+        config.UPLOAD_FOLDER = str(tmp_path / 'uploads')
+        config.FAKE_STORAGE_ROOT = str(tmp_path / 'fake')
+        config.BUCKET_NAME = 'test-bucket'
+        config.STORAGE_SIGNING_KEY = ''
+        config.SECRET_KEY = 'secret'
+        config.LOCAL_STORAGE_BASE_URL = '/providers/files'
+        return config
+
+    def test_create_local_backend(self, config):
+        """Prueba la creación del backend local sobre UPLOAD_FOLDER"""
+        config.STORAGE_BACKEND = 'local'
+
+        backend = create_storage_backend(config)
+
+        assert isinstance(backend, LocalStorageBackend)
+        assert backend.root == config.UPLOAD_FOLDER
+
+    def test_create_memory_backend(self, config):
+        """Prueba la creación del backend en memoria"""
+        config.STORAGE_BACKEND = 'memory'
+
+        assert isinstance(create_storage_backend(config), MemoryStorageBackend)
+
+    def test_get_storage_backend_is_shared(self, config):
+        """Prueba que el backend se comparte entre servicios del mismo proceso"""
+        config.STORAGE_BACKEND = 'memory'
+
+        assert get_storage_backend(config) is get_storage_backend(config)
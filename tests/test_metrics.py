@@ -0,0 +1,108 @@
+import pytest
+from unittest.mock import patch
+from flask import Flask
+from flask_restful import Api
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from app.controllers.metrics_controller import MetricsController
+from app.utils.metrics import init_metrics, instrument_engine, record_cache_access, render_metrics
+from app.utils.timing import span, timed, remove_phase_observer
+from app.utils import metrics
+
+
+def sample(name, **labels):
+    """Valor actual de una métrica del registro global (0 si no existe)"""
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestMetrics:
+    """Pruebas unitarias para las métricas Prometheus"""
+    
+    @pytest.fixture
+    def app(self):
+        """Aplicación con métricas habilitadas y una ruta instrumentada"""
+        app = Flask(__name__)
+        init_metrics(app, True)
+        Api(app).add_resource(MetricsController, '/metrics')
+        
+        @timed('db.get_all')
+        def query():
+            with span('storage.exists'):
+                return []
+        
+        @app.route('/providers/<provider_id>')
+        def provider(provider_id):
+            query()
+            return {'id': provider_id}
+        
+        yield app
+        remove_phase_observer(metrics._observe_phase)
+    
+    def test_request_latency_by_route_and_status(self, app):
+        """Prueba que la latencia se agrupa por la regla de la ruta, no por la URL"""
+        labels = {'method': 'GET', 'route': '/providers/<provider_id>', 'status': '200'}
+        before = sample('providers_http_request_duration_seconds_count', **labels)
+        
+        app.test_client().get('/providers/abc')
+        
+        assert sample('providers_http_request_duration_seconds_count', **labels) == before + 1
+    
+    def test_repository_and_storage_phases(self, app):
+        """Prueba que los spans de repositorio y almacenamiento alimentan las métricas"""
+        queries = sample('providers_db_queries_total', operation='get_all', outcome='ok')
+        exists = sample('providers_storage_operation_duration_seconds_count', operation='exists', outcome='ok')
+        
+        app.test_client().get('/providers/abc')
+        
+        assert sample('providers_db_queries_total', operation='get_all', outcome='ok') == queries + 1
+        assert sample('providers_storage_operation_duration_seconds_count', operation='exists', outcome='ok') == exists + 1
+    
+    def test_failed_operation_outcome(self, app):
+        """Prueba que una operación con excepción se cuenta como error"""
+        @timed('db.count_all')
+        def failing():
+            raise RuntimeError("db caída")
+        
+        before = sample('providers_db_queries_total', operation='count_all', outcome='error')
+        with pytest.raises(RuntimeError):
+            failing()
+        
+        assert sample('providers_db_queries_total', operation='count_all', outcome='error') == before + 1
+    
+    def test_cache_access_counters(self, app):
+        """Prueba los contadores de aciertos y fallos de caché"""
+        hits = sample('providers_cache_requests_total', cache='providers_list', result='hit')
+        
+        record_cache_access('providers_list', True)
+        
+        assert sample('providers_cache_requests_total', cache='providers_list', result='hit') == hits + 1
+    
+    def test_pool_gauges_follow_engine_events(self):
+        """Prueba que los gauges del pool siguen checkout/checkin del engine"""
+        engine = create_engine('sqlite://')
+        instrument_engine(engine)
+        before = sample('providers_db_pool_checked_out')
+        
+        with engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+            assert sample('providers_db_pool_checked_out') == before + 1
+        
+        assert sample('providers_db_pool_checked_out') == before
+        engine.dispose()
+    
+    def test_metrics_endpoint(self, app):
+        """Prueba que /metrics responde en formato de texto Prometheus"""
+        response = app.test_client().get('/metrics')
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        assert b'providers_http_request_duration_seconds' in response.data
+    
+    def test_render_metrics_multiprocess(self, tmp_path):
+        """Prueba que con PROMETHEUS_MULTIPROC_DIR se agregan los archivos de los workers"""
+        with patch.dict('os.environ', {'PROMETHEUS_MULTIPROC_DIR': str(tmp_path)}):
+            with patch('app.utils.metrics.multiprocess.MultiProcessCollector') as collector:
+                render_metrics()
+        
+        collector.assert_called_once()
+        assert collector.call_args[0][0] is not REGISTRY
@@ -0,0 +1,148 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from flask import Flask
+from flask_restful import Api
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+from app.config.settings import Config
+from app.controllers.provider_controller import ProviderController, ProviderLookupController
+from app.repositories.migrations import upgrade_database
+from app.repositories.provider_repository import ProviderRepository
+from app.services.cloud_storage_service import CloudStorageService
+from app.services.provider_service import ProviderService
+
+
+@pytest.fixture
+def repository():
+    with patch('app.repositories.provider_repository.Config.SQLALCHEMY_DATABASE_URI', 'sqlite://'):
+        repository = ProviderRepository()
+    upgrade_database(repository.engine)
+    return repository
+
+
+@pytest.fixture
+def ids(repository):
+    """IDs de tres proveedores; dos comparten el mismo logo"""
+    return [
+        repository.create(name='Farmacia Uno', email='uno@farmacia.com', phone='3001234567', logo_filename='a.png').id,
+        repository.create(name='Farmacia Dos', email='dos@farmacia.com', phone='3001234568', logo_filename='a.png').id,
+        repository.create(name='Farmacia Tres', email='tres@farmacia.com', phone='3001234569', logo_filename='b.png').id
+    ]
+
+
+@pytest.fixture
+def statements(repository):
+    """Sentencias SELECT ejecutadas por el repositorio"""
+    executed = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            executed.append(statement)
+    event.listen(repository.engine, 'before_cursor_execute', capture)
+    yield executed
+    event.remove(repository.engine, 'before_cursor_execute', capture)
+
+
+@pytest.fixture
+def backend():
+    backend = MagicMock()
+    backend.exists.return_value = True
+    backend.sign.side_effect = lambda path, expires_in: f'https://firmada/{path}'
+    return backend
+
+
+@pytest.fixture
+def service(repository, backend):
+    return ProviderService(
+        provider_repository=repository,
+        cloud_storage_service=CloudStorageService(Config(), storage_backend=backend)
+    )
+
+
+class TestMultiGet:
+    """Pruebas unitarias para la consulta por varios IDs en el repositorio y el servicio"""
+
+    def test_request_order_and_missing(self, service, ids, statements):
+        """Prueba que se respeta el orden pedido con None para los inexistentes, en una sola consulta"""
+        requested = [ids[2], 'no-existe', ids[0]]
+
+        providers = service.get_by_ids(requested)
+
+        assert [provider.name if provider else None for provider in providers] == [
+            'Farmacia Tres', None, 'Farmacia Uno'
+        ]
+        assert len(statements) == 1
+
+    def test_distinct_logos_signed_once(self, service, ids, backend):
+        """Prueba que cada logo distinto se firma una sola vez"""
+        with patch.object(Config, 'STORAGE_SIGN_CONCURRENCY', 4):
+            providers = service.get_by_ids(ids)
+
+        assert backend.sign.call_count == 2
+        assert providers[0].logo_url == providers[1].logo_url != providers[2].logo_url
+
+    def test_fields_keep_id_and_skip_signing(self, service, ids, backend):
+        """Prueba que con fields se ubica cada fila aunque no se pida el id y no se firma sin logo_url"""
+        providers = service.get_by_ids([ids[1], ids[0]], fields=('name',))
+
+        assert [provider.to_dict(('name',)) for provider in providers] == [
+            {'name': 'Farmacia Dos'}, {'name': 'Farmacia Uno'}
+        ]
+        backend.sign.assert_not_called()
+
+    def test_postgresql_uses_any(self):
+        """Prueba que en PostgreSQL la lista viaja como un solo parámetro array"""
+        condition = ProviderRepository._ids_condition(['a', 'b', 'c'], 'postgresql')
+
+        compiled = condition.compile(dialect=postgresql.dialect())
+        assert str(compiled) == 'providers.id = ANY (%(ids)s::VARCHAR[])'
+        assert compiled.params == {'ids': ['a', 'b', 'c']}
+
+
+class TestMultiGetEndpoint:
+    """Pruebas de GET /providers?ids= y POST /providers/lookup"""
+
+    @pytest.fixture
+    def client(self, service):
+        app = Flask(__name__)
+        api = Api(app)
+        kwargs = {'provider_service': service}
+        api.add_resource(ProviderLookupController, '/providers/lookup', resource_class_kwargs=kwargs)
+        api.add_resource(
+            ProviderController, '/providers', '/providers/<string:provider_id>', resource_class_kwargs=kwargs
+        )
+        return app.test_client()
+
+    def test_get_with_not_found_markers(self, client, ids):
+        """Prueba el orden, los repetidos y los marcadores de no encontrado en GET"""
+        response = client.get(f'/providers?ids={ids[1]}, no-existe,{ids[1]}&fields=id,name')
+
+        data = response.get_json()['data']
+        assert response.status_code == 200
+        assert data['providers'] == [
+            {'id': ids[1], 'found': True, 'provider': {'id': ids[1], 'name': 'Farmacia Dos'}},
+            {'id': 'no-existe', 'found': False, 'provider': None}
+        ]
+        assert (data['found'], data['not_found']) == (1, ['no-existe'])
+
+    def test_post_body(self, client, ids):
+        """Prueba que POST /providers/lookup acepta la lista y los campos en el cuerpo"""
+        response = client.post('/providers/lookup', json={'ids': [ids[2], ids[0]], 'fields': ['name']})
+
+        data = response.get_json()['data']
+        assert [result['provider'] for result in data['providers']] == [
+            {'name': 'Farmacia Tres'}, {'name': 'Farmacia Uno'}
+        ]
+
+    @pytest.mark.parametrize('body', [{}, {'ids': 'a,b'}, {'ids': [1]}, {'ids': [' ']}, {'ids': ['a'], 'fields': 3}])
+    def test_post_invalid_body(self, client, body):
+        """Prueba que un cuerpo inválido responde 400"""
+        assert client.post('/providers/lookup', json=body).status_code == 400
+
+    def test_too_many_ids(self, client):
+        """Prueba el límite de IDs por consulta"""
+        with patch.object(Config, 'MULTI_GET_MAX_IDS', 2):
+            response = client.get('/providers?ids=a,b,c')
+
+        assert response.status_code == 400
+        assert 'máximo 2' in response.get_json()['error']
@@ -0,0 +1,287 @@
+import pika
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+from flask import Flask
+from sqlalchemy import text
+from app.config.settings import Config
+from app.exceptions.custom_exceptions import PublishError
+from app.messaging import create_publisher
+from app.messaging.base_publisher import OutboxEvent
+from app.messaging.memory_publisher import MemoryPublisher
+from app.messaging.relay import OutboxRelay, get_relay, init_outbox_relay
+from app.repositories.migrations import upgrade_database
+from app.repositories.provider_repository import ProviderRepository
+
+
+@pytest.fixture
+def repository(tmp_path):
+    # Base en archivo: el hilo del relay usa otra conexión que la prueba
+    database_url = f"sqlite:///{tmp_path / 'providers.db'}"
+    with patch('app.repositories.provider_repository.Config.SQLALCHEMY_DATABASE_URI', database_url):
+        repository = ProviderRepository()
+    upgrade_database(repository.engine)
+    with patch.object(Config, 'OUTBOX_ENABLED', True):
+        yield repository
+
+
+@pytest.fixture
+def broker():
+    return MemoryPublisher()
+
+
+@pytest.fixture
+def relay(repository, broker):
+    with patch.object(Config, 'OUTBOX_BATCH_SIZE', 2):
+        yield OutboxRelay(Config, repository=repository, publisher=broker)
+
+
+def outbox(repository):
+    """Filas pendientes del outbox: (tipo, intentos)"""
+    with repository.engine.connect() as connection:
+        return connection.execute(
+            text("SELECT event_type, attempts FROM provider_outbox ORDER BY created_at, id")
+        ).all()
+
+
+def create(repository, name='Uno', phone='3001234567'):
+    return repository.create(name=f'Farmacia {name}', email=f'{name.lower()}@farmacia.com', phone=phone)
+
+
+class TestOutbox:
+    """Pruebas del outbox transaccional y del relay contra SQLite y el broker en memoria"""
+
+    def test_writes_event_in_same_transaction(self, repository):
+        """Prueba que cada escritura deja su evento y una escritura fallida no deja ninguno"""
+        provider = create(repository)
+        with pytest.raises(ValueError):
+            create(repository, phone='3001234568')
+
+        repository.delete_by_id(provider.id)
+
+        assert [row.event_type for row in outbox(repository)] == ['provider.created', 'provider.deleted']
+
+    def test_disabled_writes_nothing(self, repository):
+        """Prueba que sin OUTBOX_ENABLED no se escriben eventos"""
+        with patch.object(Config, 'OUTBOX_ENABLED', False):
+            create(repository)
+
+        assert outbox(repository) == []
+
+    def test_relay_publishes_in_batches_and_drains(self, repository, relay, broker):
+        """Prueba que el relay publica en orden, por lotes, y vacía el outbox"""
+        created = [create(repository, name, f'300123456{i}') for i, name in enumerate(('Uno', 'Dos', 'Tres'))]
+        repository.delete_all_returning_logos()
+
+        with patch.object(broker, 'publish_batch', wraps=broker.publish_batch) as publish_batch:
+            assert relay.run_once() == 4
+
+        assert [len(call.args[0]) for call in publish_batch.call_args_list] == [2, 2]
+        assert broker.routing_keys() == ['provider.created'] * 3 + ['provider.all_deleted']
+        assert [message['body']['data'].get('id') for message in broker.messages[:3]] == [p.id for p in created]
+        assert broker.messages[3]['body']['data'] == {'count': 3}
+        assert outbox(repository) == []
+
+    def test_rejected_batch_stays_for_retry(self, repository, relay, broker):
+        """Prueba que un lote rechazado por el broker queda en el outbox y se publica en el siguiente intento"""
+        create(repository)
+        broker.reject_next = 1
+
+        with pytest.raises(PublishError):
+            relay.run_once()
+        assert outbox(repository) == [('provider.created', 1)]
+
+        assert relay.run_once() == 1
+        assert outbox(repository) == []
+        assert broker.messages[0]['message_id'] == broker.messages[0]['body']['id']
+
+    def test_rejected_event_parked_after_max_attempts(self, repository, relay, broker, caplog):
+        """Prueba que un evento siempre rechazado se reintenta solo y, tras OUTBOX_MAX_ATTEMPTS, deja pasar a los siguientes"""
+        poison, *others = [create(repository, name, f'300123456{i}') for i, name in enumerate(('Uno', 'Dos', 'Tres'))]
+        with repository.engine.connect() as connection:
+            poison_event = connection.execute(
+                text("SELECT id FROM provider_outbox WHERE aggregate_id = :id"), {'id': poison.id}
+            ).scalar_one()
+        broker.reject_ids = {poison_event}
+
+        with patch.object(Config, 'OUTBOX_MAX_ATTEMPTS', 3), \
+                patch.object(broker, 'publish_batch', wraps=broker.publish_batch) as publish_batch:
+            for _ in range(3):
+                with pytest.raises(PublishError):
+                    relay.run_once()
+            assert relay.run_once() == 1
+            assert relay.run_once() == 1
+
+        # El primer lote falla completo; después el evento rechazado se publica solo
+        assert [len(call.args[0]) for call in publish_batch.call_args_list] == [2, 1, 1, 1, 1]
+        assert [message['body']['data']['id'] for message in broker.messages] == [p.id for p in others]
+        assert outbox(repository) == [('provider.created', 3)]
+        assert relay.snapshot()['parked'] == 1
+        assert poison_event in caplog.text
+
+    def test_unavailable_broker_not_counted(self, repository, relay, broker):
+        """Prueba que un broker que no responde no suma intentos: con el broker caído nada se aparta"""
+        create(repository)
+
+        with patch.object(broker, 'publish_batch', side_effect=PublishError("sin conexión", unavailable=True)):
+            for _ in range(3):
+                with pytest.raises(PublishError):
+                    relay.run_once()
+
+        assert outbox(repository) == [('provider.created', 0)]
+        assert relay.run_once() == 1
+
+    def test_background_relay_wakes_on_write(self, repository, broker):
+        """Prueba que el hilo del relay publica poco después de una escritura del proceso"""
+        relay = OutboxRelay(Config, repository=repository, publisher=broker)
+        with patch.object(Config, 'OUTBOX_POLL_SECONDS', 30):
+            relay.start()
+            try:
+                create(repository)
+                for _ in range(200):
+                    if broker.messages:
+                        break
+                    relay._stopped.wait(0.01)
+            finally:
+                relay.stop(timeout=5)
+
+        assert broker.routing_keys() == ['provider.created']
+        assert relay.snapshot()['published'] == 1
+
+    def test_relay_started_with_first_request(self, broker):
+        """Prueba que la aplicación inicia el relay del worker con la primera petición"""
+        app = Flask(__name__)
+        app.add_url_rule('/providers/ping', 'ping', lambda: 'pong')
+        with patch.object(Config, 'OUTBOX_ENABLED', True):
+            init_outbox_relay(app, Config)
+            with patch('app.messaging.relay.OutboxRelay.start') as start:
+                app.test_client().get('/providers/ping')
+                app.test_client().get('/providers/ping')
+
+        start.assert_called_once()
+        assert get_relay(Config) is not None
+
+    def test_relay_state_in_readiness(self):
+        """Prueba que /providers/health informa el estado del relay sin afectar la disponibilidad"""
+        from app.controllers.provider_controller import ProviderHealthController
+        from app.utils.health import health_checker
+        app = Flask(__name__)
+        with patch.object(Config, 'OUTBOX_ENABLED', True), \
+                patch.object(health_checker, 'ensure_started'), \
+                patch.object(health_checker, 'snapshot', return_value={'status': 'healthy', 'checks': {}}), \
+                app.test_request_context('/providers/health'):
+            body, status = ProviderHealthController().get()
+
+        assert status == 200
+        assert body['data']['outbox'] == {
+            'running': False, 'published': 0, 'failures': 0, 'parked': 0, 'last_error': None, 'backoff_seconds': 0.0
+        }
+
+
+def broker_connection():
+    """Conexión de pika simulada, abierta, con su canal"""
+    connection = MagicMock(is_open=True)
+    connection.channel.return_value.is_open = True
+    return connection
+
+
+def event(event_id='e-1'):
+    return OutboxEvent(event_id, 'provider.created', 'p-1', '{"id": "%s"}' % event_id, datetime(2026, 10, 19))
+
+
+class TestRabbitMQPublisher:
+    """Pruebas del publicador de RabbitMQ con pika.BlockingConnection simulada"""
+
+    @pytest.fixture
+    def publisher(self):
+        with patch.object(Config, 'EVENTS_BROKER', 'rabbitmq'):
+            return create_publisher(Config)
+
+    def test_publishes_persistent_messages_with_confirms(self, publisher):
+        """Prueba el canal en modo confirm y las propiedades de cada mensaje"""
+        with patch('pika.BlockingConnection', return_value=broker_connection()) as connect:
+            publisher.publish_batch([event('e-1'), event('e-2')])
+
+        channel = connect.return_value.channel.return_value
+        channel.confirm_delivery.assert_called_once()
+        channel.exchange_declare.assert_called_once_with(
+            exchange=Config.RABBITMQ_EXCHANGE, exchange_type='topic', durable=True
+        )
+        assert channel.basic_publish.call_count == 2
+        kwargs = channel.basic_publish.call_args.kwargs
+        assert kwargs['exchange'] == Config.RABBITMQ_EXCHANGE
+        assert kwargs['routing_key'] == 'provider.created'
+        assert kwargs['body'] == b'{"id": "e-2"}'
+        assert kwargs['properties'].message_id == 'e-2'
+        assert kwargs['properties'].delivery_mode == pika.spec.PERSISTENT_DELIVERY_MODE
+        assert kwargs['properties'].timestamp == int(datetime(2026, 10, 19, tzinfo=timezone.utc).timestamp())
+
+    def test_channel_reused_between_batches(self, publisher):
+        """Prueba que la conexión abierta se reutiliza y se reabre si el broker cerró el canal"""
+        first, second = broker_connection(), broker_connection()
+        with patch('pika.BlockingConnection', side_effect=[first, second]) as connect:
+            publisher.publish_batch([event('e-1')])
+            publisher.publish_batch([event('e-2')])
+            assert connect.call_count == 1
+
+            first.channel.return_value.is_open = False
+            publisher.publish_batch([event('e-3')])
+
+        assert connect.call_count == 2
+        second.channel.return_value.confirm_delivery.assert_called_once()
+
+    def test_nack_raises_publish_error(self, publisher):
+        """Prueba que un nack del broker hace fallar el lote sin reconectar"""
+        with patch('pika.BlockingConnection', return_value=broker_connection()) as connect:
+            channel = connect.return_value.channel.return_value
+            channel.basic_publish.side_effect = pika.exceptions.NackError([MagicMock(), MagicMock()])
+
+            with pytest.raises(PublishError, match="rechazó 2 mensajes") as error:
+                publisher.publish_batch([event('e-1'), event('e-2')])
+
+        assert error.value.unavailable is False
+        assert connect.call_count == 1
+
+    def test_reconnects_once_after_connection_error(self, publisher):
+        """Prueba que una conexión cerrada por el broker se reabre una vez y el lote se publica completo"""
+        stale, fresh = broker_connection(), broker_connection()
+        stale.channel.return_value.basic_publish.side_effect = pika.exceptions.StreamLostError('conexión perdida')
+        with patch('pika.BlockingConnection', side_effect=[stale, fresh]) as connect:
+            publisher.publish_batch([event('e-1'), event('e-2')])
+
+        assert connect.call_count == 2
+        stale.close.assert_called_once()
+        assert fresh.channel.return_value.basic_publish.call_count == 2
+        fresh.channel.return_value.confirm_delivery.assert_called_once()
+
+    def test_confirm_delivery_failure_retried(self, publisher):
+        """Prueba que un error al activar el modo confirm también reabre la conexión"""
+        stale, fresh = broker_connection(), broker_connection()
+        stale.channel.return_value.confirm_delivery.side_effect = pika.exceptions.ChannelClosedByBroker(406, 'PRECONDITION_FAILED')
+        with patch('pika.BlockingConnection', side_effect=[stale, fresh]):
+            publisher.publish_batch([event('e-1')])
+
+        stale.channel.return_value.basic_publish.assert_not_called()
+        fresh.channel.return_value.basic_publish.assert_called_once()
+
+    def test_second_connection_error_raises(self, publisher):
+        """Prueba que si la reconexión también falla el lote falla con PublishError"""
+        with patch('pika.BlockingConnection', side_effect=[
+            pika.exceptions.AMQPConnectionError('rechazada'), pika.exceptions.AMQPConnectionError('rechazada')
+        ]) as connect:
+            with pytest.raises(PublishError, match="Error de conexión con RabbitMQ") as error:
+                publisher.publish_batch([event('e-1')])
+
+        assert connect.call_count == 2
+        assert error.value.unavailable is True
+
+    def test_close(self, publisher):
+        """Prueba que close cierra la conexión abierta y la siguiente publicación abre otra"""
+        with patch('pika.BlockingConnection', side_effect=[broker_connection(), broker_connection()]) as connect:
+            publisher.publish_batch([event('e-1')])
+            first = publisher._connection
+            publisher.close()
+            publisher.publish_batch([event('e-2')])
+
+        first.close.assert_called_once()
+        assert connect.call_count == 2
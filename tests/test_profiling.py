@@ -0,0 +1,237 @@
+import os
+import signal
+import threading
+import time
+from collections import Counter
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from flask import Flask
+from flask_restful import Api
+from app.config.settings import Config
+from app.controllers.admin_controller import ProfilerController
+from app.exceptions.custom_exceptions import ProfilerBusyError
+from app.utils import profiling
+from app.utils.profiling import (
+    StackSampler, sample_stacks, render_collapsed, profile_to_file, install_signal_handler, init_request_profiling
+)
+
+
+def profiling_config(**overrides):
+    """Configuración mínima de perfilado"""
+    values = {
+        'ADMIN_TOKEN': 'secreto',
+        'PROFILE_ALLOWED_IPS': [],
+        'PROFILE_MAX_SECONDS': 5.0,
+        'PROFILE_SAMPLE_INTERVAL_MS': 1.0,
+        'PROFILE_STATS_LIMIT': 20,
+        'PROFILE_SIGNAL_ENABLED': True,
+        'PROFILE_SIGNAL_SECONDS': 0.05,
+        'PROFILE_OUTPUT_DIR': '/tmp'
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def busy_wait_for_profiler(stop):
+    while not stop.is_set():
+        sum(range(100))
+
+
+@pytest.fixture
+def busy_thread():
+    """Hilo ocupado con un nombre reconocible en las pilas"""
+    stop = threading.Event()
+    thread = threading.Thread(target=busy_wait_for_profiler, args=(stop,), name='busy-worker')
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+class TestStackSampler:
+    """Pruebas unitarias para el muestreador de pilas"""
+
+    def test_samples_other_threads(self, busy_thread):
+        """Prueba que las pilas incluyen el hilo y la función en ejecución"""
+        sampler = StackSampler(interval=0.001)
+        stacks = sampler.run(0.05)
+
+        assert sampler.samples > 1
+        busy = [stack for stack in stacks if stack.startswith('busy-worker;')]
+        assert busy
+        assert any('busy_wait_for_profiler (tests/test_profiling.py:' in stack for stack in busy)
+
+    def test_excludes_sampler_thread(self):
+        """Prueba que el hilo que muestrea no aparece en sus propias pilas"""
+        stacks = StackSampler(interval=0.001).run(0.01)
+
+        assert not any('test_excludes_sampler_thread' in stack for stack in stacks)
+
+    def test_render_collapsed_most_common_first(self):
+        """Prueba el formato 'pila N' ordenado por número de muestras"""
+        stacks = Counter({'main;a;b': 2, 'main;a;c': 5})
+
+        assert render_collapsed(stacks) == "main;a;c 5\nmain;a;b 2\n"
+
+    def test_concurrent_sampling_rejected(self):
+        """Prueba que un segundo muestreo simultáneo se rechaza"""
+        with profiling._sampling_lock:
+            with pytest.raises(ProfilerBusyError):
+                sample_stacks(0.01, 0.001)
+
+    def test_profile_to_file(self, tmp_path, busy_thread):
+        """Prueba que el perfilado por señal escribe un archivo collapsed"""
+        path = profile_to_file(0.02, 0.001, str(tmp_path / 'profiles'))
+
+        assert os.path.basename(path).startswith(f"providers-profile-{os.getpid()}-")
+        with open(path) as output:
+            assert 'busy-worker;' in output.read()
+
+    def test_profile_to_file_busy(self, tmp_path):
+        """Prueba que el perfilado por señal se descarta si hay otro en curso"""
+        with profiling._sampling_lock:
+            assert profile_to_file(0.01, 0.001, str(tmp_path)) is None
+        assert not os.listdir(tmp_path)
+
+
+class TestProfileSignal:
+    """Pruebas unitarias para el perfilado disparado por señal"""
+
+    @pytest.fixture(autouse=True)
+    def restore_handler(self):
+        previous = signal.getsignal(signal.SIGUSR2)
+        yield
+        signal.signal(signal.SIGUSR2, previous)
+
+    def test_disabled_by_default(self):
+        """Prueba que sin PROFILE_SIGNAL_ENABLED no se registra el manejador"""
+        assert install_signal_handler(profiling_config(PROFILE_SIGNAL_ENABLED=False)) is False
+
+    def test_signal_writes_profile(self, tmp_path):
+        """Prueba que SIGUSR2 muestrea el proceso en segundo plano"""
+        assert install_signal_handler(profiling_config(PROFILE_OUTPUT_DIR=str(tmp_path))) is True
+
+        os.kill(os.getpid(), signal.SIGUSR2)
+        deadline = time.monotonic() + 5
+        while not os.listdir(tmp_path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert [name for name in os.listdir(tmp_path) if name.endswith('.folded')]
+
+    def test_requires_main_thread(self):
+        """Prueba que fuera del hilo principal no se registra el manejador"""
+        result = []
+        thread = threading.Thread(target=lambda: result.append(install_signal_handler(profiling_config())))
+        thread.start()
+        thread.join()
+
+        assert result == [False]
+
+
+class TestProfilerController:
+    """Pruebas unitarias para el endpoint de muestreo"""
+
+    @pytest.fixture
+    def client(self):
+        app = Flask(__name__)
+        Api(app).add_resource(ProfilerController, '/providers/admin/profile')
+        with patch.object(Config, 'ADMIN_TOKEN', 'secreto'), patch.object(Config, 'PROFILE_MAX_SECONDS', 5.0):
+            yield app.test_client()
+
+    def test_hidden_without_admin_token(self, client):
+        """Prueba que sin ADMIN_TOKEN configurado el endpoint responde 404"""
+        with patch.object(Config, 'ADMIN_TOKEN', ''):
+            response = client.get('/providers/admin/profile', headers={'X-Admin-Token': ''})
+
+        assert response.status_code == 404
+
+    def test_invalid_token(self, client):
+        """Prueba que un token inválido responde 401"""
+        response = client.get('/providers/admin/profile?seconds=0.01', headers={'X-Admin-Token': 'otro'})
+
+        assert response.status_code == 401
+
+    def test_returns_collapsed_stacks(self, client, busy_thread):
+        """Prueba que el endpoint retorna las pilas en texto plano"""
+        response = client.get(
+            '/providers/admin/profile?seconds=0.05&interval_ms=1', headers={'X-Admin-Token': 'secreto'}
+        )
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        assert int(response.headers['X-Profile-Samples']) > 1
+        assert 'busy-worker;' in response.get_data(as_text=True)
+
+    @pytest.mark.parametrize('query', ['seconds=0', 'seconds=10', 'seconds=1&interval_ms=0'])
+    def test_invalid_parameters(self, client, query):
+        """Prueba que la duración y el intervalo se validan"""
+        response = client.get(f'/providers/admin/profile?{query}', headers={'X-Admin-Token': 'secreto'})
+
+        assert response.status_code == 400
+
+    def test_busy(self, client):
+        """Prueba que un muestreo en curso responde 409"""
+        with profiling._sampling_lock:
+            response = client.get('/providers/admin/profile?seconds=0.01', headers={'X-Admin-Token': 'secreto'})
+
+        assert response.status_code == 409
+
+
+class TestRequestProfiling:
+    """Pruebas unitarias para el modo ?__profile=1"""
+
+    def make_client(self, config):
+        app = Flask(__name__)
+        init_request_profiling(app, config)
+
+        @app.route('/providers')
+        def providers():
+            return {'data': sum(range(1000))}
+
+        return app.test_client()
+
+    def test_profile_report_for_admin(self):
+        """Prueba que un administrador recibe el informe de cProfile en lugar de la respuesta"""
+        client = self.make_client(profiling_config())
+
+        response = client.get('/providers?__profile=1', headers={'X-Admin-Token': 'secreto'})
+        body = response.get_data(as_text=True)
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        assert response.headers['X-Profile'] == 'cProfile'
+        assert 'function calls' in body
+        assert 'providers' in body
+
+    def test_ignored_for_other_callers(self):
+        """Prueba que sin token ni IP permitida la petición se atiende normalmente"""
+        client = self.make_client(profiling_config())
+
+        response = client.get('/providers?__profile=1', headers={'X-Admin-Token': 'otro'})
+
+        assert response.get_json() == {'data': 499500}
+        assert 'X-Profile' not in response.headers
+
+    def test_allowed_ip(self):
+        """Prueba que las IPs de PROFILE_ALLOWED_IPS pueden perfilar sin token"""
+        client = self.make_client(profiling_config(ADMIN_TOKEN='', PROFILE_ALLOWED_IPS=['127.0.0.1']))
+
+        response = client.get('/providers?__profile=1')
+
+        assert response.headers['X-Profile'] == 'cProfile'
+
+    def test_sort_key(self):
+        """Prueba que __profile_sort elige el orden del informe"""
+        client = self.make_client(profiling_config())
+
+        response = client.get('/providers?__profile=1&__profile_sort=tottime', headers={'X-Admin-Token': 'secreto'})
+
+        assert 'Ordered by: internal time' in response.get_data(as_text=True)
+
+    def test_not_registered_without_allowed_callers(self):
+        """Prueba que sin ADMIN_TOKEN ni IPs permitidas no se registran hooks"""
+        app = Flask(__name__)
+        init_request_profiling(app, profiling_config(ADMIN_TOKEN=''))
+
+        assert not app.before_request_funcs
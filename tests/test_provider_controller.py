@@ -1,9 +1,11 @@
 import pytest
 from unittest.mock import patch, MagicMock
 from flask import Flask
-from app.controllers.provider_controller import ProviderController, ProviderDeleteAllController
+from app.controllers.provider_controller import (
+    ProviderController, ProviderDeleteAllController, ProviderLogoUploadController, ProviderJobController
+)
 from app.models.provider_model import Provider
-from app.exceptions.custom_exceptions import ValidationError, BusinessLogicError
+from app.exceptions.custom_exceptions import ValidationError, BusinessLogicError, NotFoundError
 from werkzeug.datastructures import FileStorage
 import io
 import json
@@ -56,8 +58,8 @@ class TestProviderController:
         assert isinstance(provider_controller, ProviderController)
         assert hasattr(provider_controller, 'provider_service')
     
-    @patch('app.controllers.provider_controller.ProviderService')
-    def test_get_provider_by_id_success(self, mock_service_class, provider_controller, sample_provider):
+    @patch('app.services.provider_service.ProviderService')
+    def test_get_provider_by_id_success(self, mock_service_class, app, provider_controller, sample_provider):
         """Prueba la obtención exitosa de un proveedor por ID"""
         mock_service = MagicMock()
         mock_service_class.return_value = mock_service
@@ -66,24 +68,26 @@ class TestProviderController:
         # Mock del servicio en la instancia del controlador
         provider_controller.provider_service = mock_service
 
-        result = provider_controller.get("test-id")
+        with app.test_request_context('/providers/test-id'):
+            result = provider_controller.get("test-id")
 
-        mock_service.get_by_id.assert_called_once_with("test-id")
+        mock_service.get_by_id.assert_called_once_with("test-id", fields=None)
         assert result[0]["message"] == "Proveedor obtenido exitosamente"
         assert result[0]["data"] == sample_provider.to_dict()
         assert result[1] == 200
     
-    def test_get_provider_by_id_not_found(self, provider_controller, mock_service):
+    def test_get_provider_by_id_not_found(self, app, provider_controller, mock_service):
         """Prueba la obtención de proveedor por ID cuando no se encuentra"""
         mock_service.get_by_id.return_value = None
         
-        result = provider_controller.get("test-id")
+        with app.test_request_context('/providers/test-id'):
+            result = provider_controller.get("test-id")
         
         assert result[0]["error"] == "Proveedor no encontrado"
         assert result[1] == 404
     
-    @patch('app.controllers.provider_controller.ProviderService')
-    def test_get_provider_by_id_service_error(self, mock_service_class, provider_controller):
+    @patch('app.services.provider_service.ProviderService')
+    def test_get_provider_by_id_service_error(self, mock_service_class, app, provider_controller):
         """Prueba la obtención de proveedor por ID con error del servicio"""
         mock_service = MagicMock()
         mock_service_class.return_value = mock_service
@@ -92,11 +96,13 @@ class TestProviderController:
         # Mock del servicio en la instancia del controlador
         provider_controller.provider_service = mock_service
         
-        with patch.object(provider_controller, 'handle_exception') as mock_handle:
+        with app.test_request_context('/providers/test-id'), \
+                patch.object(provider_controller, 'handle_exception') as mock_handle:
             mock_handle.return_value = ({"error": "Error temporal"}, 500)
             result = provider_controller.get("test-id")
             
             mock_handle.assert_called_once()
+            mock_service.get_by_id.assert_called_once_with("test-id", fields=None)
             assert result[1] == 500
     
     def test_get_providers_list_success(self, app, provider_controller, mock_service, sample_provider):
@@ -112,7 +118,7 @@ class TestProviderController:
             assert "pagination" in result[0]["data"]
             assert result[1] == 200
     
-    @patch('app.controllers.provider_controller.ProviderService')
+    @patch('app.services.provider_service.ProviderService')
     def test_get_providers_list_invalid_page(self, mock_service_class, app, provider_controller):
         """Prueba la obtención de lista con página inválida"""
         mock_service = MagicMock()
@@ -124,7 +130,7 @@ class TestProviderController:
             assert result[0]["error"] == "El parámetro 'page' debe ser mayor a 0"
             assert result[1] == 400
     
-    @patch('app.controllers.provider_controller.ProviderService')
+    @patch('app.services.provider_service.ProviderService')
     def test_get_providers_list_invalid_per_page(self, mock_service_class, app, provider_controller):
         """Prueba la obtención de lista con per_page inválido"""
         mock_service = MagicMock()
@@ -136,7 +142,7 @@ class TestProviderController:
             assert result[0]["error"] == "El parámetro 'per_page' debe estar entre 1 y 100"
             assert result[1] == 400
     
-    @patch('app.controllers.provider_controller.ProviderService')
+    @patch('app.services.provider_service.ProviderService')
     def test_get_providers_list_service_error(self, mock_service_class, app, provider_controller):
         """Prueba la obtención de lista con error del servicio"""
         mock_service = MagicMock()
@@ -154,7 +160,7 @@ class TestProviderController:
                 mock_handle.assert_called_once()
                 assert result[1] == 500
     
-    @patch('app.controllers.provider_controller.ProviderService')
+    @patch('app.services.provider_service.ProviderService')
     def test_post_json_success(self, mock_service_class, app, provider_controller, sample_provider):
         """Prueba la creación exitosa con JSON"""
         mock_service = MagicMock()
@@ -175,7 +181,7 @@ class TestProviderController:
             assert result[0]["data"] == sample_provider.to_dict()
             assert result[1] == 201
     
-    @patch('app.controllers.provider_controller.ProviderService')
+    @patch('app.services.provider_service.ProviderService')
     def test_post_multipart_success(self, mock_service_class, app, provider_controller, sample_provider, sample_file_storage):
         """Prueba la creación exitosa con multipart"""
         mock_service = MagicMock()
@@ -204,7 +210,7 @@ class TestProviderController:
                 assert result[0]["data"] == sample_provider.to_dict()
                 assert result[1] == 201
     
-    @patch('app.controllers.provider_controller.ProviderService')
+    @patch('app.services.provider_service.ProviderService')
     def test_post_validation_error(self, mock_service_class, app, provider_controller):
         """Prueba la creación con error de validación"""
         mock_service = MagicMock()
@@ -224,7 +230,7 @@ class TestProviderController:
             assert result[0]["error"] == "Error de validación"
             assert result[1] == 400
     
-    @patch('app.controllers.provider_controller.ProviderService')
+    @patch('app.services.provider_service.ProviderService')
     def test_post_business_logic_error(self, mock_service_class, app, provider_controller):
         """Prueba la creación con error de lógica de negocio"""
         mock_service = MagicMock()
@@ -244,7 +250,7 @@ class TestProviderController:
             assert result[0]["error"] == "Error de negocio: Error de negocio"
             assert result[1] == 500
     
-    @patch('app.controllers.provider_controller.ProviderService')
+    @patch('app.services.provider_service.ProviderService')
     def test_post_generic_error(self, mock_service_class, app, provider_controller):
         """Prueba la creación con error genérico"""
         mock_service = MagicMock()
@@ -264,7 +270,7 @@ class TestProviderController:
             assert result[0]["error"] == "Error del sistema: Error genérico"
             assert result[1] == 500
     
-    @patch('app.controllers.provider_controller.ProviderService')
+    @patch('app.services.provider_service.ProviderService')
     def test_post_invalid_content_type(self, mock_service_class, app, provider_controller):
         """Prueba la creación con tipo de contenido inválido"""
         mock_service = MagicMock()
@@ -276,7 +282,7 @@ class TestProviderController:
             assert result[0]["error"] == "Content-Type no soportado. Use application/json o multipart/form-data"
             assert result[1] == 400
     
-    @patch('app.controllers.provider_controller.ProviderService')
+    @patch('app.services.provider_service.ProviderService')
     def test_post_json_malformed(self, mock_service_class, app, provider_controller):
         """Prueba la creación con JSON malformado"""
         mock_service = MagicMock()
@@ -304,6 +310,22 @@ class TestProviderController:
             assert result["email"] == "test@farmacia.com"
             assert result["phone"] == "3001234567"
             assert result["logo_file"] is None
+            assert result["uploaded_logo_filename"] is None
+            assert result["uploaded_logo_token"] is None
+    
+    def test_process_json_request_with_uploaded_logo(self, app, provider_controller):
+        """Prueba el procesamiento de request JSON con logo subido por URL firmada"""
+        with app.test_request_context(json={
+            "name": "Farmacia Test",
+            "email": "test@farmacia.com",
+            "phone": "3001234567",
+            "logo_filename": " logo_1.png ",
+            "logo_upload_token": "token"
+        }):
+            result = provider_controller._process_json_request()
+            
+            assert result["uploaded_logo_filename"] == "logo_1.png"
+            assert result["uploaded_logo_token"] == "token"
     
     def test_process_multipart_request(self, app, provider_controller, sample_file_storage):
         """Prueba el procesamiento de request multipart"""
@@ -363,13 +385,14 @@ class TestProviderDeleteAllController:
     
     def test_delete_all_success(self, delete_controller, mock_service):
         """Prueba la eliminación exitosa de todos los proveedores"""
-        mock_service.delete_all.return_value = 5
+        mock_service.delete_all.return_value = {'deleted_count': 5, 'cleanup_job': {'id': 'job-1'}}
 
         result = delete_controller.delete()
 
         mock_service.delete_all.assert_called_once()
         assert result[0]["message"] == "Se eliminaron 5 proveedores exitosamente"
         assert result[0]["data"]["deleted_count"] == 5
+        assert result[0]["data"]["cleanup_job"] == {'id': 'job-1'}
         assert result[1] == 200
     
     def test_delete_all_service_error(self, delete_controller, mock_service):
@@ -383,10 +406,135 @@ class TestProviderDeleteAllController:
     
     def test_delete_all_zero_providers(self, delete_controller, mock_service):
         """Prueba la eliminación cuando no hay proveedores"""
-        mock_service.delete_all.return_value = 0
+        mock_service.delete_all.return_value = {'deleted_count': 0, 'cleanup_job': None}
 
         result = delete_controller.delete()
 
         assert result[0]["message"] == "Se eliminaron 0 proveedores exitosamente"
         assert result[0]["data"]["deleted_count"] == 0
         assert result[1] == 200
+
+
+class TestProviderLogoUploadController:
+    """Pruebas unitarias para ProviderLogoUploadController"""
+    
+    @pytest.fixture
+    def app(self):
+        """Fixture para aplicación Flask"""
+        app = Flask(__name__)
+        app.config['TESTING'] = True
+        return app
+    
+    @pytest.fixture
+    def mock_service(self):
+        """Fixture para mock del ProviderService"""
+        return MagicMock()
+    
+    @pytest.fixture
+    def upload_controller(self, mock_service):
+        """Fixture para ProviderLogoUploadController con servicio mockeado"""
+        return ProviderLogoUploadController(provider_service=mock_service)
+    
+    def test_post_success(self, app, upload_controller, mock_service):
+        """Prueba la generación exitosa de URL de subida"""
+        mock_service.create_logo_upload_url.return_value = {
+            'logo_filename': 'logo_1.png',
+            'upload_url': 'https://upload',
+            'method': 'PUT'
+        }
+        
+        with app.test_request_context(json={'filename': 'logo.png'}):
+            result = upload_controller.post()
+        
+        mock_service.create_logo_upload_url.assert_called_once_with('logo.png')
+        assert result[0]["data"]["logo_filename"] == 'logo_1.png'
+        assert result[1] == 201
+    
+    def test_post_missing_filename(self, app, upload_controller, mock_service):
+        """Prueba la generación de URL de subida sin nombre de archivo"""
+        with app.test_request_context(json={}):
+            result = upload_controller.post()
+        
+        assert result[1] == 400
+        mock_service.create_logo_upload_url.assert_not_called()
+    
+    def test_post_validation_error(self, app, upload_controller, mock_service):
+        """Prueba la generación de URL de subida con extensión inválida"""
+        mock_service.create_logo_upload_url.side_effect = ValidationError("Extensión no permitida")
+        
+        with app.test_request_context(json={'filename': 'doc.pdf'}):
+            result = upload_controller.post()
+        
+        assert result[0]["error"] == "Extensión no permitida"
+        assert result[1] == 400
+
+
+class TestProviderDeleteController:
+    """Pruebas unitarias para DELETE /providers/{id}"""
+    
+    @pytest.fixture
+    def mock_service(self):
+        """Fixture para mock del ProviderService"""
+        return MagicMock()
+    
+    @pytest.fixture
+    def controller(self, mock_service):
+        """Fixture para ProviderController con servicio mockeado"""
+        return ProviderController(provider_service=mock_service)
+    
+    def test_delete_success(self, controller, mock_service):
+        """Prueba la eliminación exitosa de un proveedor"""
+        mock_service.delete.return_value = {'id': 'p-1', 'cleanup_job': None}
+        
+        result = controller.delete('p-1')
+        
+        mock_service.delete.assert_called_once_with('p-1')
+        assert result[0]["data"]["id"] == 'p-1'
+        assert result[1] == 200
+    
+    def test_delete_not_found(self, controller, mock_service):
+        """Prueba la eliminación de un proveedor inexistente"""
+        mock_service.delete.side_effect = NotFoundError("Proveedor no encontrado")
+        
+        result = controller.delete('missing')
+        
+        assert result[0]["error"] == "Proveedor no encontrado"
+        assert result[1] == 404
+    
+    def test_delete_without_id(self, controller, mock_service):
+        """Prueba DELETE /providers sin ID"""
+        result = controller.delete()
+        
+        assert result[1] == 400
+        mock_service.delete.assert_not_called()
+
+
+class TestProviderJobController:
+    """Pruebas unitarias para ProviderJobController"""
+    
+    @pytest.fixture
+    def mock_service(self):
+        """Fixture para mock del ProviderService"""
+        return MagicMock()
+    
+    @pytest.fixture
+    def job_controller(self, mock_service):
+        """Fixture para ProviderJobController con servicio mockeado"""
+        return ProviderJobController(provider_service=mock_service)
+    
+    def test_get_job_success(self, job_controller, mock_service):
+        """Prueba obtener el progreso de un trabajo"""
+        mock_service.get_job.return_value = {'id': 'job-1', 'status': 'running', 'progress': 50.0}
+        
+        result = job_controller.get('job-1')
+        
+        assert result[0]["data"]["progress"] == 50.0
+        assert result[1] == 200
+    
+    def test_get_job_not_found(self, job_controller, mock_service):
+        """Prueba obtener un trabajo inexistente"""
+        mock_service.get_job.return_value = None
+        
+        result = job_controller.get('missing')
+        
+        assert result[1] == 404
@@ -1,8 +1,10 @@
 import pytest
 from unittest.mock import patch, MagicMock, call
 from app.repositories.provider_repository import ProviderRepository, ProviderDB
+from app.repositories.migrations import upgrade_database
 from app.models.provider_model import Provider
 from app.exceptions.custom_exceptions import ValidationError, BusinessLogicError
+from sqlalchemy import inspect
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime
 import uuid
@@ -378,25 +380,22 @@ class TestProviderRepository:
         """Prueba eliminación exitosa de todos los proveedores"""
         mock_session = MagicMock()
         mock_get_session.return_value = mock_session
-        
-        # Mock del query
-        mock_query = MagicMock()
-        mock_query.count.return_value = 5  # Simular que hay 5 proveedores antes de eliminar
-        mock_query.delete.return_value = 5  # Simular que se eliminaron 5 proveedores
-        mock_session.query.return_value = mock_query
-        mock_session.commit.return_value = None
+        mock_session.execute.return_value.all.return_value = [
+            MagicMock(id=f'p-{i}', logo_filename=None) for i in range(5)
+        ]
         
         result = provider_repository.delete_all()
         
-        # Verificar que se llamó count, delete y commit
-        # El método delete_all llama a query dos veces: una para count y otra para delete
-        assert mock_session.query.call_count == 2
-        mock_query.count.assert_called_once()
-        mock_query.delete.assert_called_once()
+        # Una sola sentencia DELETE ... RETURNING (sin SELECT count(*) previo) y las lápidas en la misma transacción
+        statements = [str(c.args[0]) for c in mock_session.execute.call_args_list]
+        assert statements[0].startswith("DELETE FROM providers RETURNING providers.id")
+        assert statements[-1].startswith("INSERT INTO provider_tombstones")
+        assert len(mock_session.execute.call_args_list[-1].args[1]) == 5
+        mock_session.query.assert_not_called()
         mock_session.commit.assert_called_once()
         mock_session.close.assert_called_once()
         
-        # Verificar que se retornó el número de registros que había antes de eliminar
+        # Verificar que se retornó el número de registros eliminados
         assert result == 5
     
     @patch('app.repositories.provider_repository.ProviderRepository._get_session')
@@ -405,8 +404,8 @@ class TestProviderRepository:
         mock_session = MagicMock()
         mock_get_session.return_value = mock_session
         
-        # Mock del query para lanzar excepción
-        mock_session.query.side_effect = SQLAlchemyError("Database error")
+        # Mock de la sentencia para lanzar excepción
+        mock_session.execute.side_effect = SQLAlchemyError("Database error")
         
         with pytest.raises(Exception) as exc_info:
             provider_repository.delete_all()
@@ -414,6 +413,161 @@ class TestProviderRepository:
         assert "Error al eliminar todos los proveedores" in str(exc_info.value)
         mock_session.close.assert_called_once()
     
+    @patch('app.repositories.provider_repository.ProviderRepository._get_session')
+    def test_delete_all_truncate_on_postgresql(self, mock_get_session, provider_repository):
+        """Prueba el modo TRUNCATE: bloquea la tabla, lee los logos y vacía la tabla"""
+        mock_session = MagicMock()
+        mock_get_session.return_value = mock_session
+        provider_repository.engine.dialect.name = 'postgresql'
+        mock_session.execute.return_value.all.return_value = [
+            MagicMock(id='p-1', logo_filename='logo_1.png'), MagicMock(id='p-2', logo_filename=None)
+        ]
+        
+        result = provider_repository.delete_all_returning_logos(truncate=True)
+        
+        statements = [str(c.args[0]) for c in mock_session.execute.call_args_list]
+        assert statements[0].startswith("LOCK TABLE providers")
+        assert statements[2] == "TRUNCATE TABLE providers"
+        assert statements[-1].startswith("INSERT INTO provider_tombstones")
+        assert result == (2, ['logo_1.png'])
+    
+    @patch('app.repositories.provider_repository.ProviderRepository._get_session')
+    def test_delete_all_truncate_ignored_on_other_dialects(self, mock_get_session, provider_repository):
+        """Prueba que TRUNCATE se ignora fuera de PostgreSQL"""
+        mock_session = MagicMock()
+        mock_get_session.return_value = mock_session
+        provider_repository.engine.dialect.name = 'sqlite'
+        mock_session.execute.return_value.all.return_value = [MagicMock(id='p-1'), MagicMock(id='p-2')]
+        
+        assert provider_repository.delete_all(truncate=True) == 2
+        assert not any("TRUNCATE" in str(c.args[0]) for c in mock_session.execute.call_args_list)
+    
+    @patch('app.repositories.provider_repository.ProviderRepository._get_session')
+    def test_writes_bump_collection_version(self, mock_get_session, provider_repository):
+        """Prueba que las escrituras invalidan cachés y contadores en el mismo paso"""
+        from app.utils.collection_version import providers_version
+        mock_session = MagicMock()
+        mock_get_session.return_value = mock_session
+        mock_session.execute.return_value.all.return_value = [MagicMock(id='p-1', logo_filename=None)]
+        events = []
+        listener = lambda event, version: events.append(event)
+        providers_version.subscribe(listener)
+        try:
+            before = providers_version.value
+            assert provider_repository.delete_all() == 1
+            assert providers_version.value == before + 1
+            assert events == ['delete_all']
+        finally:
+            providers_version.unsubscribe(listener)
+    
+    @patch('app.repositories.provider_repository.ProviderRepository._get_session')
+    def test_delete_all_returning_logos_success(self, mock_get_session, provider_repository):
+        """Prueba la eliminación en una sola sentencia retornando los logos"""
+        mock_session = MagicMock()
+        mock_get_session.return_value = mock_session
+        mock_session.execute.return_value.all.return_value = [
+            MagicMock(id='p-1', logo_filename='logo_1.png'),
+            MagicMock(id='p-2', logo_filename=None),
+            MagicMock(id='p-3', logo_filename='logo_2.png')
+        ]
+        
+        result = provider_repository.delete_all_returning_logos()
+        
+        statements = [str(c.args[0]) for c in mock_session.execute.call_args_list]
+        assert [statement.split()[0] for statement in statements] == ['DELETE', 'DELETE', 'INSERT']
+        mock_session.query.assert_not_called()
+        mock_session.commit.assert_called_once()
+        mock_session.close.assert_called_once()
+        assert result == (3, ['logo_1.png', 'logo_2.png'])
+    
+    @patch('app.repositories.provider_repository.ProviderRepository._get_session')
+    def test_delete_all_returning_logos_database_error(self, mock_get_session, provider_repository):
+        """Prueba la eliminación retornando logos con error de base de datos"""
+        mock_session = MagicMock()
+        mock_get_session.return_value = mock_session
+        mock_session.execute.side_effect = SQLAlchemyError("Database error")
+        
+        with pytest.raises(Exception) as exc_info:
+            provider_repository.delete_all_returning_logos()
+        
+        assert "Error al eliminar todos los proveedores" in str(exc_info.value)
+        mock_session.rollback.assert_called_once()
+        mock_session.close.assert_called_once()
+    
+    @patch('app.repositories.provider_repository.ProviderRepository._get_session')
+    def test_delete_by_id_success(self, mock_get_session, provider_repository):
+        """Prueba la eliminación de un proveedor retornando su logo"""
+        mock_session = MagicMock()
+        mock_get_session.return_value = mock_session
+        mock_session.execute.return_value.first.return_value = MagicMock(logo_filename='logo_1.png')
+        
+        result = provider_repository.delete_by_id('p-1')
+        
+        mock_session.commit.assert_called_once()
+        assert result == (True, 'logo_1.png')
+    
+    @patch('app.repositories.provider_repository.ProviderRepository._get_session')
+    def test_delete_by_id_without_returning(self, mock_get_session, provider_repository):
+        """Prueba que sin RETURNING se lee la fila con bloqueo antes de eliminarla, como en delete_all"""
+        mock_session = MagicMock()
+        mock_get_session.return_value = mock_session
+        provider_repository.engine.dialect.delete_returning = False
+        mock_session.execute.return_value.first.return_value = MagicMock(logo_filename='logo_1.png')
+        
+        result = provider_repository.delete_by_id('p-1')
+        
+        statements = [str(c.args[0]) for c in mock_session.execute.call_args_list]
+        assert statements[0].startswith("SELECT providers.logo_filename")
+        assert statements[0].endswith("FOR UPDATE")
+        assert statements[1].startswith("DELETE FROM providers WHERE providers.id")
+        assert "RETURNING" not in statements[1]
+        assert result == (True, 'logo_1.png')
+    
+    @patch('app.repositories.provider_repository.ProviderRepository._get_session')
+    def test_delete_by_id_not_found(self, mock_get_session, provider_repository):
+        """Prueba la eliminación de un proveedor inexistente"""
+        mock_session = MagicMock()
+        mock_get_session.return_value = mock_session
+        mock_session.execute.return_value.first.return_value = None
+        
+        result = provider_repository.delete_by_id('missing')
+        
+        assert result == (False, None)
+    
+    def test_delete_returning_on_sqlite(self):
+        """Prueba DELETE ... RETURNING contra una base SQLite real en memoria"""
+        with patch('app.repositories.provider_repository.Config.SQLALCHEMY_DATABASE_URI', 'sqlite://'):
+            repository = ProviderRepository()
+        upgrade_database(repository.engine)
+        repository.create(name='Farmacia Uno', email='uno@farmacia.com', phone='3001234567', logo_filename='logo_1.png')
+        provider = repository.create(name='Farmacia Dos', email='dos@farmacia.com', phone='3001234568')
+        repository.create(name='Farmacia Tres', email='tres@farmacia.com', phone='3001234569', logo_filename='logo_3.png')
+        
+        assert repository.delete_by_id(provider.id) == (True, None)
+        deleted_count, logos = repository.delete_all_returning_logos()
+        
+        assert deleted_count == 2
+        assert sorted(logos) == ['logo_1.png', 'logo_3.png']
+        assert repository.count_all() == 0
+    
+    def test_initialization_runs_no_ddl(self):
+        """Prueba que construir el repositorio no crea tablas (el esquema es de las migraciones)"""
+        with patch('app.repositories.provider_repository.Config.SQLALCHEMY_DATABASE_URI', 'sqlite://'):
+            repository = ProviderRepository()
+        
+        assert not inspect(repository.engine).has_table('providers')
+    
+    def test_email_lookup_ignores_case_on_sqlite(self):
+        """Prueba que la búsqueda y la unicidad de email usan lower(email)"""
+        with patch('app.repositories.provider_repository.Config.SQLALCHEMY_DATABASE_URI', 'sqlite://'):
+            repository = ProviderRepository()
+        upgrade_database(repository.engine)
+        repository.create(name='Farmacia Uno', email='Uno@Farmacia.com', phone='3001234567')
+        
+        assert repository.get_by_email('uno@farmacia.COM').name == 'Farmacia Uno'
+        with pytest.raises(ValueError):
+            repository.create(name='Farmacia Otra', email='UNO@farmacia.com', phone='3001234568')
+    
     @patch('app.repositories.provider_repository.ProviderRepository._get_session')
     def test_count_all_success(self, mock_get_session, provider_repository):
         """Prueba conteo exitoso de todos los proveedores"""
@@ -1,6 +1,10 @@
+import time
 import pytest
 from unittest.mock import patch, MagicMock
+from itsdangerous import TimestampSigner
+from app.config.settings import Config
 from app.services.provider_service import ProviderService
+from app.utils.upload_token import issue_upload_token, verify_upload_token
 from app.models.provider_model import Provider
 from app.exceptions.custom_exceptions import ValidationError, BusinessLogicError
 from werkzeug.datastructures import FileStorage
@@ -64,7 +68,7 @@ class TestProviderService:
 
         result = provider_service.create(**sample_provider_data)
 
-        mock_repository.get_by_email.assert_called_once_with(sample_provider_data['email'])
+        mock_repository.get_by_email.assert_called_once_with(sample_provider_data['email'], use_primary=True)
         mock_repository.create.assert_called_once()
         assert isinstance(result, Provider)
     
@@ -127,7 +131,7 @@ class TestProviderService:
         
         result = provider_service.get_by_id("test-id")
         
-        mock_repository.get_by_id.assert_called_once_with("test-id")
+        mock_repository.get_by_id.assert_called_once_with("test-id", fields=None)
         assert result == sample_provider
     
     def test_get_by_id_not_found(self, provider_service, mock_repository):
@@ -136,7 +140,7 @@ class TestProviderService:
         
         result = provider_service.get_by_id("non-existent-id")
         
-        mock_repository.get_by_id.assert_called_once_with("non-existent-id")
+        mock_repository.get_by_id.assert_called_once_with("non-existent-id", fields=None)
         assert result is None
     
     def test_get_all_success(self, provider_service, mock_repository, sample_provider):
@@ -154,7 +158,7 @@ class TestProviderService:
         
         result = provider_service.get_providers_summary(limit=10, offset=0)
         
-        mock_repository.get_all.assert_called_once_with(limit=10, offset=0)
+        mock_repository.get_all.assert_called_once_with(limit=10, offset=0, fields=None)
         # get_providers_summary devuelve diccionarios, no objetos Provider
         expected = [{
             'id': sample_provider.id,
@@ -177,12 +181,88 @@ class TestProviderService:
     
     def test_delete_all_success(self, provider_service, mock_repository):
         """Prueba eliminar todos los proveedores exitosamente"""
-        mock_repository.delete_all.return_value = 3
+        mock_repository.delete_all_returning_logos.return_value = (3, [])
         
         result = provider_service.delete_all()
         
-        mock_repository.delete_all.assert_called_once()
-        assert result == 3
+        mock_repository.delete_all_returning_logos.assert_called_once()
+        assert result == {'deleted_count': 3, 'cleanup_job': None}
+    
+    def test_delete_all_schedules_logo_cleanup(self, mock_repository):
+        """Prueba que los logos eliminados se limpian del bucket en segundo plano"""
+        from app.services.job_service import JobService
+        
+        mock_storage = MagicMock()
+        mock_storage.delete_images.side_effect = lambda filenames, progress: progress(len(filenames), len(filenames))
+        job_service = JobService(max_workers=1)
+        mock_repository.delete_all_returning_logos.return_value = (3, ['logo_1.png', 'logo_2.png'])
+        service = ProviderService(provider_repository=mock_repository, cloud_storage_service=mock_storage,
+                                  job_service=job_service)
+        
+        result = service.delete_all()
+        job_service._executor.shutdown(wait=True)
+        
+        assert result['deleted_count'] == 3
+        assert result['cleanup_job']['total'] == 2
+        mock_storage.delete_images.assert_called_once()
+        assert mock_storage.delete_images.call_args[0][0] == ['logo_1.png', 'logo_2.png']
+        job = service.get_job(result['cleanup_job']['id'])
+        assert job['status'] == 'completed'
+        assert job['processed'] == 2
+        assert job['progress'] == 100.0
+    
+    def test_delete_all_truncate_strategy(self, provider_service, mock_repository):
+        """Prueba que DELETE_ALL_STRATEGY=truncate se respeta fuera de producción con la habilitación explícita"""
+        provider_service.config.DELETE_ALL_STRATEGY = 'truncate'
+        provider_service.config.DELETE_ALL_ALLOW_TRUNCATE = True
+        provider_service.config.ENVIRONMENT = 'testing'
+        mock_repository.delete_all_returning_logos.return_value = (0, [])
+        
+        provider_service.delete_all()
+        
+        mock_repository.delete_all_returning_logos.assert_called_once_with(truncate=True)
+    
+    def test_delete_all_truncate_ignored_in_production(self, provider_service, mock_repository):
+        """Prueba que TRUNCATE nunca se usa en producción"""
+        provider_service.config.DELETE_ALL_STRATEGY = 'truncate'
+        provider_service.config.DELETE_ALL_ALLOW_TRUNCATE = True
+        provider_service.config.ENVIRONMENT = 'production'
+        mock_repository.delete_all_returning_logos.return_value = (0, [])
+        
+        provider_service.delete_all()
+        
+        mock_repository.delete_all_returning_logos.assert_called_once_with(truncate=False)
+    
+    def test_delete_all_truncate_requires_opt_in(self, provider_service, mock_repository):
+        """Prueba que sin DELETE_ALL_ALLOW_TRUNCATE la estrategia truncate no se aplica (entorno por defecto)"""
+        provider_service.config.DELETE_ALL_STRATEGY = 'truncate'
+        mock_repository.delete_all_returning_logos.return_value = (0, [])
+        
+        provider_service.delete_all()
+        
+        mock_repository.delete_all_returning_logos.assert_called_once_with(truncate=False)
+    
+    def test_delete_success(self, mock_repository):
+        """Prueba eliminar un proveedor con logo"""
+        job_service = MagicMock()
+        job_service.submit.return_value.to_dict.return_value = {'id': 'job-1'}
+        mock_repository.delete_by_id.return_value = (True, 'logo_1.png')
+        service = ProviderService(provider_repository=mock_repository, cloud_storage_service=MagicMock(),
+                                  job_service=job_service)
+        
+        result = service.delete('provider-1')
+        
+        mock_repository.delete_by_id.assert_called_once_with('provider-1')
+        assert job_service.submit.call_args[0][:2] == ('logo_cleanup', 1)
+        assert result == {'id': 'provider-1', 'cleanup_job': {'id': 'job-1'}}
+    
+    def test_delete_not_found(self, provider_service, mock_repository):
+        """Prueba eliminar un proveedor inexistente"""
+        from app.exceptions.custom_exceptions import NotFoundError
+        mock_repository.delete_by_id.return_value = (False, None)
+        
+        with pytest.raises(NotFoundError):
+            provider_service.delete('missing')
     
     def test_validate_business_rules_success(self, provider_service, mock_repository):
         """Prueba la validación exitosa de reglas de negocio"""
@@ -197,7 +277,7 @@ class TestProviderService:
         # No debería lanzar excepción
         provider_service.validate_business_rules(**provider_data)
         
-        mock_repository.get_by_email.assert_called_once_with(provider_data['email'])
+        mock_repository.get_by_email.assert_called_once_with(provider_data['email'], use_primary=True)
     
     def test_validate_business_rules_validation_error(self, provider_service, mock_repository):
         """Prueba la validación con error de validación"""
@@ -304,7 +384,7 @@ class TestProviderService:
     
     def test_delete_all_with_repository_exception(self, provider_service, mock_repository):
         """Prueba la eliminación de todos con excepción del repositorio"""
-        mock_repository.delete_all.side_effect = Exception("Error de base de datos")
+        mock_repository.delete_all_returning_logos.side_effect = Exception("Error de base de datos")
         
         with pytest.raises(BusinessLogicError, match="Error al eliminar todos los proveedores"):
             provider_service.delete_all()
@@ -342,4 +422,101 @@ class TestProviderService:
         # No debería lanzar excepción
         provider_service.validate_business_rules(**provider_data)
         
-        mock_repository.get_by_email.assert_called_once_with(provider_data['email'])
+        mock_repository.get_by_email.assert_called_once_with(provider_data['email'], use_primary=True)
+    
+    def test_create_with_uploaded_logo_filename(self, provider_service, mock_repository):
+        """Prueba la creación confirmando un logo subido con URL firmada"""
+        mock_repository.get_by_email.return_value = None
+        mock_repository.logo_filename_in_use.return_value = False
+        mock_repository.create.return_value = MagicMock()
+        provider_service.cloud_storage_service = MagicMock()
+        provider_service.cloud_storage_service.confirm_upload.return_value = (True, "ok", "https://signed/logo_1.png")
+        
+        provider_service.create(
+            name='Farmacia Test', email='test@farmacia.com', phone='3001234567', logo_file=None,
+            uploaded_logo_filename='logo_1.png', uploaded_logo_token=issue_upload_token('logo_1.png', Config.SECRET_KEY)
+        )
+        
+        provider_service.cloud_storage_service.confirm_upload.assert_called_once_with('logo_1.png')
+        mock_repository.logo_filename_in_use.assert_called_once_with('logo_1.png')
+        create_kwargs = mock_repository.create.call_args.kwargs
+        assert create_kwargs['logo_filename'] == 'logo_1.png'
+        assert create_kwargs['logo_url'] == 'https://signed/logo_1.png'
+        assert 'uploaded_logo_filename' not in create_kwargs
+        assert 'uploaded_logo_token' not in create_kwargs
+    
+    def test_create_with_unconfirmed_uploaded_logo(self, provider_service, mock_repository):
+        """Prueba la creación cuando el logo subido no se puede confirmar"""
+        mock_repository.get_by_email.return_value = None
+        mock_repository.logo_filename_in_use.return_value = False
+        provider_service.cloud_storage_service = MagicMock()
+        provider_service.cloud_storage_service.confirm_upload.return_value = (False, "La imagen no ha sido subida al bucket", None)
+        
+        with pytest.raises(BusinessLogicError, match="Error al confirmar imagen"):
+            provider_service.create(
+                name='Farmacia Test', email='test@farmacia.com', phone='3001234567',
+                uploaded_logo_token=issue_upload_token('logo_1.png', Config.SECRET_KEY)
+            )
+        mock_repository.create.assert_not_called()
+    
+    def test_confirm_uploaded_logo_rejects_foreign_filename(self, provider_service):
+        """Prueba que solo se aceptan nombres de logo generados por el servicio"""
+        provider_service.cloud_storage_service = MagicMock()
+        
+        with pytest.raises(ValidationError, match="no es válido"):
+            provider_service._confirm_uploaded_logo(issue_upload_token('../otro/archivo.png', Config.SECRET_KEY))
+        provider_service.cloud_storage_service.confirm_upload.assert_not_called()
+    
+    @pytest.mark.parametrize('token, filename, message', [
+        (None, 'logo_1.png', 'logo_upload_token'),
+        ('falso', None, 'no es válido'),
+        (issue_upload_token('logo_1.png', 'otra-clave'), None, 'no es válido'),
+        (issue_upload_token('logo_2.png', Config.SECRET_KEY), 'logo_1.png', 'no corresponde'),
+    ])
+    def test_confirm_uploaded_logo_requires_upload_token(self, provider_service, token, filename, message):
+        """Prueba que el logo solo se confirma con el token firmado entregado al generar la URL de subida"""
+        provider_service.cloud_storage_service = MagicMock()
+        
+        with pytest.raises(ValidationError, match=message):
+            provider_service._confirm_uploaded_logo(token, filename)
+        provider_service.cloud_storage_service.confirm_upload.assert_not_called()
+    
+    def test_confirm_uploaded_logo_expired_token(self, provider_service):
+        """Prueba que un token más antiguo que LOGO_UPLOAD_TOKEN_MAX_AGE_SECONDS se rechaza"""
+        with patch.object(TimestampSigner, 'get_timestamp', return_value=int(time.time()) - 120):
+            token = issue_upload_token('logo_1.png', Config.SECRET_KEY)
+        
+        with patch.object(Config, 'LOGO_UPLOAD_TOKEN_MAX_AGE_SECONDS', 60):
+            with pytest.raises(ValidationError, match='venció'):
+                provider_service._confirm_uploaded_logo(token)
+    
+    def test_confirm_uploaded_logo_already_referenced(self, provider_service, mock_repository):
+        """Prueba que un logo ya asociado a otro proveedor no se puede reutilizar"""
+        mock_repository.logo_filename_in_use.return_value = True
+        provider_service.cloud_storage_service = MagicMock()
+        
+        with pytest.raises(ValidationError, match='ya está asociado'):
+            provider_service._confirm_uploaded_logo(issue_upload_token('logo_1.png', Config.SECRET_KEY))
+        provider_service.cloud_storage_service.confirm_upload.assert_not_called()
+    
+    def test_create_logo_upload_url(self, provider_service):
+        """Prueba la generación de URL de subida directa del logo"""
+        provider_service.cloud_storage_service = MagicMock()
+        provider_service.cloud_storage_service.generate_upload_url.return_value = {
+            'upload_url': 'https://upload', 'method': 'PUT'
+        }
+        
+        result = provider_service.create_logo_upload_url('Mi Logo.JPG')
+        
+        filename, content_type = provider_service.cloud_storage_service.generate_upload_url.call_args.args
+        assert filename.startswith('logo_') and filename.endswith('.jpg')
+        assert content_type == 'image/jpeg'
+        assert result['logo_filename'] == filename
+        assert result['upload_url'] == 'https://upload'
+        assert verify_upload_token(result['logo_upload_token'], Config.SECRET_KEY, 60) == filename
+    
+    def test_create_logo_upload_url_invalid_extension(self, provider_service):
+        """Prueba la generación de URL de subida con extensión no permitida"""
+        with pytest.raises(ValidationError):
+            provider_service.create_logo_upload_url('documento.pdf')
+
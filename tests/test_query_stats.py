@@ -0,0 +1,259 @@
+import json
+import logging
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from flask import Flask
+from flask_restful import Api
+from sqlalchemy import create_engine, text
+from app.config.settings import Config
+from app.controllers.admin_controller import QueryStatsController
+from app.utils.query_stats import (
+    QueryStats, query_stats, normalize_statement, redact_parameters, is_locking_read, instrument_engine
+)
+
+
+def stats_config(**overrides):
+    """Configuración mínima de estadísticas de consultas"""
+    values = {
+        'QUERY_STATS_ENABLED': True,
+        'QUERY_STATS_MAX_SHAPES': 500,
+        'SLOW_QUERY_THRESHOLD_MS': 0.0,
+        'SLOW_QUERY_EXPLAIN': True
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+@pytest.fixture(autouse=True)
+def reset_query_stats():
+    query_stats.reset()
+    yield
+    query_stats.reset()
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Engine SQLite en disco (el plan se captura desde otra conexión)"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'queries.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE providers (id TEXT PRIMARY KEY, email TEXT, name TEXT)"))
+        connection.execute(text("INSERT INTO providers VALUES ('1', 'a@test.com', 'Alfa')"))
+    yield engine
+    engine.dispose()
+
+
+class TestNormalization:
+    """Pruebas unitarias para la forma de las sentencias"""
+
+    @pytest.mark.parametrize('statement, shape', [
+        ("SELECT * FROM providers WHERE email = %(email_1)s LIMIT %(param_1)s",
+         "SELECT * FROM providers WHERE email = ? LIMIT ?"),
+        ("SELECT providers.id FROM providers\n  WHERE providers.name = 'Alfa' OFFSET 20",
+         "SELECT providers.id FROM providers WHERE providers.name = ? OFFSET ?"),
+        ("SELECT * FROM providers WHERE id IN (?, ?, ?)", "SELECT * FROM providers WHERE id IN (?, ...)"),
+        ("SELECT * FROM providers WHERE id IN (%(id_1_1)s, %(id_1_2)s)", "SELECT * FROM providers WHERE id IN (?, ...)"),
+        ("SELECT anon_1.id FROM t WHERE x = $1 AND y::text = :name", "SELECT anon_1.id FROM t WHERE x = ? AND y::text = ?"),
+    ])
+    def test_normalize_statement(self, statement, shape):
+        """Prueba que literales y parámetros no distinguen formas"""
+        assert normalize_statement(statement) == shape
+
+    def test_redact_parameters(self):
+        """Prueba que solo se conservan nombres y tipos"""
+        assert redact_parameters({'email_1': 'a@test.com', 'param_1': 1}) == {'email_1': 'str', 'param_1': 'int'}
+        assert redact_parameters(('a@test.com',)) == ['str']
+        assert redact_parameters([{'id': 1}, {'id': 2}], executemany=True) == "<2 filas>"
+
+    @pytest.mark.parametrize('statement, locking', [
+        ("SELECT * FROM providers WHERE id = %(id_1)s FOR UPDATE", True),
+        ("SELECT id FROM provider_outbox ORDER BY created_at LIMIT 10\nFOR UPDATE SKIP LOCKED", True),
+        ("SELECT * FROM providers for no key update nowait", True),
+        ("SELECT * FROM providers FOR SHARE", True),
+        ("SELECT * FROM providers WHERE name = 'for update'", False),
+        ("SELECT * FROM providers_for_update", False),
+    ])
+    def test_is_locking_read(self, statement, locking):
+        """Prueba que se reconocen las lecturas que bloquean filas"""
+        assert is_locking_read(statement) is locking
+
+
+class TestQueryStats:
+    """Pruebas unitarias para la acumulación por forma"""
+
+    def test_aggregates_by_shape(self):
+        """Prueba que ejecuciones con distintos valores se acumulan en la misma forma"""
+        stats = QueryStats()
+        stats.record("SELECT * FROM providers WHERE id = '1'", 10.0)
+        stats.record("SELECT * FROM providers WHERE id = '2'", 30.0, slow=True)
+        stats.record("SELECT count(*) FROM providers", 5.0, failed=True)
+
+        first, second = stats.snapshot()
+
+        assert first['statement'] == "SELECT * FROM providers WHERE id = ?"
+        assert (first['calls'], first['total_ms'], first['mean_ms'], first['max_ms'], first['slow_calls']) == (2, 40.0, 20.0, 30.0, 1)
+        assert second['errors'] == 1
+
+    def test_sort_and_limit(self):
+        """Prueba el orden por llamadas y el límite"""
+        stats = QueryStats()
+        stats.record("SELECT 1", 100.0)
+        for _ in range(3):
+            stats.record("SELECT * FROM providers", 1.0)
+
+        result = stats.snapshot(sort='calls', limit=1)
+
+        assert [stat['statement'] for stat in result] == ["SELECT * FROM providers"]
+
+    def test_max_shapes(self):
+        """Prueba que las formas nuevas se descartan al alcanzar el máximo"""
+        stats = QueryStats(max_shapes=1)
+        stats.record("SELECT * FROM a", 1.0)
+
+        assert stats.record("SELECT * FROM b", 1.0) is None
+        assert stats.dropped == 1
+        assert len(stats.snapshot()) == 1
+
+
+class TestEngineInstrumentation:
+    """Pruebas unitarias para los eventos del engine"""
+
+    def test_records_every_statement(self, engine):
+        """Prueba que cada sentencia se mide y agrupa por forma"""
+        instrument_engine(engine, stats_config(SLOW_QUERY_THRESHOLD_MS=10000))
+        with engine.connect() as connection:
+            for email in ('a@test.com', 'b@test.com'):
+                connection.execute(text("SELECT * FROM providers WHERE email = :email"), {'email': email})
+
+        stat, = [stat for stat in query_stats.snapshot() if 'email' in stat['statement']]
+
+        assert stat['calls'] == 2
+        assert stat['slow_calls'] == 0
+        assert stat['explain'] is None
+
+    def test_slow_query_logged_with_redacted_parameters(self, engine, caplog):
+        """Prueba que las sentencias lentas se registran sin valores de parámetros"""
+        instrument_engine(engine, stats_config(SLOW_QUERY_EXPLAIN=False))
+        with caplog.at_level(logging.WARNING, logger='app.slow_query'):
+            with engine.connect() as connection:
+                connection.execute(text("SELECT * FROM providers WHERE email = :email"), {'email': 'secreto@test.com'})
+
+        entries = [json.loads(record.message) for record in caplog.records if record.name == 'app.slow_query']
+
+        assert entries[0]['event'] == 'slow_query'
+        assert entries[0]['statement'] == "SELECT * FROM providers WHERE email = ?"
+        assert entries[0]['parameters'] == ['str']
+        assert 'secreto@test.com' not in caplog.text
+
+    def test_explain_captured_once_per_shape(self, engine):
+        """Prueba que el plan se captura en la primera ocurrencia lenta de un SELECT"""
+        instrument_engine(engine, stats_config())
+        with patch.object(query_stats, '_explain', wraps=query_stats._explain) as explain:
+            with engine.connect() as connection:
+                for email in ('a@test.com', 'b@test.com'):
+                    connection.execute(text("SELECT * FROM providers WHERE email = :email"), {'email': email})
+            query_stats.wait_for_explains(timeout=5)
+
+        stat, = [stat for stat in query_stats.snapshot() if 'email' in stat['statement']]
+
+        assert explain.call_count == 1
+        assert stat['explain']['status'] == 'captured'
+        assert any('providers' in line for line in stat['explain']['plan'])
+        assert not any(stat['statement'].startswith('EXPLAIN') for stat in query_stats.snapshot())
+
+    def test_no_explain_for_writes(self, engine):
+        """Prueba que ANALYZE nunca se aplica a sentencias que modifican datos"""
+        instrument_engine(engine, stats_config())
+        with engine.begin() as connection:
+            connection.execute(text("UPDATE providers SET name = :name"), {'name': 'Beta'})
+
+        stat, = [stat for stat in query_stats.snapshot() if stat['statement'].startswith('UPDATE')]
+
+        assert stat['explain'] is None
+
+    def test_no_explain_for_locking_reads(self, engine):
+        """Prueba que ANALYZE no se aplica a lecturas con FOR UPDATE, que volverían a tomar los bloqueos"""
+        instrument_engine(engine, stats_config())
+        with patch.object(query_stats, '_explain') as explain:
+            # SQLite no acepta FOR UPDATE: la sentencia falla, pero igual se mide como lenta
+            with pytest.raises(Exception):
+                with engine.connect() as connection:
+                    connection.execute(text("SELECT * FROM providers FOR UPDATE SKIP LOCKED"))
+            query_stats.wait_for_explains(timeout=5)
+
+        stat, = [stat for stat in query_stats.snapshot() if 'SKIP LOCKED' in stat['statement']]
+
+        assert stat['slow_calls'] == 1
+        assert stat['explain'] is None
+        explain.assert_not_called()
+
+    def test_failed_statement(self, engine):
+        """Prueba que los errores se cuentan en la forma de la sentencia"""
+        instrument_engine(engine, stats_config(SLOW_QUERY_EXPLAIN=False))
+        with pytest.raises(Exception):
+            with engine.connect() as connection:
+                connection.execute(text("SELECT * FROM missing_table"))
+
+        stat, = [stat for stat in query_stats.snapshot() if 'missing_table' in stat['statement']]
+
+        assert stat['errors'] == 1
+
+    def test_disabled(self, engine):
+        """Prueba que sin QUERY_STATS_ENABLED no se registran eventos"""
+        instrument_engine(engine, stats_config(QUERY_STATS_ENABLED=False))
+        with engine.connect() as connection:
+            connection.execute(text("SELECT * FROM providers"))
+
+        assert query_stats.snapshot() == []
+
+
+class TestQueryStatsController:
+    """Pruebas unitarias para el endpoint de estadísticas de consultas"""
+
+    @pytest.fixture
+    def client(self):
+        app = Flask(__name__)
+        Api(app).add_resource(QueryStatsController, '/providers/admin/queries')
+        with patch.object(Config, 'ADMIN_TOKEN', 'secreto'):
+            yield app.test_client()
+
+    def test_hidden_without_admin_token(self, client):
+        """Prueba que sin ADMIN_TOKEN configurado el endpoint responde 404"""
+        with patch.object(Config, 'ADMIN_TOKEN', ''):
+            response = client.get('/providers/admin/queries')
+
+        assert response.status_code == 404
+
+    def test_invalid_token(self, client):
+        """Prueba que un token inválido responde 401"""
+        response = client.get('/providers/admin/queries', headers={'X-Admin-Token': 'otro'})
+
+        assert response.status_code == 401
+
+    def test_returns_sorted_shapes(self, client):
+        """Prueba que las formas se retornan ordenadas por el criterio pedido"""
+        query_stats.record("SELECT * FROM providers ORDER BY name OFFSET 10", 50.0)
+        query_stats.record("SELECT count(*) FROM providers", 80.0)
+
+        response = client.get('/providers/admin/queries?sort=max&limit=1', headers={'X-Admin-Token': 'secreto'})
+        data = response.get_json()['data']
+
+        assert response.status_code == 200
+        assert [query['statement'] for query in data['queries']] == ["SELECT count(*) FROM providers"]
+        assert data['dropped'] == 0
+
+    @pytest.mark.parametrize('query', ['sort=random', 'limit=0'])
+    def test_invalid_parameters(self, client, query):
+        """Prueba que el orden y el límite se validan"""
+        response = client.get(f'/providers/admin/queries?{query}', headers={'X-Admin-Token': 'secreto'})
+
+        assert response.status_code == 400
+
+    def test_reset(self, client):
+        """Prueba que DELETE reinicia las estadísticas"""
+        query_stats.record("SELECT 1", 1.0)
+
+        response = client.delete('/providers/admin/queries', headers={'X-Admin-Token': 'secreto'})
+
+        assert response.status_code == 200
+        assert query_stats.snapshot() == []
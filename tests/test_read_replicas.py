@@ -0,0 +1,127 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from sqlalchemy.exc import OperationalError
+from app.config.settings import Config
+from app.repositories.migrations import upgrade_database
+from app.repositories.provider_repository import ProviderRepository, get_engine, dispose_engines
+from app.repositories.read_replicas import ReplicaSet, get_replica_set
+
+
+def replica_config(**overrides):
+    values = dict(
+        DATABASE_READ_URLS=[],
+        DATABASE_READ_STRATEGY='round_robin',
+        DATABASE_READ_CHECK_INTERVAL_SECONDS=0,
+        DATABASE_READ_RETRY_SECONDS=30,
+        DATABASE_READ_MAX_LAG_SECONDS=0
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+@pytest.fixture
+def databases(tmp_path):
+    """Primario y dos réplicas SQLite; cada base tiene un proveedor distinto para saber de dónde se leyó"""
+    urls = {name: f"sqlite:///{tmp_path / (name + '.db')}" for name in ('primary', 'replica_a', 'replica_b')}
+    for name, url in urls.items():
+        engine = get_engine(url)
+        upgrade_database(engine)
+        with patch.object(Config, 'SQLALCHEMY_DATABASE_URI', url), patch.object(Config, 'DATABASE_READ_URLS', []):
+            ProviderRepository().create(name=name.replace('_', ' '), email=f"{name}@farmacia.com", phone='3001234567')
+    yield urls
+    dispose_engines()
+
+
+@pytest.fixture
+def repository(databases):
+    with patch.object(Config, 'SQLALCHEMY_DATABASE_URI', databases['primary']), \
+            patch.object(Config, 'DATABASE_READ_URLS', [databases['replica_a'], databases['replica_b']]), \
+            patch.object(Config, 'DATABASE_READ_CHECK_INTERVAL_SECONDS', 0):
+        yield ProviderRepository()
+
+
+class TestReadReplicas:
+    """Pruebas unitarias para el enrutamiento de lecturas a réplicas"""
+
+    def test_no_replicas_configured(self):
+        """Prueba que sin DATABASE_READ_URLS no hay réplicas"""
+        assert get_replica_set(replica_config(), get_engine) is None
+
+    def test_reads_round_robin_across_replicas(self, repository):
+        """Prueba que las lecturas alternan entre las réplicas"""
+        names = [repository.get_all()[0].name for _ in range(4)]
+
+        assert names == ['replica a', 'replica b', 'replica a', 'replica b']
+
+    def test_writes_and_pinned_reads_use_primary(self, repository):
+        """Prueba que las escrituras y las lecturas previas a una escritura van al primario"""
+        repository.create(name='nuevo', email='nuevo@farmacia.com', phone='3001234567')
+
+        assert repository.get_by_email('nuevo@farmacia.com', use_primary=True).name == 'nuevo'
+        assert repository.get_by_email('nuevo@farmacia.com') is None
+        assert repository.get_by_email('primary@farmacia.com', use_primary=True).name == 'primary'
+
+    def test_unavailable_replica_falls_back(self, repository):
+        """Prueba que una réplica que no conecta sale de la rotación sin que falle la lectura"""
+        replica_a = repository.replicas.replicas[0]
+        with patch.object(replica_a.engine, 'connect', side_effect=OperationalError('SELECT 1', {}, Exception('caída'))):
+            names = [repository.get_all()[0].name for _ in range(3)]
+
+        assert names == ['replica b', 'replica b', 'replica b']
+        assert replica_a.healthy is False
+        assert 'caída' in replica_a.last_error
+
+    def test_all_replicas_down_uses_primary(self, repository):
+        """Prueba que sin réplicas disponibles las lecturas usan el primario"""
+        for replica in repository.replicas.replicas:
+            repository.replicas.mark_down(replica, Exception('caída'))
+
+        assert repository.count_all() == 1
+        assert repository.get_all()[0].name == 'primary'
+
+    def test_check_restores_replica(self, repository):
+        """Prueba que la verificación devuelve a la rotación una réplica recuperada y mide su latencia"""
+        replica_a = repository.replicas.replicas[0]
+        repository.replicas.mark_down(replica_a, Exception('caída'))
+
+        repository.replicas.check()
+
+        assert replica_a.healthy is True
+        assert replica_a.latency_ms is not None
+        assert repository.replicas.snapshot()[0]['error'] is None
+
+    def test_retry_after_down_period(self, databases):
+        """Prueba que una réplica caída se vuelve a intentar tras DATABASE_READ_RETRY_SECONDS"""
+        replica_set = ReplicaSet([get_engine(databases['replica_a'])], replica_config(DATABASE_READ_RETRY_SECONDS=0))
+
+        replica_set.mark_down(replica_set.replicas[0], Exception('caída'))
+
+        assert replica_set.choose() is replica_set.replicas[0]
+
+    def test_least_latency(self, databases):
+        """Prueba que least_latency elige la réplica con menor latencia medida"""
+        replica_set = ReplicaSet(
+            [get_engine(databases['replica_a']), get_engine(databases['replica_b'])],
+            replica_config(DATABASE_READ_STRATEGY='least_latency')
+        )
+        replica_set.replicas[0].latency_ms = 12.0
+        replica_set.replicas[1].latency_ms = 3.0
+
+        assert replica_set.choose() is replica_set.replicas[1]
+
+    def test_invalid_strategy(self, databases):
+        """Prueba que una estrategia desconocida se rechaza"""
+        with pytest.raises(ValueError):
+            ReplicaSet([get_engine(databases['replica_a'])], replica_config(DATABASE_READ_STRATEGY='random'))
+
+    def test_lagging_replica_taken_out(self, databases):
+        """Prueba que una réplica con más retraso que DATABASE_READ_MAX_LAG_SECONDS sale de la rotación"""
+        replica_set = ReplicaSet([get_engine(databases['replica_a'])], replica_config(DATABASE_READ_MAX_LAG_SECONDS=30))
+
+        with patch.object(replica_set, '_probe', return_value=(2.0, 90.0)):
+            replica_set.check()
+
+        assert replica_set.replicas[0].healthy is False
+        assert replica_set.snapshot()[0]['lag_seconds'] == 90.0
+        assert replica_set.choose() is None
@@ -0,0 +1,222 @@
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from flask import Flask
+from flask_restful import Api
+from app.config.settings import Config
+from app.controllers.admin_controller import CacheStatsController
+from app.controllers.provider_controller import ProviderController
+from app.repositories.migrations import upgrade_database
+from app.repositories.provider_repository import ProviderRepository
+from app.services.cloud_storage_service import CloudStorageService
+from app.services.provider_service import ProviderService
+from app.utils.collection_version import CollectionVersion
+from app.utils.response_cache import ResponseCache, get_list_cache
+
+
+@pytest.fixture
+def collection():
+    return CollectionVersion('prueba')
+
+
+@pytest.fixture
+def cache(collection):
+    cache = ResponseCache('prueba', collection, max_entries=3, max_bytes=100)
+    yield cache
+    cache.close()
+
+
+class TestResponseCache:
+    """Pruebas unitarias para ResponseCache"""
+
+    def test_hit_and_miss(self, cache, collection):
+        """Prueba que se sirve el cuerpo guardado y se cuentan aciertos y fallos"""
+        assert cache.get('a') is None
+        assert cache.put('a', '{"a": 1}', collection.value, time.time() + 60)
+
+        assert cache.get('a') == '{"a": 1}'
+        snapshot = cache.snapshot()
+        assert (snapshot['hits'], snapshot['misses'], snapshot['entries']) == (1, 1, 1)
+        assert snapshot['hit_rate'] == 0.5
+
+    def test_write_invalidates(self, cache, collection):
+        """Prueba que una escritura de la colección vacía la caché"""
+        cache.put('a', 'cuerpo', collection.value, time.time() + 60)
+
+        collection.bump('create')
+
+        assert cache.get('a') is None
+        assert cache.snapshot()['invalidations'] == 1
+
+    def test_stale_computation_not_stored(self, cache, collection):
+        """Prueba que un cuerpo calculado antes de una escritura no se guarda después de ella"""
+        version = collection.value
+        collection.bump('delete')
+
+        assert cache.put('a', 'cuerpo', version, time.time() + 60) is False
+        assert cache.get('a') is None
+
+    def test_expired_entry(self, cache, collection):
+        """Prueba que una entrada vencida no se sirve"""
+        cache.put('a', 'cuerpo', collection.value, time.time() + 60)
+
+        with patch('app.utils.response_cache.time.time', return_value=time.time() + 61):
+            assert cache.get('a') is None
+        assert cache.snapshot()['expirations'] == 1
+
+    def test_bounded_by_entries_and_bytes(self, cache, collection):
+        """Prueba que se descartan las entradas menos usadas al exceder entradas o bytes"""
+        expires_at = time.time() + 60
+        for key in ('a', 'b', 'c'):
+            cache.put(key, 'x' * 10, collection.value, expires_at)
+        cache.get('a')
+        cache.put('d', 'x' * 10, collection.value, expires_at)
+
+        assert cache.get('b') is None
+        cache.put('e', 'x' * 80, collection.value, expires_at)
+        snapshot = cache.snapshot()
+        assert list(cache._entries) == ['a', 'd', 'e']
+        assert snapshot['bytes'] == 100
+        assert snapshot['evictions'] == 2
+        assert cache.put('f', 'x' * 101, collection.value, expires_at) is False
+
+    def test_stamp_change_discards_entry(self, cache, collection):
+        """Prueba que una entrada guardada con otra marca compartida no se sirve"""
+        cache.put('a', 'cuerpo', collection.value, time.time() + 60, stamp=(1, 'x'))
+
+        assert cache.get('a', (1, 'x')) == 'cuerpo'
+        assert cache.get('a', (2, 'y')) is None
+        assert cache.snapshot()['stale'] == 1
+
+
+class TestProviderListCache:
+    """Pruebas de la caché de páginas en GET /providers"""
+
+    @pytest.fixture
+    def backend(self):
+        backend = MagicMock()
+        backend.exists.return_value = True
+        backend.sign.return_value = 'https://firmada/logo.png'
+        return backend
+
+    @pytest.fixture
+    def database_url(self, tmp_path):
+        # Base en archivo: las dos instancias de la prueba de lectura tras escritura la comparten
+        return f"sqlite:///{tmp_path / 'providers.db'}"
+
+    @pytest.fixture
+    def repository(self, database_url):
+        with patch('app.repositories.provider_repository.Config.SQLALCHEMY_DATABASE_URI', database_url):
+            repository = ProviderRepository()
+        upgrade_database(repository.engine)
+        repository.create(name='Farmacia Uno', email='uno@farmacia.com', phone='3001234567')
+        return repository
+
+    @staticmethod
+    def make_app(repository, backend) -> Flask:
+        service = ProviderService(
+            provider_repository=repository,
+            cloud_storage_service=CloudStorageService(Config(), storage_backend=backend)
+        )
+        app = Flask(__name__)
+        api = Api(app)
+        api.add_resource(
+            ProviderController, '/providers', '/providers/<string:provider_id>',
+            resource_class_kwargs={'provider_service': service}
+        )
+        api.add_resource(CacheStatsController, '/providers/admin/cache')
+        return app
+
+    @pytest.fixture
+    def client(self, repository, backend):
+        repository.get_all = MagicMock(wraps=repository.get_all)
+        app = self.make_app(repository, backend)
+        with patch.object(Config, 'ADMIN_TOKEN', 'secreto'), patch.object(Config, 'RESPONSE_CACHE_ENABLED', True):
+            yield app.test_client()
+
+    def test_disabled_by_default(self, repository, backend):
+        """Prueba que sin RESPONSE_CACHE_ENABLED las páginas no se guardan"""
+        client = self.make_app(repository, backend).test_client()
+
+        response = client.get('/providers')
+
+        assert response.status_code == 200
+        assert 'X-Cache' not in response.headers
+        assert get_list_cache(Config) is None
+
+    def test_second_request_served_from_cache(self, client, repository):
+        """Prueba que la misma página con parámetros equivalentes se sirve sin consultar la base"""
+        first = client.get('/providers?page=1&per_page=10')
+        second = client.get('/providers?per_page=10')
+
+        assert first.headers['X-Cache'] == 'MISS'
+        assert second.headers['X-Cache'] == 'HIT'
+        assert second.get_json() == first.get_json()
+        assert repository.get_all.call_count == 1
+
+    def test_create_invalidates(self, client, repository):
+        """Prueba que crear un proveedor invalida las páginas guardadas"""
+        client.get('/providers')
+        repository.create(name='Farmacia Dos', email='dos@farmacia.com', phone='3001234568')
+
+        response = client.get('/providers')
+
+        assert response.headers['X-Cache'] == 'MISS'
+        assert response.get_json()['data']['pagination']['total'] == 2
+
+    def test_read_after_write_in_other_instance(self, client, database_url, backend):
+        """Prueba que una escritura hecha en otra instancia se ve en la siguiente lectura de esta"""
+        with patch('app.repositories.provider_repository.Config.SQLALCHEMY_DATABASE_URI', database_url):
+            other_repository = ProviderRepository()
+        other = self.make_app(other_repository, backend).test_client()
+        client.get('/providers')
+        assert client.get('/providers').headers['X-Cache'] == 'HIT'
+
+        # La otra instancia tiene su propia versión de la colección: no vacía la caché de esta
+        with patch('app.repositories.provider_repository.providers_version', CollectionVersion('otra')):
+            created = other.post('/providers', json={
+                'name': 'Farmacia Dos', 'email': 'dos@farmacia.com', 'phone': '3001234568'
+            })
+            assert created.status_code == 201
+            response = client.get('/providers')
+            assert response.headers['X-Cache'] == 'MISS'
+            assert response.get_json()['data']['pagination']['total'] == 2
+
+            provider_id = created.get_json()['data']['id']
+            assert other.delete(f'/providers/{provider_id}').status_code == 200
+            response = client.get('/providers')
+            assert response.headers['X-Cache'] == 'MISS'
+            assert response.get_json()['data']['pagination']['total'] == 1
+
+    def test_expires_before_signed_urls(self, client, repository):
+        """Prueba que la página con logos vence antes que su primera URL firmada"""
+        repository.create(name='Farmacia Logo', email='logo@farmacia.com', phone='3001234569', logo_filename='logo.png')
+
+        with patch.object(Config, 'RESPONSE_CACHE_TTL_SECONDS', 10 ** 9):
+            client.get('/providers')
+        entry = next(iter(get_list_cache(Config)._entries.values()))
+
+        assert entry.expires_at <= time.time() + 168 * 3600 - Config.RESPONSE_CACHE_URL_MARGIN_SECONDS
+
+    def test_public_fallback_url_not_cached(self, client, backend, repository):
+        """Prueba que una página con una URL sin vencimiento conocido no se guarda"""
+        repository.create(name='Farmacia Logo', email='logo@farmacia.com', phone='3001234569', logo_filename='logo.png')
+        backend.exists.side_effect = Exception("timeout")
+        backend.public_url.return_value = 'https://publica/logo.png'
+
+        client.get('/providers')
+
+        assert client.get('/providers').headers['X-Cache'] == 'MISS'
+
+    def test_admin_stats_and_clear(self, client):
+        """Prueba las estadísticas y el vaciado de la caché del worker"""
+        client.get('/providers')
+        client.get('/providers')
+        headers = {'X-Admin-Token': 'secreto'}
+
+        stats = client.get('/providers/admin/cache', headers=headers).get_json()['data']
+        cleared = client.delete('/providers/admin/cache', headers=headers).get_json()['data']
+
+        assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+        assert cleared == {'cleared': 1}
+        assert client.get('/providers').headers['X-Cache'] == 'MISS'
@@ -0,0 +1,140 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from sqlalchemy.exc import IntegrityError, OperationalError
+from app.config.settings import Config
+from app.exceptions.custom_exceptions import DatabaseError
+from app.repositories.migrations import upgrade_database
+from app.repositories.provider_repository import ProviderRepository
+from app.repositories.retry import (
+    classify_error, backoff_delay, retry_transient, IDEMPOTENT, NON_IDEMPOTENT, DISCONNECT, CONFLICT
+)
+
+
+def db_error(sqlstate=None, message='error', invalidated=False, error_class=OperationalError):
+    orig = Exception(message)
+    orig.pgcode = sqlstate
+    return error_class('SELECT 1', {}, orig, connection_invalidated=invalidated)
+
+
+def failing_operation(*errors, result='ok'):
+    """Operación que lanza los errores indicados (como DatabaseError con causa) y luego retorna result"""
+    remaining = list(errors)
+
+    def operation():
+        if remaining:
+            error = remaining.pop(0)
+            raise DatabaseError(f"Error al obtener proveedores: {error}") from error
+        return result
+    return MagicMock(side_effect=operation)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep():
+    with patch('app.repositories.retry.time.sleep') as mock_sleep:
+        yield mock_sleep
+
+
+class TestRetry:
+    """Pruebas unitarias para los reintentos ante errores transitorios"""
+
+    @pytest.mark.parametrize('error, reason', [
+        (db_error(invalidated=True), DISCONNECT),
+        (db_error('40001'), CONFLICT),
+        (db_error('40P01'), CONFLICT),
+        (db_error('08006'), DISCONNECT),
+        (db_error('57P01'), DISCONNECT),
+        (db_error('23505', error_class=IntegrityError), None),
+        (db_error(message='database is locked'), CONFLICT),
+        (db_error(message='no such table: providers'), None),
+        (ValueError('dato inválido'), None)
+    ])
+    def test_classify_error(self, error, reason):
+        """Prueba la clasificación de errores transitorios"""
+        assert classify_error(error) == reason
+
+    def test_retries_idempotent_operation(self, no_sleep):
+        """Prueba que una lectura se repite tras una desconexión y registra los reintentos"""
+        operation = failing_operation(db_error(invalidated=True), db_error('40001'))
+
+        with patch('app.repositories.retry.metrics.record_db_retry') as mock_record:
+            result = retry_transient('get_all', IDEMPOTENT)(operation)()
+
+        assert result == 'ok'
+        assert operation.call_count == 3
+        assert no_sleep.call_count == 2
+        assert [c.args for c in mock_record.call_args_list] == [('get_all', DISCONNECT), ('get_all', CONFLICT)]
+
+    def test_write_not_retried_after_disconnect(self):
+        """Prueba que una escritura no idempotente no se repite si no se sabe si se aplicó"""
+        operation = failing_operation(db_error(invalidated=True))
+
+        with pytest.raises(DatabaseError):
+            retry_transient('delete_by_id', NON_IDEMPOTENT)(operation)()
+
+        assert operation.call_count == 1
+
+    def test_non_transient_error_not_retried(self):
+        """Prueba que los errores que no son transitorios se propagan de inmediato"""
+        operation = failing_operation(db_error('23505', error_class=IntegrityError))
+
+        with pytest.raises(DatabaseError):
+            retry_transient('get_all', IDEMPOTENT)(operation)()
+
+        assert operation.call_count == 1
+
+    def test_attempts_exhausted(self):
+        """Prueba que tras DB_RETRY_MAX_ATTEMPTS se propaga el error y se registra como agotado"""
+        operation = failing_operation(*[db_error('40001')] * 5)
+
+        with patch('app.repositories.retry.metrics.record_db_retry') as mock_record:
+            with pytest.raises(DatabaseError):
+                retry_transient('get_all', IDEMPOTENT)(operation)()
+
+        assert operation.call_count == Config.DB_RETRY_MAX_ATTEMPTS
+        assert mock_record.call_args_list[-1].kwargs == {'exhausted': True}
+
+    def test_budget_exceeded(self):
+        """Prueba que no se reintenta si la espera excede DB_RETRY_BUDGET_MS"""
+        operation = failing_operation(db_error('40001'))
+
+        with patch('app.repositories.retry.backoff_delay', return_value=5.0):
+            with pytest.raises(DatabaseError):
+                retry_transient('get_all', IDEMPOTENT)(operation)()
+
+        assert operation.call_count == 1
+
+    def test_backoff_delay_full_jitter(self):
+        """Prueba que la espera es uniforme entre 0 y el backoff exponencial acotado"""
+        with patch('app.repositories.retry.random.uniform', side_effect=lambda low, high: high) as mock_uniform:
+            assert backoff_delay(1) == Config.DB_RETRY_BASE_DELAY_MS / 1000
+            assert backoff_delay(3) == Config.DB_RETRY_BASE_DELAY_MS * 4 / 1000
+            assert backoff_delay(20) == Config.DB_RETRY_MAX_DELAY_MS / 1000
+
+        assert mock_uniform.call_args.args[0] == 0
+
+    def test_create_recognizes_committed_attempt(self):
+        """Prueba que un create repetido tras perder la conexión en el COMMIT no duplica el proveedor"""
+        with patch('app.repositories.provider_repository.Config.SQLALCHEMY_DATABASE_URI', 'sqlite://'):
+            repository = ProviderRepository()
+        upgrade_database(repository.engine)
+        get_session = repository._get_session
+        sessions = []
+
+        def flaky_session(*args, **kwargs):
+            session = get_session(*args, **kwargs)
+            if not sessions:
+                commit = session.commit
+
+                def commit_then_disconnect():
+                    commit()
+                    raise db_error(message='server closed the connection unexpectedly', invalidated=True)
+                session.commit = commit_then_disconnect
+            sessions.append(session)
+            return session
+
+        with patch.object(repository, '_get_session', side_effect=flaky_session):
+            provider = repository.create(name='Farmacia Uno', email='uno@farmacia.com', phone='3001234567')
+
+        assert len(sessions) == 2
+        assert repository.count_all() == 1
+        assert repository.get_by_id(provider.id).email == 'uno@farmacia.com'
@@ -0,0 +1,157 @@
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+from app.config.settings import Config
+from app.services.provider_service import ProviderService
+from app.utils.collection_version import providers_version
+from app.utils.single_flight import SingleFlight
+
+
+def wait_for_calls(mock_record, count):
+    """Espera a que count threads hayan pedido su clave (líder o no)"""
+    while mock_record.call_count < count:
+        pass
+
+
+def start_followers(group, key, function, count):
+    """Lanza count threads que piden la misma clave"""
+    results = []
+
+    def call():
+        try:
+            results.append(group.do(key, function))
+        except Exception as e:
+            results.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+class TestSingleFlight:
+    """Pruebas unitarias para SingleFlight"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Prueba que las llamadas concurrentes con la misma clave ejecutan la función una vez"""
+        group = SingleFlight('prueba')
+        release = threading.Event()
+        calls = []
+
+        def slow_read():
+            calls.append(1)
+            release.wait(5)
+            return ['proveedor']
+
+        with patch('app.utils.single_flight.metrics.record_cache_access') as mock_record:
+            threads, results = start_followers(group, 'page-1', slow_read, 5)
+            wait_for_calls(mock_record, 5)
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        assert len(calls) == 1
+        assert results == [['proveedor']] * 5
+        assert all(result is results[0] for result in results)
+        assert group.in_flight == 0
+
+    def test_error_shared_and_key_released(self):
+        """Prueba que los que esperan reciben la excepción del líder y la clave se libera"""
+        group = SingleFlight('prueba')
+        release = threading.Event()
+
+        def failing():
+            release.wait(5)
+            raise RuntimeError("base de datos caída")
+
+        with patch('app.utils.single_flight.metrics.record_cache_access') as mock_record:
+            threads, results = start_followers(group, 'page-1', failing, 3)
+            wait_for_calls(mock_record, 3)
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert group.do('page-1', lambda: 'ok') == 'ok'
+
+    def test_different_keys_run_independently(self):
+        """Prueba que claves distintas no se agrupan"""
+        group = SingleFlight('prueba')
+
+        assert group.do('a', lambda: 1) == 1
+        assert group.do('b', lambda: 2) == 2
+
+    def test_records_followers_as_hits(self):
+        """Prueba que el líder cuenta como fallo y los que se unen como aciertos"""
+        group = SingleFlight('prueba')
+        release = threading.Event()
+
+        with patch('app.utils.single_flight.metrics.record_cache_access') as mock_record:
+            threads, _ = start_followers(group, 'k', lambda: release.wait(5), 3)
+            wait_for_calls(mock_record, 3)
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        assert sorted(c.kwargs['hit'] for c in mock_record.call_args_list) == [False, True, True]
+
+
+class TestProviderServiceCoalescing:
+    """Pruebas de la agrupación de lecturas en ProviderService"""
+
+    @pytest.fixture
+    def repository(self):
+        repository = MagicMock()
+        release = threading.Event()
+        repository.release = release
+
+        def get_all(limit=None, offset=0, fields=None):
+            release.wait(5)
+            return []
+        repository.get_all.side_effect = get_all
+        return repository
+
+    def read_concurrently(self, repository, count):
+        threads = [
+            threading.Thread(target=ProviderService(provider_repository=repository).get_all, args=(10, 0))
+            for _ in range(count)
+        ]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def test_identical_page_reads_coalesced(self, repository):
+        """Prueba que varias peticiones de la misma página consultan el repositorio una vez"""
+        with patch('app.utils.single_flight.metrics.record_cache_access') as mock_record:
+            threads = self.read_concurrently(repository, 4)
+            wait_for_calls(mock_record, 4)
+            repository.release.set()
+            for thread in threads:
+                thread.join()
+
+        repository.get_all.assert_called_once_with(limit=10, offset=0, fields=None)
+
+    def test_write_starts_new_flight(self, repository):
+        """Prueba que una lectura que empieza después de una escritura no reutiliza la anterior"""
+        first = self.read_concurrently(repository, 1)
+        while repository.get_all.call_count < 1:
+            pass
+        providers_version.bump('create')
+        second = self.read_concurrently(repository, 1)
+        while repository.get_all.call_count < 2:
+            pass
+        repository.release.set()
+        for thread in first + second:
+            thread.join()
+
+        assert repository.get_all.call_count == 2
+
+    def test_disabled(self, repository):
+        """Prueba que con SINGLE_FLIGHT_ENABLED=False cada lectura consulta el repositorio"""
+        repository.release.set()
+        with patch.object(Config, 'SINGLE_FLIGHT_ENABLED', False):
+            service = ProviderService(provider_repository=repository)
+            service.get_all(10, 0)
+            service.get_all(10, 0)
+
+        assert repository.get_all.call_count == 2
@@ -0,0 +1,149 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from flask import Flask
+from flask_restful import Api
+from sqlalchemy import event
+from app.config.settings import Config
+from app.controllers.provider_controller import ProviderController
+from app.models.provider_model import Provider
+from app.repositories.migrations import upgrade_database
+from app.repositories.provider_repository import ProviderRepository
+from app.services.cloud_storage_service import CloudStorageService
+from app.services.provider_service import ProviderService
+
+
+@pytest.fixture
+def repository():
+    with patch('app.repositories.provider_repository.Config.SQLALCHEMY_DATABASE_URI', 'sqlite://'):
+        repository = ProviderRepository()
+    upgrade_database(repository.engine)
+    repository.create(name='Farmacia Uno', email='uno@farmacia.com', phone='3001234567', logo_filename='logo.png')
+    return repository
+
+
+@pytest.fixture
+def statements(repository):
+    """Sentencias SELECT ejecutadas por el repositorio"""
+    executed = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            executed.append(statement)
+    event.listen(repository.engine, 'before_cursor_execute', capture)
+    yield executed
+    event.remove(repository.engine, 'before_cursor_execute', capture)
+
+
+@pytest.fixture
+def backend():
+    backend = MagicMock()
+    backend.exists.return_value = True
+    backend.sign.return_value = 'https://firmada/logo.png'
+    return backend
+
+
+@pytest.fixture
+def service(repository, backend):
+    return ProviderService(
+        provider_repository=repository,
+        cloud_storage_service=CloudStorageService(Config(), storage_backend=backend)
+    )
+
+
+class TestSparseFields:
+    """Pruebas unitarias para fields= en el modelo, el repositorio y el servicio"""
+
+    @pytest.mark.parametrize('value, fields', [
+        (None, None),
+        ('', None),
+        ('name,id', ('id', 'name')),
+        (' logo_url , id,id ', ('id', 'logo_url'))
+    ])
+    def test_parse_fields(self, value, fields):
+        """Prueba que los campos se normalizan al orden de serialización"""
+        assert Provider.parse_fields(value) == fields
+
+    def test_parse_unknown_fields(self):
+        """Prueba que un campo inexistente se rechaza indicando los permitidos"""
+        with pytest.raises(ValueError, match="password.*Permitidos: id, name"):
+            Provider.parse_fields('id,password')
+
+    def test_to_dict_subset(self):
+        """Prueba que to_dict solo incluye los campos pedidos"""
+        provider = Provider(id='p1', name='Farmacia Uno', email='uno@farmacia.com')
+
+        assert provider.to_dict(('id', 'name')) == {'id': 'p1', 'name': 'Farmacia Uno'}
+
+    def test_repository_selects_only_requested_columns(self, repository, statements):
+        """Prueba que la selección de columnas llega a la consulta"""
+        providers = repository.get_all(limit=10, fields=('id', 'name'))
+
+        assert providers[0].to_dict(('id', 'name'))['name'] == 'Farmacia Uno'
+        select_clause = statements[-1].split('FROM')[0]
+        assert 'providers.name' in select_clause and 'providers.id' in select_clause
+        assert 'providers.email' not in select_clause and 'providers.logo_filename' not in select_clause
+
+    def test_repository_get_by_id_with_fields(self, repository):
+        """Prueba get_by_id con columnas y sin resultado"""
+        provider_id = repository.get_all()[0].id
+
+        assert repository.get_by_id(provider_id, fields=('email',)).email == 'uno@farmacia.com'
+        assert repository.get_by_id('no-existe', fields=('email',)) is None
+
+    def test_summary_without_logo_url_skips_signing(self, service, backend):
+        """Prueba que sin logo_url no se consulta el almacenamiento"""
+        summary = service.get_providers_summary(limit=10, fields=('id', 'name'))
+
+        assert list(summary[0]) == ['id', 'name']
+        backend.exists.assert_not_called()
+        backend.sign.assert_not_called()
+
+    def test_logo_url_reads_filename_and_signs(self, service, backend, statements):
+        """Prueba que pedir logo_url lee logo_filename para firmar pero no lo retorna"""
+        summary = service.get_providers_summary(limit=10, fields=('name', 'logo_url'))
+
+        assert summary == [{'name': 'Farmacia Uno', 'logo_url': 'https://firmada/logo.png'}]
+        assert 'providers.logo_filename' in statements[-1].split('FROM')[0]
+        backend.sign.assert_called_once()
+
+
+class TestSparseFieldsEndpoint:
+    """Pruebas de fields= en GET /providers y GET /providers/{id}"""
+
+    @pytest.fixture
+    def client(self, service):
+        app = Flask(__name__)
+        Api(app).add_resource(
+            ProviderController, '/providers', '/providers/<string:provider_id>',
+            resource_class_kwargs={'provider_service': service}
+        )
+        return app.test_client()
+
+    def test_list_and_detail(self, client, repository, backend):
+        """Prueba que el listado y el detalle retornan solo los campos pedidos"""
+        provider_id = repository.get_all()[0].id
+
+        listing = client.get('/providers?fields=id,name').get_json()['data']
+        detail = client.get(f'/providers/{provider_id}?fields=name,created_at').get_json()['data']
+
+        assert listing['providers'] == [{'id': provider_id, 'name': 'Farmacia Uno'}]
+        assert listing['pagination']['total'] == 1
+        assert list(detail) == ['name', 'created_at']
+        backend.sign.assert_not_called()
+
+    def test_fieldsets_cached_separately(self, client):
+        """Prueba que la caché de páginas distingue los campos pedidos"""
+        with patch.object(Config, 'RESPONSE_CACHE_ENABLED', True):
+            client.get('/providers?fields=id')
+
+            response = client.get('/providers?fields=name')
+
+        assert response.headers['X-Cache'] == 'MISS'
+        assert response.get_json()['data']['providers'] == [{'name': 'Farmacia Uno'}]
+
+    def test_unknown_field(self, client):
+        """Prueba que un campo inexistente responde 400"""
+        response = client.get('/providers?fields=id,password')
+
+        assert response.status_code == 400
+        assert 'password' in response.get_json()['error']
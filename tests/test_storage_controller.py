@@ -0,0 +1,122 @@
+"""
+Pruebas para el controlador de archivos de los backends locales
+"""
+import io
+import pytest
+from datetime import timedelta
+from urllib.parse import urlparse
+from unittest.mock import MagicMock
+from flask import Flask
+from app.controllers.storage_controller import LocalStorageController
+from app.storage.local_storage import LocalStorageBackend, UrlSigner
+from app.storage.memory_storage import MemoryStorageBackend
+
+
+class TestLocalStorageController:
+    """Pruebas unitarias para LocalStorageController"""
+
+    @pytest.fixture
+    def app(self):
+        """Fixture para aplicación Flask"""
+        app = Flask(__name__)
+        app.config['TESTING'] = True
+        return app
+
+    @pytest.fixture
+    def config(self):
+        """Configuración mock"""
+        config = MagicMock()
+        config.MAX_CONTENT_LENGTH = 1024
+        config.LOCAL_STORAGE_X_ACCEL_PREFIX = ''
+        return config
+
+    @pytest.fixture
+    def backend(self, tmp_path):
+        """Backend local con un logo guardado"""
+        backend = LocalStorageBackend(str(tmp_path), UrlSigner('test-secret', '/providers/files'))
+        backend.put('providers/logo.png', io.BytesIO(b'png-bytes'), 'image/png')
+        return backend
+
+    def _signed_path(self, backend, method='GET', content_type=None, expiration=timedelta(minutes=5)):
+        url = urlparse(backend.sign('providers/logo.png', expiration, method, content_type))
+        return f"{url.path}?{url.query}"
+
+    def test_get_serves_file_with_valid_signature(self, app, backend, config):
+        """Prueba la descarga con firma válida"""
+        controller = LocalStorageController(storage_backend=backend, config=config)
+
+        with app.test_request_context(self._signed_path(backend)):
+            response = controller.get('providers/logo.png')
+            response.direct_passthrough = False
+
+        assert response.status_code == 200
+        assert response.mimetype == 'image/png'
+        assert response.get_data() == b'png-bytes'
+
+    def test_get_uses_x_accel_redirect(self, app, backend, config):
+        """Prueba que se delega la transferencia al proxy cuando está configurado"""
+        config.LOCAL_STORAGE_X_ACCEL_PREFIX = '/protected-uploads/'
+        controller = LocalStorageController(storage_backend=backend, config=config)
+
+        with app.test_request_context(self._signed_path(backend)):
+            response = controller.get('providers/logo.png')
+
+        assert response.headers['X-Accel-Redirect'] == '/protected-uploads/providers/logo.png'
+        assert response.headers['Content-Type'] == 'image/png'
+
+    def test_get_rejects_invalid_signature(self, app, backend, config):
+        """Prueba que se rechazan firmas inválidas o expiradas"""
+        controller = LocalStorageController(storage_backend=backend, config=config)
+
+        with app.test_request_context('/providers/files/providers/logo.png?expires=1&signature=x'):
+            result = controller.get('providers/logo.png')
+
+        assert result[1] == 403
+
+        with app.test_request_context(self._signed_path(backend, expiration=timedelta(seconds=-5))):
+            result = controller.get('providers/logo.png')
+
+        assert result[1] == 403
+
+    def test_get_serves_memory_backend(self, app, config):
+        """Prueba la descarga desde el backend en memoria"""
+        backend = MemoryStorageBackend(UrlSigner('test-secret', '/providers/files'))
+        backend.put('providers/logo.png', io.BytesIO(b'mem'), 'image/png')
+        controller = LocalStorageController(storage_backend=backend, config=config)
+
+        with app.test_request_context(self._signed_path(backend)):
+            response = controller.get('providers/logo.png')
+            response.direct_passthrough = False
+
+        assert response.get_data() == b'mem'
+
+    def test_get_not_available_for_remote_backends(self, app, config):
+        """Prueba que los backends sin firmador local no se sirven por la API"""
+        controller = LocalStorageController(storage_backend=MagicMock(spec=['stat', 'get']), config=config)
+
+        with app.test_request_context('/providers/files/providers/logo.png'):
+            result = controller.get('providers/logo.png')
+
+        assert result[1] == 404
+
+    def test_put_with_signed_upload_url(self, app, backend, config):
+        """Prueba la subida directa con URL de subida firmada"""
+        controller = LocalStorageController(storage_backend=backend, config=config)
+        path = self._signed_path(backend, method='PUT', content_type='image/png')
+
+        with app.test_request_context(path, method='PUT', data=b'new-bytes', content_type='image/png'):
+            result = controller.put('providers/logo.png')
+
+        assert result[1] == 200
+        assert backend.get('providers/logo.png') == b'new-bytes'
+
+    def test_put_rejects_other_content_type_and_large_files(self, app, backend, config):
+        """Prueba que la subida valida tipo de contenido firmado y tamaño"""
+        controller = LocalStorageController(storage_backend=backend, config=config)
+        path = self._signed_path(backend, method='PUT', content_type='image/png')
+
+        with app.test_request_context(path, method='PUT', data=b'x', content_type='text/html'):
+            assert controller.put('providers/logo.png')[1] == 403
+
+        with app.test_request_context(path, method='PUT', data=b'x' * 2048, content_type='image/png'):
+            assert controller.put('providers/logo.png')[1] == 413
@@ -0,0 +1,75 @@
+import json
+import logging
+import pytest
+from flask import Flask
+from app.utils.timing import span, timed, current_timing, init_request_timing, _NULL_SPAN
+
+
+class TestTiming:
+    """Pruebas unitarias para la medición de tiempos por petición"""
+    
+    def _make_app(self, enabled):
+        """Aplicación mínima con una ruta instrumentada"""
+        app = Flask(__name__)
+        init_request_timing(app, enabled)
+        
+        @timed('db.get_all')
+        def query():
+            return ['a', 'b']
+        
+        @app.route('/items')
+        def items():
+            rows = query()
+            for _ in rows:
+                with span('storage.sign'):
+                    pass
+            return {'items': rows}
+        
+        return app
+    
+    def test_span_is_noop_without_active_timing(self):
+        """Prueba que sin medición activa span retorna el context manager nulo"""
+        assert current_timing() is None
+        assert span('db.get_all') is _NULL_SPAN
+    
+    def test_timed_calls_function_without_active_timing(self):
+        """Prueba que el decorador no altera el resultado sin medición activa"""
+        @timed('db.count_all')
+        def count():
+            return 7
+        
+        assert count() == 7
+    
+    def test_server_timing_header_with_phases(self):
+        """Prueba que la respuesta incluye las fases y su número de llamadas"""
+        client = self._make_app(enabled=True).test_client()
+        
+        response = client.get('/items')
+        
+        header = response.headers['Server-Timing']
+        assert 'db.get_all;dur=' in header
+        assert 'storage.sign;dur=' in header and 'desc="x2"' in header
+        assert 'total;dur=' in header
+        assert current_timing() is None
+    
+    def test_structured_log_line(self, caplog):
+        """Prueba que cada petición emite una línea de log JSON con las fases"""
+        client = self._make_app(enabled=True).test_client()
+        
+        with caplog.at_level(logging.INFO, logger='app.timing'):
+            client.get('/items')
+        
+        entry = json.loads(caplog.records[-1].getMessage())
+        assert entry['event'] == 'request_timing'
+        assert entry['path'] == '/items'
+        assert entry['status'] == 200
+        assert entry['phases']['storage.sign']['count'] == 2
+    
+    def test_disabled_registers_no_hooks(self):
+        """Prueba que deshabilitado no agrega header ni hooks"""
+        app = self._make_app(enabled=False)
+        
+        response = app.test_client().get('/items')
+        
+        assert 'Server-Timing' not in response.headers
+        assert not app.before_request_funcs
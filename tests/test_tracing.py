@@ -0,0 +1,113 @@
+import sys
+import pytest
+from unittest.mock import MagicMock, patch
+from flask import Flask
+from sqlalchemy import create_engine, text
+from app.utils import tracing
+from app.utils.timing import timed, set_phase_tracer
+
+TRACE_ID = '4bf92f3577b34da6a3ce929d0e0e4736'
+TRACEPARENT = f'00-{TRACE_ID}-00f067aa0ba902b7-01'
+
+
+class TestTracing:
+    """Pruebas unitarias para las trazas OpenTelemetry"""
+    
+    @pytest.fixture
+    def engine(self):
+        """Engine SQLite en memoria instrumentado"""
+        engine = create_engine('sqlite://')
+        tracing.instrument_engine(engine)
+        yield engine
+        engine.dispose()
+    
+    @pytest.fixture
+    def app(self, engine):
+        """Aplicación con trazas en memoria y una ruta que cruza servicio, repositorio y SQL"""
+        config = MagicMock(TRACING_ENABLED=True, TRACING_EXPORTER='memory', TRACING_SERVICE_NAME='providers-test')
+        app = Flask(__name__)
+        assert tracing.init_tracing(app, config)
+        
+        @timed('db.count_all')
+        def count():
+            with engine.connect() as connection:
+                return connection.execute(text('SELECT 1')).scalar()
+        
+        @timed('service.get_providers_count')
+        def service():
+            return count()
+        
+        @app.route('/providers/count')
+        def providers_count():
+            return {'total': service()}
+        
+        yield app
+        tracing._tracer = None
+        set_phase_tracer(None)
+    
+    def _spans(self):
+        return {span.name: span for span in tracing.get_memory_exporter().get_finished_spans()}
+    
+    def test_disabled_does_nothing(self):
+        """Prueba que deshabilitado no configura tracer ni hooks"""
+        app = Flask(__name__)
+        
+        assert tracing.init_tracing(app, MagicMock(TRACING_ENABLED=False)) is False
+        assert not app.before_request_funcs
+        assert tracing.current_trace_id() is None
+    
+    def test_otlp_without_exporter_package(self, caplog):
+        """Prueba que sin el paquete del exportador OTLP la aplicación arranca sin trazas"""
+        app = Flask(__name__)
+        config = MagicMock(TRACING_ENABLED=True, TRACING_EXPORTER='otlp', TRACING_SERVICE_NAME='providers-test')
+        
+        with patch.dict(sys.modules, {'opentelemetry.exporter.otlp.proto.http.trace_exporter': None}):
+            assert tracing.init_tracing(app, config) is False
+        
+        assert not app.before_request_funcs
+        assert 'opentelemetry-exporter-otlp-proto-http' in caplog.text
+    
+    def test_otlp_exporter(self):
+        """Prueba que con TRACING_EXPORTER=otlp create_app arranca con el exportador OTLP"""
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+        from app import create_app
+        from app.config.settings import Config
+        
+        # El exportador real enviaría a localhost:4318; se reemplaza por uno en memoria con la misma interfaz
+        otlp_module = MagicMock(OTLPSpanExporter=InMemorySpanExporter)
+        with patch.dict(sys.modules, {'opentelemetry.exporter.otlp.proto.http.trace_exporter': otlp_module}), \
+                patch.object(Config, 'TRACING_ENABLED', True), patch.object(Config, 'TRACING_EXPORTER', 'otlp'):
+            app = create_app()
+        
+        try:
+            assert tracing._tracer is not None
+            assert app.test_client().get('/providers/ping').status_code == 200
+        finally:
+            tracing._tracer = None
+            set_phase_tracer(None)
+    
+    def test_propagates_w3c_trace_context(self, app):
+        """Prueba que el span de servidor continúa la traza del header traceparent"""
+        response = app.test_client().get('/providers/count', headers={'traceparent': TRACEPARENT})
+        
+        spans = self._spans()
+        server = spans['GET /providers/count']
+        assert format(server.context.trace_id, '032x') == TRACE_ID
+        assert format(server.parent.span_id, '016x') == '00f067aa0ba902b7'
+        assert server.attributes['http.status_code'] == 200
+        assert TRACE_ID in response.headers['traceparent']
+    
+    def test_layer_and_sql_spans_are_nested(self, app):
+        """Prueba la jerarquía petición > servicio > repositorio > SQL"""
+        app.test_client().get('/providers/count')
+        
+        spans = self._spans()
+        server = spans['GET /providers/count']
+        service = spans['service.get_providers_count']
+        repository = spans['db.count_all']
+        sql = spans['sql SELECT']
+        assert service.parent.span_id == server.context.span_id
+        assert repository.parent.span_id == service.context.span_id
+        assert sql.parent.span_id == repository.context.span_id
+        assert sql.attributes['db.statement'] == 'SELECT 1'
+        assert len({span.context.trace_id for span in spans.values()}) == 1
@@ -0,0 +1,97 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from flask import Flask
+from app.repositories.provider_repository import get_engine
+from app.utils import warmup
+from app.utils.warmup import init_warmup, run_warmup, start_warmup, wait_for_warmup, warmup_state
+
+
+@pytest.fixture(autouse=True)
+def reset_warmup():
+    """Cada prueba parte de un proceso sin calentar"""
+    with patch.dict(warmup._state, {'status': 'idle', 'steps': {}}):
+        yield
+        wait_for_warmup(5)
+
+
+@pytest.fixture
+def config(tmp_path):
+    return SimpleNamespace(
+        WARMUP_ENABLED=True,
+        WARMUP_POOL_CONNECTIONS=2,
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'warmup.db'}",
+        STORAGE_BACKEND='memory',
+        STORAGE_SIGNING_KEY='clave',
+        SECRET_KEY='secreto',
+        LOCAL_STORAGE_BASE_URL='/providers/files',
+        BUCKET_NAME='bucket',
+        UPLOAD_FOLDER='uploads',
+        FAKE_STORAGE_ROOT='.fake'
+    )
+
+
+class TestWarmup:
+    """Pruebas unitarias para el calentamiento tras el primer health check"""
+
+    def make_app(self, config):
+        app = Flask(__name__)
+        init_warmup(app, config)
+
+        @app.route('/providers/ping')
+        def ping():
+            return 'pong'
+
+        @app.route('/providers')
+        def providers():
+            return {'data': []}
+
+        return app
+
+    def test_run_warmup_steps(self, config):
+        """Prueba que se importan las dependencias, se abre el pool y se prepara el almacenamiento"""
+        steps = run_warmup(config)
+
+        assert list(steps) == ['imports', 'database', 'storage']
+        assert all(step['ok'] for step in steps.values())
+        assert get_engine(config.SQLALCHEMY_DATABASE_URI).pool.checkedin() == 2
+        assert warmup_state()['status'] == 'completed'
+
+    def test_failed_step_does_not_stop_others(self, config):
+        """Prueba que un paso fallido se registra y los demás se ejecutan"""
+        config.STORAGE_BACKEND = 'desconocido'
+
+        steps = run_warmup(config)
+
+        assert steps['database']['ok'] is True
+        assert steps['storage']['ok'] is False
+        assert 'desconocido' in steps['storage']['error']
+        assert warmup_state()['status'] == 'failed'
+
+    def test_first_health_check_triggers_once(self, config):
+        """Prueba que solo la primera respuesta de health check lanza el calentamiento"""
+        client = self.make_app(config).test_client()
+
+        with patch.object(warmup, 'run_warmup') as mock_run:
+            client.get('/providers/ping')
+            wait_for_warmup(5)
+            client.get('/providers/ping')
+
+        mock_run.assert_called_once_with(config)
+        assert start_warmup(config) is False
+
+    def test_other_paths_do_not_trigger(self, config):
+        """Prueba que las peticiones de negocio no lanzan el calentamiento"""
+        client = self.make_app(config).test_client()
+
+        client.get('/providers')
+
+        assert warmup_state()['status'] == 'idle'
+
+    def test_disabled(self, config):
+        """Prueba que sin WARMUP_ENABLED no se registra ningún hook"""
+        config.WARMUP_ENABLED = False
+        app = Flask(__name__)
+        init_warmup(app, config)
+
+        assert not app.after_request_funcs